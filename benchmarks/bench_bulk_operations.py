@@ -0,0 +1,114 @@
+"""Benchmark: batch storage methods against their one-at-a-time loops.
+
+Saves ``--subscriptions`` subscriptions spread over ``--channels`` channels,
+looks up every channel and every channel's subscriptions, then deletes the
+subscriptions: once with a loop of single-item calls (what the ABC defaults
+do) and once with the batch methods. Reports milliseconds per phase for the
+memory and SQLite backends.
+
+Usage:
+    python benchmarks/bench_bulk_operations.py [--subscriptions N] [--channels N]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from notify_mcp.core.storage_adapter import StorageAdapter
+from notify_mcp.models import Channel, Subscription
+from notify_mcp.storage.memory import InMemoryStorage
+from notify_mcp.storage.sqlite_storage import SQLiteStorage
+
+
+async def run_phases(
+    storage: StorageAdapter, subscriptions: list[Subscription], channel_ids: list[str], bulk: bool
+) -> dict[str, float]:
+    """Time save, channel lookup, subscription lookup and delete in milliseconds."""
+    timings = {}
+    subscription_ids = [subscription.id for subscription in subscriptions]
+
+    started = time.perf_counter()
+    if bulk:
+        await storage.save_subscriptions(subscriptions)
+    else:
+        for subscription in subscriptions:
+            await storage.save_subscription(subscription)
+    timings["save"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if bulk:
+        await storage.get_channels(channel_ids)
+    else:
+        for channel_id in channel_ids:
+            await storage.get_channel(channel_id)
+    timings["get channels"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if bulk:
+        await storage.get_subscriptions_by_channels(channel_ids)
+    else:
+        for channel_id in channel_ids:
+            await storage.get_subscriptions_by_channel(channel_id)
+    timings["subscriptions by channel"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if bulk:
+        await storage.delete_subscriptions(subscription_ids)
+    else:
+        for subscription_id in subscription_ids:
+            await storage.delete_subscription(subscription_id)
+    timings["delete"] = time.perf_counter() - started
+
+    return {phase: seconds * 1000 for phase, seconds in timings.items()}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscriptions", type=int, default=5000, help="subscriptions to save")
+    parser.add_argument("--channels", type=int, default=200, help="channels to spread them over")
+    args = parser.parse_args()
+
+    channel_ids = [f"channel-{i}" for i in range(args.channels)]
+    subscriptions = [
+        Subscription(
+            id=f"sub-{i}",
+            clientId=f"client-{i}",
+            channel=channel_ids[i % args.channels],
+            subscribedAt=datetime.now(),
+        )
+        for i in range(args.subscriptions)
+    ]
+
+    print(f"{'backend':<8} {'phase':<26} {'loop ms':>10} {'batch ms':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name in ("memory", "sqlite"):
+            results = []
+            for bulk in (False, True):
+                if name == "memory":
+                    storage: StorageAdapter = InMemoryStorage()
+                else:
+                    storage = SQLiteStorage(db_path=str(Path(tmpdir) / f"bench-{bulk}.db"))
+                    await storage.initialize()
+                for channel_id in channel_ids:
+                    await storage.save_channel(
+                        Channel(
+                            id=channel_id, name=channel_id, createdAt=datetime.now(), createdBy="b"
+                        )
+                    )
+                results.append(await run_phases(storage, subscriptions, channel_ids, bulk))
+                if isinstance(storage, SQLiteStorage):
+                    await storage.close()
+
+            loop, batch = results
+            for phase in loop:
+                print(
+                    f"{name:<8} {phase:<26} {loop[phase]:>10.1f} {batch[phase]:>10.1f} "
+                    f"{loop[phase] / batch[phase]:>7.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,125 @@
+"""Benchmark: change feed delivery latency between two storage instances.
+
+Two storage instances on the same database stand in for two server
+processes. One publishes ``--publishes`` notifications at ``--rate`` per
+second and announces them as the publish tool does; the other's change
+feed delivers them. Reports the time from the start of each save to its
+delivery, for SQLite at several poll intervals and, with ``--url``, for
+PostgreSQL LISTEN/NOTIFY.
+
+Usage:
+    python benchmarks/bench_change_feed.py [--publishes N] [--rate N] [--url postgresql://...]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from notify_mcp.core.storage_adapter import StorageAdapter
+from notify_mcp.models import Channel, Context, Information, Metadata, Notification, Sender
+from notify_mcp.storage.change_feed import create_change_feed
+from notify_mcp.storage.sqlite_storage import SQLiteStorage
+
+POLL_INTERVALS = (0.05, 0.01)
+
+
+def make_notification(i: int) -> Notification:
+    """Build a representative notification."""
+    return Notification(
+        sender=Sender(id="bench", name="Bench", role="dev"),
+        context=Context(theme="state-update", priority="medium", tags=["bench"]),
+        information=Information(title=f"Notification {i}", body="Benchmark body " * 8),
+        metadata=Metadata(id=f"bench-{i}", timestamp=datetime.now(), channel="bench", sequence=i),
+    )
+
+
+async def measure(
+    publisher: StorageAdapter, listener: StorageAdapter, publishes: int, rate: float, **options
+) -> tuple[float, float]:
+    """Publish through one store, return p50/p95 delivery latency (ms) at the other."""
+    saved_at: dict[str, float] = {}
+    latencies: list[float] = []
+    done = asyncio.Event()
+
+    async def on_remote(notifications: list[Notification]) -> None:
+        now = time.perf_counter()
+        for notification in notifications:
+            latencies.append((now - saved_at[notification.metadata.id]) * 1000)
+        if len(latencies) >= publishes:
+            done.set()
+
+    publisher_feed = create_change_feed(publisher, **options)
+    listener_feed = create_change_feed(listener, **options)
+    await listener_feed.start(on_remote)
+
+    for i in range(1, publishes + 1):
+        notification = make_notification(i)
+        publisher_feed.mark_local([notification])
+        # Polling can deliver before the save call returns, so time from its start
+        saved_at[notification.metadata.id] = time.perf_counter()
+        await publisher.save_notification(notification)
+        await publisher_feed.announce([notification])
+        await asyncio.sleep(1 / rate)
+
+    await asyncio.wait_for(done.wait(), timeout=30)
+    await listener_feed.stop()
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+async def open_sqlite(path: Path) -> tuple[SQLiteStorage, SQLiteStorage]:
+    """Two SQLite stores on one file with a 'bench' channel."""
+    stores = [SQLiteStorage(db_path=str(path)) for _ in range(2)]
+    for store in stores:
+        await store.initialize()
+    await stores[0].save_channel(
+        Channel(id="bench", name="Bench", createdAt=datetime.now(), createdBy="bench")
+    )
+    return stores[0], stores[1]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--publishes", type=int, default=300, help="notifications to publish")
+    parser.add_argument("--rate", type=float, default=50.0, help="publishes per second")
+    parser.add_argument("--url", help="PostgreSQL URL of a throwaway database")
+    args = parser.parse_args()
+
+    print(f"{'feed':<28} {'p50 ms':>8} {'p95 ms':>8}")
+    for interval in POLL_INTERVALS:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            publisher, listener = await open_sqlite(Path(tmpdir) / "shared.db")
+            p50, p95 = await measure(
+                publisher, listener, args.publishes, args.rate, poll_interval=interval
+            )
+            print(f"{f'sqlite poll {interval * 1000:.0f} ms':<28} {p50:>8.2f} {p95:>8.2f}")
+            await publisher.close()
+            await listener.close()
+
+    if args.url:
+        import asyncpg
+
+        from notify_mcp.storage.postgres_storage import PostgreSQLStorage
+
+        conn = await asyncpg.connect(args.url.replace("postgresql+asyncpg://", "postgresql://", 1))
+        await conn.execute("DROP TABLE IF EXISTS notifications, subscriptions, channels")
+        await conn.close()
+
+        stores = [PostgreSQLStorage(args.url) for _ in range(2)]
+        for store in stores:
+            await store.initialize()
+        await stores[0].save_channel(
+            Channel(id="bench", name="Bench", createdAt=datetime.now(), createdBy="bench")
+        )
+        p50, p95 = await measure(stores[0], stores[1], args.publishes, args.rate)
+        print(f"{'postgresql listen/notify':<28} {p50:>8.2f} {p95:>8.2f}")
+        for store in stores:
+            await store.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
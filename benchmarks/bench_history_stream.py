@@ -0,0 +1,95 @@
+"""Benchmark: peak memory of materialized versus streamed history reads.
+
+Stores ``--notifications`` notifications in one channel, then renders the
+whole history as a JSON array twice: once the way the recent-history
+resource does (one ``get_notifications_page`` list, dumped with
+``json.dumps``) and once through ``iter_notifications`` and the streaming
+JSON writer. Reports the peak memory allocated during each read
+(tracemalloc) and its duration, for the memory and SQLite backends.
+
+Usage:
+    python benchmarks/bench_history_stream.py [--notifications N] [--batch N]
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from notify_mcp.core.storage_adapter import StorageAdapter
+from notify_mcp.models import Channel, Context, Information, Metadata, Notification, Sender
+from notify_mcp.storage.memory import InMemoryStorage
+from notify_mcp.storage.sqlite_storage import SQLiteStorage
+from notify_mcp.utils.json_stream import iter_json_array
+
+
+def make_notification(i: int) -> Notification:
+    """Build a representative notification."""
+    return Notification(
+        sender=Sender(id="bench", name="Bench", role="dev"),
+        context=Context(theme="state-update", priority="medium", tags=["bench"]),
+        information=Information(title=f"Notification {i}", body="Benchmark body " * 8),
+        metadata=Metadata(id=f"bench-{i}", timestamp=datetime.now(), channel="bench", sequence=i),
+    )
+
+
+async def materialized(storage: StorageAdapter, count: int, batch: int) -> str:
+    """Read the history as one list and dump it."""
+    notifications = await storage.get_notifications_page("bench", limit=count)
+    return json.dumps(
+        [n.model_dump(mode="json", exclude_none=True) for n in reversed(notifications)],
+        indent=2,
+    )
+
+
+async def streamed(storage: StorageAdapter, count: int, batch: int) -> str:
+    """Stream the history through the JSON writer."""
+    buffer = io.StringIO()
+    async for chunk in iter_json_array(storage.iter_notifications("bench", batch_size=batch)):
+        buffer.write(chunk)
+    return buffer.getvalue()
+
+
+async def measure(read, storage: StorageAdapter, count: int, batch: int) -> tuple[float, float]:
+    """Peak traced memory (MiB) and duration (ms) of one read."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    await read(storage, count, batch)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20, elapsed * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notifications", type=int, default=20_000, help="history length")
+    parser.add_argument("--batch", type=int, default=500, help="streaming batch size")
+    args = parser.parse_args()
+
+    notifications = [make_notification(i) for i in range(1, args.notifications + 1)]
+    print(f"{'backend':<8} {'read':<14} {'peak MiB':>9} {'ms':>8}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        memory = InMemoryStorage(max_history_per_channel=args.notifications)
+        sqlite = SQLiteStorage(
+            db_path=str(Path(tmpdir) / "bench.db"), max_history_per_channel=args.notifications
+        )
+        await sqlite.initialize()
+        await sqlite.save_channel(
+            Channel(id="bench", name="Bench", createdAt=datetime.now(), createdBy="bench")
+        )
+        for name, storage in (("memory", memory), ("sqlite", sqlite)):
+            await storage.save_notifications(notifications)
+            for label, read in (("materialized", materialized), ("streamed", streamed)):
+                peak, ms = await measure(read, storage, args.notifications, args.batch)
+                print(f"{name:<8} {label:<14} {peak:>9.1f} {ms:>8.0f}")
+        await sqlite.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""Benchmark: cost of storage latency instrumentation.
+
+First measures the fixed cost the wrapper adds to one storage call: a
+cheap memory-backend call (``get_latest_sequence``) is awaited ``--calls``
+times, bare and through ``InstrumentedStorageAdapter``, best of
+``--repeat`` runs. That cost is then set against the storage calls of a
+publish (channel lookup, subscriber lookup, sequence seed, save, stats
+bump) on SQLite, whose per-method p50/p95/p99 the wrapper records and the
+benchmark prints.
+
+Usage:
+    python benchmarks/bench_instrumentation_overhead.py [--calls N] [--repeat N] [--publishes N]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from notify_mcp.core.storage_adapter import StorageAdapter
+from notify_mcp.models import Channel, Context, Information, Metadata, Notification, Sender
+from notify_mcp.storage.instrumented import InstrumentedStorageAdapter
+from notify_mcp.storage.memory import InMemoryStorage
+from notify_mcp.storage.sqlite_storage import SQLiteStorage
+
+
+def make_notification(i: int) -> Notification:
+    """Build a representative notification."""
+    return Notification(
+        sender=Sender(id="bench", name="Bench", role="dev"),
+        context=Context(theme="state-update", priority="medium", tags=["bench"]),
+        information=Information(title=f"Notification {i}", body="Benchmark body " * 8),
+        metadata=Metadata(id=f"bench-{i}", timestamp=datetime.now(), channel="bench", sequence=i),
+    )
+
+
+async def call_cost(storage: StorageAdapter, calls: int) -> float:
+    """Microseconds per get_latest_sequence call."""
+    started = time.perf_counter()
+    for _ in range(calls):
+        await storage.get_latest_sequence("bench")
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+async def publish_loop(storage: StorageAdapter, publishes: int) -> float:
+    """Run the storage calls of each publish; return microseconds per publish."""
+    started = time.perf_counter()
+    for i in range(1, publishes + 1):
+        notification = make_notification(i)
+        await storage.get_channel("bench")
+        await storage.get_subscriptions_by_channel("bench")
+        await storage.get_latest_sequence("bench")
+        await storage.save_notification(notification)
+        await storage.record_channel_notification("bench", notification.metadata.timestamp)
+    return (time.perf_counter() - started) / publishes * 1_000_000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200_000, help="calls per overhead run")
+    parser.add_argument("--repeat", type=int, default=5, help="overhead runs (best is kept)")
+    parser.add_argument("--publishes", type=int, default=2000, help="publishes on SQLite")
+    args = parser.parse_args()
+
+    backend = InMemoryStorage()
+    wrapped = InstrumentedStorageAdapter(backend)
+    bare = metered = float("inf")
+    for _ in range(args.repeat):
+        bare = min(bare, await call_cost(backend, args.calls))
+        metered = min(metered, await call_cost(wrapped, args.calls))
+    overhead = metered - bare
+    print(f"bare call {bare:.2f} us, instrumented {metered:.2f} us: +{overhead:.2f} us per call")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sqlite = SQLiteStorage(db_path=str(Path(tmpdir) / "bench.db"))
+        await sqlite.initialize()
+        await sqlite.save_channel(
+            Channel(id="bench", name="Bench", createdAt=datetime.now(), createdBy="bench")
+        )
+        storage = InstrumentedStorageAdapter(sqlite)
+        per_publish = await publish_loop(storage, args.publishes)
+        await storage.close()
+
+    calls = sum(stats.calls for stats in storage.methods.values()) / args.publishes
+    print(
+        f"sqlite publish {per_publish:.0f} us over {calls:.0f} storage calls: "
+        f"instrumentation is {overhead * calls / per_publish:.2%} of it\n"
+    )
+    print(f"{'method':<30} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for method, stats in storage.summary().items():
+        print(
+            f"{method:<30} {stats['p50_ms']:>8.3f} {stats['p95_ms']:>8.3f} {stats['p99_ms']:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
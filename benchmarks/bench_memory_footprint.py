@@ -0,0 +1,96 @@
+"""Benchmark: bytes per stored notification in in-memory history.
+
+Compares retaining full ``Notification`` Pydantic graphs (the previous
+in-memory representation) against the ``CompactNotification`` records that
+``InMemoryStorage`` now keeps, and shows what the opt-in search index adds.
+
+Usage:
+    python benchmarks/bench_memory_footprint.py [--count N] [--channels N]
+"""
+
+import argparse
+import asyncio
+import gc
+import tracemalloc
+from datetime import datetime
+
+from notify_mcp.models import Context, Information, Metadata, Notification, Sender
+from notify_mcp.storage.compact import CompactNotification
+from notify_mcp.storage.memory import InMemoryStorage
+
+
+def make_notification(i: int, channel: str) -> Notification:
+    """Build a representative notification."""
+    return Notification(
+        schemaVersion="1.0.0",
+        sender=Sender(id=f"user-{i % 20}", name=f"User {i % 20}", role="dev"),
+        context=Context(theme="state-update", priority="medium", tags=["deploy", "backend"]),
+        information=Information(
+            title=f"Deployment {i} finished",
+            body=f"Service build #{i} rolled out to staging without errors.",
+            format="text",
+        ),
+        metadata=Metadata(
+            id=f"notif-{i:012d}",
+            timestamp=datetime.now(),
+            channel=channel,
+            sequence=i,
+        ),
+    )
+
+
+def measure(build) -> tuple[int, object]:
+    """Return (bytes allocated, retained object) for build()."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    retained = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20_000, help="notifications to store")
+    parser.add_argument("--channels", type=int, default=20, help="channels to spread them over")
+    args = parser.parse_args()
+
+    notifications = [
+        make_notification(i, f"channel-{i % args.channels}") for i in range(args.count)
+    ]
+
+    # Strings from the source objects are shared by both variants; copy the
+    # models so each variant pays for its own graph.
+    def build_pydantic() -> list[Notification]:
+        return [n.model_copy(deep=True) for n in notifications]
+
+    def build_compact() -> list[CompactNotification]:
+        return [CompactNotification.from_notification(n) for n in notifications]
+
+    def build_storage(search_index: bool = False) -> InMemoryStorage:
+        storage = InMemoryStorage(max_history_per_channel=args.count, search_index=search_index)
+        loop = asyncio.new_event_loop()
+        try:
+            for n in notifications:
+                loop.run_until_complete(storage.save_notification(n))
+        finally:
+            loop.close()
+        return storage
+
+    pydantic_bytes, _ = measure(build_pydantic)
+    compact_bytes, _ = measure(build_compact)
+    storage_bytes, _ = measure(build_storage)
+    indexed_bytes, _ = measure(lambda: build_storage(search_index=True))
+
+    print(f"notifications: {args.count} across {args.channels} channels")
+    print(f"  Notification graph     : {pydantic_bytes / args.count:8.0f} bytes/notification")
+    print(f"  CompactNotification    : {compact_bytes / args.count:8.0f} bytes/notification")
+    print(f"  InMemoryStorage (total): {storage_bytes / args.count:8.0f} bytes/notification")
+    print(f"    with search index    : {indexed_bytes / args.count:8.0f} bytes/notification")
+    print(f"  reduction              : {pydantic_bytes / max(compact_bytes, 1):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
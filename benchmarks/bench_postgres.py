@@ -0,0 +1,126 @@
+"""Benchmark: PostgreSQL storage bulk loads, publish and history latency.
+
+Imports ``--rows`` notifications in batches of ``--batch`` twice, once as
+executemany of the prepared INSERT and once through COPY, and reports rows
+per second for each. Then measures the latency of single publishes (the
+publish tool's write), newest-first history pages and tag-filtered pages
+served by the GIN index.
+
+Drops and recreates the notify-mcp tables in the target database, so point
+it at a throwaway one.
+
+Usage:
+    python benchmarks/bench_postgres.py --url postgresql://user@host/db [--rows N] [--batch N]
+        [--samples N]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+import asyncpg
+
+from notify_mcp.models import (
+    Channel,
+    Context,
+    Information,
+    Metadata,
+    Notification,
+    Sender,
+    SubscriptionFilter,
+)
+from notify_mcp.storage.postgres_storage import PostgreSQLStorage
+
+
+def make_notification(channel: str, i: int) -> Notification:
+    """Build a representative notification; one in 50 carries a rare tag."""
+    return Notification(
+        sender=Sender(id="bench", name="Bench", role="dev"),
+        context=Context(
+            theme="state-update",
+            priority="medium",
+            tags=["bench", "rare"] if i % 50 == 0 else ["bench"],
+        ),
+        information=Information(title=f"Notification {i}", body="Benchmark body " * 8),
+        metadata=Metadata(id=f"{channel}-{i}", timestamp=datetime.now(), channel=channel),
+    )
+
+
+async def open_storage(url: str, rows: int, copy_threshold: int) -> PostgreSQLStorage:
+    """Open storage on fresh tables, keeping every row."""
+    conn = await asyncpg.connect(url.replace("postgresql+asyncpg://", "postgresql://", 1))
+    await conn.execute("DROP TABLE IF EXISTS notifications, subscriptions, channels")
+    await conn.close()
+
+    storage = PostgreSQLStorage(
+        url, max_history_per_channel=rows * 2, trim_interval=rows, copy_threshold=copy_threshold
+    )
+    await storage.initialize()
+    await storage.save_channel(
+        Channel(id="bench", name="Bench", createdAt=datetime.now(), createdBy="bench")
+    )
+    return storage
+
+
+async def load(storage: PostgreSQLStorage, rows: int, batch: int) -> float:
+    """Save rows in batches, returning rows per second."""
+    notifications = [make_notification("bench", i) for i in range(1, rows + 1)]
+    started = time.perf_counter()
+    for start in range(0, rows, batch):
+        await storage.save_notifications(notifications[start : start + batch])
+    return rows / (time.perf_counter() - started)
+
+
+async def latency(call, samples: int) -> tuple[float, float]:
+    """p50 and p95 latency of an awaitable factory in milliseconds."""
+    timings = []
+    for i in range(samples):
+        started = time.perf_counter()
+        await call(i)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", required=True, help="PostgreSQL URL of a throwaway database")
+    parser.add_argument("--rows", type=int, default=50_000, help="notifications to import")
+    parser.add_argument("--batch", type=int, default=5000, help="notifications per save call")
+    parser.add_argument("--samples", type=int, default=500, help="latency samples per operation")
+    args = parser.parse_args()
+
+    for name, threshold in (("executemany", args.batch + 1), ("COPY", 1)):
+        storage = await open_storage(args.url, args.rows, threshold)
+        rate = await load(storage, args.rows, args.batch)
+        print(f"import {name:<12} {rate:>10.0f} rows/s")
+        if name == "COPY":
+            break
+        await storage.close()
+
+    # Plans are stale after a bulk load until autovacuum gets to the table
+    async with storage.pool.acquire() as conn:
+        await conn.execute("ANALYZE notifications")
+
+    rare = SubscriptionFilter(tags=["rare"])
+    operations = {
+        "publish": lambda i: storage.save_notification(
+            make_notification("bench", args.rows + 1 + i)
+        ),
+        "history page (50)": lambda i: storage.get_notifications_page("bench", limit=50),
+        "tag-filtered page (20)": lambda i: storage.get_filtered_notifications_page(
+            "bench", rare, limit=20
+        ),
+    }
+    print(f"{'operation':<24} {'p50 ms':>8} {'p95 ms':>8}")
+    for label, call in operations.items():
+        p50, p95 = await latency(call, args.samples)
+        print(f"{label:<24} {p50:>8.2f} {p95:>8.2f}")
+
+    await storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
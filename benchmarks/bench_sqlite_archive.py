@@ -0,0 +1,98 @@
+"""Benchmark: SQLite history with and without the archive tier.
+
+Publishes ``--rows`` notifications into one channel with a small hot window
+(``--history``), once deleting trimmed rows and once archiving them, and
+reports publish throughput and on-disk size. With the archive, it also
+times reading a page at increasing depths: pages inside the hot window come
+from SQLite, deeper ones from the compressed segments.
+
+Usage:
+    python benchmarks/bench_sqlite_archive.py [--rows N] [--history N] [--page N]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from notify_mcp.models import Channel, Context, Information, Metadata, Notification, Sender
+from notify_mcp.storage.sqlite_storage import SQLiteStorage
+
+REPEATS = 20
+BATCH = 100
+
+
+def make_notification(i: int) -> Notification:
+    """Build a representative notification."""
+    return Notification(
+        sender=Sender(id="bench", name="Bench", role="dev"),
+        context=Context(theme="state-update", priority="medium", tags=["bench"]),
+        information=Information(title=f"Notification {i}", body="Benchmark body " * 8),
+        metadata=Metadata(id=f"notif-{i}", timestamp=datetime.now(), channel="bench", sequence=i),
+    )
+
+
+def disk_size(path: Path) -> int:
+    """Total size of a file or directory tree in bytes."""
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+async def fill(storage: SQLiteStorage, rows: int) -> float:
+    """Publish rows in batches; return notifications per second."""
+    await storage.save_channel(
+        Channel(id="bench", name="Bench", createdAt=datetime.now(), createdBy="bench")
+    )
+    start = time.perf_counter()
+    for first in range(1, rows + 1, BATCH):
+        last = min(first + BATCH, rows + 1)
+        await storage.save_notifications([make_notification(i) for i in range(first, last)])
+    return rows / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000, help="notifications to publish")
+    parser.add_argument("--history", type=int, default=1000, help="hot window (max_history)")
+    parser.add_argument("--page", type=int, default=50, help="page size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        print(f"{'mode':>8} {'publish/s':>10} {'db MB':>8} {'archive MB':>11}")
+        for mode in ("delete", "archive"):
+            db_path = root / f"{mode}.db"
+            archive_dir = root / "archive" if mode == "archive" else None
+            storage = SQLiteStorage(
+                db_path=str(db_path),
+                max_history_per_channel=args.history,
+                archive_dir=str(archive_dir) if archive_dir else None,
+            )
+            await storage.initialize()
+            rate = await fill(storage, args.rows)
+            db_mb = sum(disk_size(p) for p in root.glob(f"{mode}.db*")) / 1e6
+            archive_mb = disk_size(archive_dir) / 1e6 if archive_dir else 0.0
+            print(f"{mode:>8} {rate:>10.0f} {db_mb:>8.2f} {archive_mb:>11.2f}")
+            if mode == "delete":
+                await storage.close()
+
+        print(f"\n{'depth':>10} {'tier':>8} {'page ms':>8}")
+        depth = args.page
+        while depth < args.rows:
+            before = args.rows - depth + 1
+            tier = "hot" if depth <= args.history else "archive"
+            start = time.perf_counter()
+            for _ in range(REPEATS):
+                await storage.get_notifications_page("bench", limit=args.page, before=before)
+            page_ms = (time.perf_counter() - start) / REPEATS * 1000
+            print(f"{depth:>10} {tier:>8} {page_ms:>8.2f}")
+            depth *= 4
+
+        await storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
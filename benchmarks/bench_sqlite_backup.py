@@ -0,0 +1,102 @@
+"""Benchmark: publish latency while SQLiteStorage.backup() runs.
+
+Builds a database of ``--rows`` notifications, then publishes continuously
+while a backup runs with several step sizes, reporting publish latency and
+backup time, restarts and size. The baseline row publishes without a
+backup. Small steps sleep often and yield the lock more, but concurrent
+writes restart them; after ``max_restarts`` the backup copies the rest in
+one step.
+
+Usage:
+    python benchmarks/bench_sqlite_backup.py [--rows N]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from notify_mcp.models import Channel, Context, Information, Metadata, Notification, Sender
+from notify_mcp.storage.sqlite_storage import SQLiteStorage
+
+STEP_SIZES = (256, 1024, 4096)
+BATCH = 5000
+
+
+def make_notification(i: int) -> Notification:
+    """Build a representative notification."""
+    return Notification(
+        sender=Sender(id="bench", name="Bench", role="dev"),
+        context=Context(theme="state-update", priority="medium", tags=["bench"]),
+        information=Information(title=f"Notification {i}", body="Benchmark body " * 8),
+        metadata=Metadata(id=f"notif-{i}", timestamp=datetime.now(), channel="bench", sequence=i),
+    )
+
+
+async def publish_until(storage: SQLiteStorage, done: asyncio.Future, first: int) -> list[float]:
+    """Publish one notification at a time until done; return latencies in ms."""
+    latencies = []
+    i = first
+    while not done.done():
+        t0 = time.perf_counter()
+        await storage.save_notification(make_notification(i))
+        latencies.append((time.perf_counter() - t0) * 1000)
+        i += 1
+        await asyncio.sleep(0.001)
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="notifications in the database")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        storage = SQLiteStorage(
+            db_path=str(root / "live.db"), max_history_per_channel=10 * args.rows
+        )
+        await storage.initialize()
+        await storage.save_channel(
+            Channel(id="bench", name="Bench", createdAt=datetime.now(), createdBy="bench")
+        )
+        for start in range(1, args.rows + 1, BATCH):
+            end = min(start + BATCH, args.rows + 1)
+            await storage.save_notifications([make_notification(i) for i in range(start, end)])
+        next_sequence = args.rows + 1
+
+        print(
+            f"{'pages':>8} {'p50 ms':>8} {'p99 ms':>8} {'publishes':>10} "
+            f"{'backup s':>9} {'restarts':>9} {'MB':>8}"
+        )
+
+        idle = asyncio.get_running_loop().create_future()
+        asyncio.get_running_loop().call_later(2.0, idle.set_result, None)
+        latencies = await publish_until(storage, idle, next_sequence)
+        next_sequence += len(latencies)
+        p99 = sorted(latencies)[int(len(latencies) * 0.99) - 1]
+        print(
+            f"{'none':>8} {statistics.median(latencies):>8.2f} {p99:>8.2f} "
+            f"{len(latencies):>10} {'-':>9} {'-':>9} {'-':>8}"
+        )
+
+        for pages in STEP_SIZES:
+            backup = asyncio.ensure_future(storage.backup(root / "backup.db", pages=pages))
+            latencies = await publish_until(storage, backup, next_sequence)
+            next_sequence += len(latencies)
+            stats = backup.result()
+            p99 = sorted(latencies)[int(len(latencies) * 0.99) - 1]
+            size_mb = stats.path.stat().st_size / 1e6
+            print(
+                f"{pages:>8} {statistics.median(latencies):>8.2f} {p99:>8.2f} "
+                f"{len(latencies):>10} {stats.elapsed:>9.2f} {stats.restarts:>9} {size_mb:>8.1f}"
+            )
+
+        await storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
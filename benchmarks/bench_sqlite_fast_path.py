@@ -0,0 +1,211 @@
+"""Benchmark: ORM session path vs. prebuilt Core statements for SQLite hot paths.
+
+The "orm" column reproduces the previous implementation (ORM session, fresh
+``select(Model)`` per call, ORM objects converted field by field); the "core"
+column calls ``SQLiteStorage`` directly, which now runs prebuilt Core
+statements and maps rows straight to dicts.
+
+Usage:
+    python benchmarks/bench_sqlite_fast_path.py [--ops N]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import desc, select
+
+from notify_mcp.models import (
+    Channel,
+    ChannelPermissions,
+    Context,
+    Information,
+    Metadata,
+    Notification,
+    Sender,
+    Subscription,
+)
+from notify_mcp.models.notification import Action, Visibility
+from notify_mcp.models.subscription import SubscriptionFilter
+from notify_mcp.storage.models import ChannelModel, NotificationModel, SubscriptionModel
+from notify_mcp.storage.sqlite_storage import SQLiteStorage
+
+SUBSCRIBERS = 50
+
+
+def make_notification(i: int) -> Notification:
+    """Build a representative notification."""
+    return Notification(
+        sender=Sender(id="bench", name="Bench", role="dev"),
+        context=Context(theme="state-update", priority="medium", tags=["bench"]),
+        information=Information(title=f"Notification {i}", body="Benchmark body " * 8),
+        metadata=Metadata(
+            id=f"notif-{i}", timestamp=datetime.now(), channel="bench", sequence=i
+        ),
+    )
+
+
+class ORMBaseline:
+    """The ORM-session implementation the Core fast path replaced."""
+
+    def __init__(self, storage: SQLiteStorage):
+        self.session_factory = storage.session_factory
+
+    async def save_notification(self, notification: Notification) -> None:
+        async with self.session_factory() as session:
+            session.add(
+                NotificationModel(
+                    id=notification.metadata.id,
+                    channel=notification.metadata.channel,
+                    sequence=notification.metadata.sequence or 0,
+                    priority=notification.context.priority,
+                    timestamp=notification.metadata.timestamp,
+                    schema_version=notification.schemaVersion,
+                    sender_data=notification.sender.model_dump(mode="json"),
+                    context_data=notification.context.model_dump(mode="json"),
+                    information=notification.information.model_dump(mode="json"),
+                    actions=None,
+                    visibility=notification.visibility.model_dump(mode="json"),
+                    metadata_data=notification.metadata.model_dump(mode="json"),
+                )
+            )
+            await session.commit()
+
+    async def get_notifications(self, channel_id: str, limit: int = 50) -> list[Notification]:
+        async with self.session_factory() as session:
+            stmt = (
+                select(NotificationModel)
+                .where(NotificationModel.channel == channel_id)
+                .order_by(desc(NotificationModel.timestamp))
+                .limit(limit)
+            )
+            result = await session.execute(stmt)
+            return [
+                Notification(
+                    schemaVersion=m.schema_version,
+                    sender=Sender(**m.sender_data),
+                    context=Context(**m.context_data),
+                    information=Information(**m.information),
+                    actions=[Action(**a) for a in m.actions] if m.actions else [],
+                    visibility=Visibility(**m.visibility),
+                    metadata=Metadata(**m.metadata_data),
+                )
+                for m in result.scalars().all()
+            ]
+
+    async def get_subscriptions_by_channel(self, channel_id: str) -> list[Subscription]:
+        async with self.session_factory() as session:
+            stmt = select(SubscriptionModel).where(SubscriptionModel.channel == channel_id)
+            result = await session.execute(stmt)
+            return [
+                Subscription(
+                    id=m.id,
+                    clientId=m.client_id,
+                    channel=m.channel,
+                    subscribedAt=m.subscribed_at,
+                    filters=SubscriptionFilter(**m.filters) if m.filters else SubscriptionFilter(),
+                )
+                for m in result.scalars().all()
+            ]
+
+    async def get_channel(self, channel_id: str) -> Channel | None:
+        async with self.session_factory() as session:
+            stmt = select(ChannelModel).where(ChannelModel.id == channel_id)
+            m = (await session.execute(stmt)).scalar_one_or_none()
+            if m is None:
+                return None
+            return Channel(
+                id=m.id,
+                name=m.name,
+                description=m.description,
+                createdAt=m.created_at,
+                createdBy=m.created_by,
+                permissions=(
+                    ChannelPermissions(**m.permissions) if m.permissions else ChannelPermissions()
+                ),
+                metadata=m.channel_metadata or {},
+                subscriberCount=m.subscriber_count,
+                notificationCount=m.notification_count,
+                lastNotificationAt=m.last_notification_at,
+            )
+
+
+async def timed(ops: int, call: Callable[[int], Awaitable[object]]) -> float:
+    """Return microseconds per call."""
+    start = time.perf_counter()
+    for i in range(ops):
+        await call(i)
+    return (time.perf_counter() - start) / ops * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=1000, help="calls per operation")
+    args = parser.parse_args()
+    ops = args.ops
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = SQLiteStorage(
+            db_path=str(Path(tmpdir) / "bench.db"),
+            max_history_per_channel=ops * 4,
+            trim_interval=ops * 4,
+        )
+        await storage.initialize()
+        orm = ORMBaseline(storage)
+
+        await storage.save_channel(
+            Channel(id="bench", name="Bench", createdAt=datetime.now(), createdBy="bench")
+        )
+        for i in range(SUBSCRIBERS):
+            await storage.save_subscription(
+                Subscription(
+                    id=f"sub-{i}", clientId=f"client-{i}", channel="bench",
+                    subscribedAt=datetime.now(),
+                )
+            )
+
+        orm_notifications = [make_notification(i) for i in range(ops)]
+        core_notifications = [make_notification(ops + i) for i in range(ops)]
+        bulk_notifications = [make_notification(2 * ops + i) for i in range(ops)]
+
+        rows = [
+            (
+                "save_notification",
+                await timed(ops, lambda i: orm.save_notification(orm_notifications[i])),
+                await timed(ops, lambda i: storage.save_notification(core_notifications[i])),
+            ),
+            (
+                "get_notifications(50)",
+                await timed(ops, lambda i: orm.get_notifications("bench")),
+                await timed(ops, lambda i: storage.get_notifications("bench")),
+            ),
+            (
+                f"get_subscriptions({SUBSCRIBERS})",
+                await timed(ops, lambda i: orm.get_subscriptions_by_channel("bench")),
+                await timed(ops, lambda i: storage.get_subscriptions_by_channel("bench")),
+            ),
+            (
+                "get_channel",
+                await timed(ops, lambda i: orm.get_channel("bench")),
+                await timed(ops, lambda i: storage.get_channel("bench")),
+            ),
+        ]
+
+        start = time.perf_counter()
+        await storage.save_notifications(bulk_notifications)
+        bulk_us = (time.perf_counter() - start) / ops * 1e6
+
+        await storage.close()
+
+    print(f"{'operation':<26} {'orm us/op':>10} {'core us/op':>11} {'speedup':>8}")
+    for name, orm_us, core_us in rows:
+        print(f"{name:<26} {orm_us:>10.0f} {core_us:>11.0f} {orm_us / core_us:>7.1f}x")
+    print(f"{'save_notifications (bulk)':<26} {'':>10} {bulk_us:>11.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
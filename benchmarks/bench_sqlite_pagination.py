@@ -0,0 +1,85 @@
+"""Benchmark: OFFSET vs. keyset (sequence cursor) paging through SQLite history.
+
+Fills one channel with ``--rows`` notifications and times reading a page at
+increasing depths, once with ``get_notifications(offset=...)`` and once with
+``get_notifications_page(before=...)``. OFFSET cost grows with depth; keyset
+cost should stay flat.
+
+Usage:
+    python benchmarks/bench_sqlite_pagination.py [--rows N] [--page N]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from pathlib import Path
+
+from notify_mcp.models import Channel, Context, Information, Metadata, Notification, Sender
+from notify_mcp.storage.sqlite_storage import SQLiteStorage
+
+REPEATS = 20
+BATCH = 5000
+
+
+def make_notification(i: int) -> Notification:
+    """Build a representative notification."""
+    return Notification(
+        sender=Sender(id="bench", name="Bench", role="dev"),
+        context=Context(theme="state-update", priority="medium", tags=["bench"]),
+        information=Information(title=f"Notification {i}", body="Benchmark body " * 8),
+        metadata=Metadata(id=f"notif-{i}", timestamp=datetime.now(), channel="bench", sequence=i),
+    )
+
+
+async def timed(call: Callable[[], Awaitable[object]]) -> float:
+    """Return milliseconds per call."""
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        await call()
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="notifications in the channel")
+    parser.add_argument("--page", type=int, default=50, help="page size")
+    args = parser.parse_args()
+    rows, page = args.rows, args.page
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = SQLiteStorage(
+            db_path=str(Path(tmpdir) / "bench.db"),
+            max_history_per_channel=rows,
+            trim_interval=rows,
+        )
+        await storage.initialize()
+        await storage.save_channel(
+            Channel(id="bench", name="Bench", createdAt=datetime.now(), createdBy="bench")
+        )
+        for start in range(1, rows + 1, BATCH):
+            end = min(start + BATCH, rows + 1)
+            await storage.save_notifications([make_notification(i) for i in range(start, end)])
+
+        print(f"{'depth':>10} {'offset ms':>10} {'keyset ms':>10}")
+        depth = page
+        while depth < rows:
+            offset_ms = await timed(
+                lambda d=depth: storage.get_notifications("bench", limit=page, offset=d)
+            )
+            # The page at this depth starts below sequence rows - depth + 1
+            keyset_ms = await timed(
+                lambda d=depth: storage.get_notifications_page(
+                    "bench", limit=page, before=rows - d + 1
+                )
+            )
+            print(f"{depth:>10} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+            depth *= 4
+
+        await storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""Benchmark: SQLite publish and read throughput per PRAGMA profile.
+
+For each preset in ``SQLITE_PRAGMA_PROFILES`` this creates a fresh database,
+publishes notifications through ``SQLiteStorage.save_notification`` and then
+reads channel history with ``get_notifications``.
+
+Usage:
+    python benchmarks/bench_sqlite_profiles.py [--publishes N] [--reads N]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from notify_mcp.models import Channel, Context, Information, Metadata, Notification, Sender
+from notify_mcp.storage.sqlite_storage import SQLITE_PRAGMA_PROFILES, SQLiteStorage
+
+CHANNELS = 4
+
+
+def make_notification(i: int) -> Notification:
+    """Build a representative notification."""
+    return Notification(
+        sender=Sender(id="bench", name="Bench", role="dev"),
+        context=Context(theme="state-update", priority="medium", tags=["bench"]),
+        information=Information(title=f"Notification {i}", body="Benchmark body " * 8),
+        metadata=Metadata(
+            id=f"notif-{i}",
+            timestamp=datetime.now(),
+            channel=f"channel-{i % CHANNELS}",
+            sequence=i,
+        ),
+    )
+
+
+async def run_profile(profile: str, publishes: int, reads: int) -> tuple[float, float]:
+    """Return (publishes/sec, reads/sec) for one profile."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = SQLiteStorage(
+            db_path=str(Path(tmpdir) / "bench.db"),
+            max_history_per_channel=1000,
+            pragma_profile=profile,
+        )
+        await storage.initialize()
+
+        for c in range(CHANNELS):
+            channel = Channel(
+                id=f"channel-{c}", name=f"Channel {c}", createdAt=datetime.now(), createdBy="bench"
+            )
+            await storage.save_channel(channel)
+
+        notifications = [make_notification(i) for i in range(publishes)]
+        start = time.perf_counter()
+        for notification in notifications:
+            await storage.save_notification(notification)
+        publish_rate = publishes / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for i in range(reads):
+            await storage.get_notifications(f"channel-{i % CHANNELS}", limit=50)
+        read_rate = reads / (time.perf_counter() - start)
+
+        await storage.close()
+        return publish_rate, read_rate
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--publishes", type=int, default=2000, help="notifications to publish")
+    parser.add_argument("--reads", type=int, default=500, help="history reads (limit=50)")
+    args = parser.parse_args()
+
+    print(f"{'profile':<12} {'publish/s':>12} {'read/s':>12}")
+    for profile in SQLITE_PRAGMA_PROFILES:
+        publish_rate, read_rate = await run_profile(profile, args.publishes, args.reads)
+        print(f"{profile:<12} {publish_rate:>12.0f} {read_rate:>12.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
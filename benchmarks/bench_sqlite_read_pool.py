@@ -0,0 +1,89 @@
+"""Benchmark: SQLite publish latency while other tasks poll channel history.
+
+Runs a publisher alongside ``--pollers`` tasks that continuously call
+``get_notifications`` and reports publish latency and read throughput for
+several read pool sizes, plus a baseline without pollers. Publishes use
+the dedicated writer connection, so they never wait on a reader for a
+connection or the database lock; what remains is event-loop time spent
+converting the pollers' result rows.
+
+Usage:
+    python benchmarks/bench_sqlite_read_pool.py [--publishes N] [--pollers N]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from notify_mcp.models import Channel, Context, Information, Metadata, Notification, Sender
+from notify_mcp.storage.sqlite_storage import SQLiteStorage
+
+POOL_SIZES = (1, 2, 4, 8)
+
+
+def make_notification(i: int) -> Notification:
+    """Build a representative notification."""
+    return Notification(
+        sender=Sender(id="bench", name="Bench", role="dev"),
+        context=Context(theme="state-update", priority="medium", tags=["bench"]),
+        information=Information(title=f"Notification {i}", body="Benchmark body " * 8),
+        metadata=Metadata(id=f"notif-{i}", timestamp=datetime.now(), channel="bench"),
+    )
+
+
+async def run(pool_size: int, publishes: int, pollers: int) -> tuple[float, float, float]:
+    """Return (median publish ms, p99 publish ms, reads/sec) for one pool size."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = SQLiteStorage(db_path=str(Path(tmpdir) / "bench.db"), read_pool_size=pool_size)
+        await storage.initialize()
+        await storage.save_channel(
+            Channel(id="bench", name="Bench", createdAt=datetime.now(), createdBy="bench")
+        )
+        await storage.save_notifications([make_notification(i) for i in range(200)])
+
+        done = asyncio.Event()
+        reads = 0
+
+        async def poll() -> None:
+            nonlocal reads
+            while not done.is_set():
+                await storage.get_notifications("bench", limit=50)
+                reads += 1
+
+        tasks = [asyncio.create_task(poll()) for _ in range(pollers)]
+        latencies = []
+        start = time.perf_counter()
+        for i in range(publishes):
+            t0 = time.perf_counter()
+            await storage.save_notification(make_notification(200 + i))
+            latencies.append((time.perf_counter() - t0) * 1000)
+        elapsed = time.perf_counter() - start
+        done.set()
+        await asyncio.gather(*tasks)
+        await storage.close()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    return statistics.median(latencies), p99, reads / elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--publishes", type=int, default=500, help="notifications to publish")
+    parser.add_argument("--pollers", type=int, default=8, help="concurrent history pollers")
+    args = parser.parse_args()
+
+    print(f"{'readers':>8} {'publish p50 ms':>15} {'publish p99 ms':>15} {'reads/s':>10}")
+    p50, p99, _ = await run(1, args.publishes, 0)
+    print(f"{'idle':>8} {p50:>15.2f} {p99:>15.2f} {'-':>10}")
+    for pool_size in POOL_SIZES:
+        p50, p99, read_rate = await run(pool_size, args.publishes, args.pollers)
+        print(f"{pool_size:>8} {p50:>15.2f} {p99:>15.2f} {read_rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
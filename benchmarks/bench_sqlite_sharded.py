@@ -0,0 +1,84 @@
+"""Benchmark: aggregate publish throughput of sharded SQLite storage.
+
+Runs ``--publishers`` concurrent tasks, each publishing notifications one at
+a time (one transaction each, like the publish tool) to its own channel, and
+reports publishes per second for several shard counts. One shard is the
+single-file baseline: every commit waits for the same writer. With more
+shards, commits to channels on different files run in parallel on their own
+writer threads, which pays off most when commits wait on fsync (the
+``durable`` profile) on a real disk; on tmpfs or a single CPU the gain
+is limited to overlapping SQLite work with the event loop.
+
+Usage:
+    python benchmarks/bench_sqlite_sharded.py [--publishes N] [--publishers N] [--profile P]
+        [--dir DIR]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from notify_mcp.models import Channel, Context, Information, Metadata, Notification, Sender
+from notify_mcp.storage.sqlite_sharded import ShardedSQLiteStorage
+
+SHARD_COUNTS = (1, 2, 4, 8)
+
+
+def make_notification(channel: str, i: int) -> Notification:
+    """Build a representative notification."""
+    return Notification(
+        sender=Sender(id="bench", name="Bench", role="dev"),
+        context=Context(theme="state-update", priority="medium", tags=["bench"]),
+        information=Information(title=f"Notification {i}", body="Benchmark body " * 8),
+        metadata=Metadata(
+            id=f"{channel}-{i}", timestamp=datetime.now(), channel=channel, sequence=i
+        ),
+    )
+
+
+async def run(args: argparse.Namespace, shards: int) -> float:
+    """Return publishes per second for one shard count."""
+    publishes, publishers = args.publishes, args.publishers
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmpdir:
+        storage = ShardedSQLiteStorage(
+            db_path=str(Path(tmpdir) / "bench.db"), shards=shards, pragma_profile=args.profile
+        )
+        await storage.initialize()
+        channels = [f"bench-{i}" for i in range(publishers)]
+        for channel in channels:
+            await storage.save_channel(
+                Channel(id=channel, name=channel, createdAt=datetime.now(), createdBy="bench")
+            )
+
+        async def publish(channel: str) -> None:
+            for i in range(1, publishes // publishers + 1):
+                await storage.save_notification(make_notification(channel, i))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(publish(channel) for channel in channels))
+        elapsed = time.perf_counter() - start
+        await storage.close()
+    return publishes / elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--publishes", type=int, default=8000, help="total notifications")
+    parser.add_argument("--publishers", type=int, default=32, help="concurrent channels")
+    parser.add_argument("--profile", default="durable", help="SQLite PRAGMA profile")
+    parser.add_argument("--dir", default=None, help="directory for the databases (real disk)")
+    args = parser.parse_args()
+
+    print(f"{'shards':>7} {'publish/s':>10} {'speedup':>8}")
+    baseline = None
+    for shards in SHARD_COUNTS:
+        rate = await run(args, shards)
+        baseline = baseline or rate
+        print(f"{shards:>7} {rate:>10.0f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
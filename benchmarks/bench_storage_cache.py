@@ -0,0 +1,124 @@
+"""Benchmark: SQLite storage with and without the read-through cache.
+
+Replays the storage calls of the publish tool (save, route to subscribers,
+bump channel stats, count subscribers) and of readers polling channel info
+and the first history page, round-robin over ``--channels`` channels with
+``--subscribers`` subscriptions each. Reports operations per second for the
+plain SQLite adapter and for it wrapped in ``CachingStorageAdapter`` (with
+and without the tail cache), plus the cache hit rates.
+
+Usage:
+    python benchmarks/bench_storage_cache.py [--ops N] [--channels N] [--subscribers N]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from notify_mcp.core.storage_adapter import StorageAdapter
+from notify_mcp.models import (
+    Channel,
+    Context,
+    Information,
+    Metadata,
+    Notification,
+    Sender,
+    Subscription,
+)
+from notify_mcp.storage.caching import CachingStorageAdapter
+from notify_mcp.storage.sqlite_storage import SQLiteStorage
+
+HISTORY_PAGE = 20
+
+
+def make_notification(channel: str, i: int) -> Notification:
+    """Build a representative notification."""
+    return Notification(
+        sender=Sender(id="bench", name="Bench", role="dev"),
+        context=Context(theme="state-update", priority="medium", tags=["bench"]),
+        information=Information(title=f"Notification {i}", body="Benchmark body " * 8),
+        metadata=Metadata(
+            id=f"{channel}-{i}", timestamp=datetime.now(), channel=channel, sequence=i
+        ),
+    )
+
+
+async def publish(storage: StorageAdapter, channel: str, i: int) -> None:
+    """The publish tool's storage calls."""
+    notification = make_notification(channel, i)
+    await storage.save_notification(notification)
+    await storage.get_subscriptions_by_channel(channel)  # Router
+    await storage.record_channel_notification(channel, notification.metadata.timestamp)
+    await storage.get_subscriptions_by_channel(channel)  # Subscriber count
+
+
+async def read(storage: StorageAdapter, channel: str) -> None:
+    """A client reading channel info and the first history page."""
+    await storage.get_channel(channel)
+    await storage.get_notifications_page(channel, limit=HISTORY_PAGE)
+
+
+async def run(storage: StorageAdapter, ops: int, channels: list[str]) -> tuple[float, float]:
+    """Return (publishes/s, reads/s)."""
+    start = time.perf_counter()
+    for i in range(ops):
+        await publish(storage, channels[i % len(channels)], 1_000_000 + i)
+    publish_rate = ops / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(ops):
+        await read(storage, channels[i % len(channels)])
+    read_rate = ops / (time.perf_counter() - start)
+    return publish_rate, read_rate
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=3000, help="publishes and reads per mode")
+    parser.add_argument("--channels", type=int, default=20, help="channels")
+    parser.add_argument("--subscribers", type=int, default=10, help="subscriptions per channel")
+    args = parser.parse_args()
+
+    print(f"{'mode':>12} {'publish/s':>10} {'read/s':>8}  hit rates")
+    for mode in ("none", "cache", "cache+tail"):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            backend = SQLiteStorage(db_path=str(Path(tmpdir) / "bench.db"))
+            await backend.initialize()
+            channels = [f"bench-{i}" for i in range(args.channels)]
+            for channel in channels:
+                await backend.save_channel(
+                    Channel(id=channel, name=channel, createdAt=datetime.now(), createdBy="b")
+                )
+                for s in range(args.subscribers):
+                    await backend.save_subscription(
+                        Subscription(
+                            id=f"{channel}-sub-{s}",
+                            clientId=f"client-{s}",
+                            channel=channel,
+                            subscribedAt=datetime.now(),
+                        )
+                    )
+                await backend.save_notifications(
+                    [make_notification(channel, i) for i in range(1, 101)]
+                )
+
+            storage: StorageAdapter = backend
+            if mode != "none":
+                tail_size = 50 if mode == "cache+tail" else 0
+                storage = CachingStorageAdapter(backend, tail_size=tail_size)
+
+            publish_rate, read_rate = await run(storage, args.ops, channels)
+            rates = ""
+            if isinstance(storage, CachingStorageAdapter):
+                rates = ", ".join(
+                    f"{name}={stats.hit_rate:.0%}" for name, stats in storage.cache_stats().items()
+                )
+            print(f"{mode:>12} {publish_rate:>10.0f} {read_rate:>8.0f}  {rates}")
+            await storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""Benchmark: NDJSON export/import throughput and memory use.
+
+Fills a SQLite store with ``--rows`` notifications per size step, exports it
+to a gzip-compressed NDJSON file and imports that into a fresh SQLite store,
+reporting rows per second and the peak Python heap (tracemalloc) of each
+direction. Peak memory should stay flat as the row count grows. Rows per
+second are measured with tracemalloc running, which slows Python code down
+several-fold; compare them between steps, not with other benchmarks.
+
+Usage:
+    python benchmarks/bench_transfer.py [--rows N] [--steps N]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from pathlib import Path
+
+from notify_mcp.models import Channel, Context, Information, Metadata, Notification, Sender
+from notify_mcp.storage.sqlite_storage import SQLiteStorage
+from notify_mcp.storage.transfer import TransferStats, export_file, import_file
+
+BATCH = 5000
+
+
+def make_notification(i: int) -> Notification:
+    """Build a representative notification."""
+    return Notification(
+        sender=Sender(id="bench", name="Bench", role="dev"),
+        context=Context(theme="state-update", priority="medium", tags=["bench"]),
+        information=Information(title=f"Notification {i}", body="Benchmark body " * 8),
+        metadata=Metadata(id=f"notif-{i}", timestamp=datetime.now(), channel="bench", sequence=i),
+    )
+
+
+async def open_storage(path: Path, rows: int) -> SQLiteStorage:
+    """Open a SQLite store large enough to keep every row."""
+    storage = SQLiteStorage(db_path=str(path), max_history_per_channel=rows, trim_interval=rows)
+    await storage.initialize()
+    return storage
+
+
+async def measure(run: Callable[[], Awaitable[TransferStats]]) -> tuple[TransferStats, float]:
+    """Run a transfer, returning its stats and peak traced memory in MB."""
+    tracemalloc.start()
+    stats = await run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return stats, peak / 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000, help="notifications in the first step")
+    parser.add_argument("--steps", type=int, default=3, help="size doublings to run")
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'export rows/s':>14} {'peak MB':>8} {'import rows/s':>14} {'peak MB':>8}")
+    rows = args.rows
+    for _ in range(args.steps):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            source = await open_storage(root / "source.db", rows)
+            await source.save_channel(
+                Channel(id="bench", name="Bench", createdAt=datetime.now(), createdBy="bench")
+            )
+            for start in range(1, rows + 1, BATCH):
+                end = min(start + BATCH, rows + 1)
+                await source.save_notifications([make_notification(i) for i in range(start, end)])
+
+            dump = root / "export.ndjson.gz"
+            exported, export_peak = await measure(lambda: export_file(source, dump))
+            await source.close()
+
+            target = await open_storage(root / "target.db", rows)
+            imported, import_peak = await measure(lambda: import_file(target, dump))
+            await target.close()
+
+        print(
+            f"{rows:>8} {exported.rows_per_second:>14.0f} {export_peak:>8.1f} "
+            f"{imported.rows_per_second:>14.0f} {import_peak:>8.1f}"
+        )
+        rows *= 2
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
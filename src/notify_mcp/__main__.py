@@ -1,10 +1,20 @@
-"""CLI entry point for notify-mcp."""
+"""CLI entry point for notify-mcp.
 
+Without a command the MCP server is started. ``export`` and ``import`` copy
+the configured store (see ``StorageSettings``) to and from NDJSON files, e.g.
+to move from ``memory`` to ``sqlite`` storage. ``backup`` takes an online
+copy of a SQLite database while the server keeps running.
+"""
+
+import argparse
 import asyncio
 import logging
 import sys
 
+from .config.storage_config import StorageSettings
 from .server import NotifyMCPServer
+from .storage.factory import build_sqlite_storage, close_storage, create_storage
+from .storage.transfer import TransferStats, export_file, import_file
 
 
 def setup_logging() -> None:
@@ -16,13 +26,96 @@ def setup_logging() -> None:
     )
 
 
-async def main() -> None:
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser."""
+    parser = argparse.ArgumentParser(prog="notify-mcp", description="Notify-MCP server")
+    commands = parser.add_subparsers(dest="command")
+
+    commands.add_parser("serve", help="Run the MCP server (default)")
+
+    export = commands.add_parser("export", help="Export the configured store as NDJSON")
+    export.add_argument("path", help="Output file (gzip-compressed if it ends in .gz)")
+    export.add_argument(
+        "--page-size", type=int, default=1000, help="Notifications read per page"
+    )
+
+    import_ = commands.add_parser(
+        "import", help="Import an NDJSON export into the configured store"
+    )
+    import_.add_argument("path", help="Export file (plain or gzip-compressed)")
+    import_.add_argument(
+        "--batch-size", type=int, default=5000, help="Notifications written per transaction"
+    )
+
+    backup = commands.add_parser("backup", help="Copy the live SQLite database to a file")
+    backup.add_argument("path", help="Backup file (replaced if it exists)")
+    backup.add_argument("--pages", type=int, default=1024, help="Pages copied per step")
+    backup.add_argument(
+        "--sleep", type=float, default=0.05, help="Seconds to sleep between steps"
+    )
+    return parser
+
+
+def report(action: str, stats: TransferStats) -> None:
+    """Print a transfer summary."""
+    print(
+        f"{action} {stats.channels} channels, {stats.subscriptions} subscriptions, "
+        f"{stats.notifications} notifications in {stats.elapsed:.2f}s "
+        f"({stats.rows_per_second:.0f} rows/s)"
+    )
+
+
+async def transfer(args: argparse.Namespace) -> None:
+    """Run an export or import against the configured store."""
+    storage = await create_storage(StorageSettings())
+    try:
+        if args.command == "export":
+            report("Exported", await export_file(storage, args.path, args.page_size))
+        else:
+            report("Imported", await import_file(storage, args.path, args.batch_size))
+    finally:
+        await close_storage(storage)
+
+
+async def backup(args: argparse.Namespace) -> None:
+    """Back up the configured SQLite database."""
+    settings = StorageSettings()
+    if settings.storage_type != "sqlite":
+        raise SystemExit("backup requires NOTIFY_MCP_STORAGE_TYPE=sqlite")
+    settings.validate_configuration()
+
+    # No initialize(): the backup only reads the file through its own connection
+    storage = build_sqlite_storage(settings)
+    try:
+        stats = await storage.backup(args.path, pages=args.pages, sleep=args.sleep)
+    finally:
+        await storage.close()
+    print(
+        f"Backed up {stats.pages} pages to {stats.path} in {stats.elapsed:.2f}s "
+        f"({stats.restarts} restarts)"
+    )
+
+
+async def main(argv: list[str] | None = None) -> None:
     """Main entry point."""
     setup_logging()
+    args = build_parser().parse_args(argv)
+
+    if args.command in ("export", "import"):
+        await transfer(args)
+        return
+    if args.command == "backup":
+        await backup(args)
+        return
 
     server = NotifyMCPServer()
     await server.run()
 
 
-if __name__ == "__main__":
+def cli() -> None:
+    """Console script entry point."""
     asyncio.run(main())
+
+
+if __name__ == "__main__":
+    cli()
@@ -13,6 +13,15 @@ class TransportSettings(BaseSettings):
         transport_type: Type of transport to use (stdio or http)
         http_host: Host address for HTTP server (default: 0.0.0.0)
         http_port: Port for HTTP server (default: 8000)
+        http_client_id_header: Request header naming the client (default: None, so
+            each MCP session is a separate client)
+        session_idle_timeout: Seconds without requests after which an HTTP client is
+            gone (default: 1800; 0 disables session tracking)
+        session_grace_period: Seconds a gone client keeps its subscriptions (default: 300)
+        session_sweep_interval: Seconds between collection passes (default: 60)
+        session_gc_action: What happens to a gone client's subscriptions: "park" keeps
+            them in memory to restore if the client returns (not across restarts),
+            "delete" drops them
     """
 
     model_config = ConfigDict(
@@ -24,3 +33,8 @@ class TransportSettings(BaseSettings):
     transport_type: Literal["stdio", "http"] = "stdio"
     http_host: str = "0.0.0.0"
     http_port: int = 8000
+    http_client_id_header: str | None = None
+    session_idle_timeout: float = 1800.0
+    session_grace_period: float = 300.0
+    session_sweep_interval: float = 60.0
+    session_gc_action: Literal["park", "delete"] = "park"
@@ -104,3 +104,14 @@ class ChannelManager:
             channel.lastNotificationAt = datetime.now()
 
         await self.storage.save_channel(channel)
+
+    async def record_notification(
+        self, channel_id: str, timestamp: datetime | None = None
+    ) -> None:
+        """Count a published notification against a channel.
+
+        Args:
+            channel_id: Channel identifier
+            timestamp: Publish time (defaults to now)
+        """
+        await self.storage.record_channel_notification(channel_id, timestamp or datetime.now())
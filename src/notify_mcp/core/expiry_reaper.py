@@ -0,0 +1,77 @@
+"""Background purge of notifications past their validity."""
+
+import asyncio
+import contextlib
+import logging
+
+from .storage_adapter import StorageAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class ExpiryReaper:
+    """Periodically deletes expired notifications from storage.
+
+    Expired notifications are already hidden from reads; the reaper only
+    reclaims them. Each pass deletes in batches of ``batch_size``, yielding
+    to the event loop between batches so publishes are never stalled behind
+    one large delete.
+    """
+
+    def __init__(self, storage: StorageAdapter, interval: float = 60.0, batch_size: int = 500):
+        """Initialize the reaper.
+
+        Args:
+            storage: Storage adapter
+            interval: Seconds between passes
+            batch_size: Notifications deleted per batch
+        """
+        self.storage = storage
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start periodic passes in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task (an in-flight batch is rolled back)."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def reap(self, now: float | None = None) -> int:
+        """Run one pass: purge batches until no expired notifications remain.
+
+        Args:
+            now: POSIX time to expire against (defaults to the current time)
+
+        Returns:
+            Number of notifications deleted
+        """
+        total = 0
+        while True:
+            purged = await self.storage.purge_expired(now=now, batch_size=self.batch_size)
+            total += purged
+            if purged < self.batch_size:
+                break
+            await asyncio.sleep(0)
+
+        if total:
+            await self.storage.reclaim_space()
+            logger.info(f"Expiry reaper deleted {total} expired notifications")
+        return total
+
+    async def _run(self) -> None:
+        """Reap every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.error(f"Expiry reaper pass failed: {e}")
@@ -0,0 +1,234 @@
+"""Client session lifecycle and collection of orphaned subscriptions."""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Literal
+
+from ..models import Subscription
+from .storage_adapter import StorageAdapter
+
+logger = logging.getLogger(__name__)
+
+# Clients whose parked subscriptions are remembered (oldest dropped first)
+MAX_PARKED_CLIENTS = 10_000
+
+
+@dataclass
+class ClientSession:
+    """Activity of one client as seen by this process.
+
+    ``last_seen`` and ``disconnected_at`` are readings of the tracker's
+    monotonic clock.
+    """
+
+    client_id: str
+    connected_at: datetime
+    last_seen: float
+    requests: int = 0
+    disconnected_at: float | None = None
+
+
+class SessionTracker:
+    """Tracks client activity and collects the subscriptions of clients that are gone.
+
+    A client is gone once it disconnected or made no request for
+    ``idle_timeout`` seconds. After a further ``grace_period`` its
+    subscriptions are collected, so publishes stop routing to it:
+
+    - ``"park"`` removes them from storage but remembers them in memory;
+      they are restored if the client makes another request
+    - ``"delete"`` removes them for good
+
+    Parked subscriptions live only in this process: they are lost on
+    restart, and beyond ``MAX_PARKED_CLIENTS`` the longest-parked client's
+    are dropped. Either way a returning client has to subscribe again.
+
+    Only clients this process has seen (or adopted at startup) are
+    collected; subscriptions of clients served by other processes sharing
+    the store are left alone.
+    """
+
+    def __init__(
+        self,
+        storage: StorageAdapter,
+        idle_timeout: float = 1800.0,
+        grace_period: float = 300.0,
+        sweep_interval: float = 60.0,
+        action: Literal["park", "delete"] = "park",
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the tracker.
+
+        Args:
+            storage: Storage adapter
+            idle_timeout: Seconds without requests after which a client is gone
+            grace_period: Seconds a gone client keeps its subscriptions
+            sweep_interval: Seconds between collection passes
+            action: What happens to collected subscriptions ("park" or "delete")
+            clock: Monotonic time source (for tests)
+
+        Raises:
+            ValueError: If a duration is not positive or action is unknown
+        """
+        if idle_timeout <= 0:
+            raise ValueError(f"idle_timeout must be positive, got {idle_timeout}")
+        if grace_period < 0:
+            raise ValueError(f"grace_period must not be negative, got {grace_period}")
+        if sweep_interval <= 0:
+            raise ValueError(f"sweep_interval must be positive, got {sweep_interval}")
+        if action not in ("park", "delete"):
+            raise ValueError(f"action must be 'park' or 'delete', got {action!r}")
+
+        self.storage = storage
+        self.idle_timeout = idle_timeout
+        self.grace_period = grace_period
+        self.sweep_interval = sweep_interval
+        self.action = action
+        self.clock = clock
+        self.clients: dict[str, ClientSession] = {}
+        self.parked: OrderedDict[str, list[Subscription]] = OrderedDict()
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start periodic collection passes in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def touch(self, client_id: str) -> ClientSession:
+        """Record a request from a client, restoring its parked subscriptions.
+
+        Args:
+            client_id: Client identifier
+
+        Returns:
+            The client's session
+        """
+        now = self.clock()
+        session = self.clients.get(client_id)
+        if session is None:
+            session = self.clients[client_id] = ClientSession(
+                client_id=client_id, connected_at=datetime.now(), last_seen=now
+            )
+            logger.debug(f"Client connected: {client_id}")
+        session.last_seen = now
+        session.disconnected_at = None
+        session.requests += 1
+
+        parked = self.parked.pop(client_id, None)
+        if parked:
+            await self._restore(client_id, parked)
+        return session
+
+    def disconnect(self, client_id: str) -> None:
+        """Mark a client as gone (its grace period starts now)."""
+        session = self.clients.get(client_id)
+        if session is not None and session.disconnected_at is None:
+            session.disconnected_at = self.clock()
+            logger.debug(f"Client disconnected: {client_id}")
+
+    async def adopt_stored(self, prefix: str) -> int:
+        """Track clients known only from storage as if they were last seen now.
+
+        Session-scoped client IDs left behind by a previous run can never
+        make another request; adopting them at startup lets their
+        subscriptions be collected once idle_timeout and grace_period
+        have passed.
+
+        Args:
+            prefix: Client ID prefix of the clients to adopt
+
+        Returns:
+            Number of clients adopted
+        """
+        channels = await self.storage.list_channels()
+        by_channel = await self.storage.get_subscriptions_by_channels([c.id for c in channels])
+        now = self.clock()
+        adopted = 0
+        for subscriptions in by_channel.values():
+            for subscription in subscriptions:
+                client_id = subscription.clientId
+                if client_id.startswith(prefix) and client_id not in self.clients:
+                    self.clients[client_id] = ClientSession(
+                        client_id=client_id, connected_at=datetime.now(), last_seen=now
+                    )
+                    adopted += 1
+        return adopted
+
+    def _gone_since(self, session: ClientSession, now: float) -> float | None:
+        """Clock reading at which a client became gone, or None if it is live."""
+        if session.disconnected_at is not None:
+            return session.disconnected_at
+        idle_since = session.last_seen + self.idle_timeout
+        return idle_since if idle_since <= now else None
+
+    async def sweep(self) -> int:
+        """Run one pass: collect the subscriptions of clients gone past the grace period.
+
+        Returns:
+            Number of subscriptions collected
+        """
+        now = self.clock()
+        expired = []
+        for session in self.clients.values():
+            gone_since = self._gone_since(session, now)
+            if gone_since is not None and now - gone_since >= self.grace_period:
+                expired.append(session.client_id)
+
+        collected = 0
+        for client_id in expired:
+            current = self.clients.get(client_id)
+            if current is None or self._gone_since(current, now) is None:
+                continue  # Touched while an earlier client was being collected
+            del self.clients[client_id]
+            subscriptions = await self.storage.get_subscriptions_by_client(client_id)
+            if not subscriptions:
+                continue
+            await self.storage.delete_subscriptions([s.id for s in subscriptions])
+            if client_id in self.clients:
+                # The client came back while its subscriptions were being read
+                await self.storage.save_subscriptions(subscriptions)
+                continue
+            collected += len(subscriptions)
+            if self.action == "park":
+                self.parked[client_id] = subscriptions
+                if len(self.parked) > MAX_PARKED_CLIENTS:
+                    self.parked.popitem(last=False)
+
+        if collected:
+            verb = "Parked" if self.action == "park" else "Deleted"
+            logger.info(
+                f"{verb} {collected} subscriptions of {len(expired)} clients gone for "
+                f"more than {self.grace_period:g}s"
+            )
+        return collected
+
+    async def _restore(self, client_id: str, subscriptions: list[Subscription]) -> None:
+        """Save parked subscriptions back, skipping channels deleted meanwhile."""
+        channels = await self.storage.get_channels(list({s.channel for s in subscriptions}))
+        restored = [s for s in subscriptions if s.channel in channels]
+        await self.storage.save_subscriptions(restored)
+        logger.info(f"Restored {len(restored)} parked subscriptions of {client_id}")
+
+    async def _run(self) -> None:
+        """Sweep every ``sweep_interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Session sweep failed: {e}")
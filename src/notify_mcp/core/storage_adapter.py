@@ -1,8 +1,23 @@
 """Abstract storage adapter interface."""
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from datetime import datetime
 
-from ..models import Channel, Notification, Subscription
+from ..models import (
+    Channel,
+    FilteredPage,
+    Notification,
+    NotificationSearchResult,
+    Subscription,
+    SubscriptionFilter,
+)
+from ..utils.filters import matches_filter
+from ..utils.search import InvertedIndex
+
+# Most notifications the default filtered page reads per call, so a sparse
+# filter cannot walk a channel's whole history (archive included) at once
+MAX_FILTER_SCAN = 5000
 
 
 class StorageAdapter(ABC):
@@ -29,6 +44,37 @@ class StorageAdapter(ABC):
         """List all channels."""
         pass
 
+    async def get_channels(self, channel_ids: list[str]) -> dict[str, Channel]:
+        """Get several channels by ID.
+
+        Default implementation fetches them one at a time; backends that can
+        look them up in one query should override it.
+
+        Returns:
+            Channels keyed by ID; IDs without a channel are left out
+        """
+        channels = {}
+        for channel_id in dict.fromkeys(channel_ids):
+            channel = await self.get_channel(channel_id)
+            if channel is not None:
+                channels[channel_id] = channel
+        return channels
+
+    async def record_channel_notification(
+        self, channel_id: str, timestamp: datetime, count: int = 1
+    ) -> None:
+        """Bump a channel's notification count and last notification time.
+
+        Default implementation reads and re-saves the channel; backends that
+        can increment in place should override it.
+        """
+        channel = await self.get_channel(channel_id)
+        if channel is None:
+            return
+        channel.notificationCount += count
+        channel.lastNotificationAt = timestamp
+        await self.save_channel(channel)
+
     # Subscription operations
     @abstractmethod
     async def save_subscription(self, subscription: Subscription) -> None:
@@ -40,22 +86,92 @@ class StorageAdapter(ABC):
         """Delete a subscription."""
         pass
 
+    async def save_subscriptions(self, subscriptions: list[Subscription]) -> None:
+        """Save several subscriptions.
+
+        Default implementation saves them one at a time; backends that can
+        write in bulk should override it.
+        """
+        for subscription in subscriptions:
+            await self.save_subscription(subscription)
+
+    async def delete_subscriptions(self, subscription_ids: list[str]) -> None:
+        """Delete several subscriptions by ID.
+
+        Default implementation deletes them one at a time; backends that can
+        delete in bulk should override it.
+        """
+        for subscription_id in subscription_ids:
+            await self.delete_subscription(subscription_id)
+
     @abstractmethod
     async def get_subscriptions_by_channel(self, channel: str) -> list[Subscription]:
         """Get all subscriptions for a channel."""
         pass
 
+    async def get_subscriptions_by_channels(
+        self, channels: list[str]
+    ) -> dict[str, list[Subscription]]:
+        """Get the subscriptions of several channels.
+
+        Default implementation queries one channel at a time; backends that
+        can look them up in one query should override it.
+
+        Returns:
+            Subscriptions keyed by channel, with an entry for every channel asked for
+        """
+        return {
+            channel: await self.get_subscriptions_by_channel(channel)
+            for channel in dict.fromkeys(channels)
+        }
+
     @abstractmethod
     async def get_subscriptions_by_client(self, client_id: str) -> list[Subscription]:
         """Get all subscriptions for a client."""
         pass
 
+    async def get_subscriptions_by_client_and_channel(
+        self, client_id: str, channel: str
+    ) -> list[Subscription]:
+        """Get a client's subscriptions to a single channel.
+
+        Default implementation filters get_subscriptions_by_client();
+        backends with a composite index should override it.
+        """
+        subscriptions = await self.get_subscriptions_by_client(client_id)
+        return [sub for sub in subscriptions if sub.channel == channel]
+
     # Notification operations
     @abstractmethod
     async def save_notification(self, notification: Notification) -> None:
         """Save a notification."""
         pass
 
+    async def save_notifications(self, notifications: list[Notification]) -> None:
+        """Save several notifications.
+
+        Default implementation saves them one at a time; backends that can
+        insert in bulk should override it.
+        """
+        for notification in notifications:
+            await self.save_notification(notification)
+
+    async def append_notification(self, notification: Notification) -> int:
+        """Save a notification under its channel's next sequence number.
+
+        Processes sharing a store publish through this, so the store hands
+        out each sequence once. Default implementation reads the latest
+        sequence and saves, which is only safe for a store private to one
+        process; shared backends allocate it atomically in the insert.
+
+        Returns:
+            Sequence number assigned (also set on the notification)
+        """
+        sequence = await self.get_latest_sequence(notification.metadata.channel or "") + 1
+        notification.metadata.sequence = sequence
+        await self.save_notification(notification)
+        return sequence
+
     @abstractmethod
     async def get_notifications(
         self, channel: str, limit: int = 50
@@ -63,7 +179,186 @@ class StorageAdapter(ABC):
         """Get recent notifications from a channel."""
         pass
 
+    async def get_notifications_page(
+        self,
+        channel: str,
+        limit: int = 50,
+        before: int | None = None,
+        after: int | None = None,
+    ) -> list[Notification]:
+        """Get a page of a channel's history by sequence cursor, newest first.
+
+        ``before`` returns the ``limit`` newest notifications with a lower
+        sequence; ``after`` returns the ``limit`` oldest with a higher one.
+        Pass the last page item's sequence as ``before`` to page backwards
+        and the first item's as ``after`` to page forwards.
+
+        Default implementation filters the full history; backends with a
+        sequence index should override it.
+        """
+        count = await self.get_notification_count(channel)
+        notifications = await self.get_notifications(channel, limit=count)
+        notifications.sort(key=lambda n: n.metadata.sequence or 0, reverse=True)
+        page = [
+            n
+            for n in notifications
+            if (before is None or (n.metadata.sequence or 0) < before)
+            and (after is None or (n.metadata.sequence or 0) > after)
+        ]
+        return page[-limit:] if after is not None else page[:limit]
+
+    async def get_filtered_notifications_page(
+        self,
+        channel: str,
+        filters: SubscriptionFilter,
+        limit: int = 50,
+        before: int | None = None,
+    ) -> FilteredPage:
+        """Get a page of a channel's history matching a subscription filter.
+
+        Newest first, up to ``limit`` matches; pass ``next_before`` as
+        ``before`` for the next page until it is None. A backend may stop
+        scanning early, so a page can hold fewer matches (even none) while
+        more history remains. Matching follows ``matches_filter``.
+
+        Default implementation pages through the history and filters each
+        page, reading at most MAX_FILTER_SCAN notifications per call;
+        backends that can evaluate filters in a query should override it.
+        """
+        matched: list[Notification] = []
+        if limit <= 0:
+            return FilteredPage(notifications=matched)
+
+        scanned = 0
+        while scanned < MAX_FILTER_SCAN:
+            page_size = min(max(limit, 50), MAX_FILTER_SCAN - scanned)
+            page = await self.get_notifications_page(channel, limit=page_size, before=before)
+            scanned += len(page)
+            for notification in page:
+                if matches_filter(notification, filters):
+                    matched.append(notification)
+                    if len(matched) == limit:
+                        return FilteredPage(
+                            notifications=matched, next_before=notification.metadata.sequence
+                        )
+            if len(page) < page_size:
+                return FilteredPage(notifications=matched)
+            before = page[-1].metadata.sequence
+        return FilteredPage(notifications=matched, next_before=before)
+
+    async def iter_notifications(
+        self,
+        channel: str,
+        since: int | None = None,
+        until: int | None = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Notification]:
+        """Stream a channel's history oldest first without loading all of it.
+
+        Yields notifications with ``since < sequence <= until`` (either bound
+        may be omitted), reading ``batch_size`` at a time, so memory use does
+        not grow with the length of the history. Close the iterator (e.g.
+        with ``contextlib.aclosing``) when abandoning it early.
+
+        Default implementation walks keyset pages forward; backends with
+        streaming cursors should override it.
+
+        Raises:
+            ValueError: If batch_size is below 1
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+        cursor = -1 if since is None else since
+        before = None if until is None else until + 1
+        while True:
+            page = await self.get_notifications_page(
+                channel, limit=batch_size, before=before, after=cursor
+            )
+            for notification in reversed(page):
+                yield notification
+            if len(page) < batch_size:
+                return
+            cursor = page[0].metadata.sequence or 0
+
+    async def search_notifications(
+        self, query: str, channels: list[str] | None = None, limit: int = 20
+    ) -> list[NotificationSearchResult]:
+        """Full-text search over notification titles and bodies.
+
+        Every query term must match (case-insensitive). Results are ordered
+        by relevance.
+
+        Default implementation indexes the searched channels' history on
+        every call; backends should override it with a maintained index.
+
+        Args:
+            query: Free-text query
+            channels: Channels to search (None = all channels)
+            limit: Maximum number of results
+        """
+        if channels is None:
+            channels = [channel.id for channel in await self.list_channels()]
+
+        found: list[Notification] = []
+        index: InvertedIndex[int] = InvertedIndex(
+            lambda key: (found[key].information.title, found[key].information.body)
+        )
+        for channel in channels:
+            count = await self.get_notification_count(channel)
+            for notification in await self.get_notifications(channel, limit=count):
+                index.add(
+                    len(found),
+                    channel,
+                    notification.metadata.sequence or 0,
+                    notification.information.title,
+                    notification.information.body,
+                )
+                found.append(notification)
+
+        return [
+            NotificationSearchResult(
+                notification=found[hit.key], score=hit.score, snippet=hit.snippet
+            )
+            for hit in index.search(query, limit=limit)
+        ]
+
     @abstractmethod
     async def get_notification_count(self, channel: str) -> int:
         """Get total notification count for a channel."""
         pass
+
+    async def get_latest_sequence(self, channel: str) -> int:
+        """Get the highest sequence number stored for a channel (0 if none).
+
+        Default implementation reads the most recent notification; backends
+        with a sequence index should override it.
+        """
+        notifications = await self.get_notifications(channel, limit=1)
+        return max((n.metadata.sequence or 0 for n in notifications), default=0)
+
+    # Expiry
+    async def purge_expired(self, now: float | None = None, batch_size: int = 500) -> int:
+        """Delete up to ``batch_size`` notifications whose validity has passed.
+
+        Backends that track ``Context.validity`` hide expired notifications
+        from reads immediately and reclaim them here; call repeatedly until
+        it returns less than ``batch_size``.
+
+        Default implementation purges nothing.
+
+        Args:
+            now: POSIX time to expire against (defaults to the current time)
+            batch_size: Maximum notifications to delete
+
+        Returns:
+            Number of notifications deleted
+        """
+        return 0
+
+    async def reclaim_space(self) -> None:
+        """Release storage freed by purges back to the OS, if supported.
+
+        Default implementation does nothing.
+        """
+        return None
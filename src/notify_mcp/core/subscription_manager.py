@@ -52,14 +52,15 @@ class SubscriptionManager:
         Returns:
             True if unsubscribed, False if not subscribed
         """
-        subscriptions = await self.storage.get_subscriptions_by_client(client_id)
+        subscriptions = await self.storage.get_subscriptions_by_client_and_channel(
+            client_id, channel
+        )
 
-        for sub in subscriptions:
-            if sub.channel == channel:
-                await self.storage.delete_subscription(sub.id)
-                return True
+        if not subscriptions:
+            return False
 
-        return False
+        await self.storage.delete_subscription(subscriptions[0].id)
+        return True
 
     async def get_subscribers(self, channel: str) -> list[Subscription]:
         """Get all subscribers for a channel.
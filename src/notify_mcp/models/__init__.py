@@ -11,6 +11,7 @@ from .notification import (
     Sender,
     Visibility,
 )
+from .search import FilteredPage, NotificationSearchResult
 from .subscription import Subscription, SubscriptionFilter
 
 __all__ = [
@@ -29,4 +30,7 @@ __all__ = [
     # Subscription models
     "Subscription",
     "SubscriptionFilter",
+    # Search models
+    "NotificationSearchResult",
+    "FilteredPage",
 ]
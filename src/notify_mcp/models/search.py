@@ -0,0 +1,20 @@
+"""Search result models."""
+
+from pydantic import BaseModel
+
+from .notification import Notification
+
+
+class NotificationSearchResult(BaseModel):
+    """A notification matched by full-text search."""
+
+    notification: Notification
+    score: float  # Higher is more relevant; only comparable within one backend
+    snippet: str  # Matched terms wrapped in [brackets]
+
+
+class FilteredPage(BaseModel):
+    """A page of history matching a filter, newest first."""
+
+    notifications: list[Notification]
+    next_before: int | None = None  # Cursor for the next page; None once history is exhausted
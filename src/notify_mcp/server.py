@@ -1,13 +1,18 @@
 """Main MCP server implementation."""
 
+import hashlib
+import io
 import json
 import logging
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from urllib.parse import parse_qs
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
+from mcp.server.streamable_http import MCP_SESSION_ID_HEADER
 from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
 from mcp.types import (
     GetPromptResult,
@@ -17,12 +22,18 @@ from mcp.types import (
     TextContent,
     Tool,
 )
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from .config.storage_config import StorageSettings
 from .config.transport_config import TransportSettings
 from .core.channel_manager import ChannelManager
+from .core.expiry_reaper import ExpiryReaper
 from .core.notification_router import NotificationRouter
 from .core.notification_validator import NotificationValidator
+from .core.session_tracker import ClientSession, SessionTracker
+from .core.storage_adapter import StorageAdapter
 from .core.subscription_manager import SubscriptionManager
 from .models import (
     Context,
@@ -32,29 +43,56 @@ from .models import (
     Sender,
     SubscriptionFilter,
 )
+from .storage.caching import CachingStorageAdapter
+from .storage.change_feed import ChangeFeed, create_change_feed
 from .storage.factory import close_storage, create_storage
+from .storage.instrumented import InstrumentedStorageAdapter
+from .storage.memory import InMemoryStorage
+from .utils.json_stream import iter_json_array
 
 logger = logging.getLogger(__name__)
 
+# Page sizes for the notification://<channel>/recent resource
+HISTORY_PAGE_SIZE = 50
+MAX_HISTORY_PAGE_SIZE = 500
+
+# Upper bound for the search_notifications tool's limit
+MAX_SEARCH_RESULTS = 100
+
+# HTTP path of the Prometheus storage metrics (NOTIFY_MCP_STORAGE_METRICS_ENABLED)
+METRICS_PATH = "/metrics"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Prefix of client IDs derived from MCP session IDs (one client per session)
+HTTP_SESSION_CLIENT_PREFIX = "http-"
+
+# Client that sent the MCP request being handled. Each request runs in its
+# own task, so concurrent HTTP requests never see each other's identity.
+_current_client: ContextVar[str | None] = ContextVar("notify_mcp_client", default=None)
+
 
 class NotifyMCPServer:
     """Notify-MCP server implementation."""
 
-    def __init__(self):
+    def __init__(self) -> None:
         """Initialize the server."""
         # Storage will be initialized asynchronously in run()
-        self.storage = None  # type: ignore
+        self.storage: StorageAdapter = None  # type: ignore[assignment]
         self.validator = NotificationValidator()
-        self.subscription_manager = None  # type: ignore
-        self.channel_manager = None  # type: ignore
-        self.router = None  # type: ignore
+        self.subscription_manager: SubscriptionManager = None  # type: ignore[assignment]
+        self.channel_manager: ChannelManager = None  # type: ignore[assignment]
+        self.router: NotificationRouter = None  # type: ignore[assignment]
+        self.expiry_reaper: ExpiryReaper | None = None
+        self.change_feed: ChangeFeed | None = None
+        self.session_tracker: SessionTracker | None = None
 
         # Create MCP server
         self.server = Server("notify-mcp")
 
         # Multi-client support
-        self.active_clients: dict[str, dict] = {}  # client_id -> session info
-        self._client_context: Optional[str] = None  # Current request context
+        self.active_clients: dict[str, ClientSession] = {}  # Filled by the session tracker
+        self._client_context: str | None = None  # Identity outside HTTP requests (stdio)
+        self.client_id_header: str | None = None  # HTTP header naming the client
 
         # Sequence counters per channel
         self.sequences: dict[str, int] = {}
@@ -69,16 +107,61 @@ class NotifyMCPServer:
         """Get current client ID from context.
 
         For stdio: Returns fixed "stdio-client"
-        For HTTP: Returns session-specific client ID from context
+        For HTTP: Returns the identity bound to the current request (see
+        _identify_client), so concurrent sessions never share one
         """
+        client_id = _current_client.get() or self._identify_client()
+        if client_id:
+            return client_id
         if self._client_context:
             return self._client_context
         return "stdio-client"  # Fallback for stdio mode
 
-    def _get_next_sequence(self, channel: str) -> int:
-        """Get next sequence number for a channel."""
+    def _identify_client(self) -> str | None:
+        """Derive the client identity of the HTTP request being handled.
+
+        With ``client_id_header`` set (NOTIFY_MCP_HTTP_CLIENT_ID_HEADER), its
+        value names the client, so subscriptions follow a client across
+        sessions; Authorization values are hashed rather than stored.
+        Otherwise each MCP session is its own client.
+
+        Returns:
+            Client ID, or None outside an HTTP request (e.g. stdio)
+        """
+        try:
+            request = self.server.request_context.request
+        except LookupError:
+            return None
+        headers = getattr(request, "headers", None)
+        if headers is None:
+            return None
+        return self._client_id_from_headers(headers)
+
+    def _client_id_from_headers(self, headers: Headers) -> str | None:
+        """Client ID named by HTTP request headers (see _identify_client)."""
+        if self.client_id_header:
+            value = headers.get(self.client_id_header)
+            if value:
+                if self.client_id_header.lower() == "authorization":
+                    return "auth-" + hashlib.sha256(value.encode()).hexdigest()[:16]
+                return value
+        session_id = headers.get(MCP_SESSION_ID_HEADER)
+        return f"{HTTP_SESSION_CLIENT_PREFIX}{session_id}" if session_id else None
+
+    async def _note_activity(self, client_id: str | None) -> None:
+        """Record a request from an HTTP client with the session tracker."""
+        if client_id is not None and self.session_tracker is not None:
+            await self.session_tracker.touch(client_id)
+
+    async def _get_next_sequence(self, channel: str) -> int:
+        """Get next sequence number for a channel.
+
+        The counter is seeded from storage so sequences keep increasing
+        across restarts (history trimming relies on this).
+        """
         if channel not in self.sequences:
-            self.sequences[channel] = 0
+            latest = await self.storage.get_latest_sequence(channel)
+            self.sequences.setdefault(channel, latest)
         self.sequences[channel] += 1
         return self.sequences[channel]
 
@@ -122,6 +205,11 @@ class NotifyMCPServer:
                                 "items": {"type": "string"},
                                 "default": [],
                             },
+                            "validity": {
+                                "type": "string",
+                                "format": "date-time",
+                                "description": "ISO 8601 time after which the notification expires",
+                            },
                         },
                         "required": ["channel", "title", "body"],
                     },
@@ -187,25 +275,82 @@ class NotifyMCPServer:
                     description="Get current user's subscriptions",
                     inputSchema={"type": "object", "properties": {}},
                 ),
+                Tool(
+                    name="search_notifications",
+                    description=(
+                        "Full-text search over notification titles and bodies. "
+                        "Every word in the query must match; results are ranked by relevance."
+                    ),
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "query": {"type": "string", "description": "Words to search for"},
+                            "channels": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Channels to search (default: all)",
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "minimum": 1,
+                                "maximum": MAX_SEARCH_RESULTS,
+                                "default": 20,
+                            },
+                        },
+                        "required": ["query"],
+                    },
+                ),
+                Tool(
+                    name="get_storage_stats",
+                    description=(
+                        "Memory storage usage and evictions, and per-method storage call "
+                        "counts, errors and latency percentiles "
+                        "(requires NOTIFY_MCP_STORAGE_METRICS_ENABLED)"
+                    ),
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "reset": {
+                                "type": "boolean",
+                                "default": False,
+                                "description": "Clear the recorded calls after reading them",
+                            },
+                        },
+                    },
+                ),
             ]
 
         @self.server.call_tool()
         async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-            """Call a tool."""
-            if name == "publish_notification":
-                return await self._publish_notification(arguments)
-            elif name == "subscribe_to_channel":
-                return await self._subscribe_to_channel(arguments)
-            elif name == "unsubscribe_from_channel":
-                return await self._unsubscribe_from_channel(arguments)
-            elif name == "list_channels":
-                return await self._list_channels()
-            elif name == "create_channel":
-                return await self._create_channel(arguments)
-            elif name == "get_my_subscriptions":
-                return await self._get_my_subscriptions()
-            else:
-                raise ValueError(f"Unknown tool: {name}")
+            """Call a tool as the client that sent the request."""
+            client_id = self._identify_client()
+            await self._note_activity(client_id)
+            token = _current_client.set(client_id)
+            try:
+                return await self._dispatch_tool(name, arguments)
+            finally:
+                _current_client.reset(token)
+
+    async def _dispatch_tool(self, name: str, arguments: dict) -> list[TextContent]:
+        """Run a tool handler by name."""
+        if name == "publish_notification":
+            return await self._publish_notification(arguments)
+        elif name == "subscribe_to_channel":
+            return await self._subscribe_to_channel(arguments)
+        elif name == "unsubscribe_from_channel":
+            return await self._unsubscribe_from_channel(arguments)
+        elif name == "list_channels":
+            return await self._list_channels()
+        elif name == "create_channel":
+            return await self._create_channel(arguments)
+        elif name == "get_my_subscriptions":
+            return await self._get_my_subscriptions()
+        elif name == "search_notifications":
+            return await self._search_notifications(arguments)
+        elif name == "get_storage_stats":
+            return await self._get_storage_stats(arguments)
+        else:
+            raise ValueError(f"Unknown tool: {name}")
 
     async def _publish_notification(self, args: dict) -> list[TextContent]:
         """Publish notification tool handler."""
@@ -223,6 +368,7 @@ class NotifyMCPServer:
                 theme=args.get("theme", "info"),
                 priority=args.get("priority", "medium"),
                 tags=args.get("tags", []),
+                validity=args.get("validity"),
             ),
             information=Information(
                 title=args["title"],
@@ -236,18 +382,27 @@ class NotifyMCPServer:
         )
 
         # Validate and enrich
-        sequence = self._get_next_sequence(channel)
+        if self.change_feed is None:
+            sequence = await self._get_next_sequence(channel)
+        else:
+            sequence = 0  # Assigned by the store on save
         notification = self.validator.validate_and_enrich(notification, channel, sequence)
 
-        # Save notification
-        await self.storage.save_notification(notification)
+        # Save notification. Processes sharing the store let it number the
+        # notification in the insert transaction, so sequences stay unique
+        # and commit in order; the save is announced to the other processes.
+        if self.change_feed is None:
+            await self.storage.save_notification(notification)
+        else:
+            self.change_feed.mark_local([notification])
+            await self.storage.append_notification(notification)
+            await self.change_feed.announce([notification])
 
         # Route to subscribers (in stdio mode, notifications are stored, not pushed)
         stats = await self.router.route_notification(notification)
 
         # Update channel stats
-        count = await self.storage.get_notification_count(channel)
-        await self.channel_manager.update_channel_stats(channel, count)
+        await self.channel_manager.record_notification(channel, notification.metadata.timestamp)
 
         # Get subscriber count for this channel
         subscriptions = await self.subscription_manager.get_subscribers(channel)
@@ -351,6 +506,91 @@ class NotifyMCPServer:
 
         return [TextContent(type="text", text="\n".join(lines))]
 
+    async def _search_notifications(self, args: dict) -> list[TextContent]:
+        """Search notifications tool handler."""
+        query = args["query"]
+        limit = max(1, min(int(args.get("limit", 20)), MAX_SEARCH_RESULTS))
+
+        results = await self.storage.search_notifications(
+            query, channels=args.get("channels"), limit=limit
+        )
+
+        if not results:
+            return [TextContent(type="text", text=f"No notifications match: {query}")]
+
+        lines = [f"🔎 {len(results)} result(s) for: {query}\n"]
+        for result in results:
+            metadata = result.notification.metadata
+            lines.append(
+                f"• [{metadata.channel} #{metadata.sequence}] "
+                f"{result.notification.information.title} ({metadata.timestamp.isoformat()})"
+            )
+            lines.append(f"  {result.snippet}\n")
+
+        return [TextContent(type="text", text="\n".join(lines))]
+
+    async def _get_storage_stats(self, args: dict) -> list[TextContent]:
+        """Storage stats tool handler."""
+        lines = []
+        memory = self._memory_storage()
+        if memory is not None:
+            usage = memory.get_memory_stats()
+            budget = usage["max_memory_bytes"]
+            lines.append("🧠 Memory storage:\n")
+            lines.append(
+                f"• {usage['memory_bytes']} bytes of "
+                f"{'unlimited' if budget is None else budget}, "
+                f"{usage['notifications']} notifications in {usage['channels']} channels"
+            )
+            lines.append(f"• {usage['evicted_by_budget']} evicted to stay under budget\n")
+
+        if not isinstance(self.storage, InstrumentedStorageAdapter):
+            lines.append(
+                "Storage call metrics are disabled (set NOTIFY_MCP_STORAGE_METRICS_ENABLED=true)"
+            )
+            return [TextContent(type="text", text="\n".join(lines))]
+
+        summary = self.storage.summary()
+        if args.get("reset"):
+            self.storage.reset()
+
+        if not summary:
+            lines.append("No storage calls recorded yet")
+            return [TextContent(type="text", text="\n".join(lines))]
+
+        lines.append("⏱️ Storage latency in ms (by total time):\n")
+        by_total = sorted(summary.items(), key=lambda item: -item[1]["mean_ms"] * item[1]["calls"])
+        for method, stats in by_total:
+            lines.append(f"• {method}: {stats['calls']} calls, {stats['errors']} errors")
+            lines.append(
+                f"  mean {stats['mean_ms']}, p50 {stats['p50_ms']}, p95 {stats['p95_ms']}, "
+                f"p99 {stats['p99_ms']}, max {stats['max_ms']}\n"
+            )
+
+        return [TextContent(type="text", text="\n".join(lines))]
+
+    def _memory_storage(self) -> InMemoryStorage | None:
+        """Find the in-memory backend behind the storage wrappers, if any."""
+        storage = self.storage
+        while isinstance(storage, (CachingStorageAdapter, InstrumentedStorageAdapter)):
+            storage = storage.storage
+        return storage if isinstance(storage, InMemoryStorage) else None
+
+    def _render_metrics(self) -> str | None:
+        """Render storage metrics in the Prometheus text exposition format.
+
+        Returns:
+            Call metrics (if instrumented) and memory usage (if the backend is
+            in-memory), or None if there are neither
+        """
+        parts = []
+        if isinstance(self.storage, InstrumentedStorageAdapter):
+            parts.append(self.storage.render_prometheus())
+        memory = self._memory_storage()
+        if memory is not None:
+            parts.append(memory.render_prometheus())
+        return "".join(parts) if parts else None
+
     def _register_resource_handlers(self) -> None:
         """Register MCP resource handlers."""
 
@@ -376,7 +616,23 @@ class NotifyMCPServer:
                     Resource(
                         uri=f"notification://{channel.id}/recent",
                         name=f"Recent Notifications - {channel.name}",
-                        description=f"Last 50 notifications from {channel.name}",
+                        description=(
+                            f"Last {HISTORY_PAGE_SIZE} notifications from {channel.name} "
+                            "(page with ?before=<sequence> or ?after=<sequence>; filter with "
+                            "?priority=, ?tags=, ?themes=, ?roles= or ?senders=)"
+                        ),
+                        mimeType="application/json",
+                    )
+                )
+                resources.append(
+                    Resource(
+                        uri=f"notification://{channel.id}/history",
+                        name=f"Notification History - {channel.name}",
+                        description=(
+                            f"Retained history of {channel.name}, oldest first, up to "
+                            f"{MAX_HISTORY_PAGE_SIZE} per read (bound with ?since=<sequence>, "
+                            "?until=<sequence> and ?limit=<n>)"
+                        ),
                         mimeType="application/json",
                     )
                 )
@@ -394,6 +650,7 @@ class NotifyMCPServer:
         @self.server.read_resource()
         async def read_resource(uri: str) -> str:
             """Read a resource."""
+            await self._note_activity(self._identify_client())
             # Convert AnyUrl to string if needed
             uri_str = str(uri)
             parts = uri_str.split("://")
@@ -416,32 +673,189 @@ class NotifyMCPServer:
                     raise ValueError(f"Unknown schema: {path}")
 
             elif scheme == "notification":
-                # notification://<channel>/recent
+                # notification://<channel>/recent[?before=<seq>|after=<seq>][&limit=<n>]
+                #     [&priority=..][&tags=..][&themes=..][&roles=..][&senders=..]
+                # notification://<channel>/history[?since=<seq>][&until=<seq>][&limit=<n>]
+                path, _, query = path.partition("?")
                 channel_path = path.split("/")
                 if len(channel_path) < 2:
                     raise ValueError(f"Invalid notification URI: {uri}")
 
                 channel = channel_path[0]
-                notifications = await self.storage.get_notifications(channel, limit=50)
-
-                return json.dumps(
-                    [n.model_dump(mode="json", exclude_none=True) for n in notifications],
-                    indent=2,
-                )
+                if channel_path[1] == "history":
+                    return await self._read_history(channel, query)
+                return await self._read_recent(channel, query)
 
             elif scheme == "channel":
                 # channel://<channel>/info
                 channel_id = path.split("/")[0]
-                channel = await self.channel_manager.get_channel(channel_id)
+                info = await self.channel_manager.get_channel(channel_id)
 
-                if not channel:
+                if not info:
                     raise ValueError(f"Channel not found: {channel_id}")
 
-                return json.dumps(channel.model_dump(mode="json", exclude_none=True), indent=2)
+                return json.dumps(info.model_dump(mode="json", exclude_none=True), indent=2)
 
             else:
                 raise ValueError(f"Unknown resource scheme: {scheme}")
 
+    async def _read_recent(self, channel: str, query: str) -> str:
+        """Render a page of a channel's history, newest first.
+
+        Filter parameters (comma-separated lists, matched like subscription
+        filters) are evaluated by the storage backend. Backends without
+        filter queries scan a bounded stretch of history per read, so a
+        filtered page can hold fewer than ``limit`` matches while more
+        remain; it is continued with its ``next_before`` cursor.
+
+        Args:
+            channel: Channel ID
+            query: URI query string, e.g. "before=120&limit=20&priority=high,critical"
+
+        Returns:
+            JSON array of notifications, newest first; with filters, a JSON
+            object with the ``notifications`` array and ``next_before``
+            (null once the history is exhausted)
+
+        Raises:
+            ValueError: If a parameter is invalid, or ``after`` is combined with filters
+        """
+        limit, before, after = self._parse_history_cursor(query)
+        filters = self._parse_history_filter(query)
+        if filters is None:
+            notifications = await self.storage.get_notifications_page(
+                channel, limit=limit, before=before, after=after
+            )
+            return json.dumps(
+                [n.model_dump(mode="json", exclude_none=True) for n in notifications],
+                indent=2,
+            )
+        if after is not None:
+            raise ValueError("Filtered history pages only support the before cursor")
+
+        page = await self.storage.get_filtered_notifications_page(
+            channel, filters, limit=limit, before=before
+        )
+        return json.dumps(
+            {
+                "notifications": [
+                    n.model_dump(mode="json", exclude_none=True) for n in page.notifications
+                ],
+                "next_before": page.next_before,
+            },
+            indent=2,
+        )
+
+    @staticmethod
+    def _parse_history_filter(query: str) -> SubscriptionFilter | None:
+        """Parse history filter query parameters.
+
+        Args:
+            query: URI query string, e.g. "priority=high,critical&tags=deploy"
+
+        Returns:
+            Filter built from the priority, tags, themes, roles and senders
+            parameters, or None if none of them is given
+
+        Raises:
+            ValidationError: If a parameter holds a value the filter does not accept
+        """
+        params = parse_qs(query)
+        fields = {
+            name: [value for values in params[name] for value in values.split(",") if value]
+            for name in SubscriptionFilter.model_fields
+            if name in params
+        }
+        return SubscriptionFilter.model_validate(fields) if fields else None
+
+    @staticmethod
+    def _parse_history_cursor(query: str) -> tuple[int, int | None, int | None]:
+        """Parse history resource query parameters.
+
+        Args:
+            query: URI query string, e.g. "before=120&limit=20"
+
+        Returns:
+            Tuple of (limit, before, after)
+
+        Raises:
+            ValueError: If a parameter is not an integer or the limit is out of range
+        """
+        params = parse_qs(query)
+        try:
+            limit = int(params.get("limit", [HISTORY_PAGE_SIZE])[0])
+            before = int(params["before"][0]) if "before" in params else None
+            after = int(params["after"][0]) if "after" in params else None
+        except ValueError as e:
+            raise ValueError(f"Invalid history cursor: {query}") from e
+
+        if not 1 <= limit <= MAX_HISTORY_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_HISTORY_PAGE_SIZE}")
+        return limit, before, after
+
+    async def _read_history(self, channel: str, query: str) -> str:
+        """Render up to ``limit`` notifications of a channel's history as a JSON array.
+
+        Notifications are streamed from storage and encoded one at a time,
+        and at most MAX_HISTORY_PAGE_SIZE are read per call, however long
+        the history (archived segments included) is. To continue, read
+        again with ``since`` set to the sequence of the last item returned.
+
+        Args:
+            channel: Channel ID
+            query: URI query string, e.g. "since=120&until=400&limit=100"
+
+        Returns:
+            JSON array of notifications, oldest first
+        """
+        since, until, limit = self._parse_history_range(query)
+
+        async def first_page(stream: AsyncIterator[Notification]) -> AsyncIterator[Notification]:
+            """The first ``limit`` notifications; the storage stream is closed after them."""
+            try:
+                count = 0
+                async for notification in stream:
+                    yield notification
+                    count += 1
+                    if count == limit:
+                        break
+            finally:
+                if isinstance(stream, AsyncGenerator):
+                    await stream.aclose()
+
+        stream = self.storage.iter_notifications(
+            channel, since=since, until=until, batch_size=limit
+        )
+        buffer = io.StringIO()
+        async for chunk in iter_json_array(first_page(stream)):
+            buffer.write(chunk)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _parse_history_range(query: str) -> tuple[int | None, int | None, int]:
+        """Parse history range query parameters.
+
+        Args:
+            query: URI query string, e.g. "since=120&until=400&limit=100"
+
+        Returns:
+            Tuple of (since, until, limit)
+
+        Raises:
+            ValueError: If a parameter is not an integer or the limit is out of range
+        """
+        params = parse_qs(query)
+        try:
+            since = int(params["since"][0]) if "since" in params else None
+            until = int(params["until"][0]) if "until" in params else None
+            limit = int(params.get("limit", [MAX_HISTORY_PAGE_SIZE])[0])
+        except ValueError as e:
+            raise ValueError(f"Invalid history range: {query}") from e
+
+        if not 1 <= limit <= MAX_HISTORY_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_HISTORY_PAGE_SIZE}")
+        return since, until, limit
+
     def _register_prompt_handlers(self) -> None:
         """Register MCP prompt handlers."""
 
@@ -525,6 +939,21 @@ Format as an urgent team alert.""",
         self.channel_manager = ChannelManager(self.storage)
         self.router = NotificationRouter(self.storage, self.subscription_manager)
 
+        # Purge notifications past their validity in the background
+        if settings.expiry_reap_interval > 0:
+            self.expiry_reaper = ExpiryReaper(
+                self.storage, settings.expiry_reap_interval, settings.expiry_batch_size
+            )
+            self.expiry_reaper.start()
+
+        # Route notifications published by other processes sharing the store
+        if settings.change_feed_enabled:
+            self.change_feed = create_change_feed(
+                self.storage, poll_interval=settings.change_feed_poll_interval
+            )
+            await self.change_feed.start(self._on_remote_notifications)
+            logger.info(f"Change feed started: {type(self.change_feed).__name__}")
+
         # Create default channel
         try:
             await self.channel_manager.create_channel(
@@ -537,9 +966,33 @@ Format as an urgent team alert.""",
         except ValueError:
             pass  # Channel already exists
 
+    async def _on_remote_notifications(self, notifications: list[Notification]) -> None:
+        """Route notifications another process published to the shared store.
+
+        They are already saved and counted in the channel stats; this
+        process's cache is updated.
+        """
+        cache = self.storage
+        if isinstance(cache, InstrumentedStorageAdapter):
+            cache = cache.storage
+        if isinstance(cache, CachingStorageAdapter):
+            cache.note_external_notifications(notifications)
+
+        for notification in notifications:
+            await self.router.route_notification(notification)
+
     async def _shutdown_server(self) -> None:
         """Cleanup server resources."""
         logger.info("Shutting down server...")
+        if self.session_tracker is not None:
+            await self.session_tracker.stop()
+            self.session_tracker = None
+        if self.change_feed is not None:
+            await self.change_feed.stop()
+            self.change_feed = None
+        if self.expiry_reaper is not None:
+            await self.expiry_reaper.stop()
+            self.expiry_reaper = None
         await close_storage(self.storage)
 
     async def run_stdio(self) -> None:
@@ -559,32 +1012,37 @@ Format as an urgent team alert.""",
         finally:
             await self._shutdown_server()
 
-    async def run_http(self, host: str = "0.0.0.0", port: int = 8000) -> None:
+    async def run_http(
+        self, host: str = "0.0.0.0", port: int = 8000, client_id_header: str | None = None
+    ) -> None:
         """Run server with HTTP transport (multi-client).
 
         Args:
             host: Host address to bind to
             port: Port to listen on
+            client_id_header: Header identifying clients (None = one client per MCP session)
         """
         logger.info(f"Starting Notify-MCP server with HTTP transport on {host}:{port}...")
+        self.client_id_header = client_id_header
 
         await self._initialize_server()
+        settings = TransportSettings()
 
         try:
+            await self._start_session_tracker(settings)
+
             # Create session manager for multi-client support
-            session_manager = StreamableHTTPSessionManager(self.server)
+            session_manager = StreamableHTTPSessionManager(
+                self.server, session_idle_timeout=settings.session_idle_timeout or None
+            )
 
             # Run HTTP server context
             async with session_manager.run():
                 # Import uvicorn for HTTP server
                 import uvicorn
 
-                # Create ASGI app that uses session_manager.handle_request
-                async def app(scope, receive, send):
-                    """ASGI app that delegates to session manager."""
-                    await session_manager.handle_request(scope, receive, send)
-
                 # Run HTTP server
+                app = self._http_app(session_manager)
                 config = uvicorn.Config(app, host=host, port=port, log_level="info")
                 server = uvicorn.Server(config)
                 await server.serve()
@@ -592,7 +1050,67 @@ Format as an urgent team alert.""",
         finally:
             await self._shutdown_server()
 
-    async def run(self, transport: Optional[str] = None) -> None:
+    async def _start_session_tracker(self, settings: TransportSettings) -> None:
+        """Track HTTP clients and collect the subscriptions of clients that are gone."""
+        if settings.session_idle_timeout <= 0:
+            logger.info("Session tracking disabled (NOTIFY_MCP_SESSION_IDLE_TIMEOUT=0)")
+            return
+
+        self.session_tracker = SessionTracker(
+            self.storage,
+            idle_timeout=settings.session_idle_timeout,
+            grace_period=settings.session_grace_period,
+            sweep_interval=settings.session_sweep_interval,
+            action=settings.session_gc_action,
+        )
+        self.active_clients = self.session_tracker.clients
+
+        # Sessions of a previous run never come back. With a change feed the
+        # store is shared, and such clients may belong to another process.
+        if self.change_feed is None:
+            adopted = await self.session_tracker.adopt_stored(HTTP_SESSION_CLIENT_PREFIX)
+            if adopted:
+                logger.info(f"Tracking {adopted} clients left over from a previous run")
+
+        self.session_tracker.start()
+        logger.info(
+            f"Session tracking: idle_timeout={settings.session_idle_timeout:g}s, "
+            f"grace_period={settings.session_grace_period:g}s, "
+            f"action={settings.session_gc_action}"
+        )
+
+    def _http_app(self, session_manager: StreamableHTTPSessionManager) -> ASGIApp:
+        """Create the ASGI app for the HTTP transport.
+
+        Requests go to the session manager, except ``GET /metrics``, which
+        serves storage metrics in the Prometheus format when they are enabled.
+        A ``DELETE`` (session termination) marks its client as disconnected.
+        """
+
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            """ASGI app that delegates to session manager."""
+            if (
+                scope["type"] == "http"
+                and scope["method"] == "DELETE"
+                and self.session_tracker is not None
+            ):
+                client_id = self._client_id_from_headers(Headers(scope=scope))
+                if client_id is not None:
+                    self.session_tracker.disconnect(client_id)
+            if (
+                scope["type"] == "http"
+                and scope["path"] == METRICS_PATH
+                and scope["method"] == "GET"
+                and (metrics := self._render_metrics()) is not None
+            ):
+                response = Response(metrics, media_type=PROMETHEUS_CONTENT_TYPE)
+                await response(scope, receive, send)
+                return
+            await session_manager.handle_request(scope, receive, send)
+
+        return app
+
+    async def run(self, transport: str | None = None) -> None:
         """Run server with configured transport.
 
         Args:
@@ -610,6 +1128,7 @@ Format as an urgent team alert.""",
             await self.run_http(
                 host=settings.http_host,
                 port=settings.http_port,
+                client_id_header=settings.http_client_id_header,
             )
         else:
             raise ValueError(f"Unknown transport type: {transport_type}")
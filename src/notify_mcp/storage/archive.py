@@ -0,0 +1,320 @@
+"""Compressed, append-only archive tier for notification history.
+
+``SQLiteStorage`` can move notifications that fall out of the hot window
+(``max_history``) into an archive instead of deleting them. Each channel
+gets a directory of segment files; a segment is a sequence of frames:
+
+- a fixed header: first sequence, last sequence, payload length, CRC32
+- a zlib-compressed NDJSON payload of notification documents in sequence
+  order (one frame per history trim)
+
+Channel directories are named ``ch-<hex of the UTF-8 channel ID>``, so any
+ID maps to exactly one directory inside the archive and back.
+
+Frames are only ever appended, and a segment is closed once it grows past
+``segment_bytes``. The sparse sequence index (one entry per frame, not per
+notification) is rebuilt on open by walking the frame headers, so reading a
+page at any depth decompresses only the frames that overlap it. A torn
+frame at the end of a segment (crash mid-append) is truncated on open.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import struct
+import zlib
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".seg"
+
+_CHANNEL_DIR_PREFIX = "ch-"
+
+# first_seq, last_seq, payload length, payload CRC32
+_FRAME_HEADER = struct.Struct(">qqII")
+
+_COMPRESSION_LEVEL = 6
+
+# Decoded frames kept in memory; paging through cold history reads the same
+# frame for several consecutive pages
+_FRAME_CACHE_SIZE = 32
+
+
+class _Frame(NamedTuple):
+    first_seq: int
+    last_seq: int
+    path: Path
+    offset: int  # Offset of the payload, past the header
+    length: int
+    crc: int
+
+
+class _ChannelIndex:
+    """Sparse sequence index over one channel's frames, in sequence order."""
+
+    def __init__(self) -> None:
+        self.frames: list[_Frame] = []
+        self.first_seqs: list[int] = []
+        self.last_seqs: list[int] = []
+
+    def add(self, frame: _Frame) -> None:
+        self.frames.append(frame)
+        self.first_seqs.append(frame.first_seq)
+        self.last_seqs.append(frame.last_seq)
+
+    @property
+    def last_sequence(self) -> int:
+        return self.last_seqs[-1] if self.last_seqs else 0
+
+
+class SegmentArchive:
+    """Per-channel compressed segment files with a sparse sequence index.
+
+    Documents are notification dicts as produced by
+    ``Notification.model_dump(mode="json")``; the archive only looks at
+    ``metadata.sequence``.
+    """
+
+    def __init__(self, directory: str | Path, segment_bytes: int = 64 * 1024 * 1024):
+        """Initialize archive.
+
+        Args:
+            directory: Root directory holding one subdirectory per channel
+            segment_bytes: Size after which a new segment file is started
+
+        Raises:
+            ValueError: If segment_bytes is below 1
+        """
+        if segment_bytes < 1:
+            raise ValueError(f"segment_bytes must be at least 1, got {segment_bytes}")
+
+        self.directory = Path(directory).expanduser()
+        self.segment_bytes = segment_bytes
+        self._channels: dict[str, _ChannelIndex] = {}
+        self._cache: OrderedDict[tuple[Path, int], list[dict[str, Any]]] = OrderedDict()
+
+    # Lifecycle
+    async def open(self) -> None:
+        """Create the directory and index existing segments."""
+        self._channels = await asyncio.to_thread(self._scan)
+        frames = sum(len(index.frames) for index in self._channels.values())
+        logger.info(
+            f"Archive opened: dir={self.directory}, channels={len(self._channels)}, "
+            f"frames={frames}"
+        )
+
+    def close(self) -> None:
+        """Drop the in-memory index and frame cache."""
+        self._channels.clear()
+        self._cache.clear()
+
+    # Writes
+    def last_sequence(self, channel: str) -> int:
+        """Highest archived sequence for a channel (0 if none)."""
+        index = self._channels.get(channel)
+        return index.last_sequence if index is not None else 0
+
+    async def append(self, channel: str, documents: list[dict[str, Any]]) -> None:
+        """Durably append documents (ascending sequence) as one frame.
+
+        Raises:
+            ValueError: If the documents are not above the archived sequences
+        """
+        if not documents:
+            return
+
+        first_seq = documents[0]["metadata"]["sequence"]
+        last_seq = documents[-1]["metadata"]["sequence"]
+        index = self._channels.setdefault(channel, _ChannelIndex())
+        if first_seq <= index.last_sequence:
+            raise ValueError(
+                f"Archive for channel {channel} already holds sequence {index.last_sequence}; "
+                f"cannot append from {first_seq}"
+            )
+
+        frame = await asyncio.to_thread(
+            self._write_frame, channel, index, first_seq, last_seq, documents
+        )
+        index.add(frame)
+
+    async def drop_channel(self, channel: str) -> None:
+        """Delete a channel's archive."""
+        channel_dir = self._channel_dir(channel)
+        self._channels.pop(channel, None)
+        for key in [key for key in self._cache if key[0].parent == channel_dir]:
+            del self._cache[key]
+        await asyncio.to_thread(shutil.rmtree, channel_dir, True)
+
+    # Reads
+    async def read_page(
+        self,
+        channel: str,
+        limit: int,
+        before: int | None = None,
+        after: int | None = None,
+        keep: Callable[[dict[str, Any]], bool] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Read archived documents strictly between the cursors.
+
+        Same contract as ``StorageAdapter.get_notifications_page``: without
+        ``after`` the ``limit`` newest below ``before`` are returned, with it
+        the ``limit`` oldest above ``after``; both newest first. Documents
+        rejected by ``keep`` are skipped and do not count toward ``limit``.
+        """
+        index = self._channels.get(channel)
+        if index is None or limit <= 0:
+            return []
+
+        lower = -1 if after is None else after
+        upper = index.last_sequence + 1 if before is None else before
+
+        page: list[dict[str, Any]] = []
+        if after is None:
+            # Frames whose first sequence is below the upper cursor, newest first
+            position = bisect_left(index.first_seqs, upper) - 1
+            while position >= 0 and len(page) < limit:
+                frame = index.frames[position]
+                if frame.last_seq <= lower:
+                    break
+                for document in reversed(await self._read_frame(frame)):
+                    sequence = document["metadata"]["sequence"]
+                    if lower < sequence < upper and (keep is None or keep(document)):
+                        page.append(document)
+                        if len(page) == limit:
+                            break
+                position -= 1
+        else:
+            # Frames whose last sequence is above the lower cursor, oldest first
+            position = bisect_right(index.last_seqs, lower)
+            while position < len(index.frames) and len(page) < limit:
+                frame = index.frames[position]
+                if frame.first_seq >= upper:
+                    break
+                for document in await self._read_frame(frame):
+                    sequence = document["metadata"]["sequence"]
+                    if lower < sequence < upper and (keep is None or keep(document)):
+                        page.append(document)
+                        if len(page) == limit:
+                            break
+                position += 1
+            page.reverse()
+        return page
+
+    # Private helpers
+    def _channel_dir(self, channel: str) -> Path:
+        # Channel IDs are user-supplied; hex keeps ".", ".." and separators out of the path
+        return self.directory / f"{_CHANNEL_DIR_PREFIX}{channel.encode().hex()}"
+
+    @staticmethod
+    def _dir_channel(name: str) -> str | None:
+        """Channel ID of a directory name, None if it is not a channel directory."""
+        if not name.startswith(_CHANNEL_DIR_PREFIX):
+            return None
+        try:
+            return bytes.fromhex(name[len(_CHANNEL_DIR_PREFIX) :]).decode()
+        except ValueError:
+            return None
+
+    async def _read_frame(self, frame: _Frame) -> list[dict[str, Any]]:
+        """Decode a frame, via the LRU frame cache."""
+        key = (frame.path, frame.offset)
+        documents = self._cache.get(key)
+        if documents is not None:
+            self._cache.move_to_end(key)
+            return documents
+
+        documents = await asyncio.to_thread(self._load_frame, frame)
+        self._cache[key] = documents
+        if len(self._cache) > _FRAME_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return documents
+
+    @staticmethod
+    def _load_frame(frame: _Frame) -> list[dict[str, Any]]:
+        with open(frame.path, "rb") as f:
+            f.seek(frame.offset)
+            payload = f.read(frame.length)
+        if len(payload) != frame.length or zlib.crc32(payload) != frame.crc:
+            raise ValueError(f"Corrupt archive frame in {frame.path} at offset {frame.offset}")
+        return [json.loads(line) for line in zlib.decompress(payload).splitlines()]
+
+    def _write_frame(
+        self,
+        channel: str,
+        index: _ChannelIndex,
+        first_seq: int,
+        last_seq: int,
+        documents: list[dict[str, Any]],
+    ) -> _Frame:
+        payload = zlib.compress(
+            "\n".join(json.dumps(d, separators=(",", ":")) for d in documents).encode(),
+            _COMPRESSION_LEVEL,
+        )
+        crc = zlib.crc32(payload)
+
+        path = index.frames[-1].path if index.frames else None
+        if path is None or path.stat().st_size >= self.segment_bytes:
+            channel_dir = self._channel_dir(channel)
+            channel_dir.mkdir(parents=True, exist_ok=True)
+            path = channel_dir / f"{first_seq:020d}{SEGMENT_SUFFIX}"
+
+        with open(path, "ab") as f:
+            offset = f.tell() + _FRAME_HEADER.size
+            f.write(_FRAME_HEADER.pack(first_seq, last_seq, len(payload), crc))
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        return _Frame(first_seq, last_seq, path, offset, len(payload), crc)
+
+    def _scan(self) -> dict[str, _ChannelIndex]:
+        """Rebuild the sparse index from frame headers."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        channels: dict[str, _ChannelIndex] = {}
+        for channel_dir in sorted(p for p in self.directory.iterdir() if p.is_dir()):
+            channel = self._dir_channel(channel_dir.name)
+            if channel is None:
+                continue
+            index = _ChannelIndex()
+            for path in sorted(channel_dir.glob(f"*{SEGMENT_SUFFIX}")):
+                self._scan_segment(path, index)
+            if index.frames:
+                channels[channel] = index
+        return channels
+
+    @staticmethod
+    def _scan_segment(path: Path, index: _ChannelIndex) -> None:
+        """Index one segment's frames, truncating a torn frame at its end."""
+        size = path.stat().st_size
+        with open(path, "r+b") as f:
+            position = 0
+            while position < size:
+                header = f.read(_FRAME_HEADER.size)
+                if len(header) < _FRAME_HEADER.size:
+                    break
+                first_seq, last_seq, length, crc = _FRAME_HEADER.unpack(header)
+                offset = position + _FRAME_HEADER.size
+                if (
+                    offset + length > size
+                    or length == 0
+                    or not index.last_sequence < first_seq <= last_seq
+                ):
+                    break
+                if offset + length == size:
+                    # Only the last frame can be torn; verify it before trusting it
+                    if zlib.crc32(f.read(length)) != crc:
+                        break
+                else:
+                    f.seek(length, os.SEEK_CUR)
+                index.add(_Frame(first_seq, last_seq, path, offset, length, crc))
+                position = offset + length
+
+            if position < size:
+                logger.warning(f"Truncating torn archive frame in {path} at offset {position}")
+                f.truncate(position)
@@ -0,0 +1,555 @@
+"""Read-through caching wrapper around any storage adapter.
+
+Channels and subscriptions change rarely but are read on every publish
+(``get_subscribers`` twice, ``get_channel`` for channel info) and on most
+tool calls. ``CachingStorageAdapter`` keeps them in bounded LRU caches with
+a TTL:
+
+- writes go through to the wrapped storage and then invalidate the entries
+  they affect; ``record_channel_notification`` updates a cached channel in
+  place instead, so publishes do not evict it
+- a miss started before a concurrent write does not cache its (possibly
+  stale) result, so invalidation cannot be undone by a slow read
+- the TTL bounds staleness when another process writes to the same
+  database (shared SQLite file)
+
+Optionally, the newest ``tail_size`` notifications of each channel are
+cached too, appended to on publish, and serve history pages that fall
+inside them. Expired notifications are filtered out on read; history the
+wrapped storage drops by other means (memory budget eviction) can still be
+served from a tail until its TTL runs out.
+
+Cache hits return the cached objects themselves, not copies; callers
+must not mutate them without saving them back.
+"""
+
+import logging
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Callable, Hashable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Generic, TypeVar
+
+from ..core.storage_adapter import StorageAdapter
+from ..models.channel import Channel
+from ..models.notification import Notification
+from ..models.search import FilteredPage, NotificationSearchResult
+from ..models.subscription import Subscription, SubscriptionFilter
+from .expiry import expiry_timestamp, is_expired
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_CHANNEL_LIST_KEY = "*"
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counters for one cache."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded LRU cache whose entries expire ``ttl`` seconds after insertion.
+
+    ``generation`` changes on every invalidation. Read-through callers take
+    it before loading and pass it to ``put``, which drops the value if an
+    invalidation happened in the meantime.
+    """
+
+    def __init__(
+        self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self.generation = 0
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: K) -> tuple[bool, V | None]:
+        """Return (found, value), counting a hit or a miss."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > self.clock():
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return True, entry[1]
+        if entry is not None:
+            del self._entries[key]
+        self.stats.misses += 1
+        return False, None
+
+    def put(self, key: K, value: V, generation: int | None = None) -> None:
+        """Cache a value, unless the cache was invalidated since ``generation``."""
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def peek(self, key: K) -> V | None:
+        """Return a live value without touching stats or recency."""
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None and entry[0] > self.clock() else None
+
+    def replace(self, key: K, value: V) -> None:
+        """Update a cached value in place, keeping its expiry."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries[key] = (entry[0], value)
+        self.generation += 1
+
+    def invalidate(self, key: K) -> None:
+        """Drop one entry."""
+        self._entries.pop(key, None)
+        self.generation += 1
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+        self.generation += 1
+
+
+def _own(channel: Channel | None) -> Channel | None:
+    """Copy a channel before caching it.
+
+    The memory backend updates its stored channels in place; a shared
+    object would receive record_channel_notification bumps twice.
+    """
+    return channel.model_copy() if channel is not None else None
+
+
+class _Tail:
+    """The newest notifications of a channel, oldest first."""
+
+    def __init__(self, notifications: list[Notification], complete: bool) -> None:
+        self.notifications = deque(notifications)
+        # True while the tail holds the channel's entire history
+        self.complete = complete
+
+    @property
+    def newest_sequence(self) -> int:
+        return (self.notifications[-1].metadata.sequence or 0) if self.notifications else 0
+
+    @property
+    def oldest_sequence(self) -> int:
+        return (self.notifications[0].metadata.sequence or 0) if self.notifications else 0
+
+
+class CachingStorageAdapter(StorageAdapter):
+    """Storage adapter caching channels, subscriptions and recent history.
+
+    Wraps another ``StorageAdapter``; every call not served from a cache is
+    delegated to it unchanged.
+    """
+
+    def __init__(
+        self,
+        storage: StorageAdapter,
+        ttl: float = 30.0,
+        max_entries: int = 1024,
+        tail_size: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize caching wrapper.
+
+        Args:
+            storage: Storage adapter to wrap
+            ttl: Seconds a cached entry stays valid
+            max_entries: Entries kept per cache (LRU beyond that)
+            tail_size: Newest notifications cached per channel (0 = off). Keep
+                it at or below the wrapped storage's max_history.
+            clock: Monotonic time source (for tests)
+
+        Raises:
+            ValueError: If ttl is not positive, max_entries is below 1 or
+                tail_size is negative
+        """
+        if ttl <= 0:
+            raise ValueError(f"ttl must be positive, got {ttl}")
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+        if tail_size < 0:
+            raise ValueError(f"tail_size must not be negative, got {tail_size}")
+
+        self.storage = storage
+        self.tail_size = tail_size
+        self._channels: TTLCache[str, Channel | None] = TTLCache(max_entries, ttl, clock)
+        self._channel_list: TTLCache[str, tuple[str, ...]] = TTLCache(1, ttl, clock)
+        self._subscriptions_by_channel: TTLCache[str, list[Subscription]] = TTLCache(
+            max_entries, ttl, clock
+        )
+        self._subscriptions_by_client: TTLCache[str, list[Subscription]] = TTLCache(
+            max_entries, ttl, clock
+        )
+        self._tails: TTLCache[str, _Tail] = TTLCache(max_entries, ttl, clock)
+
+    def cache_stats(self) -> dict[str, CacheStats]:
+        """Hit and miss counters per cache."""
+        stats = {
+            "channels": self._channels.stats,
+            "channel_list": self._channel_list.stats,
+            "subscriptions_by_channel": self._subscriptions_by_channel.stats,
+            "subscriptions_by_client": self._subscriptions_by_client.stats,
+        }
+        if self.tail_size:
+            stats["tail"] = self._tails.stats
+        return stats
+
+    async def initialize(self) -> None:
+        """Initialize the wrapped storage, if it needs it."""
+        if hasattr(self.storage, "initialize"):
+            await self.storage.initialize()
+
+    async def close(self) -> None:
+        """Log hit rates, drop the caches and close the wrapped storage."""
+        rates = ", ".join(
+            f"{name}={stats.hit_rate:.1%}" for name, stats in self.cache_stats().items()
+        )
+        logger.info(f"Storage cache hit rates: {rates}")
+        for cache in (
+            self._channels,
+            self._channel_list,
+            self._subscriptions_by_channel,
+            self._subscriptions_by_client,
+            self._tails,
+        ):
+            cache.clear()
+        if hasattr(self.storage, "close"):
+            await self.storage.close()
+
+    # ========== Channel Operations ==========
+
+    async def save_channel(self, channel: Channel) -> None:
+        """Save a channel and invalidate its cached copy."""
+        await self.storage.save_channel(channel)
+        self._channels.invalidate(channel.id)
+        self._channel_list.clear()
+
+    async def record_channel_notification(
+        self, channel_id: str, timestamp: datetime, count: int = 1
+    ) -> None:
+        """Bump a channel's stats, applying the same bump to its cached copy."""
+        await self.storage.record_channel_notification(channel_id, timestamp, count)
+        channel = self._channels.peek(channel_id)
+        if channel is not None:
+            self._channels.replace(
+                channel_id,
+                channel.model_copy(
+                    update={
+                        "notificationCount": channel.notificationCount + count,
+                        "lastNotificationAt": timestamp,
+                    }
+                ),
+            )
+
+    async def get_channel(self, channel_id: str) -> Channel | None:
+        """Get a channel by ID (cached, including misses)."""
+        found, channel = self._channels.lookup(channel_id)
+        if found:
+            return channel
+        generation = self._channels.generation
+        channel = await self.storage.get_channel(channel_id)
+        self._channels.put(channel_id, _own(channel), generation)
+        return channel
+
+    async def get_channels(self, channel_ids: list[str]) -> dict[str, Channel]:
+        """Get several channels, loading the uncached ones in one call."""
+        channels: dict[str, Channel] = {}
+        missing = []
+        for channel_id in dict.fromkeys(channel_ids):
+            found, channel = self._channels.lookup(channel_id)
+            if not found:
+                missing.append(channel_id)
+            elif channel is not None:
+                channels[channel_id] = channel
+        if not missing:
+            return channels
+
+        generation = self._channels.generation
+        loaded = await self.storage.get_channels(missing)
+        for channel_id in missing:
+            channel = loaded.get(channel_id)
+            self._channels.put(channel_id, _own(channel), generation)
+            if channel is not None:
+                channels[channel_id] = channel
+        return channels
+
+    async def delete_channel(self, channel_id: str) -> None:
+        """Delete a channel and everything cached for it."""
+        await self.storage.delete_channel(channel_id)
+        self._channels.invalidate(channel_id)
+        self._channel_list.clear()
+        self._tails.invalidate(channel_id)
+        # Subscriptions are deleted with the channel
+        self._subscriptions_by_channel.clear()
+        self._subscriptions_by_client.clear()
+
+    async def list_channels(self) -> list[Channel]:
+        """List all channels.
+
+        The cached list holds channel IDs; the channels themselves come
+        from the channel cache, so stats bumps need no list invalidation.
+        """
+        found, channel_ids = self._channel_list.lookup(_CHANNEL_LIST_KEY)
+        if found and channel_ids is not None:
+            cached = [self._channels.peek(channel_id) for channel_id in channel_ids]
+            hits = [channel for channel in cached if channel is not None]
+            if len(hits) == len(cached):
+                return hits
+
+        list_generation = self._channel_list.generation
+        channel_generation = self._channels.generation
+        channels = await self.storage.list_channels()
+        self._channel_list.put(
+            _CHANNEL_LIST_KEY, tuple(channel.id for channel in channels), list_generation
+        )
+        for channel in channels:
+            self._channels.put(channel.id, _own(channel), channel_generation)
+        return channels
+
+    # ========== Subscription Operations ==========
+
+    async def save_subscription(self, subscription: Subscription) -> None:
+        """Save a subscription and invalidate the lists it appears in."""
+        await self.storage.save_subscription(subscription)
+        self._subscriptions_by_channel.invalidate(subscription.channel)
+        self._subscriptions_by_client.invalidate(subscription.clientId)
+
+    async def delete_subscription(self, subscription_id: str) -> None:
+        """Delete a subscription; its channel and client are unknown, so drop all lists."""
+        await self.storage.delete_subscription(subscription_id)
+        self._subscriptions_by_channel.clear()
+        self._subscriptions_by_client.clear()
+
+    async def save_subscriptions(self, subscriptions: list[Subscription]) -> None:
+        """Save subscriptions and invalidate the lists they appear in."""
+        await self.storage.save_subscriptions(subscriptions)
+        for subscription in subscriptions:
+            self._subscriptions_by_channel.invalidate(subscription.channel)
+            self._subscriptions_by_client.invalidate(subscription.clientId)
+
+    async def delete_subscriptions(self, subscription_ids: list[str]) -> None:
+        """Delete subscriptions and drop all subscription lists."""
+        await self.storage.delete_subscriptions(subscription_ids)
+        self._subscriptions_by_channel.clear()
+        self._subscriptions_by_client.clear()
+
+    async def get_subscriptions_by_channel(self, channel: str) -> list[Subscription]:
+        """Get all subscriptions for a channel (cached)."""
+        found, subscriptions = self._subscriptions_by_channel.lookup(channel)
+        if found and subscriptions is not None:
+            return list(subscriptions)
+        generation = self._subscriptions_by_channel.generation
+        subscriptions = await self.storage.get_subscriptions_by_channel(channel)
+        self._subscriptions_by_channel.put(channel, subscriptions, generation)
+        return list(subscriptions)
+
+    async def get_subscriptions_by_channels(
+        self, channels: list[str]
+    ) -> dict[str, list[Subscription]]:
+        """Get the subscriptions of several channels, loading the uncached ones in one call."""
+        by_channel: dict[str, list[Subscription]] = {}
+        missing = []
+        for channel in dict.fromkeys(channels):
+            found, subscriptions = self._subscriptions_by_channel.lookup(channel)
+            if found and subscriptions is not None:
+                by_channel[channel] = list(subscriptions)
+            else:
+                missing.append(channel)
+        if missing:
+            generation = self._subscriptions_by_channel.generation
+            loaded = await self.storage.get_subscriptions_by_channels(missing)
+            for channel in missing:
+                subscriptions = loaded.get(channel, [])
+                self._subscriptions_by_channel.put(channel, subscriptions, generation)
+                by_channel[channel] = list(subscriptions)
+        return {channel: by_channel[channel] for channel in channels}
+
+    async def get_subscriptions_by_client(self, client_id: str) -> list[Subscription]:
+        """Get all subscriptions for a client (cached)."""
+        found, subscriptions = self._subscriptions_by_client.lookup(client_id)
+        if found and subscriptions is not None:
+            return list(subscriptions)
+        generation = self._subscriptions_by_client.generation
+        subscriptions = await self.storage.get_subscriptions_by_client(client_id)
+        self._subscriptions_by_client.put(client_id, subscriptions, generation)
+        return list(subscriptions)
+
+    async def get_subscriptions_by_client_and_channel(
+        self, client_id: str, channel: str
+    ) -> list[Subscription]:
+        """Get a client's subscriptions to a single channel (from the channel's list)."""
+        subscriptions = await self.get_subscriptions_by_channel(channel)
+        return [s for s in subscriptions if s.clientId == client_id]
+
+    # ========== Notification Operations ==========
+
+    async def save_notification(self, notification: Notification) -> None:
+        """Save a notification and append it to its channel's cached tail."""
+        await self.save_notifications([notification])
+
+    async def save_notifications(self, notifications: list[Notification]) -> None:
+        """Save notifications and append them to the cached tails."""
+        await self.storage.save_notifications(notifications)
+        self._append_to_tails(notifications)
+
+    async def append_notification(self, notification: Notification) -> int:
+        """Save a notification under its channel's next sequence number; cache it."""
+        sequence = await self.storage.append_notification(notification)
+        self._append_to_tails([notification])
+        return sequence
+
+    def note_external_notifications(self, notifications: list[Notification]) -> None:
+        """Account for notifications another process saved (see change_feed).
+
+        Their channels' cached stats are stale, so those entries are
+        dropped; the notifications are appended to the cached tails.
+        """
+        for notification in notifications:
+            self._channels.invalidate(notification.metadata.channel or "")
+        self._append_to_tails(notifications)
+
+    def _append_to_tails(self, notifications: list[Notification]) -> None:
+        """Append saved notifications to their channels' cached tails."""
+        if not self.tail_size:
+            return
+
+        for notification in notifications:
+            channel = notification.metadata.channel or ""
+            tail = self._tails.peek(channel)
+            sequence = notification.metadata.sequence or 0
+            if tail is None:
+                continue
+            if tail.notifications and sequence <= tail.newest_sequence:
+                # Out-of-order insert (e.g. an import); reload on next read
+                self._tails.invalidate(channel)
+                continue
+            tail.notifications.append(notification)
+            if len(tail.notifications) > self.tail_size:
+                tail.notifications.popleft()
+                tail.complete = False
+            self._tails.replace(channel, tail)
+
+    async def get_notifications(self, channel: str, limit: int = 50) -> list[Notification]:
+        """Get recent notifications from a channel (not cached)."""
+        return await self.storage.get_notifications(channel, limit=limit)
+
+    async def get_notifications_page(
+        self,
+        channel: str,
+        limit: int = 50,
+        before: int | None = None,
+        after: int | None = None,
+    ) -> list[Notification]:
+        """Get a page of history, from the cached tail when it covers the page."""
+        if not self.tail_size or limit <= 0:
+            return await self.storage.get_notifications_page(channel, limit, before, after)
+
+        found, tail = self._tails.lookup(channel)
+        if not found or tail is None:
+            generation = self._tails.generation
+            newest = await self.storage.get_notifications_page(channel, limit=self.tail_size)
+            tail = _Tail(newest[::-1], complete=len(newest) < self.tail_size)
+            self._tails.put(channel, tail, generation)
+
+        page = self._page_from_tail(tail, limit, before, after)
+        if page is None:
+            return await self.storage.get_notifications_page(channel, limit, before, after)
+        return page
+
+    async def get_filtered_notifications_page(
+        self,
+        channel: str,
+        filters: SubscriptionFilter,
+        limit: int = 50,
+        before: int | None = None,
+    ) -> FilteredPage:
+        """Get a page of history matching a filter (not cached)."""
+        return await self.storage.get_filtered_notifications_page(channel, filters, limit, before)
+
+    def iter_notifications(
+        self,
+        channel: str,
+        since: int | None = None,
+        until: int | None = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Notification]:
+        """Stream a channel's history oldest first (not cached)."""
+        return self.storage.iter_notifications(channel, since, until, batch_size)
+
+    @staticmethod
+    def _page_from_tail(
+        tail: _Tail, limit: int, before: int | None, after: int | None
+    ) -> list[Notification] | None:
+        """Serve a page from a tail, or None if the tail may not cover it."""
+        now = time.time()
+        lower = -1 if after is None else after
+        upper = None if before is None else before
+
+        def in_range(notification: Notification) -> bool:
+            sequence = notification.metadata.sequence or 0
+            return (
+                lower < sequence
+                and (upper is None or sequence < upper)
+                and not is_expired(expiry_timestamp(notification.context.validity), now)
+            )
+
+        if after is None:
+            page: list[Notification] = []
+            for notification in reversed(tail.notifications):
+                if in_range(notification):
+                    page.append(notification)
+                    if len(page) == limit:
+                        return page
+            # Fewer matches than asked for: only final if nothing older exists
+            return page if tail.complete else None
+
+        # Every notification above `after` is in the tail once `after` reaches into it
+        if not tail.complete and after < tail.oldest_sequence:
+            return None
+        page = []
+        for notification in tail.notifications:
+            if in_range(notification):
+                page.append(notification)
+                if len(page) == limit:
+                    break
+        page.reverse()
+        return page
+
+    async def search_notifications(
+        self, query: str, channels: list[str] | None = None, limit: int = 20
+    ) -> list[NotificationSearchResult]:
+        """Full-text search (not cached)."""
+        return await self.storage.search_notifications(query, channels, limit)
+
+    async def get_notification_count(self, channel: str) -> int:
+        """Get total notification count for a channel (not cached)."""
+        return await self.storage.get_notification_count(channel)
+
+    async def get_latest_sequence(self, channel: str) -> int:
+        """Get the highest sequence number stored for a channel (not cached)."""
+        return await self.storage.get_latest_sequence(channel)
+
+    async def purge_expired(self, now: float | None = None, batch_size: int = 500) -> int:
+        """Purge expired notifications (cached tails already hide them)."""
+        return await self.storage.purge_expired(now=now, batch_size=batch_size)
+
+    async def reclaim_space(self) -> None:
+        """Release storage freed by purges."""
+        await self.storage.reclaim_space()
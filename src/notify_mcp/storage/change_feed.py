@@ -0,0 +1,322 @@
+"""Cross-process change feed for servers sharing one database.
+
+Several ``notify-mcp`` processes (e.g. HTTP workers behind a load balancer)
+can share a SQLite file or a PostgreSQL database, but each routes only the
+notifications published through it. A ``ChangeFeed`` tells a process about
+notifications the *other* processes saved, so its router can deliver them
+to the subscribers connected to it:
+
+- ``SQLiteChangeFeed`` polls a rowid watermark every ``poll_interval``
+  seconds (one indexed ``max(rowid)`` read when idle) and reads the rows
+  inserted since, per shard for ``sqlite-sharded``
+- ``PostgresChangeFeed`` uses ``LISTEN``/``NOTIFY``: publishers announce
+  ``(channel, first, last sequence)`` after committing and listeners fetch
+  those notifications by keyset page, typically within milliseconds
+
+Notifications the process saved itself are recognized by ID and skipped.
+The in-memory backend is private to its process and has no feed.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+from ..core.storage_adapter import StorageAdapter
+from ..models.notification import Notification
+from .caching import CachingStorageAdapter
+from .instrumented import InstrumentedStorageAdapter
+
+if TYPE_CHECKING:
+    from .postgres_storage import PostgreSQLStorage
+    from .sqlite_storage import SQLiteStorage
+
+logger = logging.getLogger(__name__)
+
+RemoteNotificationsCallback = Callable[[list[Notification]], Awaitable[None]]
+
+# PostgreSQL NOTIFY channel the feed listens on
+PG_NOTIFY_CHANNEL = "notify_mcp_changes"
+
+# Local notification IDs remembered until the feed reads them back
+_LOCAL_IDS_LIMIT = 10_000
+
+
+class ChangeFeed(ABC):
+    """Delivers notifications saved by other processes to a callback.
+
+    Call ``mark_local`` before saving notifications and ``announce`` after
+    the save committed.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the local ID set."""
+        self._callback: RemoteNotificationsCallback | None = None
+        self._local_ids: OrderedDict[str, None] = OrderedDict()
+
+    async def start(self, callback: RemoteNotificationsCallback) -> None:
+        """Start watching; ``callback`` receives remote notifications in save order."""
+        self._callback = callback
+        await self._start()
+
+    @abstractmethod
+    async def _start(self) -> None:
+        """Set the watermark to the current state and start watching."""
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Stop watching."""
+
+    def mark_local(self, notifications: list[Notification]) -> None:
+        """Remember notifications this process is about to save."""
+        for notification in notifications:
+            self._local_ids[notification.metadata.id] = None
+        while len(self._local_ids) > _LOCAL_IDS_LIMIT:
+            self._local_ids.popitem(last=False)
+
+    async def announce(self, notifications: list[Notification]) -> None:
+        """Tell other processes about saved notifications, if the feed needs it.
+
+        Default implementation does nothing; the change is found by polling.
+        """
+        return None
+
+    async def _deliver(self, notifications: list[Notification]) -> None:
+        """Pass on notifications not saved by this process."""
+        remote = []
+        for notification in notifications:
+            if notification.metadata.id in self._local_ids:
+                del self._local_ids[notification.metadata.id]
+            else:
+                remote.append(notification)
+        if remote and self._callback is not None:
+            try:
+                await self._callback(remote)
+            except Exception as e:
+                logger.error(f"Change feed callback failed: {e}")
+
+
+class SQLiteChangeFeed(ChangeFeed):
+    """Change feed polling the rowid watermark of one or more SQLite files."""
+
+    def __init__(
+        self, shards: list["SQLiteStorage"], poll_interval: float = 0.05, batch_size: int = 500
+    ):
+        """Initialize the feed.
+
+        Args:
+            shards: SQLite stores to watch (every shard of a sharded store)
+            poll_interval: Seconds between polls
+            batch_size: Rows read per query
+        """
+        super().__init__()
+        self.shards = shards
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._cursors: list[int] = []
+        self._task: asyncio.Task[None] | None = None
+
+    async def _start(self) -> None:
+        """Start polling from the current end of every shard."""
+        self._cursors = [await shard.get_max_rowid() for shard in self.shards]
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def poll(self) -> int:
+        """Read every shard's rows past its watermark once.
+
+        Returns:
+            Number of new unexpired rows found (local ones included)
+        """
+        found = 0
+        for index, shard in enumerate(self.shards):
+            latest = await shard.get_max_rowid()
+            cursor = self._cursors[index]
+            if latest < cursor:
+                # Newest rows deleted or renumbered by VACUUM: continue from the new end
+                logger.warning(f"Change feed watermark of {shard.db_path} moved back; resyncing")
+                self._cursors[index] = latest
+                continue
+
+            while cursor < latest:
+                batch = await shard.get_notifications_since_rowid(cursor, self.batch_size)
+                if batch.last_rowid == cursor:
+                    break
+                cursor = batch.last_rowid
+                self._cursors[index] = cursor
+                if batch.notifications:
+                    found += len(batch.notifications)
+                    await self._deliver(batch.notifications)
+        return found
+
+    async def _run(self) -> None:
+        """Poll every ``poll_interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"Change feed poll failed: {e}")
+
+
+class PostgresChangeFeed(ChangeFeed):
+    """Change feed on PostgreSQL LISTEN/NOTIFY."""
+
+    def __init__(self, storage: "PostgreSQLStorage", page_size: int = 500):
+        """Initialize the feed.
+
+        Args:
+            storage: PostgreSQL storage shared with the other processes
+            page_size: Notifications fetched per page when catching up
+        """
+        super().__init__()
+        self.storage = storage
+        self.page_size = page_size
+        # Identifies this process's own announcements
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._connection: Any = None
+        self._pending: dict[str, tuple[int, int]] = {}
+        self._watermarks: dict[str, int] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    async def _start(self) -> None:
+        """Open the listening connection and start the fetch loop."""
+        await self._listen()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop listening and close the listening connection."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def announce(self, notifications: list[Notification]) -> None:
+        """NOTIFY listeners of the saved sequence range of each channel."""
+        ranges: dict[str, tuple[int, int]] = {}
+        for notification in notifications:
+            channel = notification.metadata.channel or ""
+            sequence = notification.metadata.sequence or 0
+            first, last = ranges.get(channel, (sequence, sequence))
+            ranges[channel] = (min(first, sequence), max(last, sequence))
+
+        for channel, (first, last) in ranges.items():
+            payload = json.dumps(
+                {"origin": self.origin, "channel": channel, "first": first, "last": last}
+            )
+            await self.storage.pool.execute("SELECT pg_notify($1, $2)", PG_NOTIFY_CHANNEL, payload)
+
+    async def _listen(self) -> None:
+        """Open a dedicated connection (pooled ones are shared) and LISTEN on it."""
+        import asyncpg
+
+        self._connection = await asyncpg.connect(self.storage.dsn)
+        await self._connection.add_listener(PG_NOTIFY_CHANNEL, self._on_notify)
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        """Record an announced range; the fetch loop reads it."""
+        message = json.loads(payload)
+        if message["origin"] == self.origin:
+            return
+        first, last = self._pending.get(message["channel"], (message["first"], message["last"]))
+        self._pending[message["channel"]] = (
+            min(first, message["first"]),
+            max(last, message["last"]),
+        )
+        self._wakeup.set()
+
+    async def _fetch(self, channel: str, first: int) -> None:
+        """Read a channel's notifications past its watermark.
+
+        A channel seen for the first time starts just below the announced
+        range; later announcements only wake the fetch, so ranges missed
+        while the listener was reconnecting are caught up as well.
+        """
+        watermark = self._watermarks.get(channel, first - 1)
+        while True:
+            page = await self.storage.get_notifications_page(
+                channel, limit=self.page_size, after=watermark
+            )
+            if page:
+                page.reverse()
+                watermark = page[-1].metadata.sequence or watermark
+                await self._deliver(page)
+            if len(page) < self.page_size:
+                break
+        self._watermarks[channel] = watermark
+
+    async def _run(self) -> None:
+        """Fetch announced ranges as they arrive; reconnect a dropped listener."""
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=5.0)
+            self._wakeup.clear()
+            try:
+                if self._connection is None or self._connection.is_closed():
+                    logger.warning("Change feed listener disconnected; reconnecting")
+                    await self._listen()
+                pending, self._pending = self._pending, {}
+                for channel, (first, _) in pending.items():
+                    await self._fetch(channel, first)
+            except Exception as e:
+                logger.error(f"Change feed fetch failed: {e}")
+
+
+def create_change_feed(storage: StorageAdapter, poll_interval: float = 0.05) -> ChangeFeed:
+    """Create the change feed matching a storage backend.
+
+    Args:
+        storage: Storage adapter (caching and instrumentation wrappers are looked through)
+        poll_interval: Seconds between polls for SQLite backends
+
+    Returns:
+        Change feed (not started)
+
+    Raises:
+        ValueError: If the backend is not shared between processes
+    """
+    while isinstance(storage, (CachingStorageAdapter, InstrumentedStorageAdapter)):
+        storage = storage.storage
+
+    # Import here to avoid dependency issues
+    from .sqlite_sharded import ShardedSQLiteStorage
+    from .sqlite_storage import SQLiteStorage
+
+    if isinstance(storage, SQLiteStorage):
+        return SQLiteChangeFeed([storage], poll_interval=poll_interval)
+    if isinstance(storage, ShardedSQLiteStorage):
+        return SQLiteChangeFeed(storage.shards, poll_interval=poll_interval)
+
+    try:
+        from .postgres_storage import PostgreSQLStorage
+    except ImportError:
+        pass  # Without asyncpg there is no PostgreSQL storage to watch
+    else:
+        if isinstance(storage, PostgreSQLStorage):
+            return PostgresChangeFeed(storage)
+
+    raise ValueError(
+        f"{type(storage).__name__} is not shared between processes and has no change feed. "
+        f"Supported types: sqlite, sqlite-sharded, postgresql"
+    )
@@ -0,0 +1,221 @@
+"""Compact in-memory representation of notifications.
+
+A validated ``Notification`` is a graph of seven Pydantic models plus their
+lists and dicts. ``InMemoryStorage`` keeps thousands of them per channel, so
+history entries are flattened into a single ``__slots__`` record instead and
+inflated back to ``Notification`` only when they leave the storage layer.
+
+Repeated short strings (channel, sender, tags, enum values) are interned so
+every record references one shared copy. Sub-objects that are almost always
+left at their defaults (actions, attachments, visibility) are stored as
+``None`` in the common case.
+
+Each record also carries ``size``, an approximation of the notification's
+JSON-encoded size used for memory-budget accounting.
+"""
+
+import sys
+from datetime import datetime
+from typing import Any
+
+from ..models.notification import (
+    Action,
+    Attachment,
+    Context,
+    Information,
+    Metadata,
+    Notification,
+    Sender,
+    Visibility,
+)
+from .expiry import expiry_timestamp
+
+# Approximate JSON size of the fixed structure: keys, punctuation, timestamp,
+# enum values. Variable-length strings are added on top of this.
+_BASE_ENCODED_SIZE = 320
+
+
+def _intern(value: str | None) -> str | None:
+    """Intern an optional string."""
+    return sys.intern(value) if value is not None else None
+
+
+class CompactNotification:
+    """Flat, slotted record holding one stored notification."""
+
+    __slots__ = (
+        "id",
+        "channel",
+        "sequence",
+        "timestamp",
+        "version",
+        "reply_to",
+        "schema_version",
+        "sender",
+        "theme",
+        "priority",
+        "validity",
+        "expires_at",
+        "tags",
+        "related_conversation_id",
+        "project_id",
+        "title",
+        "body",
+        "format",
+        "attachments",
+        "actions",
+        "visibility",
+        "size",
+    )
+
+    id: str
+    channel: str | None
+    sequence: int | None
+    timestamp: datetime
+    version: str | None
+    reply_to: str | None
+    schema_version: str
+    sender: tuple[str, str, str, str | None, str | None]
+    theme: str
+    priority: str
+    validity: datetime | None
+    expires_at: float | None  # validity as POSIX seconds, for expiry checks
+    tags: tuple[str, ...]
+    related_conversation_id: str | None
+    project_id: str | None
+    title: str
+    body: str
+    format: str
+    attachments: tuple[tuple[str, str, str | None], ...] | None
+    actions: tuple[tuple[str, str, str | None, dict[str, Any] | None], ...] | None
+    visibility: tuple[tuple[str, ...], bool, tuple[str, ...]] | None
+    size: int
+
+    @classmethod
+    def from_notification(cls, notification: Notification) -> "CompactNotification":
+        """Flatten a validated notification into a compact record."""
+        record = cls.__new__(cls)
+        metadata = notification.metadata
+        sender = notification.sender
+        context = notification.context
+        information = notification.information
+        visibility = notification.visibility
+
+        record.id = metadata.id
+        record.channel = _intern(metadata.channel)
+        record.sequence = metadata.sequence
+        record.timestamp = metadata.timestamp
+        record.version = _intern(metadata.version)
+        record.reply_to = metadata.replyTo
+        record.schema_version = sys.intern(notification.schemaVersion)
+        record.sender = (
+            sys.intern(sender.id),
+            sys.intern(sender.name),
+            sys.intern(sender.role),
+            _intern(sender.aiTool),
+            _intern(sender.email),
+        )
+        record.theme = sys.intern(context.theme)
+        record.priority = sys.intern(context.priority)
+        record.validity = context.validity
+        record.expires_at = expiry_timestamp(context.validity)
+        record.tags = tuple(sys.intern(tag) for tag in context.tags)
+        record.related_conversation_id = context.relatedConversationId
+        record.project_id = _intern(context.projectId)
+        record.title = information.title
+        record.body = information.body
+        record.format = sys.intern(information.format)
+        record.attachments = (
+            tuple((sys.intern(a.type), a.url, a.name) for a in information.attachments)
+            if information.attachments
+            else None
+        )
+        record.actions = (
+            tuple((sys.intern(a.type), a.label, a.url, a.data) for a in notification.actions)
+            if notification.actions
+            else None
+        )
+        if visibility.teams == ["all"] and not visibility.private and not visibility.allowedUsers:
+            record.visibility = None
+        else:
+            record.visibility = (
+                tuple(sys.intern(team) for team in visibility.teams),
+                visibility.private,
+                tuple(sys.intern(user) for user in visibility.allowedUsers),
+            )
+        record.size = record._estimate_size()
+        return record
+
+    def _estimate_size(self) -> int:
+        """Approximate the JSON-encoded size of the notification in bytes.
+
+        String lengths are counted in characters rather than encoded bytes;
+        this is a budget heuristic, not an exact measurement.
+        """
+        size = _BASE_ENCODED_SIZE + len(self.id) + len(self.title) + len(self.body)
+        size += len(self.channel or "") + len(self.reply_to or "")
+        size += sum(len(part) for part in self.sender if part)
+        size += sum(len(tag) + 3 for tag in self.tags)
+        size += len(self.related_conversation_id or "") + len(self.project_id or "")
+        for attachment in self.attachments or ():
+            size += 40 + sum(len(part) for part in attachment if part)
+        for action in self.actions or ():
+            size += 40 + len(action[1]) + len(action[2] or "") + len(repr(action[3] or ""))
+        if self.visibility is not None:
+            size += sum(len(user) + 3 for user in self.visibility[2])
+        return size
+
+    def to_notification(self) -> Notification:
+        """Inflate the record back into a ``Notification``.
+
+        Uses ``model_construct`` throughout: the data was validated when the
+        record was created, so re-validating on every read is wasted work.
+        """
+        sender_id, sender_name, role, ai_tool, email = self.sender
+        visibility: dict[str, Any]
+        if self.visibility is None:
+            visibility = {"teams": ["all"], "private": False, "allowedUsers": []}
+        else:
+            teams, private, allowed_users = self.visibility
+            visibility = {
+                "teams": list(teams),
+                "private": private,
+                "allowedUsers": list(allowed_users),
+            }
+
+        return Notification.model_construct(
+            schemaVersion=self.schema_version,
+            sender=Sender.model_construct(
+                id=sender_id, name=sender_name, role=role, aiTool=ai_tool, email=email
+            ),
+            context=Context.model_construct(
+                theme=self.theme,
+                priority=self.priority,
+                validity=self.validity,
+                tags=list(self.tags),
+                relatedConversationId=self.related_conversation_id,
+                projectId=self.project_id,
+            ),
+            information=Information.model_construct(
+                title=self.title,
+                body=self.body,
+                format=self.format,
+                attachments=[
+                    Attachment.model_construct(type=t, url=url, name=name)
+                    for t, url, name in self.attachments or ()
+                ],
+            ),
+            metadata=Metadata.model_construct(
+                id=self.id,
+                timestamp=self.timestamp,
+                version=self.version,
+                channel=self.channel,
+                replyTo=self.reply_to,
+                sequence=self.sequence,
+            ),
+            actions=[
+                Action.model_construct(type=t, label=label, url=url, data=data)
+                for t, label, url, data in self.actions or ()
+            ],
+            visibility=Visibility.model_construct(**visibility),
+        )
@@ -0,0 +1,131 @@
+"""Eviction policies for the in-memory storage byte budget.
+
+When ``InMemoryStorage`` exceeds its memory budget it asks an
+``EvictionPolicy`` which channels to evict from. Channel histories are FIFO,
+so only the oldest record of each channel is ever a candidate; the policy
+decides which channel's oldest record goes next.
+
+Policies are generators: the storage pops one record from each yielded
+channel and stops iterating as soon as usage is back under its target, so
+a policy never has to know the byte sizes involved.
+"""
+
+import heapq
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Mapping
+from typing import Literal
+
+from .compact import CompactNotification
+from .ring_buffer import RingBuffer
+
+EvictionPolicyName = Literal["lru", "channel-floor", "priority"]
+
+_PRIORITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+
+class EvictionPolicy(ABC):
+    """Chooses which channel to evict the next oldest notification from."""
+
+    @abstractmethod
+    def victims(
+        self, histories: Mapping[str, RingBuffer[CompactNotification]]
+    ) -> Iterator[str]:
+        """Yield channel IDs to evict from, one record per yielded channel.
+
+        The storage pops the oldest record of each yielded channel before
+        resuming the generator, so ``histories`` reflects prior evictions.
+
+        Args:
+            histories: Per-channel notification histories
+
+        Yields:
+            Channel ID whose oldest record should be evicted next
+        """
+
+
+class GlobalLRUPolicy(EvictionPolicy):
+    """Evict the globally oldest notification, regardless of channel."""
+
+    def _key(self, record: CompactNotification) -> tuple[float, ...]:
+        """Ordering key for a channel's oldest record (lowest evicted first)."""
+        return (record.timestamp.timestamp(),)
+
+    def _evictable(self, history: RingBuffer[CompactNotification]) -> bool:
+        """Whether the channel may give up its oldest record."""
+        return len(history) > 0
+
+    def victims(
+        self, histories: Mapping[str, RingBuffer[CompactNotification]]
+    ) -> Iterator[str]:
+        """Yield channels ordered by the key of their oldest record."""
+        heap: list[tuple[tuple[float, ...], str]] = []
+        for channel, history in histories.items():
+            oldest = history.peek_oldest()
+            if oldest is not None and self._evictable(history):
+                heap.append((self._key(oldest), channel))
+        heapq.heapify(heap)
+
+        while heap:
+            _, channel = heapq.heappop(heap)
+            remaining = histories.get(channel)
+            if remaining is None or not self._evictable(remaining):
+                continue
+
+            yield channel
+
+            oldest = remaining.peek_oldest()
+            if oldest is not None and self._evictable(remaining):
+                heapq.heappush(heap, (self._key(oldest), channel))
+
+
+class ChannelFloorPolicy(GlobalLRUPolicy):
+    """Global LRU that never shrinks a channel below a minimum history."""
+
+    def __init__(self, min_per_channel: int):
+        """Initialize policy.
+
+        Args:
+            min_per_channel: Notifications each channel always keeps
+        """
+        self.min_per_channel = min_per_channel
+
+    def _evictable(self, history: RingBuffer[CompactNotification]) -> bool:
+        return len(history) > self.min_per_channel
+
+
+class PriorityAwarePolicy(GlobalLRUPolicy):
+    """Evict low-priority notifications before higher-priority ones.
+
+    Among channels whose oldest record has the same priority, the oldest is
+    evicted first.
+    """
+
+    def _key(self, record: CompactNotification) -> tuple[float, ...]:
+        return (_PRIORITY_RANK.get(record.priority, 1), record.timestamp.timestamp())
+
+
+def create_eviction_policy(
+    name: EvictionPolicyName, min_per_channel: int = 0
+) -> EvictionPolicy:
+    """Create an eviction policy by name.
+
+    Args:
+        name: Policy name ("lru", "channel-floor" or "priority")
+        min_per_channel: Per-channel floor used by "channel-floor"
+
+    Returns:
+        Eviction policy instance
+
+    Raises:
+        ValueError: If the policy name is unknown
+    """
+    if name == "lru":
+        return GlobalLRUPolicy()
+    elif name == "channel-floor":
+        return ChannelFloorPolicy(min_per_channel)
+    elif name == "priority":
+        return PriorityAwarePolicy()
+    else:
+        raise ValueError(
+            f"Unknown eviction policy: {name}. Supported policies: lru, channel-floor, priority"
+        )
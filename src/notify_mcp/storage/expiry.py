@@ -0,0 +1,62 @@
+"""Expiry helpers for notifications with a ``Context.validity`` deadline.
+
+Expiry is tracked as POSIX seconds so aware and naive ``validity`` values
+compare uniformly: aware datetimes convert exactly, naive ones are taken as
+local time (like the naive ``datetime.now()`` timestamps used elsewhere).
+
+Both backends hide expired notifications from reads immediately and
+reclaim them later in batches via ``StorageAdapter.purge_expired()``.
+``InMemoryStorage`` finds due records with ``ExpiryHeap``; ``SQLiteStorage``
+uses an index on its ``expires_at`` column.
+"""
+
+import heapq
+import itertools
+from collections.abc import Callable
+from datetime import datetime
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+def expiry_timestamp(validity: datetime | None) -> float | None:
+    """Convert a validity deadline to POSIX seconds (None = never expires)."""
+    return validity.timestamp() if validity is not None else None
+
+
+def is_expired(expires_at: float | None, now: float) -> bool:
+    """Whether an item with the given expiry is expired at ``now``."""
+    return expires_at is not None and expires_at <= now
+
+
+class ExpiryHeap(Generic[T]):
+    """Min-heap of items ordered by expiry time.
+
+    Removal is lazy: items that leave storage by other means (eviction,
+    channel deletion) stay in the heap until they come due or the heap is
+    pruned, so callers check liveness on pop.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, T]] = []
+        self._counter = itertools.count()  # Tie-breaker; items need not be comparable
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, expires_at: float, item: T) -> None:
+        """Track an item until its expiry time."""
+        heapq.heappush(self._heap, (expires_at, next(self._counter), item))
+
+    def pop_due(self, now: float, limit: int) -> list[T]:
+        """Remove and return up to ``limit`` items expiring at or before ``now``."""
+        due: list[T] = []
+        heap = self._heap
+        while heap and len(due) < limit and heap[0][0] <= now:
+            due.append(heapq.heappop(heap)[2])
+        return due
+
+    def prune(self, is_live: Callable[[T], bool]) -> None:
+        """Drop entries for items no longer held by storage."""
+        self._heap = [entry for entry in self._heap if is_live(entry[2])]
+        heapq.heapify(self._heap)
@@ -6,11 +6,19 @@ backend based on the provided configuration settings.
 
 import logging
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 from ..config.storage_config import StorageSettings
 from ..core.storage_adapter import StorageAdapter
+from .caching import CachingStorageAdapter
+from .eviction import create_eviction_policy
+from .instrumented import InstrumentedStorageAdapter
+from .journal import MemoryJournal
 from .memory import InMemoryStorage
 
+if TYPE_CHECKING:
+    from .sqlite_storage import SQLiteStorage
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,7 +29,9 @@ async def create_storage(settings: StorageSettings) -> StorageAdapter:
         settings: Storage configuration settings
 
     Returns:
-        Initialized storage adapter instance
+        Initialized storage adapter instance, wrapped in a
+        CachingStorageAdapter if caching is enabled and, outermost, in an
+        InstrumentedStorageAdapter if storage metrics are enabled
 
     Raises:
         ValueError: If storage type is not supported or configuration is invalid
@@ -31,34 +41,96 @@ async def create_storage(settings: StorageSettings) -> StorageAdapter:
     settings.validate_configuration()
 
     logger.info(f"Initializing storage: type={settings.storage_type}")
+    storage = await _create_backend(settings)
+
+    if settings.cache_enabled:
+        # A tail longer than the history window would serve trimmed notifications
+        tail_size = min(settings.cache_tail_size, settings.max_history)
+        logger.info(
+            f"Storage cache enabled: ttl={settings.cache_ttl}s, "
+            f"max_entries={settings.cache_max_entries}, tail_size={tail_size}"
+        )
+        storage = CachingStorageAdapter(
+            storage,
+            ttl=settings.cache_ttl,
+            max_entries=settings.cache_max_entries,
+            tail_size=tail_size,
+        )
+
+    if settings.storage_metrics_enabled:
+        # Outermost, so cache hits are measured as the server sees them
+        logger.info("Storage metrics enabled")
+        storage = InstrumentedStorageAdapter(storage)
+    return storage
+
 
+async def _create_backend(settings: StorageSettings) -> StorageAdapter:
+    """Create and initialize the configured storage backend."""
     if settings.storage_type == "memory":
-        logger.info(f"Creating in-memory storage (max_history={settings.max_history})")
-        return InMemoryStorage(max_history_per_channel=settings.max_history)
+        logger.info(
+            f"Creating in-memory storage (max_history={settings.max_history}, "
+            f"memory_budget={settings.memory_budget_bytes}, "
+            f"eviction_policy={settings.memory_eviction_policy})"
+        )
+        journal = None
+        if settings.memory_journal_dir is not None:
+            logger.info(f"Memory storage journal enabled: dir={settings.memory_journal_dir}")
+            journal = MemoryJournal(
+                settings.memory_journal_dir,
+                fsync_interval=settings.memory_fsync_interval,
+                snapshot_every=settings.memory_snapshot_every,
+            )
+
+        memory = InMemoryStorage(
+            max_history_per_channel=settings.max_history,
+            max_memory_bytes=settings.memory_budget_bytes,
+            eviction_policy=create_eviction_policy(
+                settings.memory_eviction_policy, settings.memory_min_per_channel
+            ),
+            journal=journal,
+            search_index=settings.memory_search_index,
+        )
+
+        # Replay journal (no-op for volatile storage)
+        await memory.initialize()
+        return memory
 
     elif settings.storage_type == "sqlite":
-        # Import here to avoid dependency issues
+        # Ensure parent directory exists
+        db_path = Path(settings.sqlite_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        sqlite = build_sqlite_storage(settings)
+
+        # Initialize database schema
+        await sqlite.initialize()
+        logger.info("SQLite storage initialized successfully")
+        return sqlite
+
+    elif settings.storage_type == "sqlite-sharded":
         try:
-            from .sqlite_storage import SQLiteStorage
+            from .sqlite_sharded import ShardedSQLiteStorage
         except ImportError as e:
             raise RuntimeError(
                 "SQLite storage requires 'sqlalchemy[asyncio]' and 'aiosqlite' packages"
             ) from e
 
-        # Ensure parent directory exists
-        db_path = Path(settings.sqlite_path)
-        db_path.parent.mkdir(parents=True, exist_ok=True)
+        Path(settings.sqlite_path).parent.mkdir(parents=True, exist_ok=True)
 
-        logger.info(f"Creating SQLite storage: path={settings.sqlite_path}")
-        storage = SQLiteStorage(
+        logger.info(
+            f"Creating sharded SQLite storage: path={settings.sqlite_path}, "
+            f"shards={settings.sqlite_shards}, profile={settings.sqlite_profile}"
+        )
+        sharded = ShardedSQLiteStorage(
             db_path=settings.sqlite_path,
-            max_history_per_channel=settings.max_history,
+            shards=settings.sqlite_shards,
+            **_sqlite_options(settings),
         )
 
-        # Initialize database schema
-        await storage.initialize()
-        logger.info("SQLite storage initialized successfully")
-        return storage
+        # Initialize every shard's schema
+        await sharded.initialize()
+        logger.info("Sharded SQLite storage initialized successfully")
+        return sharded
 
     elif settings.storage_type == "postgresql":
         # Import here to avoid dependency issues
@@ -66,31 +138,77 @@ async def create_storage(settings: StorageSettings) -> StorageAdapter:
             from .postgres_storage import PostgreSQLStorage
         except ImportError as e:
             raise RuntimeError(
-                "PostgreSQL storage requires 'sqlalchemy[asyncio]' and 'asyncpg' packages. "
-                "This feature is available in the Enterprise Edition."
+                "PostgreSQL storage requires the 'asyncpg' package "
+                "(pip install 'notify-mcp[postgresql]')"
             ) from e
 
         if settings.postgresql_url is None:
             raise ValueError("postgresql_url must be set when storage_type is 'postgresql'")
 
-        logger.info("Creating PostgreSQL storage (Enterprise Edition)")
-        storage = PostgreSQLStorage(
+        logger.info(
+            f"Creating PostgreSQL storage: pool={settings.postgresql_pool_min_size}.."
+            f"{settings.postgresql_pool_max_size}"
+        )
+        postgres = PostgreSQLStorage(
             connection_url=settings.postgresql_url,
             max_history_per_channel=settings.max_history,
+            pool_min_size=settings.postgresql_pool_min_size,
+            pool_max_size=settings.postgresql_pool_max_size,
+            statement_cache_size=settings.postgresql_statement_cache_size,
+            copy_threshold=settings.postgresql_copy_threshold,
         )
 
-        # Initialize database schema
-        await storage.initialize()
+        # Open the pool and create the schema
+        await postgres.initialize()
         logger.info("PostgreSQL storage initialized successfully")
-        return storage
+        return postgres
 
     else:
         raise ValueError(
             f"Unsupported storage type: {settings.storage_type}. "
-            f"Supported types: memory, sqlite, postgresql"
+            f"Supported types: memory, sqlite, sqlite-sharded, postgresql"
         )
 
 
+def build_sqlite_storage(settings: StorageSettings) -> "SQLiteStorage":
+    """Create the configured single-file SQLite storage without initializing it.
+
+    create_storage() initializes the result; maintenance commands such as
+    backups use it as-is so they read the file with the same path, profile
+    and pragmas as the server without migrating the schema.
+
+    Raises:
+        RuntimeError: If the SQLite dependencies are not installed
+    """
+    # Import here to avoid dependency issues
+    try:
+        from .sqlite_storage import SQLiteStorage
+    except ImportError as e:
+        raise RuntimeError(
+            "SQLite storage requires 'sqlalchemy[asyncio]' and 'aiosqlite' packages"
+        ) from e
+
+    logger.info(
+        f"Creating SQLite storage: path={settings.sqlite_path}, "
+        f"profile={settings.sqlite_profile}"
+    )
+    return SQLiteStorage(db_path=settings.sqlite_path, **_sqlite_options(settings))
+
+
+def _sqlite_options(settings: StorageSettings) -> dict[str, Any]:
+    """SQLiteStorage keyword arguments shared by the sqlite and sqlite-sharded backends."""
+    return {
+        "max_history_per_channel": settings.max_history,
+        "pragma_profile": settings.sqlite_profile,
+        "pragmas": settings.sqlite_pragmas,
+        "trim_interval": settings.sqlite_trim_interval,
+        "read_pool_size": settings.sqlite_read_pool_size,
+        "incremental_vacuum": settings.sqlite_incremental_vacuum,
+        "archive_dir": settings.sqlite_archive_dir,
+        "archive_segment_bytes": settings.sqlite_archive_segment_bytes,
+    }
+
+
 async def close_storage(storage: StorageAdapter) -> None:
     """Close storage and cleanup resources.
 
@@ -0,0 +1,420 @@
+"""Latency instrumentation wrapper around any storage adapter.
+
+``InstrumentedStorageAdapter`` times every storage call and keeps, per
+method, a call count, an error count and a latency histogram. It answers
+"which storage call makes publishes slow?" without a profiler:
+
+- histograms use HDR-style log-linear buckets, so p50/p95/p99 are within
+  about 1.6% of the exact value at any scale while memory stays bounded
+- ``summary()`` feeds the ``get_storage_stats`` tool and
+  ``render_prometheus()`` the HTTP ``/metrics`` endpoint
+- streams (``iter_notifications``) count as one call whose latency is
+  the time spent inside the wrapped stream, not in the consumer
+
+Instrumentation is opt-in (``NOTIFY_MCP_STORAGE_METRICS_ENABLED``). When
+it is off the factory does not wrap the storage at all, so disabled
+metrics cost nothing; when on, a call costs two clock reads and a few
+dict and integer updates.
+"""
+
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TypeVar
+
+from ..core.storage_adapter import StorageAdapter
+from ..models.channel import Channel
+from ..models.notification import Notification
+from ..models.search import FilteredPage, NotificationSearchResult
+from ..models.subscription import Subscription, SubscriptionFilter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Microseconds below 2**_SUB_BUCKET_BITS get a bucket each; every power of
+# two above is split into half as many buckets (1/64 relative width)
+_SUB_BUCKET_BITS = 7
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+_HALF_SUB_BUCKETS = _SUB_BUCKETS // 2
+
+# Quantiles reported by summary() and render_prometheus()
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _bucket_index(micros: int) -> int:
+    """Histogram bucket of a non-negative duration in microseconds."""
+    if micros < _SUB_BUCKETS:
+        return micros
+    shift = micros.bit_length() - _SUB_BUCKET_BITS
+    return _SUB_BUCKETS + (shift - 1) * _HALF_SUB_BUCKETS + (micros >> shift) - _HALF_SUB_BUCKETS
+
+
+def _bucket_upper_bound(index: int) -> int:
+    """Largest duration in microseconds that falls into a bucket."""
+    if index < _SUB_BUCKETS:
+        return index
+    shift, offset = divmod(index - _SUB_BUCKETS, _HALF_SUB_BUCKETS)
+    return ((offset + _HALF_SUB_BUCKETS + 1) << (shift + 1)) - 1
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram with microsecond resolution.
+
+    Durations up to 127 µs are counted exactly; above that each doubling
+    is split into 64 buckets. Only buckets that were hit are stored.
+    """
+
+    def __init__(self) -> None:
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add one duration."""
+        index = _bucket_index(max(0, int(seconds * 1_000_000)))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Duration in seconds at or below which a fraction ``q`` of calls finished.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Upper bound of the bucket holding the quantile (capped at the
+            largest recorded duration), or 0.0 if nothing was recorded
+
+        Raises:
+            ValueError: If q is outside [0, 1]
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"q must be between 0 and 1, got {q}")
+        if not self.count:
+            return 0.0
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(_bucket_upper_bound(index) / 1_000_000, self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        """Mean duration in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass
+class MethodStats:
+    """Call and error counters and latencies of one storage method."""
+
+    calls: int = 0
+    errors: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def summary(self) -> dict[str, float | int]:
+        """Counters and latencies in milliseconds, JSON-friendly."""
+        summary: dict[str, float | int] = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "mean_ms": round(self.latency.mean * 1000, 3),
+        }
+        for q in QUANTILES:
+            summary[f"p{q * 100:g}_ms"] = round(self.latency.quantile(q) * 1000, 3)
+        summary["max_ms"] = round(self.latency.max * 1000, 3)
+        return summary
+
+
+class InstrumentedStorageAdapter(StorageAdapter):
+    """Storage adapter recording per-method call counts, errors and latency.
+
+    Wraps another ``StorageAdapter`` and delegates every call to it
+    unchanged.
+    """
+
+    def __init__(self, storage: StorageAdapter, clock: Callable[[], float] = time.perf_counter):
+        """Initialize instrumentation wrapper.
+
+        Args:
+            storage: Storage adapter to wrap
+            clock: High-resolution time source in seconds (for tests)
+        """
+        self.storage = storage
+        self.clock = clock
+        self.methods: dict[str, MethodStats] = {}
+
+    def _stats(self, method: str) -> MethodStats:
+        stats = self.methods.get(method)
+        if stats is None:
+            stats = self.methods[method] = MethodStats()
+        return stats
+
+    async def _timed(self, method: str, call: Awaitable[T]) -> T:
+        """Await a wrapped call, recording its latency and any error."""
+        stats = self._stats(method)
+        started = self.clock()
+        try:
+            return await call
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.calls += 1
+            stats.latency.record(self.clock() - started)
+
+    def summary(self) -> dict[str, dict[str, float | int]]:
+        """Per-method counters and latencies in milliseconds, sorted by method."""
+        return {method: self.methods[method].summary() for method in sorted(self.methods)}
+
+    def reset(self) -> None:
+        """Drop all recorded calls."""
+        self.methods.clear()
+
+    def render_prometheus(self) -> str:
+        """Render the recorded calls in the Prometheus text exposition format."""
+        methods = sorted(self.methods)
+        lines = [
+            "# HELP notify_mcp_storage_calls_total Storage adapter calls by method.",
+            "# TYPE notify_mcp_storage_calls_total counter",
+        ]
+        lines += [
+            f'notify_mcp_storage_calls_total{{method="{m}"}} {self.methods[m].calls}'
+            for m in methods
+        ]
+        lines += [
+            "# HELP notify_mcp_storage_errors_total Storage adapter calls that raised, by method.",
+            "# TYPE notify_mcp_storage_errors_total counter",
+        ]
+        lines += [
+            f'notify_mcp_storage_errors_total{{method="{m}"}} {self.methods[m].errors}'
+            for m in methods
+        ]
+        lines += [
+            "# HELP notify_mcp_storage_latency_seconds Storage adapter call latency by method.",
+            "# TYPE notify_mcp_storage_latency_seconds summary",
+        ]
+        for m in methods:
+            latency = self.methods[m].latency
+            for q in QUANTILES:
+                lines.append(
+                    f'notify_mcp_storage_latency_seconds{{method="{m}",quantile="{q:g}"}} '
+                    f"{latency.quantile(q):.6f}"
+                )
+            lines.append(
+                f'notify_mcp_storage_latency_seconds_sum{{method="{m}"}} {latency.total:.6f}'
+            )
+            lines.append(
+                f'notify_mcp_storage_latency_seconds_count{{method="{m}"}} {latency.count}'
+            )
+        return "\n".join(lines) + "\n"
+
+    async def initialize(self) -> None:
+        """Initialize the wrapped storage, if it needs it."""
+        if hasattr(self.storage, "initialize"):
+            await self.storage.initialize()
+
+    async def close(self) -> None:
+        """Log the slowest methods and close the wrapped storage."""
+        slowest = sorted(
+            self.methods.items(), key=lambda item: item[1].latency.quantile(0.99), reverse=True
+        )[:5]
+        if slowest:
+            report = ", ".join(
+                f"{method}={stats.latency.quantile(0.99) * 1000:.2f}ms" for method, stats in slowest
+            )
+            logger.info(f"Slowest storage methods by p99: {report}")
+        if hasattr(self.storage, "close"):
+            await self.storage.close()
+
+    # ========== Channel Operations ==========
+
+    async def save_channel(self, channel: Channel) -> None:
+        """Save or update a channel."""
+        await self._timed("save_channel", self.storage.save_channel(channel))
+
+    async def get_channel(self, channel_id: str) -> Channel | None:
+        """Get a channel by ID."""
+        return await self._timed("get_channel", self.storage.get_channel(channel_id))
+
+    async def get_channels(self, channel_ids: list[str]) -> dict[str, Channel]:
+        """Get several channels by ID."""
+        return await self._timed("get_channels", self.storage.get_channels(channel_ids))
+
+    async def delete_channel(self, channel_id: str) -> None:
+        """Delete a channel."""
+        await self._timed("delete_channel", self.storage.delete_channel(channel_id))
+
+    async def list_channels(self) -> list[Channel]:
+        """List all channels."""
+        return await self._timed("list_channels", self.storage.list_channels())
+
+    async def record_channel_notification(
+        self, channel_id: str, timestamp: datetime, count: int = 1
+    ) -> None:
+        """Bump a channel's notification stats."""
+        await self._timed(
+            "record_channel_notification",
+            self.storage.record_channel_notification(channel_id, timestamp, count),
+        )
+
+    # ========== Subscription Operations ==========
+
+    async def save_subscription(self, subscription: Subscription) -> None:
+        """Save or update a subscription."""
+        await self._timed("save_subscription", self.storage.save_subscription(subscription))
+
+    async def delete_subscription(self, subscription_id: str) -> None:
+        """Delete a subscription."""
+        await self._timed("delete_subscription", self.storage.delete_subscription(subscription_id))
+
+    async def save_subscriptions(self, subscriptions: list[Subscription]) -> None:
+        """Save or update several subscriptions."""
+        await self._timed("save_subscriptions", self.storage.save_subscriptions(subscriptions))
+
+    async def delete_subscriptions(self, subscription_ids: list[str]) -> None:
+        """Delete several subscriptions."""
+        await self._timed(
+            "delete_subscriptions", self.storage.delete_subscriptions(subscription_ids)
+        )
+
+    async def get_subscriptions_by_channel(self, channel: str) -> list[Subscription]:
+        """Get all subscriptions for a channel."""
+        return await self._timed(
+            "get_subscriptions_by_channel", self.storage.get_subscriptions_by_channel(channel)
+        )
+
+    async def get_subscriptions_by_channels(
+        self, channels: list[str]
+    ) -> dict[str, list[Subscription]]:
+        """Get the subscriptions of several channels."""
+        return await self._timed(
+            "get_subscriptions_by_channels", self.storage.get_subscriptions_by_channels(channels)
+        )
+
+    async def get_subscriptions_by_client(self, client_id: str) -> list[Subscription]:
+        """Get all subscriptions for a client."""
+        return await self._timed(
+            "get_subscriptions_by_client", self.storage.get_subscriptions_by_client(client_id)
+        )
+
+    async def get_subscriptions_by_client_and_channel(
+        self, client_id: str, channel: str
+    ) -> list[Subscription]:
+        """Get a client's subscriptions to a single channel."""
+        return await self._timed(
+            "get_subscriptions_by_client_and_channel",
+            self.storage.get_subscriptions_by_client_and_channel(client_id, channel),
+        )
+
+    # ========== Notification Operations ==========
+
+    async def save_notification(self, notification: Notification) -> None:
+        """Save a notification."""
+        await self._timed("save_notification", self.storage.save_notification(notification))
+
+    async def save_notifications(self, notifications: list[Notification]) -> None:
+        """Save several notifications."""
+        await self._timed("save_notifications", self.storage.save_notifications(notifications))
+
+    async def append_notification(self, notification: Notification) -> int:
+        """Save a notification under its channel's next sequence number."""
+        return await self._timed(
+            "append_notification", self.storage.append_notification(notification)
+        )
+
+    async def get_notifications(self, channel: str, limit: int = 50) -> list[Notification]:
+        """Get recent notifications from a channel."""
+        return await self._timed(
+            "get_notifications", self.storage.get_notifications(channel, limit=limit)
+        )
+
+    async def get_notifications_page(
+        self,
+        channel: str,
+        limit: int = 50,
+        before: int | None = None,
+        after: int | None = None,
+    ) -> list[Notification]:
+        """Get a page of channel history."""
+        return await self._timed(
+            "get_notifications_page",
+            self.storage.get_notifications_page(channel, limit, before, after),
+        )
+
+    async def get_filtered_notifications_page(
+        self,
+        channel: str,
+        filters: SubscriptionFilter,
+        limit: int = 50,
+        before: int | None = None,
+    ) -> FilteredPage:
+        """Get a page of history matching a filter."""
+        return await self._timed(
+            "get_filtered_notifications_page",
+            self.storage.get_filtered_notifications_page(channel, filters, limit, before),
+        )
+
+    async def iter_notifications(
+        self,
+        channel: str,
+        since: int | None = None,
+        until: int | None = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Notification]:
+        """Stream a channel's history, timing only the wrapped stream."""
+        stats = self._stats("iter_notifications")
+        stream = self.storage.iter_notifications(channel, since, until, batch_size)
+        elapsed = 0.0
+        try:
+            while True:
+                started = self.clock()
+                try:
+                    notification = await anext(stream)
+                except StopAsyncIteration:
+                    break
+                finally:
+                    elapsed += self.clock() - started
+                yield notification
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.calls += 1
+            stats.latency.record(elapsed)
+
+    async def search_notifications(
+        self, query: str, channels: list[str] | None = None, limit: int = 20
+    ) -> list[NotificationSearchResult]:
+        """Full-text search over notifications."""
+        return await self._timed(
+            "search_notifications", self.storage.search_notifications(query, channels, limit)
+        )
+
+    async def get_notification_count(self, channel: str) -> int:
+        """Get total notification count for a channel."""
+        return await self._timed(
+            "get_notification_count", self.storage.get_notification_count(channel)
+        )
+
+    async def get_latest_sequence(self, channel: str) -> int:
+        """Get the highest sequence number stored for a channel."""
+        return await self._timed("get_latest_sequence", self.storage.get_latest_sequence(channel))
+
+    async def purge_expired(self, now: float | None = None, batch_size: int = 500) -> int:
+        """Purge expired notifications."""
+        return await self._timed(
+            "purge_expired", self.storage.purge_expired(now=now, batch_size=batch_size)
+        )
+
+    async def reclaim_space(self) -> None:
+        """Release storage freed by purges."""
+        await self._timed("reclaim_space", self.storage.reclaim_space())
@@ -0,0 +1,253 @@
+"""Append-only journal and snapshots for the in-memory storage backend.
+
+``InMemoryStorage`` can optionally persist its state to a directory:
+
+- ``journal.<generation>.ndjson``: every mutation, one JSON object per line.
+  Lines are written through a buffered file and fsync'd in batches (at most
+  once per ``fsync_interval``), so publishes stay at in-memory speed.
+- ``snapshot.ndjson``: a compacted dump of the full state, written
+  periodically. Its header records the journal generation it covers up to.
+
+Journal and snapshot lines share one format, ``{"op": ..., "data": ...}``,
+so restoring is a single replay loop: memory-map the snapshot and stream its
+lines, then replay every journal whose generation is at or above the
+snapshot's.
+
+Compaction rotates the journal to a new generation first, so the snapshot
+captures exactly the state at the rotation point and writes that arrive
+while it is being written land in the new journal. A crash at any point
+leaves either the old snapshot plus all journals since, or the new snapshot
+plus the new journal; both replay to the same state.
+"""
+
+import json
+import logging
+import mmap
+import os
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import IO, Any
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "snapshot.ndjson"
+SNAPSHOT_FORMAT_VERSION = 1
+_JOURNAL_PATTERN = re.compile(r"^journal\.(\d+)\.ndjson$")
+
+
+def encode_entry(op: str, data_json: str) -> str:
+    """Encode one journal/snapshot line from an already-serialized payload."""
+    return f'{{"op":"{op}","data":{data_json}}}\n'
+
+
+class MemoryJournal:
+    """Append-only journal with periodic compacted snapshots."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        fsync_interval: float = 1.0,
+        snapshot_every: int = 100_000,
+    ):
+        """Initialize journal.
+
+        Args:
+            directory: Directory holding the journal and snapshot files
+            fsync_interval: Seconds between batched fsyncs of the journal
+            snapshot_every: Journal entries after which a compacted snapshot is due
+        """
+        self.directory = Path(directory).expanduser()
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+
+        self.generation = 0
+        self.entries_since_snapshot = 0
+        self._file: IO[str] | None = None
+        self._dirty = False
+        # Previous generation's file, left open by rotate() for close_rotated()
+        self._rotated: IO[str] | None = None
+
+    @property
+    def snapshot_path(self) -> Path:
+        """Path of the compacted snapshot file."""
+        return self.directory / SNAPSHOT_FILE
+
+    def journal_path(self, generation: int) -> Path:
+        """Path of the journal file for a generation."""
+        return self.directory / f"journal.{generation}.ndjson"
+
+    @property
+    def needs_snapshot(self) -> bool:
+        """Whether enough entries have accumulated to warrant compaction."""
+        return self.entries_since_snapshot >= self.snapshot_every
+
+    # ========== Restore ==========
+
+    def load(self) -> Iterator[tuple[str, Any]]:
+        """Yield (op, data) entries from the snapshot and journal tail.
+
+        Also positions the journal so that open() continues at the latest
+        generation found on disk.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        snapshot_generation = 0
+        if self.snapshot_path.exists():
+            entries = self._read_lines(self.snapshot_path)
+            header = next(entries, None)
+            if header is not None:
+                snapshot_generation = header.get("generation", 0)
+                yield from ((e["op"], e["data"]) for e in entries)
+
+        generations = sorted(
+            g for g in self._journal_generations() if g >= snapshot_generation
+        )
+        replayed = 0
+        for generation in generations:
+            for entry in self._read_lines(self.journal_path(generation), repair=True):
+                replayed += 1
+                yield entry["op"], entry["data"]
+
+        self.generation = max(generations, default=snapshot_generation)
+        self.entries_since_snapshot = replayed
+        logger.info(
+            f"Journal restore: snapshot generation {snapshot_generation}, "
+            f"replayed {replayed} journal entries"
+        )
+
+    def _journal_generations(self) -> list[int]:
+        """List journal generations present on disk."""
+        generations = []
+        for path in self.directory.iterdir():
+            match = _JOURNAL_PATTERN.match(path.name)
+            if match:
+                generations.append(int(match.group(1)))
+        return generations
+
+    def _read_lines(self, path: Path, repair: bool = False) -> Iterator[dict[str, Any]]:
+        """Stream JSON lines from a memory-mapped file.
+
+        A torn final line (crash mid-write) ends the stream with a warning.
+        With ``repair``, the file is truncated before the torn line so that
+        later appends start on a clean line.
+        """
+        torn_at: int | None = None
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                offset = 0
+                for line in iter(mm.readline, b""):
+                    if line.strip():
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            logger.warning(f"Ignoring truncated entry at end of {path.name}")
+                            torn_at = offset
+                            break
+                        yield entry
+                    offset = mm.tell()
+
+        if repair and torn_at is not None:
+            os.truncate(path, torn_at)
+
+    # ========== Append ==========
+
+    def open(self) -> None:
+        """Open the current journal generation for appending."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.journal_path(self.generation), "a", encoding="utf-8")
+
+    def append(self, op: str, data_json: str) -> None:
+        """Append an entry; durable after the next sync().
+
+        Args:
+            op: Operation name
+            data_json: JSON-encoded operation payload
+        """
+        if self._file is None:
+            raise RuntimeError("Journal is not open")
+        self._file.write(encode_entry(op, data_json))
+        self._dirty = True
+        self.entries_since_snapshot += 1
+
+    def flush(self) -> int | None:
+        """Flush buffered entries to the OS.
+
+        Returns:
+            File descriptor to fsync, or None if nothing was written
+        """
+        if self._file is None or not self._dirty:
+            return None
+        self._file.flush()
+        self._dirty = False
+        return self._file.fileno()
+
+    def sync(self) -> None:
+        """Flush and fsync buffered entries."""
+        fd = self.flush()
+        if fd is not None:
+            os.fsync(fd)
+
+    def close(self) -> None:
+        """Sync and close the journal."""
+        self.close_rotated()
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    # ========== Compaction ==========
+
+    def rotate(self) -> int:
+        """Start a new journal generation.
+
+        The previous generation is flushed to the OS but not fsync'd;
+        close_rotated() does that off the event loop.
+
+        Returns:
+            The new generation; a snapshot taken now covers everything before it
+        """
+        self.close_rotated()
+        if self._file is not None:
+            self._file.flush()
+            self._rotated = self._file
+            self._file = None
+        self._dirty = False
+        self.generation += 1
+        self.entries_since_snapshot = 0
+        self.open()
+        return self.generation
+
+    def close_rotated(self) -> None:
+        """Fsync and close the generation replaced by the last rotate().
+
+        Blocking; intended to run in a worker thread.
+        """
+        if self._rotated is not None:
+            os.fsync(self._rotated.fileno())
+            self._rotated.close()
+            self._rotated = None
+
+    def write_snapshot(self, generation: int, lines: Iterable[str]) -> None:
+        """Atomically replace the snapshot and drop the journals it covers.
+
+        Blocking; intended to run in a worker thread.
+
+        Args:
+            generation: Generation returned by rotate()
+            lines: Encoded entries making up the full state
+        """
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            header = {"version": SNAPSHOT_FORMAT_VERSION, "generation": generation}
+            f.write(json.dumps(header) + "\n")
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        for old in self._journal_generations():
+            if old < generation:
+                self.journal_path(old).unlink(missing_ok=True)
@@ -1,35 +1,197 @@
 """In-memory storage implementation."""
 
+import asyncio
+import contextlib
+import itertools
+import json
+import logging
+import os
+import time
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
+from collections.abc import AsyncIterator, Callable, Iterator
+from typing import Any
 
 from ..core.storage_adapter import StorageAdapter
-from ..models import Channel, Notification, Subscription
+from ..models import Channel, Notification, NotificationSearchResult, Subscription
+from ..utils.search import InvertedIndex
+from .compact import CompactNotification
+from .eviction import EvictionPolicy, GlobalLRUPolicy
+from .expiry import ExpiryHeap, is_expired
+from .journal import MemoryJournal, encode_entry
+from .ring_buffer import RingBuffer
+
+logger = logging.getLogger(__name__)
+
+# Once over budget, evict down to this fraction of it so eviction rounds
+# are amortized over many publishes instead of running on every one.
+_EVICTION_LOW_WATERMARK = 0.9
+
+# Rebuild the expiry heap once dead entries (records that left storage
+# before expiring) outnumber live ones by this much
+_EXPIRY_HEAP_SLACK = 1024
+
+
+def _sequence(record: CompactNotification) -> int:
+    """Bisect key for cursor lookups in a channel history."""
+    return record.sequence or 0
+
+
+def _text(record: CompactNotification) -> tuple[str, str]:
+    """Title and body the search index cuts snippets from."""
+    return record.title, record.body
 
 
 class InMemoryStorage(StorageAdapter):
     """In-memory storage implementation using Python dictionaries."""
 
-    def __init__(self, max_history_per_channel: int = 1000):
+    def __init__(
+        self,
+        max_history_per_channel: int = 1000,
+        max_memory_bytes: int | None = None,
+        eviction_policy: EvictionPolicy | None = None,
+        journal: MemoryJournal | None = None,
+        search_index: bool = False,
+    ):
         """Initialize in-memory storage.
 
         Args:
             max_history_per_channel: Maximum notifications to keep per channel
+            max_memory_bytes: Global budget for notification history, measured in
+                approximate encoded bytes (None for no budget)
+            eviction_policy: Policy choosing what to evict when over budget
+                (defaults to global LRU)
+            journal: Optional append-only journal for durability; state is
+                restored from it by initialize()
+            search_index: Maintain an inverted index for full-text search; its
+                postings count toward max_memory_bytes. Without it, searches
+                index the history on every call.
         """
         self.max_history = max_history_per_channel
+        self.max_memory_bytes = max_memory_bytes
+        self.eviction_policy = eviction_policy or GlobalLRUPolicy()
+
+        # Durability (enabled once initialize() has replayed the journal)
+        self.journal = journal
+        self._journal_active = False
+        self._journal_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task[None] | None = None
+        self._snapshot_task: asyncio.Task[None] | None = None
+
+        # Memory accounting (approximate encoded bytes of stored history)
+        self._memory_bytes = 0
+        self._evicted_count = 0
+
+        # Channels published to since the last budget check, and the (budget,
+        # channel count) at which a full eviction pass last ran out of victims
+        # while over budget. Until either changes, every other channel is as
+        # small as the policy allows, so only published channels are offered.
+        self._published: set[str] = set()
+        self._eviction_stall: tuple[int, int] | None = None
 
         # Storage dictionaries
         self._channels: dict[str, Channel] = {}
         self._subscriptions: dict[str, Subscription] = {}
-        self._notifications: dict[str, list[Notification]] = defaultdict(list)
+        # History is held as compact records and inflated on read
+        self._notifications: dict[str, RingBuffer[CompactNotification]] = {}
+
+        # Full-text index over retained records (opt-in)
+        self._search_index: InvertedIndex[CompactNotification] | None = (
+            InvertedIndex(_text) if search_index else None
+        )
+
+        # Records with a validity deadline, soonest first, and how many of
+        # them are still stored. Reads only check expiry while this is nonzero.
+        self._expiry_heap: ExpiryHeap[CompactNotification] = ExpiryHeap()
+        self._expiring = 0
+
+        # Per channel, ids of records already popped from the expiry heap as
+        # due but not yet purged from the history
+        self._lapsed: dict[str, set[int]] = {}
+
+        # Highest sequence seen per channel; survives eviction and expiry
+        self._latest_sequence: dict[str, int] = {}
+
+        # Indexes for faster lookups. Inner dicts are used as insertion-ordered
+        # sets (values are always None) so add/remove are O(1).
+        self._subscriptions_by_channel: dict[str, dict[str, None]] = defaultdict(dict)
+        self._subscriptions_by_client: dict[str, dict[str, None]] = defaultdict(dict)
+        self._subscriptions_by_client_channel: dict[tuple[str, str], dict[str, None]] = (
+            defaultdict(dict)
+        )
+
+    # Lifecycle
+    async def initialize(self) -> None:
+        """Restore state from the journal (if configured) and start syncing it."""
+        if self.journal is None:
+            return
+
+        restored = 0
+        for op, data in self.journal.load():
+            await self._apply_entry(op, data)
+            restored += 1
+
+        self.journal.open()
+        self._journal_active = True
+        self._flush_task = asyncio.create_task(self._flush_loop(self.journal))
+        logger.info(f"In-memory storage restored {restored} journal entries")
+
+    async def close(self) -> None:
+        """Stop background journal tasks and sync the journal."""
+        if self.journal is None or not self._journal_active:
+            return
+
+        if self._snapshot_task is not None:
+            await self._snapshot_task
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flush_task
+
+        async with self._journal_lock:
+            self.journal.close()
+        self._journal_active = False
+
+    async def snapshot(self) -> None:
+        """Write a compacted snapshot and truncate the journal.
+
+        State is captured synchronously at the journal rotation point;
+        syncing the previous journal, serializing and writing the snapshot
+        happen in worker threads.
+        """
+        if self.journal is None or not self._journal_active:
+            return
+
+        async with self._journal_lock:
+            generation = self.journal.rotate()
+            channels = [
+                encode_entry("save_channel", c.model_dump_json()) for c in self._channels.values()
+            ]
+            subscriptions = [
+                encode_entry("save_subscription", s.model_dump_json())
+                for s in self._subscriptions.values()
+            ]
+            # Records are immutable once stored, so a shallow copy is a consistent view
+            records = [list(history) for history in self._notifications.values()]
+            await asyncio.to_thread(self.journal.close_rotated)
 
-        # Indexes for faster lookups
-        self._subscriptions_by_channel: dict[str, list[str]] = defaultdict(list)
-        self._subscriptions_by_client: dict[str, list[str]] = defaultdict(list)
+        def lines() -> Iterator[str]:
+            yield from channels
+            yield from subscriptions
+            for history in records:
+                for record in history:
+                    yield encode_entry(
+                        "save_notification", record.to_notification().model_dump_json()
+                    )
+
+        await asyncio.to_thread(self.journal.write_snapshot, generation, lines())
+        logger.info(f"In-memory storage snapshot written (generation {generation})")
 
     # Channel operations
     async def save_channel(self, channel: Channel) -> None:
         """Save a channel."""
         self._channels[channel.id] = channel
+        self._journal_append("save_channel", channel.model_dump_json)
 
     async def get_channel(self, channel_id: str) -> Channel | None:
         """Get a channel by ID."""
@@ -37,19 +199,33 @@ class InMemoryStorage(StorageAdapter):
 
     async def delete_channel(self, channel_id: str) -> None:
         """Delete a channel."""
+        self._journal_append("delete_channel", lambda: json.dumps(channel_id))
+
         if channel_id in self._channels:
             del self._channels[channel_id]
 
-        # Clean up related subscriptions
-        if channel_id in self._subscriptions_by_channel:
-            sub_ids = self._subscriptions_by_channel[channel_id].copy()
+        # Clean up related subscriptions (O(1) per subscription)
+        sub_ids = self._subscriptions_by_channel.pop(channel_id, None)
+        if sub_ids:
             for sub_id in sub_ids:
-                await self.delete_subscription(sub_id)
-            del self._subscriptions_by_channel[channel_id]
+                subscription = self._subscriptions.pop(sub_id, None)
+                if subscription is not None:
+                    self._unindex_client(subscription)
 
         # Clean up notifications
-        if channel_id in self._notifications:
-            del self._notifications[channel_id]
+        self._latest_sequence.pop(channel_id, None)
+        history = self._notifications.pop(channel_id, None)
+        if history is not None:
+            for record in history:
+                self._forget(record)
+
+    async def get_channels(self, channel_ids: list[str]) -> dict[str, Channel]:
+        """Get several channels by ID."""
+        return {
+            channel_id: self._channels[channel_id]
+            for channel_id in channel_ids
+            if channel_id in self._channels
+        }
 
     async def list_channels(self) -> list[Channel]:
         """List all channels."""
@@ -58,62 +234,469 @@ class InMemoryStorage(StorageAdapter):
     # Subscription operations
     async def save_subscription(self, subscription: Subscription) -> None:
         """Save a subscription."""
-        self._subscriptions[subscription.id] = subscription
+        self._store_subscription(subscription)
 
-        # Update indexes
-        if subscription.id not in self._subscriptions_by_channel[subscription.channel]:
-            self._subscriptions_by_channel[subscription.channel].append(subscription.id)
-
-        if subscription.id not in self._subscriptions_by_client[subscription.clientId]:
-            self._subscriptions_by_client[subscription.clientId].append(subscription.id)
+    async def save_subscriptions(self, subscriptions: list[Subscription]) -> None:
+        """Save several subscriptions."""
+        for subscription in subscriptions:
+            self._store_subscription(subscription)
 
     async def delete_subscription(self, subscription_id: str) -> None:
         """Delete a subscription."""
-        if subscription_id not in self._subscriptions:
-            return
-
-        subscription = self._subscriptions[subscription_id]
+        self._remove_subscription(subscription_id)
 
-        # Remove from indexes
-        if subscription.channel in self._subscriptions_by_channel:
-            if subscription_id in self._subscriptions_by_channel[subscription.channel]:
-                self._subscriptions_by_channel[subscription.channel].remove(subscription_id)
-
-        if subscription.clientId in self._subscriptions_by_client:
-            if subscription_id in self._subscriptions_by_client[subscription.clientId]:
-                self._subscriptions_by_client[subscription.clientId].remove(subscription_id)
-
-        # Delete subscription
-        del self._subscriptions[subscription_id]
+    async def delete_subscriptions(self, subscription_ids: list[str]) -> None:
+        """Delete several subscriptions."""
+        for subscription_id in subscription_ids:
+            self._remove_subscription(subscription_id)
 
     async def get_subscriptions_by_channel(self, channel: str) -> list[Subscription]:
         """Get all subscriptions for a channel."""
-        sub_ids = self._subscriptions_by_channel.get(channel, [])
-        return [self._subscriptions[sub_id] for sub_id in sub_ids if sub_id in self._subscriptions]
+        sub_ids = self._subscriptions_by_channel.get(channel, {})
+        return [self._subscriptions[sub_id] for sub_id in sub_ids]
+
+    async def get_subscriptions_by_channels(
+        self, channels: list[str]
+    ) -> dict[str, list[Subscription]]:
+        """Get the subscriptions of several channels."""
+        return {
+            channel: [
+                self._subscriptions[sub_id]
+                for sub_id in self._subscriptions_by_channel.get(channel, {})
+            ]
+            for channel in channels
+        }
 
     async def get_subscriptions_by_client(self, client_id: str) -> list[Subscription]:
         """Get all subscriptions for a client."""
-        sub_ids = self._subscriptions_by_client.get(client_id, [])
-        return [self._subscriptions[sub_id] for sub_id in sub_ids if sub_id in self._subscriptions]
+        sub_ids = self._subscriptions_by_client.get(client_id, {})
+        return [self._subscriptions[sub_id] for sub_id in sub_ids]
+
+    async def get_subscriptions_by_client_and_channel(
+        self, client_id: str, channel: str
+    ) -> list[Subscription]:
+        """Get a client's subscriptions to a single channel."""
+        sub_ids = self._subscriptions_by_client_channel.get((client_id, channel), {})
+        return [self._subscriptions[sub_id] for sub_id in sub_ids]
 
     # Notification operations
     async def save_notification(self, notification: Notification) -> None:
         """Save a notification."""
-        channel = notification.metadata.channel
-        if channel:
-            self._notifications[channel].append(notification)
+        self._store_notification(notification)
+        self._check_memory_budget()
 
-            # Trim to max history (LRU - keep most recent)
-            if len(self._notifications[channel]) > self.max_history:
-                self._notifications[channel] = self._notifications[channel][-self.max_history:]
+    async def save_notifications(self, notifications: list[Notification]) -> None:
+        """Save several notifications, enforcing the memory budget once at the end."""
+        for notification in notifications:
+            self._store_notification(notification)
+        self._check_memory_budget()
 
     async def get_notifications(
         self, channel: str, limit: int = 50
     ) -> list[Notification]:
         """Get recent notifications from a channel."""
-        notifications = self._notifications.get(channel, [])
-        return notifications[-limit:] if len(notifications) > limit else notifications
+        history = self._notifications.get(channel)
+        if history is None:
+            return []
+        return [
+            record.to_notification() for record in history.tail(limit, self._live_filter())
+        ]
+
+    async def get_notifications_page(
+        self,
+        channel: str,
+        limit: int = 50,
+        before: int | None = None,
+        after: int | None = None,
+    ) -> list[Notification]:
+        """Get a page of a channel's history by sequence cursor, newest first.
+
+        Histories are stored in sequence order, so cursors are resolved by
+        binary search over the ring buffer; the walk from the cursor stops
+        once ``limit`` unexpired records are collected.
+        """
+        history = self._notifications.get(channel)
+        if history is None or limit <= 0:
+            return []
+
+        end = len(history) if before is None else bisect_left(history, before, key=_sequence)
+        start = 0 if after is None else bisect_right(history, after, key=_sequence)
+        positions = range(end - 1, start - 1, -1) if after is None else range(start, end)
+
+        live = self._live_filter()
+        page = []
+        for position in positions:
+            record = history[position]
+            if live is None or live(record):
+                page.append(record)
+                if len(page) == limit:
+                    break
+        if after is not None:
+            page.reverse()
+        return [record.to_notification() for record in page]
+
+    async def iter_notifications(
+        self,
+        channel: str,
+        since: int | None = None,
+        until: int | None = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Notification]:
+        """Stream a channel's history oldest first, one ring buffer slice at a time.
+
+        Only the current slice of ``batch_size`` records is inflated. Each
+        slice is found again by binary search from the last sequence
+        yielded, so publishes and evictions between slices are safe.
+
+        Raises:
+            ValueError: If batch_size is below 1
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+        cursor = -1 if since is None else since
+        while True:
+            history = self._notifications.get(channel)
+            if history is None:
+                return
+            start = bisect_right(history, cursor, key=_sequence)
+            end = len(history) if until is None else bisect_right(history, until, key=_sequence)
+            records = [history[position] for position in range(start, min(start + batch_size, end))]
+            if not records:
+                return
+
+            live = self._live_filter()
+            for record in records:
+                if live is None or live(record):
+                    yield record.to_notification()
+            if start + batch_size >= end:
+                return
+            cursor = _sequence(records[-1])
+
+    async def get_notification(
+        self, channel: str, notification_id: str
+    ) -> Notification | None:
+        """Get a single notification from a channel's history by ID."""
+        history = self._notifications.get(channel)
+        if history is None:
+            return None
+        record = history.get(notification_id)
+        if record is None or is_expired(record.expires_at, time.time()):
+            return None
+        return record.to_notification()
 
     async def get_notification_count(self, channel: str) -> int:
-        """Get total notification count for a channel."""
-        return len(self._notifications.get(channel, []))
+        """Get total notification count for a channel (excluding expired)."""
+        history = self._notifications.get(channel)
+        if history is None:
+            return 0
+        if self._expiring:
+            self._collect_lapsed(time.time())
+        return len(history) - len(self._lapsed.get(channel, ()))
+
+    async def get_latest_sequence(self, channel: str) -> int:
+        """Get the highest sequence number stored for a channel (0 if none)."""
+        return self._latest_sequence.get(channel, 0)
+
+    async def search_notifications(
+        self, query: str, channels: list[str] | None = None, limit: int = 20
+    ) -> list[NotificationSearchResult]:
+        """Full-text search over retained notifications via the inverted index.
+
+        Without the index, falls back to indexing the history on every call.
+        """
+        if self._search_index is None:
+            if channels is None:
+                channels = list(self._notifications)
+            return await super().search_notifications(query, channels, limit)
+        return [
+            NotificationSearchResult(
+                notification=hit.key.to_notification(), score=hit.score, snippet=hit.snippet
+            )
+            for hit in self._search_index.search(query, channels, limit, self._live_filter())
+        ]
+
+    async def purge_expired(self, now: float | None = None, batch_size: int = 500) -> int:
+        """Remove up to ``batch_size`` expired notifications.
+
+        Due records are popped from the expiry heap and join those counts
+        already found due; each affected channel history is then compacted
+        once for the whole batch.
+
+        Args:
+            now: POSIX time to expire against (defaults to the current time)
+            batch_size: Maximum notifications to remove
+
+        Returns:
+            Number of notifications removed
+        """
+        self._collect_lapsed(time.time() if now is None else now)
+
+        collected = 0
+        for channel in list(self._lapsed):
+            if collected >= batch_size:
+                break
+            record_ids = set(itertools.islice(self._lapsed[channel], batch_size - collected))
+            removed = self._notifications[channel].discard_where(
+                lambda record: id(record) in record_ids
+            )
+            for record in removed:
+                self._forget(record)
+            collected += len(removed)
+
+        if len(self._expiry_heap) > 2 * self._expiring + _EXPIRY_HEAP_SLACK:
+            self._expiry_heap.prune(self._is_stored)
+        return collected
+
+    # Record bookkeeping
+    def _store_notification(self, notification: Notification) -> None:
+        """Add a notification to its channel history and the indexes."""
+        channel = notification.metadata.channel
+        if not channel:
+            return
+
+        history = self._notifications.get(channel)
+        if history is None:
+            history = RingBuffer(self.max_history)
+            self._notifications[channel] = history
+
+        self._journal_append("save_notification", notification.model_dump_json)
+        self._published.add(channel)
+
+        record = CompactNotification.from_notification(notification)
+        self._memory_bytes += record.size
+        if record.sequence is not None:
+            self._latest_sequence[channel] = max(
+                record.sequence, self._latest_sequence.get(channel, 0)
+            )
+
+        # Ring buffer evicts the oldest entry in O(1) once at max history
+        evicted = history.append(notification.metadata.id, record)
+        if evicted is not None:
+            self._forget(evicted)
+        if self._search_index is not None:
+            self._search_index.add(
+                record, channel, record.sequence or 0, record.title, record.body
+            )
+        if record.expires_at is not None:
+            self._expiry_heap.push(record.expires_at, record)
+            self._expiring += 1
+
+    def _live_filter(self) -> Callable[[CompactNotification], bool] | None:
+        """Predicate excluding expired records, or None when nothing can expire."""
+        if not self._expiring:
+            return None
+        now = time.time()
+        return lambda record: not is_expired(record.expires_at, now)
+
+    def _collect_lapsed(self, now: float) -> None:
+        """Move records due at ``now`` from the expiry heap into the lapsed sets."""
+        for record in self._expiry_heap.pop_due(now, len(self._expiry_heap)):
+            if self._is_stored(record):
+                self._lapsed.setdefault(record.channel, set()).add(id(record))  # type: ignore[arg-type]
+
+    def _is_stored(self, record: CompactNotification) -> bool:
+        """Whether a record is still part of its channel history."""
+        history = self._notifications.get(record.channel)  # type: ignore[arg-type]
+        return history is not None and history.get(record.id) is record
+
+    def _forget(self, record: CompactNotification) -> None:
+        """Drop accounting and index entries for a record leaving storage."""
+        self._memory_bytes -= record.size
+        if self._search_index is not None:
+            self._search_index.remove(record)
+        if record.expires_at is not None:
+            self._expiring -= 1
+            lapsed = self._lapsed.get(record.channel)  # type: ignore[arg-type]
+            if lapsed is not None:
+                lapsed.discard(id(record))
+                if not lapsed:
+                    del self._lapsed[record.channel]  # type: ignore[arg-type]
+
+    # Journal
+    def _journal_append(self, op: str, encode: Any) -> None:
+        """Append an operation to the journal if durability is enabled.
+
+        Args:
+            op: Operation name
+            encode: Callable returning the JSON payload (only called when journaling)
+        """
+        if not self._journal_active or self.journal is None:
+            return
+
+        self.journal.append(op, encode())
+        if self.journal.needs_snapshot and self._snapshot_task is None:
+            self._snapshot_task = asyncio.create_task(self._run_snapshot())
+
+    async def _run_snapshot(self) -> None:
+        """Background compaction triggered by journal growth."""
+        try:
+            await self.snapshot()
+        except Exception as e:
+            logger.error(f"In-memory storage snapshot failed: {e}")
+        finally:
+            self._snapshot_task = None
+
+    async def _flush_loop(self, journal: MemoryJournal) -> None:
+        """Batch fsyncs of the journal every fsync_interval seconds."""
+        while True:
+            await asyncio.sleep(journal.fsync_interval)
+            async with self._journal_lock:
+                fd = journal.flush()
+                if fd is not None:
+                    await asyncio.to_thread(os.fsync, fd)
+
+    async def _apply_entry(self, op: str, data: Any) -> None:
+        """Apply a restored journal or snapshot entry."""
+        if op == "save_channel":
+            await self.save_channel(Channel.model_validate(data))
+        elif op == "delete_channel":
+            await self.delete_channel(data)
+        elif op == "save_subscription":
+            await self.save_subscription(Subscription.model_validate(data))
+        elif op == "delete_subscription":
+            await self.delete_subscription(data)
+        elif op == "save_notification":
+            await self.save_notification(Notification.model_validate(data))
+        else:
+            logger.warning(f"Skipping unknown journal operation: {op}")
+
+    # Memory budget
+    @property
+    def memory_bytes(self) -> int:
+        """Approximate encoded size of all stored notification history and its search index."""
+        return self._memory_bytes + self._search_index_bytes
+
+    @property
+    def _search_index_bytes(self) -> int:
+        return self._search_index.size if self._search_index is not None else 0
+
+    def get_memory_stats(self) -> dict[str, int | None]:
+        """Get memory usage metrics for notification history.
+
+        Returns:
+            Dictionary with current bytes (search index included), budget,
+            stored and evicted counts
+        """
+        return {
+            "memory_bytes": self.memory_bytes,
+            "search_index_bytes": self._search_index_bytes,
+            "max_memory_bytes": self.max_memory_bytes,
+            "notifications": sum(len(history) for history in self._notifications.values()),
+            "channels": len(self._notifications),
+            "evicted_by_budget": self._evicted_count,
+        }
+
+    def render_prometheus(self) -> str:
+        """Render the memory usage metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP notify_mcp_memory_bytes Approximate bytes of stored history and search index.",
+            "# TYPE notify_mcp_memory_bytes gauge",
+            f"notify_mcp_memory_bytes {self.memory_bytes}",
+        ]
+        if self.max_memory_bytes is not None:
+            lines += [
+                "# HELP notify_mcp_memory_budget_bytes Memory budget for stored history.",
+                "# TYPE notify_mcp_memory_budget_bytes gauge",
+                f"notify_mcp_memory_budget_bytes {self.max_memory_bytes}",
+            ]
+        lines += [
+            "# HELP notify_mcp_memory_notifications Notifications held in memory.",
+            "# TYPE notify_mcp_memory_notifications gauge",
+            "notify_mcp_memory_notifications "
+            f"{sum(len(history) for history in self._notifications.values())}",
+            "# HELP notify_mcp_memory_evicted_total Notifications evicted to stay under budget.",
+            "# TYPE notify_mcp_memory_evicted_total counter",
+            f"notify_mcp_memory_evicted_total {self._evicted_count}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _check_memory_budget(self) -> None:
+        """Evict history if stored notifications exceed the memory budget."""
+        published, self._published = self._published, set()
+        budget = self.max_memory_bytes
+        if budget is None or self.memory_bytes <= budget:
+            return
+
+        if self._eviction_stall == (budget, len(self._notifications)):
+            histories = {
+                channel: self._notifications[channel]
+                for channel in published
+                if channel in self._notifications
+            }
+            self._enforce_memory_budget(budget, histories)
+        else:
+            self._enforce_memory_budget(budget, self._notifications)
+
+    def _enforce_memory_budget(
+        self, budget: int, histories: dict[str, RingBuffer[CompactNotification]]
+    ) -> None:
+        """Evict notifications from the given channels until under the low watermark.
+
+        Args:
+            budget: Memory budget in approximate encoded bytes
+            histories: Channel histories the policy may evict from
+        """
+        target = int(budget * _EVICTION_LOW_WATERMARK)
+
+        for channel in self.eviction_policy.victims(histories):
+            record = self._notifications[channel].popleft()
+            if record is not None:
+                self._forget(record)
+                self._evicted_count += 1
+            if self.memory_bytes <= target:
+                self._eviction_stall = None
+                return
+
+        # Out of victims (e.g. every channel at its floor): remember the state
+        self._eviction_stall = (budget, len(self._notifications))
+
+    # Index maintenance
+    def _store_subscription(self, subscription: Subscription) -> None:
+        """Add or replace a subscription and index it."""
+        existing = self._subscriptions.get(subscription.id)
+        if existing is not None:
+            self._unindex_subscription(existing)
+
+        self._subscriptions[subscription.id] = subscription
+        self._journal_append("save_subscription", subscription.model_dump_json)
+
+        self._subscriptions_by_channel[subscription.channel][subscription.id] = None
+        self._subscriptions_by_client[subscription.clientId][subscription.id] = None
+        self._subscriptions_by_client_channel[
+            (subscription.clientId, subscription.channel)
+        ][subscription.id] = None
+
+    def _remove_subscription(self, subscription_id: str) -> None:
+        """Remove a subscription and its index entries, if it exists."""
+        subscription = self._subscriptions.pop(subscription_id, None)
+        if subscription is None:
+            return
+
+        self._journal_append("delete_subscription", lambda: json.dumps(subscription_id))
+        self._unindex_subscription(subscription)
+
+    def _unindex_subscription(self, subscription: Subscription) -> None:
+        """Remove a subscription from all secondary indexes."""
+        by_channel = self._subscriptions_by_channel.get(subscription.channel)
+        if by_channel is not None:
+            by_channel.pop(subscription.id, None)
+            if not by_channel:
+                del self._subscriptions_by_channel[subscription.channel]
+
+        self._unindex_client(subscription)
+
+    def _unindex_client(self, subscription: Subscription) -> None:
+        """Remove a subscription from the client and composite indexes."""
+        by_client = self._subscriptions_by_client.get(subscription.clientId)
+        if by_client is not None:
+            by_client.pop(subscription.id, None)
+            if not by_client:
+                del self._subscriptions_by_client[subscription.clientId]
+
+        key = (subscription.clientId, subscription.channel)
+        by_pair = self._subscriptions_by_client_channel.get(key)
+        if by_pair is not None:
+            by_pair.pop(subscription.id, None)
+            if not by_pair:
+                del self._subscriptions_by_client_channel[key]
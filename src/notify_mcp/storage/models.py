@@ -9,6 +9,7 @@ from sqlalchemy import (
     JSON,
     Column,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
@@ -120,6 +121,7 @@ class NotificationModel(Base):
     sequence = Column(Integer, nullable=False)
     priority = Column(String(20), nullable=False)
     timestamp = Column(DateTime, nullable=False)
+    expires_at = Column(Float, nullable=True)  # Context.validity as POSIX seconds
 
     # Schema version
     schema_version = Column(String(20), nullable=False, default="1.0.0")
@@ -139,7 +141,22 @@ class NotificationModel(Base):
         return f"<NotificationModel(id='{self.id}', channel='{self.channel}', sequence={self.sequence})>"
 
 
-# Indexes for notifications
+# Indexes for notifications. History reads, keyset pages, counts and the
+# latest-sequence lookup are all range scans on (channel, sequence); the
+# count and max are answered from the index alone. A sequence identifies
+# one notification of its channel, so the index is unique.
 Index("ix_notifications_channel", NotificationModel.channel)
-Index("ix_notifications_channel_timestamp", NotificationModel.channel, NotificationModel.timestamp.desc())
-Index("ix_notifications_channel_sequence", NotificationModel.channel, NotificationModel.sequence)
+Index(
+    "ix_notifications_channel_sequence",
+    NotificationModel.channel,
+    NotificationModel.sequence,
+    unique=True,
+)
+
+# Partial index over notifications that can expire; the expiry purge walks it
+# in deadline order and rows without a validity take no space in it.
+Index(
+    "ix_notifications_expires_at",
+    NotificationModel.expires_at,
+    sqlite_where=NotificationModel.expires_at.isnot(None),
+)
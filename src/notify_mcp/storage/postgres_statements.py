@@ -0,0 +1,350 @@
+"""SQL and row conversion for the PostgreSQL backend.
+
+``PostgreSQLStorage`` talks to asyncpg directly rather than through
+SQLAlchemy: asyncpg prepares every statement on its first use on a
+connection and keeps it in a per-connection cache, so the hot paths below
+are planned once per connection and afterwards only bound and executed.
+
+The schema mirrors the SQLite one (same tables and column names), with
+nested models stored as ``jsonb`` so tag and context filters can use GIN
+indexes, a generated ``tsvector`` column for full-text search, and a
+partial index over notifications that can expire. Parameter builders and
+row converters are shared with SQLite.
+"""
+
+from collections.abc import Mapping
+from typing import Any
+
+from ..models.notification import Notification
+from ..models.subscription import SubscriptionFilter
+from ..utils.search import tokenize
+from .sqlite_statements import (
+    SEQUENCE_MAX,
+    SEQUENCE_MIN,
+    channel_params,
+    notification_params,
+    row_to_channel,
+    row_to_document,
+    row_to_notification,
+    row_to_subscription,
+    subscription_params,
+)
+
+__all__ = [
+    "SEQUENCE_MAX",
+    "SEQUENCE_MIN",
+    "channel_params",
+    "notification_params",
+    "row_to_channel",
+    "row_to_document",
+    "row_to_notification",
+    "row_to_subscription",
+    "subscription_params",
+]
+
+# ========== Schema ==========
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS channels (
+        id varchar(255) PRIMARY KEY,
+        name varchar(255) NOT NULL,
+        description text,
+        created_at timestamp NOT NULL,
+        created_by varchar(255) NOT NULL,
+        permissions jsonb,
+        metadata jsonb,
+        subscriber_count integer NOT NULL DEFAULT 0,
+        notification_count integer NOT NULL DEFAULT 0,
+        last_notification_at timestamp
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS subscriptions (
+        id varchar(255) PRIMARY KEY,
+        client_id varchar(255) NOT NULL,
+        channel varchar(255) NOT NULL REFERENCES channels (id) ON DELETE CASCADE,
+        subscribed_at timestamp NOT NULL,
+        filters jsonb
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_subscriptions_channel_client "
+    "ON subscriptions (channel, client_id)",
+    "CREATE INDEX IF NOT EXISTS ix_subscriptions_client_id ON subscriptions (client_id)",
+    # Title and body are tokenized with the 'simple' configuration (no
+    # stemming or stop words), like the other backends' tokenizers
+    """
+    CREATE TABLE IF NOT EXISTS notifications (
+        id varchar(255) PRIMARY KEY,
+        channel varchar(255) NOT NULL REFERENCES channels (id) ON DELETE CASCADE,
+        sequence bigint NOT NULL,
+        priority varchar(20) NOT NULL,
+        timestamp timestamp NOT NULL,
+        expires_at double precision,
+        schema_version varchar(20) NOT NULL DEFAULT '1.0.0',
+        sender_data jsonb NOT NULL,
+        context_data jsonb NOT NULL,
+        information jsonb NOT NULL,
+        actions jsonb,
+        visibility jsonb NOT NULL,
+        metadata_data jsonb NOT NULL,
+        search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(information ->> 'title', '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(information ->> 'body', '')), 'B')
+        ) STORED
+    )
+    """,
+    # History tail, keyset pages, counts and max(sequence) all scan this
+    # index backwards from the newest row of a channel. Unique: a sequence
+    # identifies one notification of its channel
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_notifications_channel_sequence "
+    "ON notifications (channel, sequence DESC)",
+    # Partial: rows without a validity (most of them) take no space
+    "CREATE INDEX IF NOT EXISTS ix_notifications_expires_at "
+    "ON notifications (expires_at) WHERE expires_at IS NOT NULL",
+    # Tag filters (?| any-of) and context containment (@>) filters
+    "CREATE INDEX IF NOT EXISTS ix_notifications_tags "
+    "ON notifications USING gin ((context_data -> 'tags'))",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_context "
+    "ON notifications USING gin (context_data jsonb_path_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_search ON notifications USING gin (search_vector)",
+]
+
+# ========== Channels ==========
+
+CHANNEL_COLUMNS = [
+    "id",
+    "name",
+    "description",
+    "created_at",
+    "created_by",
+    "permissions",
+    "metadata",
+    "subscriber_count",
+    "notification_count",
+    "last_notification_at",
+]
+
+SUBSCRIPTION_COLUMNS = ["id", "client_id", "channel", "subscribed_at", "filters"]
+
+NOTIFICATION_COLUMNS = [
+    "id",
+    "channel",
+    "sequence",
+    "priority",
+    "timestamp",
+    "expires_at",
+    "schema_version",
+    "sender_data",
+    "context_data",
+    "information",
+    "actions",
+    "visibility",
+    "metadata_data",
+]
+
+_NOTIFICATION_SELECT = ", ".join(NOTIFICATION_COLUMNS)
+
+
+def _upsert(table: str, columns: list[str]) -> str:
+    """INSERT ... ON CONFLICT (id) DO UPDATE, skipped when no column changes."""
+    updated = [c for c in columns if c != "id"]
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join(f'${i}' for i in range(1, len(columns) + 1))}) "
+        f"ON CONFLICT (id) DO UPDATE SET "
+        f"{', '.join(f'{c} = excluded.{c}' for c in updated)} "
+        f"WHERE ({', '.join(f'{table}.{c}' for c in updated)}) "
+        f"IS DISTINCT FROM ({', '.join(f'excluded.{c}' for c in updated)})"
+    )
+
+
+UPSERT_CHANNEL = _upsert("channels", CHANNEL_COLUMNS)
+
+BUMP_CHANNEL_STATS = (
+    "UPDATE channels SET notification_count = notification_count + $2, "
+    "last_notification_at = $3 WHERE id = $1"
+)
+
+# Taken by appends before reading the latest sequence; concurrent appends to
+# a channel wait for each other and commit in sequence order
+LOCK_CHANNEL = "SELECT 1 FROM channels WHERE id = $1 FOR UPDATE"
+
+SELECT_CHANNEL = f"SELECT {', '.join(CHANNEL_COLUMNS)} FROM channels WHERE id = $1"
+
+SELECT_ALL_CHANNELS = f"SELECT {', '.join(CHANNEL_COLUMNS)} FROM channels ORDER BY created_at"
+
+SELECT_CHANNELS = f"SELECT {', '.join(CHANNEL_COLUMNS)} FROM channels WHERE id = ANY($1::varchar[])"
+
+DELETE_CHANNEL = "DELETE FROM channels WHERE id = $1"
+
+# ========== Subscriptions ==========
+
+UPSERT_SUBSCRIPTION = _upsert("subscriptions", SUBSCRIPTION_COLUMNS)
+
+DELETE_SUBSCRIPTION = "DELETE FROM subscriptions WHERE id = $1"
+
+DELETE_SUBSCRIPTIONS = "DELETE FROM subscriptions WHERE id = ANY($1::varchar[])"
+
+_SUBSCRIPTION_SELECT = f"SELECT {', '.join(SUBSCRIPTION_COLUMNS)} FROM subscriptions"
+
+SELECT_SUBSCRIPTIONS_BY_CHANNEL = f"{_SUBSCRIPTION_SELECT} WHERE channel = $1"
+
+SELECT_SUBSCRIPTIONS_BY_CHANNELS = f"{_SUBSCRIPTION_SELECT} WHERE channel = ANY($1::varchar[])"
+
+SELECT_SUBSCRIPTIONS_BY_CLIENT = f"{_SUBSCRIPTION_SELECT} WHERE client_id = $1"
+
+SELECT_SUBSCRIPTIONS_BY_CLIENT_AND_CHANNEL = (
+    f"{_SUBSCRIPTION_SELECT} WHERE client_id = $1 AND channel = $2"
+)
+
+# ========== Notifications ==========
+
+INSERT_NOTIFICATION = (
+    f"INSERT INTO notifications ({_NOTIFICATION_SELECT}) "
+    f"VALUES ({', '.join(f'${i}' for i in range(1, len(NOTIFICATION_COLUMNS) + 1))})"
+)
+
+SELECT_LATEST_SEQUENCE = "SELECT max(sequence) FROM notifications WHERE channel = $1"
+
+# Reads hide rows past the max_history window (awaiting the next amortized
+# trim) and rows past their validity (awaiting the next purge). $1 is the
+# channel, $2 max_history, $3 the current POSIX time.
+_VISIBLE = (
+    "channel = $1 "
+    "AND sequence > (SELECT max(latest.sequence) FROM notifications AS latest "
+    "WHERE latest.channel = $1) - $2 "
+    "AND (expires_at IS NULL OR expires_at > $3)"
+)
+
+# $4 before, $5 after, $6 limit; unused bounds are bound to the extremes
+SELECT_NOTIFICATIONS_BEFORE = (
+    f"SELECT {_NOTIFICATION_SELECT} FROM notifications "
+    f"WHERE {_VISIBLE} AND sequence < $4 AND sequence > $5 "
+    "ORDER BY sequence DESC LIMIT $6"
+)
+
+SELECT_NOTIFICATIONS_AFTER = (
+    f"SELECT {_NOTIFICATION_SELECT} FROM notifications "
+    f"WHERE {_VISIBLE} AND sequence < $4 AND sequence > $5 "
+    "ORDER BY sequence LIMIT $6"
+)
+
+COUNT_NOTIFICATIONS = f"SELECT count(*) FROM notifications WHERE {_VISIBLE}"
+
+TRIM_NOTIFICATIONS = "DELETE FROM notifications WHERE channel = $1 AND sequence <= $2"
+
+# Deletes the batch of rows soonest past their deadline via the partial
+# expires_at index, keeping each channel's newest row so sequence numbering
+# survives a channel whose whole history expired (as on SQLite).
+PURGE_EXPIRED = (
+    "DELETE FROM notifications WHERE id IN ("
+    "SELECT expired.id FROM notifications AS expired "
+    "WHERE expired.expires_at <= $1 "
+    "AND expired.sequence < (SELECT max(latest.sequence) FROM notifications AS latest "
+    "WHERE latest.channel = expired.channel) "
+    "ORDER BY expired.expires_at LIMIT $2)"
+)
+
+# ========== Full-text search ==========
+
+# $1 tsquery text, $2 max_history, $3 now, $4 limit, $5 channels (NULL = all)
+SEARCH_NOTIFICATIONS = (
+    f"SELECT {', '.join(f'notifications.{c}' for c in NOTIFICATION_COLUMNS)}, "
+    "ts_rank(notifications.search_vector, query) AS score "
+    "FROM notifications, to_tsquery('simple', $1) AS query "
+    "WHERE notifications.search_vector @@ query "
+    "AND ($5::varchar[] IS NULL OR notifications.channel = ANY($5::varchar[])) "
+    "AND notifications.sequence > (SELECT max(latest.sequence) FROM notifications AS latest "
+    "WHERE latest.channel = notifications.channel) - $2 "
+    "AND (notifications.expires_at IS NULL OR notifications.expires_at > $3) "
+    "ORDER BY score DESC, notifications.sequence DESC LIMIT $4"
+)
+
+
+def ts_query(query: str) -> str | None:
+    """Build a to_tsquery expression requiring every term of a free-text query.
+
+    Terms come from the shared tokenizer and are quoted, so tsquery operators
+    in the query are treated as plain text.
+
+    Returns:
+        tsquery text, or None if the query has no searchable terms
+    """
+    terms = tokenize(query)
+    if not terms:
+        return None
+    return " & ".join("'" + term.replace("'", "''") + "'" for term in dict.fromkeys(terms))
+
+
+# ========== Filtered history ==========
+
+
+def filtered_page(
+    filters: SubscriptionFilter, max_history: int, now: float, before: int, limit: int, channel: str
+) -> tuple[str, list[Any]]:
+    """Build a newest-first history page restricted by a subscription filter.
+
+    Tags use the GIN index on ``context_data -> 'tags'`` (``?|``: any tag),
+    themes the jsonb_path_ops index (``@>`` containment), and priority its
+    column.
+
+    Returns:
+        SQL text and its arguments
+    """
+    args: list[Any] = [channel, max_history, now, before]
+    conditions = [_VISIBLE, "sequence < $4"]
+
+    def bind(value: Any) -> str:
+        args.append(value)
+        return f"${len(args)}"
+
+    if filters.priority:
+        conditions.append(f"priority = ANY({bind(list(filters.priority))}::varchar[])")
+    if filters.tags:
+        conditions.append(f"context_data -> 'tags' ?| {bind(list(filters.tags))}::text[]")
+    if filters.themes:
+        containment = " OR ".join(
+            f"context_data @> {bind({'theme': theme})}" for theme in filters.themes
+        )
+        conditions.append(f"({containment})")
+    if filters.roles:
+        conditions.append(f"sender_data ->> 'role' = ANY({bind(list(filters.roles))}::text[])")
+    if filters.senders:
+        conditions.append(f"sender_data ->> 'id' = ANY({bind(list(filters.senders))}::text[])")
+
+    sql = (
+        f"SELECT {_NOTIFICATION_SELECT} FROM notifications "
+        f"WHERE {' AND '.join(conditions)} ORDER BY sequence DESC LIMIT {bind(limit)}"
+    )
+    return sql, args
+
+
+# ========== Parameter records ==========
+
+
+def channel_record(params: Mapping[str, Any]) -> tuple[Any, ...]:
+    """Positional UPSERT_CHANNEL arguments from ``channel_params``."""
+    return tuple(naive_timestamp(params[column]) for column in CHANNEL_COLUMNS)
+
+
+def subscription_record(params: Mapping[str, Any]) -> tuple[Any, ...]:
+    """Positional UPSERT_SUBSCRIPTION arguments from ``subscription_params``."""
+    return tuple(naive_timestamp(params[column]) for column in SUBSCRIPTION_COLUMNS)
+
+
+def notification_record(notification: Notification, sequence: int) -> tuple[Any, ...]:
+    """Positional INSERT_NOTIFICATION arguments (also a COPY record)."""
+    params = notification_params(notification, sequence)
+    return tuple(naive_timestamp(params[column]) for column in NOTIFICATION_COLUMNS)
+
+
+def naive_timestamp(value: Any) -> Any:
+    """Drop tzinfo from datetimes for ``timestamp`` columns, keeping wall time.
+
+    SQLite stores the same wall-clock value; the full timestamps survive in
+    the JSON documents.
+    """
+    if hasattr(value, "tzinfo") and getattr(value, "tzinfo", None) is not None:
+        return value.replace(tzinfo=None)
+    return value
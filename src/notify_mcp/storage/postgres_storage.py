@@ -0,0 +1,524 @@
+"""PostgreSQL storage adapter implementation.
+
+This module provides persistent storage on PostgreSQL through an asyncpg
+connection pool, for deployments that run several server processes
+against one database or need more write concurrency than a SQLite file.
+
+Every call borrows a pooled connection for a single statement (or one
+transaction); asyncpg prepares each statement on its first use on a
+connection and reuses the prepared plan afterwards, so hot paths skip
+parsing and planning. Bulk saves of ``copy_threshold`` notifications or
+more stream through ``COPY`` instead of row-by-row inserts.
+
+Nested models are ``jsonb`` columns: subscription filter queries
+(``get_filtered_notifications_page``) run in the database against GIN
+indexes on tags and context, and full-text search uses a generated
+``tsvector`` column with its own GIN index.
+
+History retention, sequence numbering and expiry behave as on SQLite:
+trims are amortized over ``trim_interval`` inserts per channel, reads hide
+rows past the window or their validity, and ``purge_expired()`` deletes
+expired rows in batches.
+"""
+
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import asyncpg
+
+from ..core.storage_adapter import StorageAdapter
+from ..models.channel import Channel
+from ..models.notification import Notification
+from ..models.search import FilteredPage, NotificationSearchResult
+from ..models.subscription import Subscription, SubscriptionFilter
+from ..utils.search import make_snippet, tokenize
+from . import postgres_statements as stmts
+
+logger = logging.getLogger(__name__)
+
+
+class PostgreSQLStorage(StorageAdapter):
+    """PostgreSQL-based persistent storage adapter.
+
+    Features:
+    - asyncpg connection pool with per-connection prepared statement caches
+    - COPY for bulk notification saves, executemany below ``copy_threshold``
+    - LRU cache for notifications (configurable max per channel), trimmed by
+      sequence watermark every ``trim_interval`` inserts per channel
+    - jsonb columns with GIN indexes for tag and context filters
+    - Full-text search over a generated tsvector column
+    - Partial expiry index for batched purges of notifications past their validity
+    """
+
+    def __init__(
+        self,
+        connection_url: str,
+        max_history_per_channel: int = 1000,
+        pool_min_size: int = 2,
+        pool_max_size: int = 10,
+        statement_cache_size: int = 256,
+        command_timeout: float | None = 30.0,
+        trim_interval: int = 100,
+        copy_threshold: int = 64,
+    ):
+        """Initialize PostgreSQL storage.
+
+        Args:
+            connection_url: PostgreSQL URL (``postgresql://`` or SQLAlchemy-style
+                ``postgresql+asyncpg://``)
+            max_history_per_channel: Maximum notifications to keep per channel (LRU)
+            pool_min_size: Connections opened on initialize and kept open
+            pool_max_size: Upper bound on pooled connections
+            statement_cache_size: Prepared statements cached per connection
+            command_timeout: Seconds before a statement is cancelled (None = no limit)
+            trim_interval: Inserts per channel between history trims. Reads hide
+                rows beyond max_history in the meantime.
+            copy_threshold: Batch size from which save_notifications() uses COPY
+
+        Raises:
+            ValueError: If the pool sizes are inconsistent
+        """
+        if pool_min_size < 0 or pool_max_size < 1 or pool_min_size > pool_max_size:
+            raise ValueError(
+                f"Invalid pool sizes: min={pool_min_size}, max={pool_max_size} "
+                f"(need 0 <= min <= max and max >= 1)"
+            )
+
+        self.dsn = connection_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+        self.max_history = max_history_per_channel
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.statement_cache_size = statement_cache_size
+        self.command_timeout = command_timeout
+        self.trim_interval = max(1, trim_interval)
+        self.copy_threshold = max(1, copy_threshold)
+        self.pool: asyncpg.Pool | None = None
+
+        # Per-channel trim bookkeeping (latest sequence, inserts since last trim)
+        self._latest_sequence: dict[str, int] = {}
+        self._inserts_since_trim: dict[str, int] = {}
+
+        logger.info(
+            f"PostgreSQL storage configured: pool={pool_min_size}..{pool_max_size}, "
+            f"statement_cache={statement_cache_size}"
+        )
+
+    async def initialize(self) -> None:
+        """Open the connection pool and create the schema if needed."""
+        self.pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=self.pool_min_size,
+            max_size=self.pool_max_size,
+            statement_cache_size=self.statement_cache_size,
+            command_timeout=self.command_timeout,
+            init=self._init_connection,
+            server_settings={
+                "application_name": "notify-mcp",
+                # Hot statements are short index lookups; JIT compilation only adds latency
+                "jit": "off",
+            },
+        )
+
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                # Serialize concurrent first starts of several server processes
+                await conn.execute("SELECT pg_advisory_xact_lock(hashtext('notify_mcp_schema'))")
+                for ddl in stmts.SCHEMA:
+                    await conn.execute(ddl)
+
+        logger.info("PostgreSQL schema initialized")
+
+    @staticmethod
+    async def _init_connection(conn: asyncpg.Connection) -> None:
+        """Exchange jsonb values as Python objects on every pooled connection.
+
+        The binary format (a version byte before the JSON text) is required
+        for binary COPY.
+        """
+        await conn.set_type_codec(
+            "jsonb",
+            encoder=_encode_jsonb,
+            decoder=_decode_jsonb,
+            schema="pg_catalog",
+            format="binary",
+        )
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+        logger.info("Database connections closed")
+
+    # ========== Channel Operations ==========
+
+    async def save_channel(self, channel: Channel) -> None:
+        """Save or update a channel with a single upsert."""
+        record = stmts.channel_record(stmts.channel_params(channel))
+        await self._pool.execute(stmts.UPSERT_CHANNEL, *record)
+
+    async def record_channel_notification(
+        self, channel_id: str, timestamp: datetime, count: int = 1
+    ) -> None:
+        """Atomically bump a channel's notification count and last activity."""
+        await self._pool.execute(
+            stmts.BUMP_CHANNEL_STATS, channel_id, count, stmts.naive_timestamp(timestamp)
+        )
+
+    async def get_channel(self, channel_id: str) -> Channel | None:
+        """Get a channel by ID."""
+        row = await self._pool.fetchrow(stmts.SELECT_CHANNEL, channel_id)
+        return stmts.row_to_channel(row) if row is not None else None
+
+    async def delete_channel(self, channel_id: str) -> None:
+        """Delete a channel (cascade deletes subscriptions and notifications)."""
+        await self._pool.execute(stmts.DELETE_CHANNEL, channel_id)
+        self._latest_sequence.pop(channel_id, None)
+        self._inserts_since_trim.pop(channel_id, None)
+
+    async def get_channels(self, channel_ids: list[str]) -> dict[str, Channel]:
+        """Get several channels with one ``= ANY`` query."""
+        rows = await self._pool.fetch(stmts.SELECT_CHANNELS, list(dict.fromkeys(channel_ids)))
+        return {row["id"]: stmts.row_to_channel(row) for row in rows}
+
+    async def list_channels(self) -> list[Channel]:
+        """List all channels."""
+        rows = await self._pool.fetch(stmts.SELECT_ALL_CHANNELS)
+        return [stmts.row_to_channel(row) for row in rows]
+
+    # ========== Subscription Operations ==========
+
+    async def save_subscription(self, subscription: Subscription) -> None:
+        """Save or update a subscription with a single upsert.
+
+        Raises:
+            asyncpg.ForeignKeyViolationError: If the subscription's channel does not exist
+        """
+        record = stmts.subscription_record(stmts.subscription_params(subscription))
+        await self._pool.execute(stmts.UPSERT_SUBSCRIPTION, *record)
+
+    async def delete_subscription(self, subscription_id: str) -> None:
+        """Delete a subscription by ID."""
+        await self._pool.execute(stmts.DELETE_SUBSCRIPTION, subscription_id)
+
+    async def save_subscriptions(self, subscriptions: list[Subscription]) -> None:
+        """Save or update subscriptions with one executemany upsert in one transaction.
+
+        Raises:
+            asyncpg.ForeignKeyViolationError: If a subscription's channel does not exist
+        """
+        if not subscriptions:
+            return
+        records = [
+            stmts.subscription_record(stmts.subscription_params(subscription))
+            for subscription in subscriptions
+        ]
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany(stmts.UPSERT_SUBSCRIPTION, records)
+
+    async def delete_subscriptions(self, subscription_ids: list[str]) -> None:
+        """Delete subscriptions by ID with one ``= ANY`` statement."""
+        if subscription_ids:
+            await self._pool.execute(stmts.DELETE_SUBSCRIPTIONS, subscription_ids)
+
+    async def get_subscriptions_by_channel(self, channel_id: str) -> list[Subscription]:
+        """Get all subscriptions for a channel."""
+        rows = await self._pool.fetch(stmts.SELECT_SUBSCRIPTIONS_BY_CHANNEL, channel_id)
+        return [stmts.row_to_subscription(row) for row in rows]
+
+    async def get_subscriptions_by_channels(
+        self, channel_ids: list[str]
+    ) -> dict[str, list[Subscription]]:
+        """Get the subscriptions of several channels with one ``= ANY`` query."""
+        by_channel: dict[str, list[Subscription]] = {channel_id: [] for channel_id in channel_ids}
+        rows = await self._pool.fetch(stmts.SELECT_SUBSCRIPTIONS_BY_CHANNELS, list(by_channel))
+        for row in rows:
+            by_channel[row["channel"]].append(stmts.row_to_subscription(row))
+        return by_channel
+
+    async def get_subscriptions_by_client(self, client_id: str) -> list[Subscription]:
+        """Get all subscriptions for a client."""
+        rows = await self._pool.fetch(stmts.SELECT_SUBSCRIPTIONS_BY_CLIENT, client_id)
+        return [stmts.row_to_subscription(row) for row in rows]
+
+    async def get_subscriptions_by_client_and_channel(
+        self, client_id: str, channel_id: str
+    ) -> list[Subscription]:
+        """Get a client's subscriptions to a single channel."""
+        rows = await self._pool.fetch(
+            stmts.SELECT_SUBSCRIPTIONS_BY_CLIENT_AND_CHANNEL, client_id, channel_id
+        )
+        return [stmts.row_to_subscription(row) for row in rows]
+
+    # ========== Notification Operations ==========
+
+    async def save_notification(self, notification: Notification) -> None:
+        """Save a notification; history beyond max_history is trimmed periodically."""
+        await self.save_notifications([notification])
+
+    async def save_notifications(self, notifications: list[Notification]) -> None:
+        """Save notifications in one transaction.
+
+        Batches of ``copy_threshold`` or more stream through COPY; smaller
+        ones run as a single executemany of the prepared INSERT.
+
+        Raises:
+            ValueError: If a notification has no channel in its metadata
+        """
+        records = []
+        latest_by_channel: dict[str, int] = {}
+        inserted_by_channel: dict[str, int] = defaultdict(int)
+        for notification in notifications:
+            channel_id = notification.metadata.channel
+            if not channel_id:
+                raise ValueError("Notification metadata must include channel")
+
+            latest = latest_by_channel.get(channel_id)
+            if latest is None:
+                latest = await self._get_cached_latest_sequence(channel_id)
+
+            sequence = notification.metadata.sequence
+            if sequence is None:
+                sequence = latest + 1
+            latest_by_channel[channel_id] = max(latest, sequence)
+            inserted_by_channel[channel_id] += 1
+            records.append(stmts.notification_record(notification, sequence))
+
+        if not records:
+            return
+
+        async with self._pool.acquire() as conn:
+            if len(records) >= self.copy_threshold:
+                await conn.copy_records_to_table(
+                    "notifications", records=records, columns=stmts.NOTIFICATION_COLUMNS
+                )
+            elif len(records) == 1:
+                await conn.execute(stmts.INSERT_NOTIFICATION, *records[0])
+            else:
+                async with conn.transaction():
+                    await conn.executemany(stmts.INSERT_NOTIFICATION, records)
+
+        await self._count_inserts(latest_by_channel, inserted_by_channel)
+
+    async def append_notification(self, notification: Notification) -> int:
+        """Save a notification under its channel's next sequence number.
+
+        The channel row is locked before the latest sequence is read, so
+        concurrent appends from any process are numbered one after another
+        and each channel's rows commit in sequence order.
+
+        Raises:
+            ValueError: If the notification has no channel in its metadata
+        """
+        channel_id = notification.metadata.channel
+        if not channel_id:
+            raise ValueError("Notification metadata must include channel")
+
+        async with self._pool.acquire() as conn, conn.transaction():
+            await conn.execute(stmts.LOCK_CHANNEL, channel_id)
+            sequence = (await conn.fetchval(stmts.SELECT_LATEST_SEQUENCE, channel_id) or 0) + 1
+            notification.metadata.sequence = sequence
+            await conn.execute(
+                stmts.INSERT_NOTIFICATION, *stmts.notification_record(notification, sequence)
+            )
+        await self._count_inserts({channel_id: sequence}, {channel_id: 1})
+        return sequence
+
+    async def _count_inserts(
+        self, latest_by_channel: dict[str, int], inserted_by_channel: dict[str, int]
+    ) -> None:
+        """Track saved sequences; trim amortized over trim_interval inserts per channel."""
+        for channel_id, latest in latest_by_channel.items():
+            self._latest_sequence[channel_id] = latest
+            inserts = self._inserts_since_trim.get(channel_id, 0)
+            inserts += inserted_by_channel[channel_id]
+            if inserts >= self.trim_interval:
+                await self._trim_history(channel_id)
+                inserts = 0
+            self._inserts_since_trim[channel_id] = inserts
+
+    async def get_notifications(self, channel_id: str, limit: int = 50) -> list[Notification]:
+        """Get notifications for a channel (highest sequence first)."""
+        return await self.get_notifications_page(channel_id, limit=limit)
+
+    async def get_notifications_page(
+        self,
+        channel_id: str,
+        limit: int = 50,
+        before: int | None = None,
+        after: int | None = None,
+    ) -> list[Notification]:
+        """Get a page of a channel's history by sequence cursor, newest first."""
+        if limit <= 0:
+            return []
+
+        if after is None:
+            stmt = stmts.SELECT_NOTIFICATIONS_BEFORE
+        else:
+            stmt = stmts.SELECT_NOTIFICATIONS_AFTER
+        rows = await self._pool.fetch(
+            stmt,
+            channel_id,
+            self.max_history,
+            time.time(),
+            stmts.SEQUENCE_MAX if before is None else before,
+            stmts.SEQUENCE_MIN if after is None else after,
+            limit,
+        )
+
+        notifications = [stmts.row_to_notification(row) for row in rows]
+        if after is not None:
+            notifications.reverse()
+        return notifications
+
+    async def get_filtered_notifications_page(
+        self,
+        channel_id: str,
+        filters: SubscriptionFilter,
+        limit: int = 50,
+        before: int | None = None,
+    ) -> FilteredPage:
+        """Get a page of history matching a subscription filter, evaluated in SQL.
+
+        Tag and theme conditions use the GIN indexes on ``context_data``.
+        """
+        if limit <= 0:
+            return FilteredPage(notifications=[])
+
+        sql, args = stmts.filtered_page(
+            filters,
+            max_history=self.max_history,
+            now=time.time(),
+            before=stmts.SEQUENCE_MAX if before is None else before,
+            limit=limit,
+            channel=channel_id,
+        )
+        rows = await self._pool.fetch(sql, *args)
+        notifications = [stmts.row_to_notification(row) for row in rows]
+        return FilteredPage(
+            notifications=notifications,
+            next_before=notifications[-1].metadata.sequence if len(rows) == limit else None,
+        )
+
+    async def search_notifications(
+        self, query: str, channels: list[str] | None = None, limit: int = 20
+    ) -> list[NotificationSearchResult]:
+        """Full-text search via the tsvector GIN index, ranked by ts_rank.
+
+        Titles carry weight A and bodies weight B; snippets come from the
+        shared snippet builder, as on the in-memory backend.
+        """
+        match = stmts.ts_query(query)
+        if match is None or limit <= 0 or channels == []:
+            return []
+
+        rows = await self._pool.fetch(
+            stmts.SEARCH_NOTIFICATIONS,
+            match,
+            self.max_history,
+            time.time(),
+            limit,
+            None if channels is None else list(channels),
+        )
+
+        terms = set(tokenize(query))
+        results = []
+        for row in rows:
+            notification = stmts.row_to_notification(row)
+            title = notification.information.title
+            body = notification.information.body
+            text = body if terms & set(tokenize(body)) else title
+            results.append(
+                NotificationSearchResult(
+                    notification=notification,
+                    score=row["score"],
+                    snippet=make_snippet(text, terms),
+                )
+            )
+        return results
+
+    async def get_notification_count(self, channel_id: str) -> int:
+        """Get total notification count for a channel (excluding expired)."""
+        return int(
+            await self._pool.fetchval(
+                stmts.COUNT_NOTIFICATIONS, channel_id, self.max_history, time.time()
+            )
+        )
+
+    async def get_latest_sequence(self, channel_id: str) -> int:
+        """Get the highest sequence number stored for a channel (0 if none)."""
+        return await self._pool.fetchval(stmts.SELECT_LATEST_SEQUENCE, channel_id) or 0
+
+    async def purge_expired(self, now: float | None = None, batch_size: int = 500) -> int:
+        """Delete up to ``batch_size`` expired notifications in one statement.
+
+        Args:
+            now: POSIX time to expire against (defaults to the current time)
+            batch_size: Maximum notifications to delete
+
+        Returns:
+            Number of notifications deleted
+        """
+        status = await self._pool.execute(
+            stmts.PURGE_EXPIRED, time.time() if now is None else now, batch_size
+        )
+        return _rowcount(status)
+
+    # ========== Private Helper Methods ==========
+
+    @property
+    def _pool(self) -> asyncpg.Pool:
+        """The connection pool.
+
+        Raises:
+            RuntimeError: If initialize() has not been called
+        """
+        if self.pool is None:
+            raise RuntimeError("PostgreSQL storage is not initialized")
+        return self.pool
+
+    async def _get_cached_latest_sequence(self, channel_id: str) -> int:
+        """Latest sequence for a channel, loaded from the database once."""
+        latest = self._latest_sequence.get(channel_id)
+        if latest is None:
+            latest = await self.get_latest_sequence(channel_id)
+            self._latest_sequence[channel_id] = latest
+        return latest
+
+    async def _trim_history(self, channel_id: str) -> None:
+        """Delete notifications at or below the sequence watermark.
+
+        Single DELETE over the (channel, sequence) index; sequences are
+        assigned per channel in publish order, so this keeps the latest
+        max_history.
+        """
+        watermark = self._latest_sequence.get(channel_id, 0) - self.max_history
+        if watermark < 0:
+            return
+
+        deleted = _rowcount(
+            await self._pool.execute(stmts.TRIM_NOTIFICATIONS, channel_id, watermark)
+        )
+        if deleted:
+            logger.info(
+                f"History trim: deleted {deleted} old notifications from channel {channel_id}"
+            )
+
+
+def _encode_jsonb(value: object) -> bytes:
+    """jsonb binary wire format: version 1 followed by the JSON text."""
+    return b"\x01" + json.dumps(value).encode()
+
+
+def _decode_jsonb(data: bytes) -> object:
+    """Decode the jsonb binary wire format."""
+    return json.loads(data[1:])
+
+
+def _rowcount(status: str) -> int:
+    """Row count from an asyncpg command status such as ``DELETE 3``."""
+    return int(status.rsplit(" ", 1)[-1])
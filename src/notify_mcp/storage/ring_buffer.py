@@ -0,0 +1,179 @@
+"""Fixed-capacity ring buffer used for per-channel notification history."""
+
+from collections.abc import Callable, Hashable, Iterator
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class RingBuffer(Generic[T]):
+    """Fixed-capacity FIFO buffer with O(1) append, eviction and keyed lookup.
+
+    Items are addressed by a monotonically increasing position; the slot for
+    position ``p`` is ``p % capacity``. Positions below ``_start`` have been
+    evicted. Slots are allocated lazily, so a channel holding a handful of
+    notifications does not pay for its full capacity up front.
+
+    A side index maps each item's key (the notification ID) to its position,
+    so lookups by key never scan the buffer.
+    """
+
+    __slots__ = ("capacity", "_items", "_keys", "_start", "_end", "_index")
+
+    def __init__(self, capacity: int):
+        """Initialize ring buffer.
+
+        Args:
+            capacity: Maximum number of items retained
+
+        Raises:
+            ValueError: If capacity is less than 1
+        """
+        if capacity < 1:
+            raise ValueError("RingBuffer capacity must be at least 1")
+
+        self.capacity = capacity
+        self._items: list[T | None] = []
+        self._keys: list[Hashable | None] = []
+        self._start = 0  # Position of the oldest retained item
+        self._end = 0  # Position one past the newest item
+        self._index: dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __iter__(self) -> Iterator[T]:
+        """Iterate items from oldest to newest."""
+        for position in range(self._start, self._end):
+            yield self._items[position % self.capacity]  # type: ignore[misc]
+
+    def __getitem__(self, index: int) -> T:
+        """Return the item at a logical index (0 = oldest).
+
+        Together with ``__len__`` this lets ``bisect`` search the buffer
+        when items are stored in key order.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("RingBuffer index out of range")
+        return self._items[(self._start + index) % self.capacity]  # type: ignore[return-value]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._index
+
+    def append(self, key: Hashable, item: T) -> T | None:
+        """Append an item, evicting the oldest one if the buffer is full.
+
+        Args:
+            key: Lookup key for the item
+            item: Item to store
+
+        Returns:
+            The evicted item, or None if nothing was evicted
+        """
+        evicted = self.popleft() if len(self) == self.capacity else None
+
+        slot = self._end % self.capacity
+        if slot == len(self._items):
+            self._items.append(item)
+            self._keys.append(key)
+        else:
+            self._items[slot] = item
+            self._keys[slot] = key
+
+        self._index[key] = self._end
+        self._end += 1
+        return evicted
+
+    def popleft(self) -> T | None:
+        """Remove and return the oldest item, or None if empty."""
+        if self._start == self._end:
+            return None
+
+        slot = self._start % self.capacity
+        item = self._items[slot]
+        key = self._keys[slot]
+
+        # Release references so evicted notifications can be collected
+        self._items[slot] = None
+        self._keys[slot] = None
+
+        # A re-saved key points at its newer position; leave that entry alone
+        if self._index.get(key) == self._start:
+            del self._index[key]
+
+        self._start += 1
+        return item
+
+    def peek_oldest(self) -> T | None:
+        """Return the oldest item without removing it, or None if empty."""
+        if self._start == self._end:
+            return None
+        return self._items[self._start % self.capacity]
+
+    def get(self, key: Hashable) -> T | None:
+        """Look up an item by key.
+
+        Args:
+            key: Lookup key passed to append()
+
+        Returns:
+            The item, or None if absent or evicted
+        """
+        position = self._index.get(key)
+        if position is None:
+            return None
+        return self._items[position % self.capacity]
+
+    def tail(self, count: int, keep: Callable[[T], bool] | None = None) -> list[T]:
+        """Return up to ``count`` most recent items, oldest first.
+
+        With ``keep``, items it rejects are skipped; the walk starts at the
+        newest item and stops as soon as ``count`` items are collected.
+        """
+        if count <= 0:
+            return []
+
+        capacity = self.capacity
+        items = self._items
+        if keep is None:
+            first = max(self._start, self._end - count)
+            return [items[p % capacity] for p in range(first, self._end)]  # type: ignore[misc]
+
+        selected: list[T] = []
+        for position in range(self._end - 1, self._start - 1, -1):
+            item = items[position % capacity]
+            if keep(item):  # type: ignore[arg-type]
+                selected.append(item)  # type: ignore[arg-type]
+                if len(selected) == count:
+                    break
+        selected.reverse()
+        return selected
+
+    def discard_where(self, predicate: Callable[[T], bool]) -> list[T]:
+        """Remove every item matching ``predicate``, keeping the rest in order.
+
+        O(n): the buffer is compacted in place and its index rebuilt. Meant
+        for occasional batch removal, not per-append use.
+
+        Returns:
+            The removed items, oldest first
+        """
+        kept: list[tuple[Hashable, T]] = []
+        removed: list[T] = []
+        capacity = self.capacity
+        for position in range(self._start, self._end):
+            slot = position % capacity
+            item = self._items[slot]
+            if predicate(item):  # type: ignore[arg-type]
+                removed.append(item)  # type: ignore[arg-type]
+            else:
+                kept.append((self._keys[slot], item))  # type: ignore[arg-type]
+
+        if removed:
+            self._items = []
+            self._keys = []
+            self._index = {}
+            self._start = self._end = 0
+            for key, item in kept:
+                self.append(key, item)
+        return removed
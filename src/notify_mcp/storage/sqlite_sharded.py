@@ -0,0 +1,384 @@
+"""Sharded SQLite storage: channels partitioned across several database files.
+
+A single SQLite file serializes every write behind one lock. This adapter
+hashes each channel ID onto one of ``shards`` ``SQLiteStorage`` instances,
+each with its own file, writer connection and reader pool, so publishes to
+channels on different shards commit in parallel.
+
+A channel's subscriptions and notifications live on the channel's shard.
+Channel-scoped calls go straight to that shard; cross-channel calls
+(``list_channels``, ``get_subscriptions_by_client``, search over all
+channels, expiry purges) fan out to every shard concurrently and merge the
+results.
+
+Shard files sit next to ``db_path`` and carry the shard count in their
+name (``storage.shard-0-of-4.db``). Routing depends on that count, so
+opening files created with a different one is refused.
+"""
+
+import asyncio
+import logging
+import re
+import zlib
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from ..core.storage_adapter import StorageAdapter
+from ..models.channel import Channel
+from ..models.notification import Notification
+from ..models.search import FilteredPage, NotificationSearchResult
+from ..models.subscription import Subscription, SubscriptionFilter
+from .sqlite_storage import SQLiteStorage
+
+logger = logging.getLogger(__name__)
+
+
+class ShardedSQLiteStorage(StorageAdapter):
+    """Storage adapter spreading channels over several SQLiteStorage shards.
+
+    Features:
+    - Stable channel-to-shard routing (CRC32 of the channel ID)
+    - One writer per shard, so aggregate write throughput scales with shards
+    - Concurrent fan-out and merge for cross-channel queries
+    - Every SQLiteStorage feature per shard (profiles, trims, expiry, archive)
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        shards: int = 4,
+        max_history_per_channel: int = 1000,
+        pragma_profile: str = "balanced",
+        pragmas: dict[str, Any] | None = None,
+        trim_interval: int = 100,
+        read_pool_size: int = 4,
+        incremental_vacuum: bool = False,
+        archive_dir: str | None = None,
+        archive_segment_bytes: int = 64 * 1024 * 1024,
+    ):
+        """Initialize sharded SQLite storage.
+
+        Args:
+            db_path: Base path; shard files are named after it
+            shards: Number of shard files
+            max_history_per_channel: Maximum notifications to keep per channel (LRU)
+            pragma_profile: Name of a preset in SQLITE_PRAGMA_PROFILES
+            pragmas: PRAGMA overrides applied on top of the profile
+            trim_interval: Inserts per channel between history trims
+            read_pool_size: Read-only connections per shard
+            incremental_vacuum: Use incremental auto-vacuum on every shard
+            archive_dir: Archive root; each shard archives into its own subdirectory
+            archive_segment_bytes: Size after which a new archive segment file is started
+
+        Raises:
+            ValueError: If shards is below 1, or a shard's options are invalid
+        """
+        if shards < 1:
+            raise ValueError(f"shards must be at least 1, got {shards}")
+
+        self.db_path = Path(db_path).expanduser()
+        self.shard_count = shards
+        self.shards = [
+            SQLiteStorage(
+                db_path=str(self.shard_path(index)),
+                max_history_per_channel=max_history_per_channel,
+                pragma_profile=pragma_profile,
+                pragmas=pragmas,
+                trim_interval=trim_interval,
+                read_pool_size=read_pool_size,
+                incremental_vacuum=incremental_vacuum,
+                archive_dir=(
+                    str(Path(archive_dir).expanduser() / f"shard-{index}")
+                    if archive_dir is not None
+                    else None
+                ),
+                archive_segment_bytes=archive_segment_bytes,
+            )
+            for index in range(shards)
+        ]
+
+        logger.info(f"Sharded SQLite storage configured: path={self.db_path}, shards={shards}")
+
+    def shard_path(self, index: int) -> Path:
+        """Path of a shard's database file."""
+        return self.db_path.with_name(
+            f"{self.db_path.stem}.shard-{index}-of-{self.shard_count}{self.db_path.suffix}"
+        )
+
+    def shard_index(self, channel_id: str) -> int:
+        """Index of the shard holding a channel.
+
+        CRC32 rather than hash(), which is salted per process for strings.
+        """
+        return zlib.crc32(channel_id.encode()) % self.shard_count
+
+    def shard_for(self, channel_id: str) -> SQLiteStorage:
+        """The shard holding a channel."""
+        return self.shards[self.shard_index(channel_id)]
+
+    def _ids_by_shard(self, channel_ids: list[str]) -> dict[int, list[str]]:
+        """Group distinct channel IDs by the index of their shard."""
+        by_shard: dict[int, list[str]] = defaultdict(list)
+        for channel_id in dict.fromkeys(channel_ids):
+            by_shard[self.shard_index(channel_id)].append(channel_id)
+        return by_shard
+
+    async def initialize(self) -> None:
+        """Check the shard layout and initialize every shard's schema.
+
+        Raises:
+            ValueError: If shard files for a different shard count exist
+        """
+        pattern = re.compile(
+            rf"^{re.escape(self.db_path.stem)}\.shard-\d+-of-(\d+){re.escape(self.db_path.suffix)}$"
+        )
+        for path in self.db_path.parent.glob(f"{self.db_path.stem}.shard-*"):
+            match = pattern.match(path.name)
+            if match and int(match.group(1)) != self.shard_count:
+                raise ValueError(
+                    f"{path} belongs to a {match.group(1)}-shard layout; "
+                    f"refusing to open with shards={self.shard_count}. "
+                    f"Export and re-import to change the shard count."
+                )
+
+        await asyncio.gather(*(shard.initialize() for shard in self.shards))
+        logger.info(f"Initialized {self.shard_count} SQLite shards")
+
+    async def close(self) -> None:
+        """Close every shard."""
+        await asyncio.gather(*(shard.close() for shard in self.shards))
+
+    # ========== Channel Operations ==========
+
+    async def save_channel(self, channel: Channel) -> None:
+        """Save or update a channel on its shard."""
+        await self.shard_for(channel.id).save_channel(channel)
+
+    async def record_channel_notification(
+        self, channel_id: str, timestamp: datetime, count: int = 1
+    ) -> None:
+        """Bump a channel's notification count and last activity on its shard."""
+        await self.shard_for(channel_id).record_channel_notification(channel_id, timestamp, count)
+
+    async def get_channel(self, channel_id: str) -> Channel | None:
+        """Get a channel by ID."""
+        return await self.shard_for(channel_id).get_channel(channel_id)
+
+    async def get_channels(self, channel_ids: list[str]) -> dict[str, Channel]:
+        """Get several channels, one query per shard, shards in parallel."""
+        results = await asyncio.gather(
+            *(
+                self.shards[index].get_channels(ids)
+                for index, ids in self._ids_by_shard(channel_ids).items()
+            )
+        )
+        return {channel_id: channel for result in results for channel_id, channel in result.items()}
+
+    async def delete_channel(self, channel_id: str) -> None:
+        """Delete a channel with its subscriptions and notifications."""
+        await self.shard_for(channel_id).delete_channel(channel_id)
+
+    async def list_channels(self) -> list[Channel]:
+        """List channels from every shard, oldest first."""
+        results = await asyncio.gather(*(shard.list_channels() for shard in self.shards))
+        channels = [channel for result in results for channel in result]
+        channels.sort(key=lambda channel: channel.createdAt)
+        return channels
+
+    # ========== Subscription Operations ==========
+
+    async def save_subscription(self, subscription: Subscription) -> None:
+        """Save or update a subscription on its channel's shard.
+
+        Raises:
+            IntegrityError: If the subscription's channel does not exist
+        """
+        await self.shard_for(subscription.channel).save_subscription(subscription)
+
+    async def delete_subscription(self, subscription_id: str) -> None:
+        """Delete a subscription by ID from whichever shard holds it."""
+        await asyncio.gather(
+            *(shard.delete_subscription(subscription_id) for shard in self.shards)
+        )
+
+    async def save_subscriptions(self, subscriptions: list[Subscription]) -> None:
+        """Save subscriptions, one transaction per shard, shards in parallel.
+
+        Raises:
+            IntegrityError: If a subscription's channel does not exist
+        """
+        by_shard: dict[int, list[Subscription]] = defaultdict(list)
+        for subscription in subscriptions:
+            by_shard[self.shard_index(subscription.channel)].append(subscription)
+
+        await asyncio.gather(
+            *(self.shards[index].save_subscriptions(batch) for index, batch in by_shard.items())
+        )
+
+    async def delete_subscriptions(self, subscription_ids: list[str]) -> None:
+        """Delete subscriptions by ID from whichever shards hold them."""
+        await asyncio.gather(
+            *(shard.delete_subscriptions(subscription_ids) for shard in self.shards)
+        )
+
+    async def get_subscriptions_by_channel(self, channel_id: str) -> list[Subscription]:
+        """Get all subscriptions for a channel."""
+        return await self.shard_for(channel_id).get_subscriptions_by_channel(channel_id)
+
+    async def get_subscriptions_by_channels(
+        self, channel_ids: list[str]
+    ) -> dict[str, list[Subscription]]:
+        """Get the subscriptions of several channels, one query per shard, in parallel."""
+        results = await asyncio.gather(
+            *(
+                self.shards[index].get_subscriptions_by_channels(ids)
+                for index, ids in self._ids_by_shard(channel_ids).items()
+            )
+        )
+        merged = {channel_id: subs for result in results for channel_id, subs in result.items()}
+        return {channel_id: merged[channel_id] for channel_id in channel_ids}
+
+    async def get_subscriptions_by_client(self, client_id: str) -> list[Subscription]:
+        """Get a client's subscriptions from every shard."""
+        results = await asyncio.gather(
+            *(shard.get_subscriptions_by_client(client_id) for shard in self.shards)
+        )
+        return [subscription for result in results for subscription in result]
+
+    async def get_subscriptions_by_client_and_channel(
+        self, client_id: str, channel_id: str
+    ) -> list[Subscription]:
+        """Get a client's subscriptions to a single channel."""
+        return await self.shard_for(channel_id).get_subscriptions_by_client_and_channel(
+            client_id, channel_id
+        )
+
+    # ========== Notification Operations ==========
+
+    async def save_notification(self, notification: Notification) -> None:
+        """Save a notification on its channel's shard.
+
+        Raises:
+            ValueError: If the notification has no channel in its metadata
+        """
+        await self.save_notifications([notification])
+
+    async def save_notifications(self, notifications: list[Notification]) -> None:
+        """Save notifications, one transaction per shard, shards in parallel.
+
+        Raises:
+            ValueError: If a notification has no channel in its metadata
+        """
+        by_shard: dict[int, list[Notification]] = defaultdict(list)
+        for notification in notifications:
+            channel_id = notification.metadata.channel
+            if not channel_id:
+                raise ValueError("Notification metadata must include channel")
+            by_shard[self.shard_index(channel_id)].append(notification)
+
+        await asyncio.gather(
+            *(self.shards[index].save_notifications(batch) for index, batch in by_shard.items())
+        )
+
+    async def append_notification(self, notification: Notification) -> int:
+        """Save a notification under its channel's next sequence number, on its shard.
+
+        Raises:
+            ValueError: If the notification has no channel in its metadata
+        """
+        channel_id = notification.metadata.channel
+        if not channel_id:
+            raise ValueError("Notification metadata must include channel")
+        return await self.shard_for(channel_id).append_notification(notification)
+
+    async def get_notifications(self, channel_id: str, limit: int = 50) -> list[Notification]:
+        """Get notifications for a channel (highest sequence first)."""
+        return await self.shard_for(channel_id).get_notifications(channel_id, limit=limit)
+
+    async def get_notifications_page(
+        self,
+        channel_id: str,
+        limit: int = 50,
+        before: int | None = None,
+        after: int | None = None,
+    ) -> list[Notification]:
+        """Get a page of a channel's history by sequence cursor, newest first."""
+        return await self.shard_for(channel_id).get_notifications_page(
+            channel_id, limit=limit, before=before, after=after
+        )
+
+    async def get_filtered_notifications_page(
+        self,
+        channel_id: str,
+        filters: SubscriptionFilter,
+        limit: int = 50,
+        before: int | None = None,
+    ) -> FilteredPage:
+        """Get a page of a channel's history matching a subscription filter."""
+        return await self.shard_for(channel_id).get_filtered_notifications_page(
+            channel_id, filters, limit=limit, before=before
+        )
+
+    def iter_notifications(
+        self,
+        channel_id: str,
+        since: int | None = None,
+        until: int | None = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Notification]:
+        """Stream a channel's history oldest first from its shard."""
+        return self.shard_for(channel_id).iter_notifications(channel_id, since, until, batch_size)
+
+    async def search_notifications(
+        self, query: str, channels: list[str] | None = None, limit: int = 20
+    ) -> list[NotificationSearchResult]:
+        """Full-text search on the shards holding the channels, merged by score.
+
+        bm25 statistics are per shard, so scores from different shards are
+        close to, but not exactly, what a single index would give.
+        """
+        if channels is None:
+            searches = [shard.search_notifications(query, None, limit) for shard in self.shards]
+        else:
+            by_shard: dict[int, list[str]] = defaultdict(list)
+            for channel_id in channels:
+                by_shard[self.shard_index(channel_id)].append(channel_id)
+            searches = [
+                self.shards[index].search_notifications(query, shard_channels, limit)
+                for index, shard_channels in by_shard.items()
+            ]
+
+        results = await asyncio.gather(*searches)
+        hits = [hit for result in results for hit in result]
+        hits.sort(key=lambda hit: hit.score, reverse=True)
+        return hits[:limit]
+
+    async def rebuild_search_index(self) -> None:
+        """Rebuild every shard's full-text index."""
+        await asyncio.gather(*(shard.rebuild_search_index() for shard in self.shards))
+
+    async def get_notification_count(self, channel_id: str) -> int:
+        """Get total notification count for a channel (excluding expired)."""
+        return await self.shard_for(channel_id).get_notification_count(channel_id)
+
+    async def get_latest_sequence(self, channel_id: str) -> int:
+        """Get the highest sequence number stored for a channel (0 if none)."""
+        return await self.shard_for(channel_id).get_latest_sequence(channel_id)
+
+    async def purge_expired(self, now: float | None = None, batch_size: int = 500) -> int:
+        """Delete up to ``batch_size`` expired notifications on each shard.
+
+        Returns the total, so callers looping until it drops below
+        ``batch_size`` keep going while any shard still has a full batch.
+        """
+        purged = await asyncio.gather(
+            *(shard.purge_expired(now=now, batch_size=batch_size) for shard in self.shards)
+        )
+        return sum(purged)
+
+    async def reclaim_space(self) -> None:
+        """Return free pages to the OS on every shard."""
+        await asyncio.gather(*(shard.reclaim_space() for shard in self.shards))
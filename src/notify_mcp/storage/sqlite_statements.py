@@ -0,0 +1,459 @@
+"""Prebuilt SQLAlchemy Core statements and row converters for SQLite hot paths.
+
+``SQLiteStorage`` runs its hot operations (publish, history reads, channel
+and subscription lookups) through SQLAlchemy Core rather than ORM sessions:
+no identity map, no unit of work, no per-call ``select(...)`` construction.
+Each statement here is built once at import time with bind parameters, so
+every execution reuses the same statement object and hits SQLAlchemy's
+compiled-statement cache. Result rows are mapped straight to dicts and
+validated into Pydantic models in a single ``model_validate`` call.
+
+Channel and subscription saves are single ``INSERT ... ON CONFLICT DO
+UPDATE`` upserts, and channel stats are bumped in place with an atomic
+``UPDATE``, so no write path needs a read first.
+
+The ORM models in ``models.py`` remain the source of the schema and are
+still used for ``create_all`` and the rarely-called delete paths.
+"""
+
+from collections.abc import Mapping
+from typing import Any
+
+from sqlalchemy import (
+    Float,
+    Integer,
+    String,
+    bindparam,
+    column,
+    delete,
+    desc,
+    func,
+    insert,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ..models.channel import Channel
+from ..models.notification import Notification
+from ..models.subscription import Subscription
+from ..utils.search import (
+    BODY_WEIGHT,
+    SNIPPET_ELLIPSIS,
+    SNIPPET_END,
+    SNIPPET_START,
+    SNIPPET_TOKENS,
+    TITLE_WEIGHT,
+)
+from .expiry import expiry_timestamp
+from .models import ChannelModel, NotificationModel, SubscriptionModel
+
+channels = ChannelModel.__table__
+subscriptions = SubscriptionModel.__table__
+notifications = NotificationModel.__table__
+
+
+def _upsert(table: Any) -> Any:
+    """INSERT ... ON CONFLICT (id) DO UPDATE for every non-key column.
+
+    The WHERE guard skips the update when no column differs, so re-saving an
+    unchanged row does not write.
+    """
+    stmt = sqlite_insert(table)
+    columns = [c.name for c in table.columns if not c.primary_key]
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.id],
+        set_={name: stmt.excluded[name] for name in columns},
+        where=or_(*(table.c[name].is_distinct_from(stmt.excluded[name]) for name in columns)),
+    )
+
+
+# Bulk lookups bind one parameter per ID; callers chunk the IDs so older
+# SQLite builds (limit 999) accept them
+MAX_IN_PARAMS = 500
+
+# ========== Channels ==========
+
+UPSERT_CHANNEL = _upsert(channels)
+
+# Atomic stats bump; bind names must not collide with column names
+BUMP_CHANNEL_STATS = (
+    update(channels)
+    .where(channels.c.id == bindparam("channel_id"))
+    .values(
+        notification_count=channels.c.notification_count + bindparam("increment"),
+        last_notification_at=bindparam("notified_at"),
+    )
+)
+
+# No-op update run first in an appending transaction: it takes the database
+# write lock, so the latest sequence read after it stays latest until commit
+LOCK_CHANNEL = (
+    update(channels)
+    .where(channels.c.id == bindparam("channel_id"))
+    .values(id=channels.c.id)
+)
+
+SELECT_CHANNEL = select(channels).where(channels.c.id == bindparam("channel_id"))
+
+SELECT_ALL_CHANNELS = select(channels)
+
+SELECT_CHANNELS = select(channels).where(
+    channels.c.id.in_(bindparam("channel_ids", expanding=True))
+)
+
+# ========== Subscriptions ==========
+
+UPSERT_SUBSCRIPTION = _upsert(subscriptions)
+
+SELECT_SUBSCRIPTIONS_BY_CHANNEL = select(subscriptions).where(
+    subscriptions.c.channel == bindparam("channel_id")
+)
+
+SELECT_SUBSCRIPTIONS_BY_CHANNELS = select(subscriptions).where(
+    subscriptions.c.channel.in_(bindparam("channel_ids", expanding=True))
+)
+
+SELECT_SUBSCRIPTIONS_BY_CLIENT = select(subscriptions).where(
+    subscriptions.c.client_id == bindparam("client_id")
+)
+
+SELECT_SUBSCRIPTIONS_BY_CLIENT_AND_CHANNEL = select(subscriptions).where(
+    subscriptions.c.channel == bindparam("channel_id"),
+    subscriptions.c.client_id == bindparam("client_id"),
+)
+
+DELETE_SUBSCRIPTIONS = delete(subscriptions).where(
+    subscriptions.c.id.in_(bindparam("subscription_ids", expanding=True))
+)
+
+# ========== Notifications ==========
+
+INSERT_NOTIFICATION = insert(notifications)
+
+SELECT_LATEST_SEQUENCE = select(func.max(notifications.c.sequence)).where(
+    notifications.c.channel == bindparam("channel_id")
+)
+
+# Rows past the max_history watermark may linger until the next amortized
+# trim; reads exclude them with this predicate.
+WITHIN_HISTORY = (
+    notifications.c.sequence
+    > SELECT_LATEST_SEQUENCE.scalar_subquery() - bindparam("max_history")
+)
+
+# Expired rows linger until the next purge; reads exclude them at :now
+NOT_EXPIRED = or_(
+    notifications.c.expires_at.is_(None), notifications.c.expires_at > bindparam("now")
+)
+
+SELECT_NOTIFICATIONS = (
+    select(notifications)
+    .where(notifications.c.channel == bindparam("channel_id"), WITHIN_HISTORY, NOT_EXPIRED)
+    .order_by(desc(notifications.c.sequence))
+    .limit(bindparam("limit"))
+    .offset(bindparam("offset"))
+)
+
+# Keyset pages walk the (channel, sequence) index from the cursor, so a page
+# costs the same however deep it is. Unused bounds are bound to the extremes.
+SEQUENCE_MIN = -1
+SEQUENCE_MAX = 2**63 - 1
+
+_IN_PAGE_RANGE = (
+    notifications.c.channel == bindparam("channel_id"),
+    notifications.c.sequence < bindparam("before"),
+    notifications.c.sequence > bindparam("after"),
+    WITHIN_HISTORY,
+    NOT_EXPIRED,
+)
+
+SELECT_NOTIFICATIONS_BEFORE = (
+    select(notifications)
+    .where(*_IN_PAGE_RANGE)
+    .order_by(desc(notifications.c.sequence))
+    .limit(bindparam("limit"))
+)
+
+SELECT_NOTIFICATIONS_AFTER = (
+    select(notifications)
+    .where(*_IN_PAGE_RANGE)
+    .order_by(notifications.c.sequence)
+    .limit(bindparam("limit"))
+)
+
+# Whole range oldest first, for streaming through a server-side cursor
+SELECT_NOTIFICATIONS_RANGE = (
+    select(notifications).where(*_IN_PAGE_RANGE).order_by(notifications.c.sequence)
+)
+
+COUNT_NOTIFICATIONS = (
+    select(func.count())
+    .select_from(notifications)
+    .where(notifications.c.channel == bindparam("channel_id"), WITHIN_HISTORY, NOT_EXPIRED)
+)
+
+DROP_TIMESTAMP_INDEX = text("DROP INDEX IF EXISTS ix_notifications_channel_timestamp")
+
+# Rows about to be trimmed, oldest first, for moving into the archive tier
+SELECT_ARCHIVABLE = (
+    select(notifications)
+    .where(
+        notifications.c.channel == bindparam("channel_id"),
+        notifications.c.sequence > bindparam("archived"),
+        notifications.c.sequence <= bindparam("watermark"),
+    )
+    .order_by(notifications.c.sequence)
+    .limit(bindparam("limit"))
+)
+
+TRIM_NOTIFICATIONS = delete(notifications).where(
+    notifications.c.channel == bindparam("channel_id"),
+    notifications.c.sequence <= bindparam("watermark"),
+)
+
+
+# ========== Change feed ==========
+
+# Each insert gets rowid max(rowid) + 1, so the largest rowid is a cheap
+# watermark other processes can poll to find rows inserted since they last
+# looked (see change_feed). The rowid is not a stable ID: VACUUM may
+# renumber rows, and deleting the newest row lets its rowid be reused.
+_ROWID = column("rowid", Integer)
+
+SELECT_MAX_ROWID = select(func.max(_ROWID)).select_from(notifications)
+
+# Expired rows are read too (and skipped in Python) so the caller's cursor
+# can move past them
+SELECT_NOTIFICATIONS_SINCE = (
+    select(_ROWID.label("row_id"), notifications)
+    .where(_ROWID > bindparam("after"))
+    .order_by(_ROWID)
+    .limit(bindparam("limit"))
+)
+
+
+# ========== Unique sequences ==========
+
+# Databases created before (channel, sequence) was unique get the index
+# rebuilt on initialize, unless they already hold duplicate sequences.
+SEQUENCE_INDEX_UNIQUE = text(
+    "SELECT \"unique\" FROM pragma_index_list('notifications') "
+    "WHERE name = 'ix_notifications_channel_sequence'"
+)
+
+SELECT_DUPLICATE_SEQUENCE = text(
+    "SELECT channel, sequence FROM notifications "
+    "GROUP BY channel, sequence HAVING count(*) > 1 LIMIT 1"
+)
+
+DROP_SEQUENCE_INDEX = text("DROP INDEX ix_notifications_channel_sequence")
+
+CREATE_UNIQUE_SEQUENCE_INDEX = text(
+    "CREATE UNIQUE INDEX ix_notifications_channel_sequence ON notifications (channel, sequence)"
+)
+
+# ========== Expiry ==========
+
+# Databases created before expires_at existed get the column added and
+# backfilled from context_data on initialize.
+NOTIFICATION_COLUMNS = text("SELECT name FROM pragma_table_info('notifications')")
+
+ADD_EXPIRES_AT_COLUMN = text("ALTER TABLE notifications ADD COLUMN expires_at FLOAT")
+
+SELECT_VALIDITIES = text(
+    "SELECT rowid, json_extract(context_data, '$.validity') AS validity FROM notifications "
+    "WHERE json_extract(context_data, '$.validity') IS NOT NULL"
+)
+
+SET_EXPIRES_AT = text("UPDATE notifications SET expires_at = :expires_at WHERE rowid = :row_id")
+
+# Deletes the batch of rows soonest past their deadline, walking the partial
+# expires_at index. Each channel's newest row is kept (still hidden from
+# reads) so the latest sequence, and with it sequence numbering after a
+# restart, survives a channel whose whole history expired.
+PURGE_EXPIRED = text(
+    "DELETE FROM notifications WHERE rowid IN ("
+    "SELECT expired.rowid FROM notifications AS expired "
+    "WHERE expired.expires_at <= :now "
+    "AND expired.sequence < (SELECT max(latest.sequence) FROM notifications AS latest "
+    "WHERE latest.channel = expired.channel) "
+    "ORDER BY expired.expires_at LIMIT :batch_size)"
+)
+
+
+# ========== Full-text search ==========
+
+# notifications_fts is an FTS5 external-content index over the title and body
+# inside the information JSON. Its content is a view, so the text is not
+# stored twice; triggers keep it in step with inserts, trims and cascade
+# deletes. FTS rows share the notification's rowid, which VACUUM may renumber
+# (there is no INTEGER PRIMARY KEY); SQLiteStorage.rebuild_search_index()
+# resyncs the index after one.
+FTS_TABLE_EXISTS = text(
+    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'notifications_fts'"
+)
+
+_TITLE = "json_extract({row}.information, '$.title')"
+_BODY = "json_extract({row}.information, '$.body')"
+
+FTS_SCHEMA = [
+    text(
+        "CREATE VIEW IF NOT EXISTS notifications_search AS "
+        f"SELECT rowid AS notification_rowid, {_TITLE.format(row='notifications')} AS title, "
+        f"{_BODY.format(row='notifications')} AS body FROM notifications"
+    ),
+    text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS notifications_fts USING fts5("
+        "title, body, content='notifications_search', content_rowid='notification_rowid')"
+    ),
+    text(
+        "CREATE TRIGGER IF NOT EXISTS notifications_fts_insert AFTER INSERT ON notifications "
+        "BEGIN INSERT INTO notifications_fts(rowid, title, body) "
+        f"VALUES (new.rowid, {_TITLE.format(row='new')}, {_BODY.format(row='new')}); END"
+    ),
+    text(
+        "CREATE TRIGGER IF NOT EXISTS notifications_fts_delete AFTER DELETE ON notifications "
+        "BEGIN INSERT INTO notifications_fts(notifications_fts, rowid, title, body) "
+        f"VALUES ('delete', old.rowid, {_TITLE.format(row='old')}, {_BODY.format(row='old')}); END"
+    ),
+    # Persistent ranking function: title matches weigh more than body matches
+    text(
+        "INSERT INTO notifications_fts(notifications_fts, rank) "
+        f"VALUES ('rank', 'bm25({TITLE_WEIGHT}, {BODY_WEIGHT})')"
+    ),
+]
+
+FTS_REBUILD = text("INSERT INTO notifications_fts(notifications_fts) VALUES ('rebuild')")
+
+_SEARCH_SQL = (
+    "SELECT {columns}, -notifications_fts.rank AS score, "
+    f"snippet(notifications_fts, -1, '{SNIPPET_START}', '{SNIPPET_END}', "
+    f"'{SNIPPET_ELLIPSIS}', {SNIPPET_TOKENS}) AS snippet "
+    "FROM notifications_fts JOIN notifications ON notifications.rowid = notifications_fts.rowid "
+    "WHERE notifications_fts MATCH :query "
+    "AND notifications.sequence > (SELECT max(latest.sequence) FROM notifications AS latest "
+    "WHERE latest.channel = notifications.channel) - :max_history "
+    "AND (notifications.expires_at IS NULL OR notifications.expires_at > :now) "
+    "{channel_filter}"
+    "ORDER BY notifications_fts.rank LIMIT :limit"
+).replace("{columns}", ", ".join(f"notifications.{c.name}" for c in notifications.columns))
+
+_SEARCH_COLUMNS = (*notifications.columns, column("score", Float), column("snippet", String))
+
+SEARCH_NOTIFICATIONS = text(_SEARCH_SQL.format(channel_filter="")).columns(*_SEARCH_COLUMNS)
+
+SEARCH_NOTIFICATIONS_IN_CHANNELS = (
+    text(_SEARCH_SQL.format(channel_filter="AND notifications.channel IN :channels "))
+    .bindparams(bindparam("channels", expanding=True))
+    .columns(*_SEARCH_COLUMNS)
+)
+
+
+# ========== Parameter builders ==========
+
+
+def channel_params(channel: Channel) -> dict[str, Any]:
+    """Build UPSERT_CHANNEL parameters for a channel."""
+    return {
+        "id": channel.id,
+        "name": channel.name,
+        "description": channel.description,
+        "created_at": channel.createdAt,
+        "created_by": channel.createdBy,
+        "permissions": channel.permissions.model_dump(mode="json") if channel.permissions else None,
+        "metadata": channel.metadata,
+        "subscriber_count": channel.subscriberCount,
+        "notification_count": channel.notificationCount,
+        "last_notification_at": channel.lastNotificationAt,
+    }
+
+
+def subscription_params(subscription: Subscription) -> dict[str, Any]:
+    """Build UPSERT_SUBSCRIPTION parameters for a subscription."""
+    return {
+        "id": subscription.id,
+        "client_id": subscription.clientId,
+        "channel": subscription.channel,
+        "subscribed_at": subscription.subscribedAt,
+        "filters": subscription.filters.model_dump(mode="json") if subscription.filters else None,
+    }
+
+
+def notification_params(notification: Notification, sequence: int) -> dict[str, Any]:
+    """Build INSERT_NOTIFICATION parameters for a notification."""
+    metadata = notification.metadata.model_dump(mode="json")
+    metadata["sequence"] = sequence
+    return {
+        "id": notification.metadata.id,
+        "channel": notification.metadata.channel,
+        "sequence": sequence,
+        "priority": notification.context.priority,
+        "timestamp": notification.metadata.timestamp,
+        "expires_at": expiry_timestamp(notification.context.validity),
+        "schema_version": notification.schemaVersion,
+        "sender_data": notification.sender.model_dump(mode="json"),
+        "context_data": notification.context.model_dump(mode="json"),
+        "information": notification.information.model_dump(mode="json"),
+        "actions": (
+            [a.model_dump(mode="json") for a in notification.actions]
+            if notification.actions
+            else None
+        ),
+        "visibility": notification.visibility.model_dump(mode="json"),
+        "metadata_data": metadata,
+    }
+
+
+# ========== Row converters ==========
+
+
+def row_to_channel(row: Mapping[str, Any]) -> Channel:
+    """Convert a channels row to a Channel."""
+    return Channel.model_validate(
+        {
+            "id": row["id"],
+            "name": row["name"],
+            "description": row["description"],
+            "createdAt": row["created_at"],
+            "createdBy": row["created_by"],
+            "permissions": row["permissions"] or {},
+            "metadata": row["metadata"] or {},
+            "subscriberCount": row["subscriber_count"],
+            "notificationCount": row["notification_count"],
+            "lastNotificationAt": row["last_notification_at"],
+        }
+    )
+
+
+def row_to_subscription(row: Mapping[str, Any]) -> Subscription:
+    """Convert a subscriptions row to a Subscription."""
+    return Subscription.model_validate(
+        {
+            "id": row["id"],
+            "clientId": row["client_id"],
+            "channel": row["channel"],
+            "subscribedAt": row["subscribed_at"],
+            "filters": row["filters"] or {},
+        }
+    )
+
+
+def row_to_document(row: Mapping[str, Any]) -> dict[str, Any]:
+    """Convert a notifications row to a Notification JSON document."""
+    return {
+        "schemaVersion": row["schema_version"],
+        "sender": row["sender_data"],
+        "context": row["context_data"],
+        "information": row["information"],
+        "actions": row["actions"] or [],
+        "visibility": row["visibility"],
+        "metadata": row["metadata_data"],
+    }
+
+
+def row_to_notification(row: Mapping[str, Any]) -> Notification:
+    """Convert a notifications row to a Notification."""
+    return Notification.model_validate(row_to_document(row))
@@ -2,60 +2,208 @@
 
 This module provides persistent storage using SQLite with async support.
 Implements LRU cache for notification history to limit database size.
+Hot paths run prebuilt Core statements from ``sqlite_statements``.
+
+Writes go through a single writer connection; ``get_*`` and ``list_*``
+calls run on a separate pool of read-only connections. In WAL mode readers
+never block the writer (or each other), so heavy history polling does not
+delay publishes.
+
+Notifications whose ``Context.validity`` has passed are hidden from reads
+at once and deleted in batches by ``purge_expired()``.
+
+``backup()`` copies the live database with SQLite's online backup API
+while publishes continue.
+
+With an ``archive_dir``, history trims move rows out of the hot table into
+compressed per-channel segment files (see ``archive``) instead of deleting
+them; keyset pages continue into the archive once the hot table runs out.
 """
 
+import asyncio
 import logging
+import os
+import re
+import sqlite3
+import time
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime
 from pathlib import Path
-
-from sqlalchemy import delete, desc, func, select, text
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from typing import Any, NamedTuple
+
+from sqlalchemy import delete, event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from ..core.storage_adapter import StorageAdapter
-from ..models.channel import Channel, ChannelPermissions
-from ..models.notification import (
-    Action,
-    Context,
-    Information,
-    Metadata,
-    Notification,
-    Sender,
-    Visibility,
-)
-from ..models.subscription import Subscription, SubscriptionFilter
-from .models import Base, ChannelModel, NotificationModel, SubscriptionModel
+from ..models.channel import Channel
+from ..models.notification import Notification
+from ..models.search import NotificationSearchResult
+from ..models.subscription import Subscription
+from ..utils.search import fts_query
+from . import sqlite_statements as stmts
+from .archive import SegmentArchive
+from .expiry import expiry_timestamp, is_expired
+from .models import Base, ChannelModel, SubscriptionModel
 
 logger = logging.getLogger(__name__)
 
+# PRAGMA presets applied to every pooled connection. foreign_keys is required
+# in all of them for cascade deletes; the rest trade durability for speed.
+SQLITE_PRAGMA_PROFILES: dict[str, dict[str, str | int]] = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "foreign_keys": "ON",
+        "busy_timeout": 5000,
+        "cache_size": -8_000,  # KiB (negative = size rather than pages)
+        "temp_store": "DEFAULT",
+        "mmap_size": 0,
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "foreign_keys": "ON",
+        "busy_timeout": 5000,
+        "cache_size": -32_000,
+        "temp_store": "MEMORY",
+        "mmap_size": 128 * 1024 * 1024,
+    },
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "foreign_keys": "ON",
+        "busy_timeout": 10_000,
+        "cache_size": -128_000,
+        "temp_store": "MEMORY",
+        "mmap_size": 1024 * 1024 * 1024,
+    },
+}
+
+_PRAGMA_VALUE_PATTERN = re.compile(r"^-?\w+$")
+
+_AUTO_VACUUM_INCREMENTAL = 2
+
+# Rows moved per archive frame when catching up on a large backlog
+_ARCHIVE_BATCH = 5000
+
+
+class RowidBatch(NamedTuple):
+    """Outcome of SQLiteStorage.get_notifications_since_rowid()."""
+
+    notifications: list[Notification]  # Unexpired rows, in insert order
+    last_rowid: int  # Highest rowid read, expired rows included (``after`` if none)
+
+
+class BackupStats(NamedTuple):
+    """Outcome of SQLiteStorage.backup()."""
+
+    path: Path
+    pages: int
+    restarts: int
+    elapsed: float
+
+
+class _BackupRestartedError(Exception):
+    """Raised from the progress callback to abandon a stepped backup."""
+
 
 class SQLiteStorage(StorageAdapter):
     """SQLite-based persistent storage adapter.
 
     Features:
     - Async SQLite operations using aiosqlite
-    - LRU cache for notifications (configurable max per channel)
+    - LRU cache for notifications (configurable max per channel), trimmed by
+      sequence watermark every ``trim_interval`` inserts per channel
     - JSON serialization of nested Pydantic models
-    - WAL mode for better concurrency
+    - WAL mode with one writer connection and a pool of read-only connections
+    - Tunable PRAGMA profile applied to every connection
+    - Expiry index for batched purges of notifications past their validity,
+      optionally returning freed pages to the OS (incremental auto-vacuum)
+    - Optional archive tier: trimmed history is kept in compressed segments
     """
 
-    def __init__(self, db_path: str, max_history_per_channel: int = 1000):
+    def __init__(
+        self,
+        db_path: str,
+        max_history_per_channel: int = 1000,
+        pragma_profile: str = "balanced",
+        pragmas: dict[str, Any] | None = None,
+        trim_interval: int = 100,
+        read_pool_size: int = 4,
+        incremental_vacuum: bool = False,
+        archive_dir: str | None = None,
+        archive_segment_bytes: int = 64 * 1024 * 1024,
+    ):
         """Initialize SQLite storage.
 
         Args:
             db_path: Path to SQLite database file
             max_history_per_channel: Maximum notifications to keep per channel (LRU)
+            pragma_profile: Name of a preset in SQLITE_PRAGMA_PROFILES
+            pragmas: PRAGMA overrides applied on top of the profile
+            trim_interval: Inserts per channel between history trims. Reads hide
+                rows beyond max_history in the meantime.
+            read_pool_size: Read-only connections serving get/list calls
+            incremental_vacuum: Switch the database to incremental auto-vacuum so
+                reclaim_space() can shrink the file after purges. Converting an
+                existing database runs a one-time VACUUM on initialize.
+            archive_dir: Directory for archived history (None = trimmed rows are deleted)
+            archive_segment_bytes: Size after which a new archive segment file is started
+
+        Raises:
+            ValueError: If the pragma profile is unknown, a pragma is malformed
+                or read_pool_size is below 1
         """
+        if read_pool_size < 1:
+            raise ValueError(f"read_pool_size must be at least 1, got {read_pool_size}")
+
         self.db_path = Path(db_path).expanduser()
         self.max_history = max_history_per_channel
+        self.trim_interval = max(1, trim_interval)
+        self.incremental_vacuum = incremental_vacuum
+        self.archive = (
+            SegmentArchive(archive_dir, segment_bytes=archive_segment_bytes)
+            if archive_dir is not None
+            else None
+        )
 
-        # Create async engine with SQLite-specific options
-        db_url = f"sqlite+aiosqlite:///{self.db_path}"
-        self.engine = create_async_engine(
-            db_url,
-            echo=False,  # Set to True for SQL debug logging
-            future=True,
+        # Per-channel trim bookkeeping (latest sequence, inserts since last trim)
+        self._latest_sequence: dict[str, int] = {}
+        self._inserts_since_trim: dict[str, int] = {}
+
+        if pragma_profile not in SQLITE_PRAGMA_PROFILES:
+            raise ValueError(
+                f"Unknown SQLite pragma profile: {pragma_profile}. "
+                f"Supported profiles: {', '.join(SQLITE_PRAGMA_PROFILES)}"
+            )
+        self.pragma_profile = pragma_profile
+        self.pragmas = {**SQLITE_PRAGMA_PROFILES[pragma_profile], **(pragmas or {})}
+
+        # PRAGMAs cannot be parameterized; only allow plain names and values
+        for name, value in self.pragmas.items():
+            if not name.isidentifier() or not _PRAGMA_VALUE_PATTERN.match(str(value)):
+                raise ValueError(f"Invalid SQLite pragma: {name}={value}")
+
+        # Single writer: SQLite serializes writes anyway, so queue them on one
+        # connection instead of letting pooled connections fight over the lock
+        self.engine = self._create_engine(
+            f"sqlite+aiosqlite:///{self.db_path}", pool_size=1, read_only=False
         )
 
+        # Readers open the same file read-only (mode=ro) with query_only set
+        self.read_engine = self._create_engine(
+            f"sqlite+aiosqlite:///file:{self.db_path}?mode=ro&uri=true",
+            pool_size=read_pool_size,
+            read_only=True,
+        )
+        self.read_pool_size = read_pool_size
+
         # Create session factory
         self.session_factory = async_sessionmaker(
             self.engine,
@@ -63,80 +211,158 @@ class SQLiteStorage(StorageAdapter):
             expire_on_commit=False,
         )
 
-        logger.info(f"SQLite storage configured: path={self.db_path}")
+        logger.info(
+            f"SQLite storage configured: path={self.db_path}, profile={self.pragma_profile}, "
+            f"readers={read_pool_size}"
+        )
+
+    def _create_engine(self, url: str, pool_size: int, read_only: bool) -> AsyncEngine:
+        """Create an engine with a fixed-size pool and the PRAGMA profile applied."""
+        engine = create_async_engine(
+            url,
+            echo=False,  # Set to True for SQL debug logging
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=pool_size,
+            max_overflow=0,
+        )
+
+        # Apply the PRAGMA profile to every new DBAPI connection in the pool
+        def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+            self._apply_pragmas(dbapi_connection, read_only)
+
+        event.listen(engine.sync_engine, "connect", on_connect)
+        return engine
+
+    def _apply_pragmas(self, dbapi_connection: Any, read_only: bool = False) -> None:
+        """Apply the configured PRAGMAs to a new connection.
+
+        Read-only connections skip journal_mode (the writer owns it) and set
+        query_only so a misrouted write fails instead of taking the lock.
+        """
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.pragmas.items():
+                if read_only and name == "journal_mode":
+                    continue
+                cursor.execute(f"PRAGMA {name}={value}")
+            if read_only:
+                cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
 
     async def initialize(self) -> None:
         """Initialize database schema.
 
-        Creates all tables and enables WAL mode for better concurrency.
+        Creates all tables. Connection PRAGMAs (WAL mode, foreign keys, ...)
+        are applied by the engine connect event, not here.
         """
-        async with self.engine.begin() as conn:
-            # Enable foreign key constraints (required for cascade deletes)
-            await conn.execute(text("PRAGMA foreign_keys=ON"))
+        vacuumed = await self._enable_incremental_vacuum() if self.incremental_vacuum else False
 
-            # Create all tables
+        async with self.engine.begin() as conn:
+            await self._migrate_expires_at(conn)
             await conn.run_sync(Base.metadata.create_all)
+            await self._migrate_unique_sequence(conn)
+            # Superseded by sequence ordering; drop it from older databases
+            await conn.execute(stmts.DROP_TIMESTAMP_INDEX)
+
+            # Full-text index; backfill existing notifications when first created
+            fts_exists = (await conn.execute(stmts.FTS_TABLE_EXISTS)).first() is not None
+            for ddl in stmts.FTS_SCHEMA:
+                await conn.execute(ddl)
+            # VACUUM may renumber rowids, which the FTS index is keyed on
+            if not fts_exists or vacuumed:
+                await conn.execute(stmts.FTS_REBUILD)
 
-            # Enable WAL mode for better concurrency
-            await conn.execute(text("PRAGMA journal_mode=WAL"))
+        if self.archive is not None:
+            await self.archive.open()
 
         logger.info("Database schema initialized")
 
+    async def _enable_incremental_vacuum(self) -> bool:
+        """Switch the database to auto_vacuum=INCREMENTAL.
+
+        The mode only takes effect directly on a database without tables;
+        an existing one is rebuilt with VACUUM.
+
+        Returns:
+            True if a VACUUM was run
+        """
+        async with self.engine.connect() as conn:
+            # PRAGMA auto_vacuum and VACUUM must run outside a transaction
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+            mode = (await conn.exec_driver_sql("PRAGMA auto_vacuum")).scalar_one()
+            if mode == _AUTO_VACUUM_INCREMENTAL:
+                return False
+            logger.info(f"Converting {self.db_path} to incremental auto-vacuum (VACUUM)")
+            await conn.exec_driver_sql("VACUUM")
+            return True
+
+    async def _migrate_expires_at(self, conn: Any) -> None:
+        """Add and backfill the expires_at column on databases that predate it."""
+        columns = {row[0] for row in await conn.execute(stmts.NOTIFICATION_COLUMNS)}
+        if not columns or "expires_at" in columns:
+            return  # New database (create_all adds it) or already migrated
+
+        await conn.execute(stmts.ADD_EXPIRES_AT_COLUMN)
+        rows = (await conn.execute(stmts.SELECT_VALIDITIES)).all()
+        params = [
+            {"row_id": row_id, "expires_at": expiry_timestamp(datetime.fromisoformat(validity))}
+            for row_id, validity in rows
+        ]
+        if params:
+            await conn.execute(stmts.SET_EXPIRES_AT, params)
+        logger.info(f"Added expires_at column ({len(params)} notifications with a validity)")
+
+    async def _migrate_unique_sequence(self, conn: Any) -> None:
+        """Make the (channel, sequence) index unique on databases that predate it."""
+        if (await conn.execute(stmts.SEQUENCE_INDEX_UNIQUE)).scalar_one_or_none() != 0:
+            return  # Created unique by create_all, or already migrated
+
+        duplicate = (await conn.execute(stmts.SELECT_DUPLICATE_SEQUENCE)).first()
+        if duplicate is not None:
+            logger.warning(
+                f"Sequence {duplicate.sequence} of channel '{duplicate.channel}' is stored "
+                f"more than once; (channel, sequence) index left non-unique"
+            )
+            return
+
+        await conn.execute(stmts.DROP_SEQUENCE_INDEX)
+        await conn.execute(stmts.CREATE_UNIQUE_SEQUENCE_INDEX)
+        logger.info("Made the (channel, sequence) index unique")
+
     async def close(self) -> None:
         """Close database connections and cleanup resources."""
+        await self.read_engine.dispose()
         await self.engine.dispose()
+        if self.archive is not None:
+            self.archive.close()
         logger.info("Database connections closed")
 
     # ========== Channel Operations ==========
 
     async def save_channel(self, channel: Channel) -> None:
-        """Save or update a channel."""
-        async with self.session_factory() as session:
-            # Check if channel exists
-            stmt = select(ChannelModel).where(ChannelModel.id == channel.id)
-            result = await session.execute(stmt)
-            existing = result.scalar_one_or_none()
-
-            if existing:
-                # Update existing
-                existing.name = channel.name
-                existing.description = channel.description
-                existing.created_at = channel.createdAt
-                existing.created_by = channel.createdBy
-                existing.permissions = channel.permissions.model_dump(mode="json") if channel.permissions else None
-                existing.channel_metadata = channel.metadata
-                existing.subscriber_count = channel.subscriberCount
-                existing.notification_count = channel.notificationCount
-                existing.last_notification_at = channel.lastNotificationAt
-            else:
-                # Create new
-                channel_model = ChannelModel(
-                    id=channel.id,
-                    name=channel.name,
-                    description=channel.description,
-                    created_at=channel.createdAt,
-                    created_by=channel.createdBy,
-                    permissions=channel.permissions.model_dump(mode="json") if channel.permissions else None,
-                    channel_metadata=channel.metadata,
-                    subscriber_count=channel.subscriberCount,
-                    notification_count=channel.notificationCount,
-                    last_notification_at=channel.lastNotificationAt,
-                )
-                session.add(channel_model)
+        """Save or update a channel with a single upsert."""
+        async with self.engine.begin() as conn:
+            await conn.execute(stmts.UPSERT_CHANNEL, stmts.channel_params(channel))
 
-            await session.commit()
+    async def record_channel_notification(
+        self, channel_id: str, timestamp: datetime, count: int = 1
+    ) -> None:
+        """Atomically bump a channel's notification count and last activity."""
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                stmts.BUMP_CHANNEL_STATS,
+                {"channel_id": channel_id, "increment": count, "notified_at": timestamp},
+            )
 
     async def get_channel(self, channel_id: str) -> Channel | None:
         """Get a channel by ID."""
-        async with self.session_factory() as session:
-            stmt = select(ChannelModel).where(ChannelModel.id == channel_id)
-            result = await session.execute(stmt)
-            channel_model = result.scalar_one_or_none()
-
-            if not channel_model:
-                return None
+        async with self.read_engine.connect() as conn:
+            result = await conn.execute(stmts.SELECT_CHANNEL, {"channel_id": channel_id})
+            row = result.mappings().first()
 
-            return self._channel_model_to_pydantic(channel_model)
+        return stmts.row_to_channel(row) if row is not None else None
 
     async def delete_channel(self, channel_id: str) -> None:
         """Delete a channel (cascade deletes subscriptions and notifications)."""
@@ -145,35 +371,40 @@ class SQLiteStorage(StorageAdapter):
             await session.execute(stmt)
             await session.commit()
 
+        self._latest_sequence.pop(channel_id, None)
+        self._inserts_since_trim.pop(channel_id, None)
+        if self.archive is not None:
+            await self.archive.drop_channel(channel_id)
+
+    async def get_channels(self, channel_ids: list[str]) -> dict[str, Channel]:
+        """Get several channels with one IN query per chunk of IDs."""
+        channels = {}
+        async with self.read_engine.connect() as conn:
+            for chunk in _chunks(list(dict.fromkeys(channel_ids))):
+                result = await conn.execute(stmts.SELECT_CHANNELS, {"channel_ids": chunk})
+                for row in result.mappings():
+                    channel = stmts.row_to_channel(row)
+                    channels[channel.id] = channel
+        return channels
+
     async def list_channels(self) -> list[Channel]:
         """List all channels."""
-        async with self.session_factory() as session:
-            stmt = select(ChannelModel)
-            result = await session.execute(stmt)
-            channel_models = result.scalars().all()
+        async with self.read_engine.connect() as conn:
+            result = await conn.execute(stmts.SELECT_ALL_CHANNELS)
+            rows = result.mappings().all()
 
-            return [self._channel_model_to_pydantic(cm) for cm in channel_models]
+        return [stmts.row_to_channel(row) for row in rows]
 
     # ========== Subscription Operations ==========
 
     async def save_subscription(self, subscription: Subscription) -> None:
-        """Save a new subscription."""
-        async with self.session_factory() as session:
-            sub_model = SubscriptionModel(
-                id=subscription.id,
-                client_id=subscription.clientId,
-                channel=subscription.channel,
-                subscribed_at=subscription.subscribedAt,
-                filters=subscription.filters.model_dump(mode="json") if subscription.filters else None,
-            )
-            session.add(sub_model)
+        """Save or update a subscription with a single upsert.
 
-            try:
-                await session.commit()
-            except IntegrityError:
-                # Subscription already exists or channel doesn't exist
-                await session.rollback()
-                raise
+        Raises:
+            IntegrityError: If the subscription's channel does not exist
+        """
+        async with self.engine.begin() as conn:
+            await conn.execute(stmts.UPSERT_SUBSCRIPTION, stmts.subscription_params(subscription))
 
     async def delete_subscription(self, subscription_id: str) -> None:
         """Delete a subscription by ID."""
@@ -182,154 +413,599 @@ class SQLiteStorage(StorageAdapter):
             await session.execute(stmt)
             await session.commit()
 
+    async def save_subscriptions(self, subscriptions: list[Subscription]) -> None:
+        """Save or update subscriptions with one executemany upsert in one transaction.
+
+        Raises:
+            IntegrityError: If a subscription's channel does not exist
+        """
+        if not subscriptions:
+            return
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                stmts.UPSERT_SUBSCRIPTION,
+                [stmts.subscription_params(subscription) for subscription in subscriptions],
+            )
+
+    async def delete_subscriptions(self, subscription_ids: list[str]) -> None:
+        """Delete subscriptions by ID in one transaction."""
+        if not subscription_ids:
+            return
+        async with self.engine.begin() as conn:
+            for chunk in _chunks(subscription_ids):
+                await conn.execute(stmts.DELETE_SUBSCRIPTIONS, {"subscription_ids": chunk})
+
     async def get_subscriptions_by_channel(self, channel_id: str) -> list[Subscription]:
         """Get all subscriptions for a channel."""
-        async with self.session_factory() as session:
-            stmt = select(SubscriptionModel).where(SubscriptionModel.channel == channel_id)
-            result = await session.execute(stmt)
-            sub_models = result.scalars().all()
+        return await self._select_subscriptions(
+            stmts.SELECT_SUBSCRIPTIONS_BY_CHANNEL, {"channel_id": channel_id}
+        )
 
-            return [self._subscription_model_to_pydantic(sm) for sm in sub_models]
+    async def get_subscriptions_by_channels(
+        self, channel_ids: list[str]
+    ) -> dict[str, list[Subscription]]:
+        """Get the subscriptions of several channels with one IN query per chunk."""
+        by_channel: dict[str, list[Subscription]] = {channel_id: [] for channel_id in channel_ids}
+        async with self.read_engine.connect() as conn:
+            for chunk in _chunks(list(by_channel)):
+                result = await conn.execute(
+                    stmts.SELECT_SUBSCRIPTIONS_BY_CHANNELS, {"channel_ids": chunk}
+                )
+                for row in result.mappings():
+                    subscription = stmts.row_to_subscription(row)
+                    by_channel[subscription.channel].append(subscription)
+        return by_channel
 
     async def get_subscriptions_by_client(self, client_id: str) -> list[Subscription]:
         """Get all subscriptions for a client."""
-        async with self.session_factory() as session:
-            stmt = select(SubscriptionModel).where(SubscriptionModel.client_id == client_id)
-            result = await session.execute(stmt)
-            sub_models = result.scalars().all()
+        return await self._select_subscriptions(
+            stmts.SELECT_SUBSCRIPTIONS_BY_CLIENT, {"client_id": client_id}
+        )
 
-            return [self._subscription_model_to_pydantic(sm) for sm in sub_models]
+    async def get_subscriptions_by_client_and_channel(
+        self, client_id: str, channel_id: str
+    ) -> list[Subscription]:
+        """Get a client's subscriptions to a single channel."""
+        return await self._select_subscriptions(
+            stmts.SELECT_SUBSCRIPTIONS_BY_CLIENT_AND_CHANNEL,
+            {"client_id": client_id, "channel_id": channel_id},
+        )
 
     # ========== Notification Operations ==========
 
     async def save_notification(self, notification: Notification) -> None:
-        """Save a notification and enforce LRU cache limit."""
-        async with self.session_factory() as session:
-            # Extract channel from metadata
+        """Save a notification; history beyond max_history is trimmed periodically."""
+        await self.save_notifications([notification])
+
+    async def save_notifications(self, notifications: list[Notification]) -> None:
+        """Save notifications with a single executemany INSERT in one transaction.
+
+        Raises:
+            ValueError: If a notification has no channel in its metadata
+        """
+        params = []
+        latest_by_channel: dict[str, int] = {}
+        inserted_by_channel: dict[str, int] = {}
+        for notification in notifications:
             channel_id = notification.metadata.channel
             if not channel_id:
                 raise ValueError("Notification metadata must include channel")
 
-            # Create notification model
-            notif_model = NotificationModel(
-                id=notification.metadata.id,
-                channel=channel_id,
-                sequence=notification.metadata.sequence or 0,
-                priority=notification.context.priority,
-                timestamp=notification.metadata.timestamp,
-                schema_version=notification.schemaVersion,
-                sender_data=notification.sender.model_dump(mode="json"),
-                context_data=notification.context.model_dump(mode="json"),
-                information=notification.information.model_dump(mode="json"),
-                actions=[a.model_dump(mode="json") for a in notification.actions] if notification.actions else None,
-                visibility=notification.visibility.model_dump(mode="json"),
-                metadata_data=notification.metadata.model_dump(mode="json"),
+            latest = latest_by_channel.get(channel_id)
+            if latest is None:
+                latest = await self._get_cached_latest_sequence(channel_id)
+
+            sequence = notification.metadata.sequence
+            if sequence is None:
+                sequence = latest + 1
+            latest_by_channel[channel_id] = max(latest, sequence)
+            inserted_by_channel[channel_id] = inserted_by_channel.get(channel_id, 0) + 1
+            params.append(stmts.notification_params(notification, sequence))
+
+        if not params:
+            return
+
+        async with self.engine.begin() as conn:
+            # A list of parameter sets runs as a single executemany
+            await conn.execute(
+                stmts.INSERT_NOTIFICATION, params[0] if len(params) == 1 else params
             )
-            session.add(notif_model)
+        await self._count_inserts(latest_by_channel, inserted_by_channel)
 
-            # Commit notification
-            await session.commit()
+    async def append_notification(self, notification: Notification) -> int:
+        """Save a notification under its channel's next sequence number.
 
-            # Enforce LRU cache limit
-            await self._enforce_lru_cache(session, channel_id)
+        The latest sequence is read and the row inserted in one transaction
+        holding the database write lock, so processes sharing the file never
+        assign the same sequence and commit each channel's rows in order.
+
+        Raises:
+            ValueError: If the notification has no channel in its metadata
+        """
+        channel_id = notification.metadata.channel
+        if not channel_id:
+            raise ValueError("Notification metadata must include channel")
+
+        async with self.engine.begin() as conn:
+            await conn.execute(stmts.LOCK_CHANNEL, {"channel_id": channel_id})
+            result = await conn.execute(stmts.SELECT_LATEST_SEQUENCE, {"channel_id": channel_id})
+            sequence = (result.scalar_one() or 0) + 1
+            notification.metadata.sequence = sequence
+            await conn.execute(
+                stmts.INSERT_NOTIFICATION, stmts.notification_params(notification, sequence)
+            )
+        await self._count_inserts({channel_id: sequence}, {channel_id: 1})
+        return sequence
+
+    async def _count_inserts(
+        self, latest_by_channel: dict[str, int], inserted_by_channel: dict[str, int]
+    ) -> None:
+        """Track saved sequences; trim amortized over trim_interval inserts per channel."""
+        for channel_id, latest in latest_by_channel.items():
+            self._latest_sequence[channel_id] = latest
+            inserts = self._inserts_since_trim.get(channel_id, 0)
+            inserts += inserted_by_channel[channel_id]
+            if inserts >= self.trim_interval:
+                await self._trim_history(channel_id)
+                inserts = 0
+            self._inserts_since_trim[channel_id] = inserts
 
     async def get_notifications(
         self, channel_id: str, limit: int = 50, offset: int = 0
     ) -> list[Notification]:
-        """Get notifications for a channel (most recent first)."""
-        async with self.session_factory() as session:
-            stmt = (
-                select(NotificationModel)
-                .where(NotificationModel.channel == channel_id)
-                .order_by(desc(NotificationModel.timestamp))
-                .limit(limit)
-                .offset(offset)
+        """Get notifications for a channel (highest sequence first)."""
+        async with self.read_engine.connect() as conn:
+            result = await conn.execute(
+                stmts.SELECT_NOTIFICATIONS,
+                {
+                    "channel_id": channel_id,
+                    "max_history": self.max_history,
+                    "now": time.time(),
+                    "limit": limit,
+                    "offset": offset,
+                },
             )
-            result = await session.execute(stmt)
-            notif_models = result.scalars().all()
+            rows = result.mappings().all()
+
+        return [stmts.row_to_notification(row) for row in rows]
+
+    async def get_notifications_page(
+        self,
+        channel_id: str,
+        limit: int = 50,
+        before: int | None = None,
+        after: int | None = None,
+    ) -> list[Notification]:
+        """Get a page of a channel's history by sequence cursor, newest first.
 
-            return [self._notification_model_to_pydantic(nm) for nm in notif_models]
+        With an archive, pages continue into archived history: every row
+        still in the hot table is served from it (including rows past
+        max_history awaiting the next trim), and older sequences from the
+        archive segments.
+        """
+        if limit <= 0:
+            return []
+
+        now = time.time()
+        if self.archive is None:
+            return await self._select_page(channel_id, limit, before, after, now)
+
+        keep = self._archive_filter(now)
+        if after is None:
+            page = await self._select_page(channel_id, limit, before, None, now)
+            if len(page) < limit:
+                # Nothing older is left in the hot table; continue below the last row
+                cursor = page[-1].metadata.sequence if page else before
+                documents = await self.archive.read_page(
+                    channel_id, limit - len(page), before=cursor, keep=keep
+                )
+                page.extend(Notification.model_validate(d) for d in documents)
+            return page
+
+        # Forward pages start in the archive, whose sequences all precede the hot table's
+        documents = await self.archive.read_page(
+            channel_id, limit, before=before, after=after, keep=keep
+        )
+        cold = [Notification.model_validate(d) for d in documents]
+        if len(cold) < limit:
+            cursor = cold[0].metadata.sequence if cold else after
+            hot = await self._select_page(channel_id, limit - len(cold), before, cursor, now)
+            return hot + cold
+        return cold
+
+    async def iter_notifications(
+        self,
+        channel_id: str,
+        since: int | None = None,
+        until: int | None = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Notification]:
+        """Stream a channel's history oldest first through a server-side cursor.
+
+        Archived history comes first, a page of ``batch_size`` at a time.
+        The hot table is then read by one SELECT whose rows are fetched
+        ``batch_size`` at a time. It holds a read connection (and its WAL
+        snapshot) until the iteration finishes or the iterator is closed.
+
+        Raises:
+            ValueError: If batch_size is below 1
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+        now = time.time()
+        cursor = stmts.SEQUENCE_MIN if since is None else since
+        before = stmts.SEQUENCE_MAX if until is None else until + 1
+        if self.archive is not None:
+            keep = self._archive_filter(now)
+            while documents := await self.archive.read_page(
+                channel_id, batch_size, before=before, after=cursor, keep=keep
+            ):
+                for document in reversed(documents):
+                    yield Notification.model_validate(document)
+                cursor = documents[0]["metadata"]["sequence"]
+
+        stmt = stmts.SELECT_NOTIFICATIONS_RANGE.execution_options(yield_per=batch_size)
+        async with self.read_engine.connect() as conn:
+            result = await conn.stream(
+                stmt,
+                {
+                    "channel_id": channel_id,
+                    "max_history": stmts.SEQUENCE_MAX if self.archive else self.max_history,
+                    "now": now,
+                    "before": before,
+                    "after": cursor,
+                },
+            )
+            async for rows in result.mappings().partitions():
+                for row in rows:
+                    yield stmts.row_to_notification(row)
+
+    async def search_notifications(
+        self, query: str, channels: list[str] | None = None, limit: int = 20
+    ) -> list[NotificationSearchResult]:
+        """Full-text search via the FTS5 index, ranked by bm25."""
+        match = fts_query(query)
+        if match is None or limit <= 0 or channels == []:
+            return []
+
+        params: dict[str, Any] = {
+            "query": match,
+            "max_history": self.max_history,
+            "now": time.time(),
+            "limit": limit,
+        }
+        if channels is None:
+            stmt = stmts.SEARCH_NOTIFICATIONS
+        else:
+            stmt = stmts.SEARCH_NOTIFICATIONS_IN_CHANNELS
+            params["channels"] = list(channels)
+
+        async with self.read_engine.connect() as conn:
+            result = await conn.execute(stmt, params)
+            rows = result.mappings().all()
+
+        return [
+            NotificationSearchResult(
+                notification=stmts.row_to_notification(row),
+                score=row["score"],
+                snippet=row["snippet"],
+            )
+            for row in rows
+        ]
+
+    async def rebuild_search_index(self) -> None:
+        """Rebuild the full-text index from the notifications table.
+
+        Only needed if the rowids of the notifications table changed, e.g.
+        after a VACUUM.
+        """
+        async with self.engine.begin() as conn:
+            await conn.execute(stmts.FTS_REBUILD)
 
     async def get_notification_count(self, channel_id: str) -> int:
-        """Get total notification count for a channel."""
-        async with self.session_factory() as session:
-            stmt = select(func.count()).select_from(NotificationModel).where(
-                NotificationModel.channel == channel_id
+        """Get total notification count for a channel (excluding expired)."""
+        async with self.read_engine.connect() as conn:
+            result = await conn.execute(
+                stmts.COUNT_NOTIFICATIONS,
+                {"channel_id": channel_id, "max_history": self.max_history, "now": time.time()},
             )
-            result = await session.execute(stmt)
             return result.scalar_one()
 
-    # ========== Private Helper Methods ==========
+    async def get_latest_sequence(self, channel_id: str) -> int:
+        """Get the highest sequence number stored for a channel (0 if none)."""
+        async with self.read_engine.connect() as conn:
+            result = await conn.execute(
+                stmts.SELECT_LATEST_SEQUENCE, {"channel_id": channel_id}
+            )
+            return result.scalar_one() or 0
+
+    async def purge_expired(self, now: float | None = None, batch_size: int = 500) -> int:
+        """Delete up to ``batch_size`` expired notifications in one transaction.
 
-    async def _enforce_lru_cache(self, session: AsyncSession, channel_id: str) -> None:
-        """Enforce LRU cache limit for notifications.
+        Args:
+            now: POSIX time to expire against (defaults to the current time)
+            batch_size: Maximum notifications to delete
 
-        Deletes oldest notifications when limit is exceeded.
+        Returns:
+            Number of notifications deleted
         """
-        # Count notifications for this channel
-        count_stmt = select(func.count()).select_from(NotificationModel).where(
-            NotificationModel.channel == channel_id
-        )
-        result = await session.execute(count_stmt)
-        count = result.scalar_one()
-
-        if count > self.max_history:
-            # Calculate how many to delete
-            to_delete = count - self.max_history
-
-            # Get IDs of oldest notifications
-            oldest_stmt = (
-                select(NotificationModel.id)
-                .where(NotificationModel.channel == channel_id)
-                .order_by(NotificationModel.timestamp)
-                .limit(to_delete)
+        params = {"now": time.time() if now is None else now, "batch_size": batch_size}
+        async with self.engine.begin() as conn:
+            result = await conn.execute(stmts.PURGE_EXPIRED, params)
+        return result.rowcount
+
+    async def reclaim_space(self) -> None:
+        """Return free pages to the OS (only with incremental_vacuum enabled)."""
+        if not self.incremental_vacuum:
+            return
+        async with self.engine.connect() as conn:
+            free_pages = (await conn.exec_driver_sql("PRAGMA freelist_count")).scalar_one()
+            if free_pages:
+                # Each step frees one page. execute() steps a statement without
+                # result columns only once, executescript() runs it to completion.
+                raw = await conn.get_raw_connection()
+                driver = raw.driver_connection
+                if driver is None:
+                    raise RuntimeError("SQLite connection is closed")
+                await driver.executescript("PRAGMA incremental_vacuum")
+        if free_pages:
+            logger.info(f"Reclaimed {free_pages} free pages from {self.db_path}")
+
+    # ========== Change Feed ==========
+
+    async def get_max_rowid(self) -> int:
+        """Largest notification rowid (0 if none), the change feed's watermark."""
+        async with self.read_engine.connect() as conn:
+            result = await conn.execute(stmts.SELECT_MAX_ROWID)
+            return result.scalar_one() or 0
+
+    async def get_notifications_since_rowid(self, after: int, limit: int = 500) -> RowidBatch:
+        """Notifications inserted after a rowid, in insert order (excluding expired).
+
+        Reads up to ``limit`` rows; expired ones count toward it but are
+        left out, so continuing from ``last_rowid`` never reads them again.
+        """
+        async with self.read_engine.connect() as conn:
+            result = await conn.execute(
+                stmts.SELECT_NOTIFICATIONS_SINCE, {"after": after, "limit": limit}
             )
-            result = await session.execute(oldest_stmt)
-            old_ids = [row[0] for row in result.all()]
+            rows = result.mappings().all()
+
+        now = time.time()
+        return RowidBatch(
+            notifications=[
+                stmts.row_to_notification(row)
+                for row in rows
+                if not is_expired(row["expires_at"], now)
+            ],
+            last_rowid=rows[-1]["row_id"] if rows else after,
+        )
+
+    # ========== Backup ==========
+
+    async def backup(
+        self,
+        destination: str | Path,
+        pages: int = 1024,
+        sleep: float = 0.05,
+        max_restarts: int = 3,
+    ) -> BackupStats:
+        """Write a consistent copy of the live database to ``destination``.
+
+        Runs SQLite's online backup API on its own read-only connection in
+        a worker thread, copying ``pages`` pages per step and sleeping
+        ``sleep`` seconds between steps, so neither the event loop nor the
+        writer connection is held. The copy is written next to the
+        destination and renamed into place once it passes a quick check.
+
+        A write from another connection restarts a stepped backup. After
+        ``max_restarts`` restarts the rest is copied in one step, which
+        under WAL only holds a read snapshot and does not block writers.
+
+        The archive directory, if any, is not included.
+
+        Args:
+            destination: Path of the backup file (replaced if it exists)
+            pages: Pages copied per step
+            sleep: Seconds to sleep between steps
+            max_restarts: Restarts tolerated before copying in one step
 
-            # Delete them
-            if old_ids:
-                delete_stmt = delete(NotificationModel).where(NotificationModel.id.in_(old_ids))
-                await session.execute(delete_stmt)
-                await session.commit()
+        Returns:
+            Pages copied, restarts and elapsed seconds
 
+        Raises:
+            ValueError: If pages is below 1
+            sqlite3.DatabaseError: If the copy fails its integrity check
+        """
+        if pages < 1:
+            raise ValueError(f"pages must be at least 1, got {pages}")
+
+        destination = Path(destination).expanduser()
+        stats = await asyncio.to_thread(
+            self._run_backup, destination, pages, sleep, max_restarts
+        )
+        logger.info(
+            f"Backup written: {destination} ({stats.pages} pages, {stats.restarts} restarts, "
+            f"{stats.elapsed:.2f}s)"
+        )
+        return stats
+
+    def _run_backup(
+        self, destination: Path, pages: int, sleep: float, max_restarts: int
+    ) -> BackupStats:
+        """Blocking body of backup(); runs in a worker thread."""
+        started = time.perf_counter()
+        tmp_path = destination.with_name(destination.name + ".tmp")
+        tmp_path.unlink(missing_ok=True)
+
+        busy_timeout = int(self.pragmas.get("busy_timeout", 5000)) / 1000
+        source = sqlite3.connect(
+            f"file:{self.db_path}?mode=ro", uri=True, timeout=busy_timeout
+        )
+        target = sqlite3.connect(tmp_path)
+        # Same pragmas as the server's connections, so settings such as a key
+        # or cache size apply to the copy as well
+        self._apply_pragmas(source, read_only=True)
+        self._apply_pragmas(target)
+        restarts = 0
+        remaining_before: int | None = None
+        total_pages = 0
+
+        def progress(status: int, remaining: int, total: int) -> None:
+            nonlocal restarts, remaining_before, total_pages
+            total_pages = total
+            # Remaining pages only go up when SQLite restarted the copy
+            if remaining_before is not None and remaining > remaining_before:
+                restarts += 1
+                if restarts > max_restarts:
+                    raise _BackupRestartedError
+            remaining_before = remaining
+
+        try:
+            try:
+                source.backup(target, pages=pages, progress=progress, sleep=sleep)
+            except _BackupRestartedError:
                 logger.info(
-                    f"LRU cache: deleted {len(old_ids)} old notifications from channel {channel_id}"
+                    f"Backup restarted {restarts} times by concurrent writes; "
+                    "copying the rest in one step"
                 )
+                source.backup(target)
+                total_pages = target.execute("PRAGMA page_count").fetchone()[0]
+
+            result = target.execute("PRAGMA quick_check").fetchone()[0]
+            if result != "ok":
+                raise sqlite3.DatabaseError(f"Backup failed integrity check: {result}")
+            # The copy inherits WAL mode; fold it into a single self-contained file
+            target.execute("PRAGMA journal_mode=DELETE")
+        except BaseException:
+            target.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        finally:
+            target.close()
+            source.close()
+
+        os.replace(tmp_path, destination)
+        return BackupStats(destination, total_pages, restarts, time.perf_counter() - started)
 
-    def _channel_model_to_pydantic(self, model: ChannelModel) -> Channel:
-        """Convert SQLAlchemy ChannelModel to Pydantic Channel."""
-        return Channel(
-            id=model.id,
-            name=model.name,
-            description=model.description,
-            createdAt=model.created_at,
-            createdBy=model.created_by,
-            permissions=ChannelPermissions(**model.permissions) if model.permissions else ChannelPermissions(),
-            metadata=model.channel_metadata or {},
-            subscriberCount=model.subscriber_count,
-            notificationCount=model.notification_count,
-            lastNotificationAt=model.last_notification_at,
-        )
+    # ========== Private Helper Methods ==========
 
-    def _subscription_model_to_pydantic(self, model: SubscriptionModel) -> Subscription:
-        """Convert SQLAlchemy SubscriptionModel to Pydantic Subscription."""
-        return Subscription(
-            id=model.id,
-            clientId=model.client_id,
-            channel=model.channel,
-            subscribedAt=model.subscribed_at,
-            filters=SubscriptionFilter(**model.filters) if model.filters else SubscriptionFilter(),
-        )
+    async def _select_page(
+        self,
+        channel_id: str,
+        limit: int,
+        before: int | None,
+        after: int | None,
+        now: float,
+    ) -> list[Notification]:
+        """Keyset page over the hot table, newest first."""
+        if after is None:
+            stmt = stmts.SELECT_NOTIFICATIONS_BEFORE
+        else:
+            stmt = stmts.SELECT_NOTIFICATIONS_AFTER
+        async with self.read_engine.connect() as conn:
+            result = await conn.execute(
+                stmt,
+                {
+                    "channel_id": channel_id,
+                    # Rows past the window are archived on the next trim, so with
+                    # an archive they are still part of the history
+                    "max_history": stmts.SEQUENCE_MAX if self.archive else self.max_history,
+                    "now": now,
+                    "before": stmts.SEQUENCE_MAX if before is None else before,
+                    "after": stmts.SEQUENCE_MIN if after is None else after,
+                    "limit": limit,
+                },
+            )
+            rows = result.mappings().all()
+
+        notifications = [stmts.row_to_notification(row) for row in rows]
+        if after is not None:
+            notifications.reverse()
+        return notifications
+
+    @staticmethod
+    def _archive_filter(now: float) -> Callable[[dict[str, Any]], bool]:
+        """Predicate excluding archived documents whose validity has passed."""
+
+        def keep(document: dict[str, Any]) -> bool:
+            validity = document["context"].get("validity")
+            if validity is None:
+                return True
+            return not is_expired(expiry_timestamp(datetime.fromisoformat(validity)), now)
+
+        return keep
+
+    async def _select_subscriptions(
+        self, stmt: Any, params: dict[str, Any]
+    ) -> list[Subscription]:
+        """Run a prebuilt subscription SELECT and convert the rows."""
+        async with self.read_engine.connect() as conn:
+            result = await conn.execute(stmt, params)
+            rows = result.mappings().all()
+
+        return [stmts.row_to_subscription(row) for row in rows]
+
+    async def _get_cached_latest_sequence(self, channel_id: str) -> int:
+        """Latest sequence for a channel, loaded from the database once."""
+        latest = self._latest_sequence.get(channel_id)
+        if latest is None:
+            latest = await self.get_latest_sequence(channel_id)
+            self._latest_sequence[channel_id] = latest
+        return latest
+
+    async def _trim_history(self, channel_id: str) -> None:
+        """Delete notifications at or below the sequence watermark.
+
+        Single indexed DELETE on (channel, sequence); sequences are assigned
+        per channel in publish order, so this keeps the latest max_history.
+        With an archive, the rows are durably appended to it first.
+        """
+        watermark = self._latest_sequence.get(channel_id, 0) - self.max_history
+        if watermark < 0:
+            return
 
-    def _notification_model_to_pydantic(self, model: NotificationModel) -> Notification:
-        """Convert SQLAlchemy NotificationModel to Pydantic Notification."""
-        return Notification(
-            schemaVersion=model.schema_version,
-            sender=Sender(**model.sender_data),
-            context=Context(**model.context_data),
-            information=Information(**model.information),
-            actions=[Action(**a) for a in model.actions] if model.actions else [],
-            visibility=Visibility(**model.visibility),
-            metadata=Metadata(**model.metadata_data),
-        )
+        if self.archive is not None:
+            await self._archive_history(self.archive, channel_id, watermark)
+
+        async with self.engine.begin() as conn:
+            result = await conn.execute(
+                stmts.TRIM_NOTIFICATIONS, {"channel_id": channel_id, "watermark": watermark}
+            )
+
+        if result.rowcount:
+            logger.info(
+                f"History trim: deleted {result.rowcount} old notifications "
+                f"from channel {channel_id}"
+            )
+
+    async def _archive_history(
+        self, archive: SegmentArchive, channel_id: str, watermark: int
+    ) -> None:
+        """Append rows at or below the watermark to the archive, oldest first.
+
+        Rows already archived (a crash between append and DELETE) are
+        skipped by starting above the archive's last sequence.
+        """
+        while True:
+            archived = archive.last_sequence(channel_id)
+            async with self.engine.connect() as conn:
+                result = await conn.execute(
+                    stmts.SELECT_ARCHIVABLE,
+                    {
+                        "channel_id": channel_id,
+                        "archived": archived,
+                        "watermark": watermark,
+                        "limit": _ARCHIVE_BATCH,
+                    },
+                )
+                rows = result.mappings().all()
+            await archive.append(channel_id, [stmts.row_to_document(row) for row in rows])
+            if len(rows) < _ARCHIVE_BATCH:
+                return
+
+
+def _chunks(ids: list[str]) -> list[list[str]]:
+    """Split IDs into lists small enough to bind in one IN clause."""
+    return [ids[i : i + stmts.MAX_IN_PARAMS] for i in range(0, len(ids), stmts.MAX_IN_PARAMS)]
@@ -0,0 +1,181 @@
+"""Streaming NDJSON export and import between storage backends.
+
+Exports use the memory journal's line format, ``{"op": ..., "data": ...}``,
+behind a ``{"version": ...}`` header line, so a memory storage snapshot is
+itself an importable export. Channels come first, then each channel's
+subscriptions and notifications (oldest first).
+
+Both directions stream: notifications are read with keyset pages of
+``page_size`` and written with ``save_notifications`` in batches of
+``batch_size``, so memory use depends on those sizes, not on the size of
+the store. Files ending in ``.gz`` are gzip-compressed; imports detect
+compression from the file contents.
+"""
+
+import gzip
+import json
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from ..core.storage_adapter import StorageAdapter
+from ..models import Channel, Notification, Subscription
+from .journal import SNAPSHOT_FORMAT_VERSION, encode_entry
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+@dataclass
+class TransferStats:
+    """Row counts and timing for an export or import."""
+
+    channels: int = 0
+    subscriptions: int = 0
+    notifications: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    elapsed: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        """Total rows transferred."""
+        return self.channels + self.subscriptions + self.notifications
+
+    @property
+    def rows_per_second(self) -> float:
+        """Throughput over the whole transfer."""
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def finish(self) -> "TransferStats":
+        """Record the elapsed time."""
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+
+async def export_lines(
+    storage: StorageAdapter, page_size: int = 1000, stats: TransferStats | None = None
+) -> AsyncIterator[str]:
+    """Yield the contents of a store as encoded NDJSON lines.
+
+    Args:
+        storage: Storage to read from
+        page_size: Notifications read per keyset page
+        stats: Optional counters updated as lines are produced
+    """
+    stats = stats if stats is not None else TransferStats()
+    header = {"version": SNAPSHOT_FORMAT_VERSION, "exported_at": datetime.now().isoformat()}
+    yield json.dumps(header) + "\n"
+
+    channels = await storage.list_channels()
+    for channel in channels:
+        stats.channels += 1
+        yield encode_entry("save_channel", channel.model_dump_json())
+
+    for channel in channels:
+        # One channel's subscriptions at a time, so memory does not grow with the total
+        for subscription in await storage.get_subscriptions_by_channel(channel.id):
+            stats.subscriptions += 1
+            yield encode_entry("save_subscription", subscription.model_dump_json())
+
+        cursor = 0
+        while page := await storage.get_notifications_page(
+            channel.id, limit=page_size, after=cursor
+        ):
+            for notification in reversed(page):
+                yield encode_entry("save_notification", notification.model_dump_json())
+            stats.notifications += len(page)
+            cursor = page[0].metadata.sequence or cursor
+
+
+async def import_lines(
+    storage: StorageAdapter, lines: Iterable[bytes | str], batch_size: int = 5000
+) -> TransferStats:
+    """Load NDJSON lines produced by ``export_lines`` into a store.
+
+    Notifications and subscriptions are buffered and written with
+    ``save_notifications`` and ``save_subscriptions`` in batches of
+    ``batch_size``, each in a single transaction where the backend supports
+    it.
+
+    Raises:
+        ValueError: If the header version is unsupported or a line has an unknown op
+    """
+    stats = TransferStats()
+    batch: list[Notification] = []
+    subscriptions: list[Subscription] = []
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        op = entry.get("op")
+        if op is None and number == 1:
+            version = entry.get("version")
+            if version != SNAPSHOT_FORMAT_VERSION:
+                raise ValueError(f"Unsupported export format version: {version}")
+        elif op == "save_notification":
+            batch.append(Notification.model_validate(entry["data"]))
+            if len(batch) >= batch_size:
+                await storage.save_notifications(batch)
+                stats.notifications += len(batch)
+                batch = []
+        elif op == "save_channel":
+            await storage.save_channel(Channel.model_validate(entry["data"]))
+            stats.channels += 1
+        elif op == "save_subscription":
+            subscriptions.append(Subscription.model_validate(entry["data"]))
+            if len(subscriptions) >= batch_size:
+                await storage.save_subscriptions(subscriptions)
+                stats.subscriptions += len(subscriptions)
+                subscriptions = []
+        else:
+            raise ValueError(f"Unknown entry on line {number}: {op}")
+
+    if subscriptions:
+        await storage.save_subscriptions(subscriptions)
+        stats.subscriptions += len(subscriptions)
+    if batch:
+        await storage.save_notifications(batch)
+        stats.notifications += len(batch)
+    return stats.finish()
+
+
+async def export_file(
+    storage: StorageAdapter, path: str | Path, page_size: int = 1000
+) -> TransferStats:
+    """Export a store to an NDJSON file (gzip-compressed if it ends in ``.gz``)."""
+    path = Path(path).expanduser()
+    stats = TransferStats()
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        chunk: list[str] = []
+        async for line in export_lines(storage, page_size, stats):
+            chunk.append(line)
+            if len(chunk) >= page_size:
+                f.writelines(chunk)
+                chunk = []
+        f.writelines(chunk)
+    return stats.finish()
+
+
+async def import_file(
+    storage: StorageAdapter, path: str | Path, batch_size: int = 5000
+) -> TransferStats:
+    """Import an NDJSON export (plain or gzip-compressed) into a store."""
+    with _open_lines(Path(path).expanduser()) as lines:
+        return await import_lines(storage, lines, batch_size)
+
+
+@contextmanager
+def _open_lines(path: Path) -> Iterator[Iterator[bytes]]:
+    """Open an export for line-by-line reading, detecting gzip by its magic bytes."""
+    with open(path, "rb") as raw:
+        compressed = raw.read(2) == _GZIP_MAGIC
+        raw.seek(0)
+        if compressed:
+            with gzip.GzipFile(fileobj=raw) as f:
+                yield iter(f)
+        else:
+            yield iter(raw)
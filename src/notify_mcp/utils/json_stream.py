@@ -0,0 +1,41 @@
+"""Incremental JSON encoding of model streams."""
+
+from collections.abc import AsyncIterable, AsyncIterator
+
+from pydantic import BaseModel
+
+
+async def iter_json_array(
+    items: AsyncIterable[BaseModel], indent: int | None = 2
+) -> AsyncIterator[str]:
+    """Encode a stream of models as a JSON array, one chunk per item.
+
+    Each model is serialized as soon as it arrives and can be dropped
+    before the next one is read, so only the output (or nothing, if the
+    chunks are written straight to a file or socket) grows with the length
+    of the stream. ``None`` values are left out; with an ``indent`` the
+    layout is the same as ``json.dumps`` of the dumped models.
+
+    Args:
+        items: Models to encode, in order
+        indent: Indentation width, or None for compact output
+
+    Yields:
+        Consecutive pieces of the JSON document
+    """
+    separator = ",\n" if indent is not None else ","
+    opening = "[\n" if indent is not None else "["
+    pad = " " * (indent or 0)
+    first = True
+    async for item in items:
+        encoded = item.model_dump_json(exclude_none=True, indent=indent)
+        if pad:
+            # String values escape their newlines, so every raw newline is structural
+            encoded = pad + encoded.replace("\n", "\n" + pad)
+        yield (opening if first else separator) + encoded
+        first = False
+
+    if first:
+        yield "[]"
+    else:
+        yield "\n]" if indent is not None else "]"
@@ -0,0 +1,206 @@
+"""Full-text search helpers shared by the storage backends.
+
+``SQLiteStorage`` searches with an FTS5 virtual table; ``InMemoryStorage``
+and the ``StorageAdapter`` default fall back to ``InvertedIndex``. Both
+tokenize the same way (case-insensitive runs of letters and digits, like
+FTS5's ``unicode61`` tokenizer) and require every query term to match, so a
+query finds the same notifications on either backend. Scores are only
+comparable within one backend: higher is more relevant.
+"""
+
+import math
+import re
+from collections.abc import Callable, Hashable, Iterable
+from typing import Generic, NamedTuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# Matches on a title weigh more than matches on a body (FTS5 bm25 weights too)
+TITLE_WEIGHT = 2.0
+BODY_WEIGHT = 1.0
+
+# Approximate bytes per posting besides its term (key reference and weight),
+# for memory-budget accounting
+POSTING_SIZE = 16
+
+SNIPPET_TOKENS = 12
+SNIPPET_START = "["
+SNIPPET_END = "]"
+SNIPPET_ELLIPSIS = "…"
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase search terms."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def fts_query(query: str) -> str | None:
+    """Build an FTS5 MATCH expression requiring every term of a free-text query.
+
+    Each term is quoted, so FTS5 operators and punctuation in the query are
+    treated as plain text.
+
+    Returns:
+        MATCH expression, or None if the query has no searchable terms
+    """
+    terms = tokenize(query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def make_snippet(text: str, terms: Iterable[str], width: int = SNIPPET_TOKENS) -> str:
+    """Extract up to ``width`` tokens around the first match, marking matched terms.
+
+    Mirrors FTS5's ``snippet()`` output so both backends format hits alike.
+    """
+    wanted = set(terms)
+    tokens = list(_TOKEN_PATTERN.finditer(text))
+    if not tokens:
+        return text
+
+    first = next((i for i, m in enumerate(tokens) if m.group().lower() in wanted), 0)
+    start = max(0, min(first - width // 2, len(tokens) - width))
+    window = tokens[start : start + width]
+
+    parts = [SNIPPET_ELLIPSIS] if start > 0 else []
+    cursor = window[0].start()
+    for match in window:
+        parts.append(text[cursor : match.start()])
+        if match.group().lower() in wanted:
+            parts.append(f"{SNIPPET_START}{match.group()}{SNIPPET_END}")
+        else:
+            parts.append(match.group())
+        cursor = match.end()
+    if start + width < len(tokens):
+        parts.append(SNIPPET_ELLIPSIS)
+    return "".join(parts)
+
+
+class SearchHit(NamedTuple, Generic[K]):
+    """One ranked match from an InvertedIndex."""
+
+    key: K
+    score: float
+    snippet: str
+
+
+class _Document(NamedTuple):
+    channel: str
+    sequence: int
+    weights: dict[str, float]
+
+
+class InvertedIndex(Generic[K]):
+    """In-process inverted index over notification titles and bodies.
+
+    Documents are identified by an opaque hashable key (``InMemoryStorage``
+    uses the stored record itself). Postings map each term to the keys
+    containing it with a title/body-weighted term frequency; ranking is
+    TF-IDF, ties broken by newest sequence. The index keeps no text of its
+    own: snippets are cut from the title and body returned by ``text``.
+    """
+
+    def __init__(self, text: Callable[[K], tuple[str, str]]) -> None:
+        """Initialize index.
+
+        Args:
+            text: Returns the (title, body) of an indexed key
+        """
+        self._text = text
+        self._postings: dict[str, dict[K, float]] = {}
+        self._documents: dict[K, _Document] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    @property
+    def size(self) -> int:
+        """Approximate bytes held by the postings (terms, key references, weights)."""
+        return self._size
+
+    def add(self, key: K, channel: str, sequence: int, title: str, body: str) -> None:
+        """Index a document, replacing any previous entry for the key."""
+        self.remove(key)
+
+        weights: dict[str, float] = {}
+        for term in tokenize(title):
+            weights[term] = weights.get(term, 0.0) + TITLE_WEIGHT
+        for term in tokenize(body):
+            weights[term] = weights.get(term, 0.0) + BODY_WEIGHT
+
+        self._documents[key] = _Document(channel, sequence, weights)
+        for term, weight in weights.items():
+            self._postings.setdefault(term, {})[key] = weight
+            self._size += len(term) + POSTING_SIZE
+
+    def remove(self, key: K) -> None:
+        """Drop a document from the index (no-op if absent)."""
+        document = self._documents.pop(key, None)
+        if document is None:
+            return
+        for term in document.weights:
+            self._size -= len(term) + POSTING_SIZE
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+
+    def search(
+        self,
+        query: str,
+        channels: Iterable[str] | None = None,
+        limit: int = 20,
+        accept: Callable[[K], bool] | None = None,
+    ) -> list[SearchHit[K]]:
+        """Return the best matches containing every query term.
+
+        Args:
+            query: Free-text query
+            channels: Restrict matches to these channels (None = all)
+            limit: Maximum number of hits
+            accept: Optional predicate a key must pass (e.g. not expired)
+
+        Returns:
+            Hits ordered by descending score
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+
+        postings = []
+        for term in terms:
+            keys = self._postings.get(term)
+            if keys is None:
+                return []
+            postings.append(keys)
+        postings.sort(key=len)
+        smallest, others = postings[0], postings[1:]
+
+        allowed = set(channels) if channels is not None else None
+        total = len(self._documents)
+        idf = {term: math.log(1 + total / len(self._postings[term])) for term in terms}
+
+        scored = []
+        for key in smallest:
+            if not all(key in keys for keys in others):
+                continue
+            document = self._documents[key]
+            if allowed is not None and document.channel not in allowed:
+                continue
+            if accept is not None and not accept(key):
+                continue
+            score = sum(document.weights[term] * idf[term] for term in terms)
+            scored.append((score, document.sequence, key))
+
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        hits = []
+        for score, _, key in scored[:limit]:
+            title, body = self._text(key)
+            text = body if set(tokenize(body)).intersection(terms) else title
+            hits.append(SearchHit(key, score, make_snippet(text, terms)))
+        return hits
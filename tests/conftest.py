@@ -0,0 +1,63 @@
+"""Helpers shared by the test modules."""
+
+from datetime import datetime, timedelta
+
+from notify_mcp.models import Context, Information, Metadata, Notification, Sender
+
+# Timestamp of notification 0; make_notification(i) is i seconds later
+EPOCH = datetime(2025, 1, 1)
+
+
+def make_notification(
+    i: int,
+    channel: str = "ops",
+    *,
+    title: str | None = None,
+    body: str = "Body",
+    theme: str = "info",
+    priority: str = "medium",
+    tags: list[str] | None = None,
+    validity: datetime | None = None,
+    base: datetime = EPOCH,
+    sequence: int | None = None,
+) -> Notification:
+    """Build notification ``i`` of a channel.
+
+    Args:
+        i: Number used for the ID (``<channel>-<i>``), default title and sequence
+        channel: Channel ID
+        title: Title (default ``Title <i>``)
+        body: Body text
+        theme: Context theme
+        priority: Context priority
+        tags: Context tags
+        validity: Expiry deadline
+        base: Timestamp of notification 0; the timestamp increases with ``i``
+        sequence: Sequence number (default ``i``)
+    """
+    return Notification(
+        sender=Sender(id="user", name="User", role="dev"),
+        context=Context(theme=theme, priority=priority, tags=tags or [], validity=validity),
+        information=Information(title=f"Title {i}" if title is None else title, body=body),
+        metadata=Metadata(
+            id=f"{channel}-{i}",
+            timestamp=base + timedelta(seconds=i),
+            channel=channel,
+            sequence=i if sequence is None else sequence,
+        ),
+    )
+
+
+class FakeClock:
+    """Manually advanced monotonic clock.
+
+    With a ``step``, every reading also advances the clock by that much.
+    """
+
+    def __init__(self, now: float = 0.0, step: float = 0.0) -> None:
+        self.now = now
+        self.step = step
+
+    def __call__(self) -> float:
+        self.now += self.step
+        return self.now
@@ -0,0 +1,240 @@
+"""Tests for the cross-process change feed."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from notify_mcp.core.channel_manager import ChannelManager
+from notify_mcp.core.notification_router import NotificationRouter
+from notify_mcp.core.subscription_manager import SubscriptionManager
+from notify_mcp.models import Channel, Notification
+from notify_mcp.server import NotifyMCPServer
+from notify_mcp.storage.caching import CachingStorageAdapter
+from notify_mcp.storage.change_feed import SQLiteChangeFeed, create_change_feed
+from notify_mcp.storage.memory import InMemoryStorage
+from notify_mcp.storage.sqlite_sharded import ShardedSQLiteStorage
+from notify_mcp.storage.sqlite_storage import SQLiteStorage
+from tests.conftest import make_notification
+
+
+async def open_pair(storage_class, path, **kwargs):
+    """Two stores on the same database, standing in for two server processes."""
+    stores = [storage_class(db_path=str(path), **kwargs) for _ in range(2)]
+    for store in stores:
+        await store.initialize()
+    for channel_id in ("ops", "dev"):
+        await stores[0].save_channel(
+            Channel(id=channel_id, name=channel_id, createdAt=datetime.now(), createdBy="u")
+        )
+    return stores
+
+
+class Received:
+    """Change feed callback collecting notification IDs."""
+
+    def __init__(self):
+        self.ids: list[str] = []
+
+    async def __call__(self, notifications: list[Notification]) -> None:
+        self.ids.extend(n.metadata.id for n in notifications)
+
+
+class TestSQLiteChangeFeed:
+    """Test the SQLite rowid-watermark change feed."""
+
+    async def test_delivers_only_other_processes_notifications(self, tmp_path):
+        """Test that remote saves are delivered in order and local ones skipped."""
+        publisher, listener = await open_pair(SQLiteStorage, tmp_path / "shared.db")
+        await publisher.save_notification(make_notification(1))
+
+        feed = create_change_feed(listener)
+        received = Received()
+        await feed.start(received)
+        await feed.stop()  # Driven by poll() below
+
+        await publisher.save_notifications([make_notification(i) for i in (2, 3)])
+        local = make_notification(4)
+        feed.mark_local([local])
+        await listener.save_notification(local)
+        await publisher.save_notification(make_notification(1, channel="dev"))
+
+        assert await feed.poll() == 4
+        assert received.ids == ["ops-2", "ops-3", "dev-1"]
+        assert await feed.poll() == 0
+
+        for store in (publisher, listener):
+            await store.close()
+
+    async def test_cursor_moves_past_expired_rows(self, tmp_path, monkeypatch):
+        """Test that trailing expired rows are read once, not on every poll."""
+        publisher, listener = await open_pair(SQLiteStorage, tmp_path / "shared.db")
+        feed = create_change_feed(listener)
+        feed.batch_size = 2
+        received = Received()
+        await feed.start(received)
+        await feed.stop()
+
+        past = datetime.now() - timedelta(minutes=1)
+        await publisher.save_notifications(
+            [make_notification(1), make_notification(2, validity=past)]
+            + [make_notification(i, validity=past) for i in range(3, 6)]
+        )
+        reads = []
+        original = listener.get_notifications_since_rowid
+
+        async def spy(after, limit=500):
+            reads.append(after)
+            return await original(after, limit)
+
+        monkeypatch.setattr(listener, "get_notifications_since_rowid", spy)
+        assert await feed.poll() == 1
+        assert received.ids == ["ops-1"]
+        assert feed._cursors == [await listener.get_max_rowid()]
+
+        reads.clear()
+        assert await feed.poll() == 0
+        assert reads == []
+
+        for store in (publisher, listener):
+            await store.close()
+
+    async def test_appends_get_unique_sequences(self, tmp_path):
+        """Test that concurrent appends from two processes never share a sequence."""
+        first, second = await open_pair(SQLiteStorage, tmp_path / "shared.db")
+        await first.save_notification(make_notification(1))
+
+        notifications = [make_notification(i) for i in range(2, 42)]
+        for notification in notifications:
+            notification.metadata.sequence = None
+        sequences = await asyncio.gather(
+            *(
+                (first, second)[i % 2].append_notification(notification)
+                for i, notification in enumerate(notifications)
+            )
+        )
+
+        assert sorted(sequences) == list(range(2, 42))
+        assert [n.metadata.sequence for n in notifications] == sequences
+        assert await second.get_latest_sequence("ops") == 41
+
+        for store in (first, second):
+            await store.close()
+
+    async def test_background_polling(self, tmp_path):
+        """Test that the started feed picks up a remote save by itself."""
+        publisher, listener = await open_pair(SQLiteStorage, tmp_path / "shared.db")
+        delivered = asyncio.Event()
+
+        async def callback(notifications):
+            delivered.set()
+
+        feed = create_change_feed(listener, poll_interval=0.01)
+        await feed.start(callback)
+        await publisher.save_notification(make_notification(1))
+        await asyncio.wait_for(delivered.wait(), timeout=2.0)
+        await feed.stop()
+
+        for store in (publisher, listener):
+            await store.close()
+
+    async def test_sharded_store(self, tmp_path):
+        """Test that every shard is watched."""
+        publisher, listener = await open_pair(ShardedSQLiteStorage, tmp_path / "s.db", shards=2)
+        feed = create_change_feed(CachingStorageAdapter(listener))
+        assert isinstance(feed, SQLiteChangeFeed) and len(feed.shards) == 2
+
+        received = Received()
+        await feed.start(received)
+        await feed.stop()
+        await publisher.save_notifications(
+            [make_notification(1, "ops"), make_notification(1, "dev")]
+        )
+        await feed.poll()
+        assert sorted(received.ids) == ["dev-1", "ops-1"]
+
+        for store in (publisher, listener):
+            await store.close()
+
+    async def test_watermark_moves_back_after_delete(self, tmp_path):
+        """Test that the feed resyncs when the newest rows are deleted."""
+        publisher, listener = await open_pair(SQLiteStorage, tmp_path / "shared.db")
+        await publisher.save_notifications([make_notification(i, "dev") for i in (1, 2, 3)])
+
+        received = Received()
+        feed = create_change_feed(listener)
+        await feed.start(received)
+        await feed.stop()
+
+        await publisher.delete_channel("dev")
+        await feed.poll()
+        await publisher.save_notification(make_notification(1))
+        await feed.poll()
+        assert received.ids == ["ops-1"]
+
+        for store in (publisher, listener):
+            await store.close()
+
+    def test_requires_shared_storage(self):
+        """Test that process-private storage has no change feed."""
+        with pytest.raises(ValueError):
+            create_change_feed(CachingStorageAdapter(InMemoryStorage()))
+
+
+class TestRemoteNotifications:
+    """Test how the server handles notifications from other processes."""
+
+    async def test_cache_and_routing(self):
+        """Test that remote notifications update the cache and are routed."""
+        server = NotifyMCPServer()
+        backend = InMemoryStorage()
+        server.storage = CachingStorageAdapter(backend, tail_size=10)
+        server.subscription_manager = SubscriptionManager(server.storage)
+        server.router = NotificationRouter(server.storage, server.subscription_manager)
+        await server.storage.save_channel(
+            Channel(id="ops", name="ops", createdAt=datetime.now(), createdBy="u")
+        )
+        await server.subscription_manager.subscribe("client", "ops")
+        delivered = []
+
+        async def deliver(client_id, notification):
+            delivered.append((client_id, notification.metadata.id))
+
+        server.router.set_notification_callback(deliver)
+
+        await backend.save_notification(make_notification(1))
+        await server.storage.get_notifications_page("ops")  # Load the cached tail
+        assert (await server.storage.get_channel("ops")).notificationCount == 0
+
+        # Another process saved sequences 2 and 3 and bumped the channel stats
+        remote = [make_notification(i) for i in (2, 3)]
+        await backend.save_notifications(remote)
+        await backend.record_channel_notification("ops", datetime.now(), count=2)
+        await server._on_remote_notifications(remote)
+
+        assert (await server.storage.get_channel("ops")).notificationCount == 2
+        page = await server.storage.get_notifications_page("ops")
+        assert [n.metadata.id for n in page] == ["ops-3", "ops-2", "ops-1"]
+        assert delivered == [("client", "ops-2"), ("client", "ops-3")]
+
+    async def test_publishes_numbered_by_the_store(self, tmp_path):
+        """Test that servers sharing a store never give out the same sequence."""
+        servers = []
+        for storage in await open_pair(SQLiteStorage, tmp_path / "shared.db"):
+            server = NotifyMCPServer()
+            server.storage = storage
+            server.subscription_manager = SubscriptionManager(storage)
+            server.channel_manager = ChannelManager(storage)
+            server.router = NotificationRouter(storage, server.subscription_manager)
+            server.change_feed = create_change_feed(storage)
+            servers.append(server)
+
+        for i in range(4):
+            await servers[i % 2]._publish_notification(
+                {"channel": "ops", "title": f"Title {i}", "body": "Body"}
+            )
+
+        page = await servers[0].storage.get_notifications_page("ops")
+        assert [n.metadata.sequence for n in page] == [4, 3, 2, 1]
+        for server in servers:
+            await server.storage.close()
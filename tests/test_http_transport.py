@@ -1,11 +1,40 @@
 """Tests for HTTP transport functionality."""
 
 import asyncio
+from datetime import datetime
 
 import pytest
+from mcp.server.lowlevel.server import request_ctx
+from mcp.shared.context import RequestContext
+from mcp.types import CallToolRequest, CallToolRequestParams
+from starlette.requests import Request
 
 from notify_mcp.config.transport_config import TransportSettings
+from notify_mcp.core.subscription_manager import SubscriptionManager
+from notify_mcp.models import Channel
 from notify_mcp.server import NotifyMCPServer
+from notify_mcp.storage.memory import InMemoryStorage
+
+
+def http_context(headers: dict[str, str]) -> RequestContext:
+    """MCP request context of an HTTP request carrying the given headers."""
+    raw = [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+    request = Request({"type": "http", "method": "POST", "path": "/mcp", "headers": raw})
+    return RequestContext(
+        request_id=1, meta=None, session=None, lifespan_context=None, request=request
+    )
+
+
+async def call_tool_as(server: NotifyMCPServer, headers: dict[str, str], name: str, args: dict):
+    """Call a tool through the MCP handler, inside an HTTP request context."""
+    token = request_ctx.set(http_context(headers))
+    try:
+        handler = server.server.request_handlers[CallToolRequest]
+        return await handler(
+            CallToolRequest(params=CallToolRequestParams(name=name, arguments=args))
+        )
+    finally:
+        request_ctx.reset(token)
 
 
 class TestHTTPTransport:
@@ -89,3 +118,60 @@ class TestHTTPTransport:
             assert Route is not None
         except ImportError as e:
             pytest.fail(f"Failed to import HTTP server dependencies: {e}")
+
+
+class TestClientIdentity:
+    """Test per-request client identity for HTTP sessions."""
+
+    @pytest.fixture
+    async def server(self):
+        server = NotifyMCPServer()
+        server.storage = InMemoryStorage()
+        server.subscription_manager = SubscriptionManager(server.storage)
+        for channel_id in ("ops", "dev"):
+            await server.storage.save_channel(
+                Channel(id=channel_id, name=channel_id, createdAt=datetime.now(), createdBy="u")
+            )
+        return server
+
+    async def test_identity_from_session_and_header(self, server):
+        """Test session IDs, the configured header and Authorization hashing."""
+        token = request_ctx.set(http_context({"Mcp-Session-Id": "abc", "X-Client-Id": "alice"}))
+        try:
+            assert server.current_client_id == "http-abc"
+            server.client_id_header = "X-Client-Id"
+            assert server.current_client_id == "alice"
+            server.client_id_header = "X-Missing"
+            assert server.current_client_id == "http-abc"
+        finally:
+            request_ctx.reset(token)
+
+        server.client_id_header = "Authorization"
+        token = request_ctx.set(http_context({"Authorization": "Bearer secret"}))
+        try:
+            client_id = server.current_client_id
+            assert client_id.startswith("auth-")
+            assert "secret" not in client_id
+        finally:
+            request_ctx.reset(token)
+
+        # Outside a request the stdio identity applies
+        assert server.current_client_id == "stdio-client"
+
+    async def test_concurrent_sessions_keep_their_subscriptions(self, server):
+        """Test that interleaved requests from many sessions act as their own client."""
+        sessions = [f"session-{i}" for i in range(20)]
+
+        async def session_flow(session_id: str, index: int) -> None:
+            headers = {"Mcp-Session-Id": session_id}
+            channel = "ops" if index % 2 else "dev"
+            await call_tool_as(server, headers, "subscribe_to_channel", {"channel": channel})
+            await asyncio.sleep(0)  # Let the other sessions interleave
+            await call_tool_as(server, headers, "get_my_subscriptions", {})
+
+        await asyncio.gather(*(session_flow(s, i) for i, s in enumerate(sessions)))
+
+        for index, session_id in enumerate(sessions):
+            subscriptions = await server.storage.get_subscriptions_by_client(f"http-{session_id}")
+            assert [s.channel for s in subscriptions] == ["ops" if index % 2 else "dev"]
+        assert await server.storage.get_subscriptions_by_client("stdio-client") == []
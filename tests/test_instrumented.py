@@ -0,0 +1,242 @@
+"""Tests for storage latency instrumentation."""
+
+import random
+from datetime import datetime
+
+import pytest
+
+from notify_mcp.config.storage_config import StorageSettings
+from notify_mcp.models import Channel
+from notify_mcp.server import NotifyMCPServer
+from notify_mcp.storage.caching import CachingStorageAdapter
+from notify_mcp.storage.change_feed import SQLiteChangeFeed, create_change_feed
+from notify_mcp.storage.factory import create_storage
+from notify_mcp.storage.instrumented import InstrumentedStorageAdapter, LatencyHistogram
+from notify_mcp.storage.memory import InMemoryStorage
+from notify_mcp.storage.sqlite_storage import SQLiteStorage
+from tests.conftest import FakeClock, make_notification
+
+
+class FailingStorage(InMemoryStorage):
+    """Memory storage whose channel lookups fail."""
+
+    async def get_channel(self, channel_id: str) -> Channel | None:
+        raise RuntimeError("database is locked")
+
+
+class TestLatencyHistogram:
+    """Test the log-linear latency histogram."""
+
+    def test_small_durations_are_exact(self):
+        """Test that durations below 128 µs are counted exactly."""
+        histogram = LatencyHistogram()
+        for micros in range(1, 101):
+            histogram.record(micros / 1_000_000)
+
+        assert histogram.count == 100
+        assert histogram.quantile(0.5) == pytest.approx(50e-6)
+        assert histogram.quantile(0.99) == pytest.approx(99e-6)
+        assert histogram.quantile(1.0) == pytest.approx(100e-6)
+
+    def test_quantiles_within_bucket_precision(self):
+        """Test that quantiles of wide-ranging latencies stay within 1/64 of exact."""
+        rng = random.Random(7)
+        samples = sorted(rng.lognormvariate(-7, 1.5) for _ in range(20_000))
+        histogram = LatencyHistogram()
+        for seconds in samples:
+            histogram.record(seconds)
+
+        for q in (0.5, 0.95, 0.99):
+            exact = samples[round(q * len(samples)) - 1]
+            assert histogram.quantile(q) == pytest.approx(exact, rel=1 / 64, abs=1e-6)
+        assert histogram.quantile(1.0) == samples[-1]
+        assert histogram.mean == pytest.approx(sum(samples) / len(samples))
+        # 128 exact buckets plus 64 per doubling up to the largest sample
+        assert len(histogram.buckets) <= 128 + 64 * int(samples[-1] * 1e6 / 128).bit_length()
+
+    def test_empty_and_invalid_quantiles(self):
+        """Test the empty histogram and out-of-range quantiles."""
+        histogram = LatencyHistogram()
+        assert histogram.quantile(0.99) == 0.0
+        assert histogram.mean == 0.0
+        with pytest.raises(ValueError):
+            histogram.quantile(1.5)
+
+
+class TestInstrumentedStorageAdapter:
+    """Test the instrumentation wrapper."""
+
+    async def test_counts_calls_and_latency(self):
+        """Test that delegated calls are counted and timed per method."""
+        storage = InstrumentedStorageAdapter(InMemoryStorage(), clock=FakeClock(step=0.002))
+        await storage.save_channel(
+            Channel(id="ops", name="Ops", createdAt=datetime.now(), createdBy="user")
+        )
+        for i in (1, 2, 3):
+            await storage.save_notification(make_notification(i))
+        page = await storage.get_notifications_page("ops", limit=2)
+
+        assert [n.metadata.sequence for n in page] == [3, 2]
+        summary = storage.summary()
+        assert list(summary) == ["get_notifications_page", "save_channel", "save_notification"]
+        assert summary["save_notification"]["calls"] == 3
+        assert summary["save_notification"]["errors"] == 0
+        assert summary["save_notification"]["p99_ms"] == pytest.approx(2.0, rel=1 / 64)
+
+        storage.reset()
+        assert storage.summary() == {}
+
+    async def test_counts_errors(self):
+        """Test that failing calls are counted as errors and re-raised."""
+        storage = InstrumentedStorageAdapter(FailingStorage())
+        with pytest.raises(RuntimeError):
+            await storage.get_channel("ops")
+        assert storage.methods["get_channel"].calls == 1
+        assert storage.methods["get_channel"].errors == 1
+
+    async def test_stream_times_only_the_wrapped_iterator(self):
+        """Test that a stream is one call timed across its __anext__ calls."""
+        backend = InMemoryStorage()
+        await backend.save_notifications([make_notification(i) for i in range(1, 4)])
+        clock = FakeClock(step=0.001)
+        storage = InstrumentedStorageAdapter(backend, clock=clock)
+
+        sequences = []
+        async for notification in storage.iter_notifications("ops", batch_size=2):
+            sequences.append(notification.metadata.sequence)
+            clock.now += 1.0  # Time spent by the consumer is not recorded
+
+        assert sequences == [1, 2, 3]
+        stats = storage.methods["iter_notifications"]
+        assert stats.calls == 1
+        # Three notifications plus the final StopAsyncIteration
+        assert stats.latency.total == pytest.approx(0.004)
+
+    async def test_render_prometheus(self):
+        """Test the Prometheus text exposition."""
+        storage = InstrumentedStorageAdapter(InMemoryStorage(), clock=FakeClock(step=0.0005))
+        await storage.list_channels()
+        await storage.list_channels()
+
+        text = storage.render_prometheus()
+        assert "# TYPE notify_mcp_storage_latency_seconds summary" in text
+        assert 'notify_mcp_storage_calls_total{method="list_channels"} 2' in text
+        assert 'notify_mcp_storage_errors_total{method="list_channels"} 0' in text
+        assert (
+            'notify_mcp_storage_latency_seconds{method="list_channels",quantile="0.99"} 0.000500'
+            in text
+        )
+        assert 'notify_mcp_storage_latency_seconds_count{method="list_channels"} 2' in text
+        assert text.endswith("\n")
+
+
+class TestStorageMetricsWiring:
+    """Test the factory, change feed and server integration."""
+
+    async def test_factory_wraps_only_when_enabled(self):
+        """Test that storage is instrumented outermost and only on request."""
+        plain = await create_storage(StorageSettings(storage_type="memory"))
+        assert isinstance(plain, InMemoryStorage)
+
+        storage = await create_storage(
+            StorageSettings(storage_type="memory", cache_enabled=True, storage_metrics_enabled=True)
+        )
+        assert isinstance(storage, InstrumentedStorageAdapter)
+        assert isinstance(storage.storage, CachingStorageAdapter)
+
+    async def test_change_feed_looks_through_instrumentation(self, tmp_path):
+        """Test that an instrumented SQLite store still gets a change feed."""
+        backend = SQLiteStorage(db_path=str(tmp_path / "shared.db"))
+        await backend.initialize()
+        feed = create_change_feed(InstrumentedStorageAdapter(CachingStorageAdapter(backend)))
+        assert isinstance(feed, SQLiteChangeFeed)
+        await backend.close()
+
+    async def test_stats_tool(self):
+        """Test the get_storage_stats tool with metrics off and on."""
+        server = NotifyMCPServer()
+        server.storage = SQLiteStorage(db_path=":memory:")
+        [disabled] = await server._get_storage_stats({})
+        assert disabled.text == (
+            "Storage call metrics are disabled (set NOTIFY_MCP_STORAGE_METRICS_ENABLED=true)"
+        )
+
+        server.storage = InstrumentedStorageAdapter(SQLiteStorage(db_path=":memory:"))
+        [empty] = await server._get_storage_stats({})
+        assert empty.text == "No storage calls recorded yet"
+
+        server.storage = InstrumentedStorageAdapter(InMemoryStorage())
+
+        await server.storage.get_channel("ops")
+        [report] = await server._get_storage_stats({"reset": True})
+        assert "• get_channel: 1 calls, 0 errors" in report.text
+        assert server.storage.summary() == {}
+
+    async def test_stats_tool_reports_memory(self):
+        """Test that memory usage and evictions are reported with and without instrumentation."""
+        server = NotifyMCPServer()
+        backend = InMemoryStorage(max_memory_bytes=2000)
+        await backend.save_notifications([make_notification(i) for i in range(1, 21)])
+        stats = backend.get_memory_stats()
+        assert stats["evicted_by_budget"] > 0
+
+        server.storage = CachingStorageAdapter(backend)
+        [report] = await server._get_storage_stats({})
+        assert f"• {stats['memory_bytes']} bytes of 2000, " in report.text
+        assert f"• {stats['evicted_by_budget']} evicted to stay under budget" in report.text
+        assert report.text.endswith("(set NOTIFY_MCP_STORAGE_METRICS_ENABLED=true)")
+
+        text = server._render_metrics()
+        assert f"notify_mcp_memory_bytes {stats['memory_bytes']}\n" in text
+        assert "notify_mcp_memory_budget_bytes 2000\n" in text
+        assert "# TYPE notify_mcp_memory_evicted_total counter" in text
+        assert f"notify_mcp_memory_evicted_total {stats['evicted_by_budget']}\n" in text
+        assert "notify_mcp_storage_calls_total" not in text
+
+        server.storage = InstrumentedStorageAdapter(server.storage)
+        [report] = await server._get_storage_stats({})
+        assert f"• {stats['memory_bytes']} bytes of 2000, " in report.text
+        assert report.text.endswith("No storage calls recorded yet")
+
+    async def test_metrics_endpoint(self):
+        """Test that GET /metrics is served and other requests reach the session manager."""
+
+        class SessionManager:
+            def __init__(self):
+                self.paths = []
+
+            async def handle_request(self, scope, receive, send):
+                self.paths.append(scope["path"])
+
+        async def request(app, path, method="GET"):
+            messages = []
+
+            async def receive():
+                return {"type": "http.request", "body": b""}
+
+            async def send(message):
+                messages.append(message)
+
+            await app({"type": "http", "path": path, "method": method}, receive, send)
+            return messages
+
+        server = NotifyMCPServer()
+        session_manager = SessionManager()
+        server.storage = SQLiteStorage(db_path=":memory:")
+        app = server._http_app(session_manager)
+        assert await request(app, "/metrics") == []
+
+        server.storage = InMemoryStorage()
+        _, body = await request(app, "/metrics")
+        assert body["body"].startswith(b"# HELP notify_mcp_memory_bytes ")
+
+        server.storage = InstrumentedStorageAdapter(InMemoryStorage())
+        await server.storage.list_channels()
+        start, body = await request(app, "/metrics")
+        assert start["status"] == 200
+        assert (b"content-type", b"text/plain; version=0.0.4; charset=utf-8") in start["headers"]
+        assert b'notify_mcp_storage_calls_total{method="list_channels"} 1' in body["body"]
+        assert b"notify_mcp_memory_bytes 0\n" in body["body"]
+
+        await request(app, "/mcp", method="POST")
+        assert session_manager.paths == ["/metrics", "/mcp"]
@@ -0,0 +1,131 @@
+"""Tests for streaming JSON encoding and the history resources."""
+
+import json
+
+import pytest
+
+from notify_mcp.server import NotifyMCPServer
+from notify_mcp.storage.memory import InMemoryStorage
+from notify_mcp.utils.json_stream import iter_json_array
+from tests.conftest import make_notification
+
+# Text that needs escaping in JSON
+ESCAPED_BODY = 'Line one\n"quoted" line two'
+
+
+async def stream(items):
+    """Async iterator over a list."""
+    for item in items:
+        yield item
+
+
+async def encode(items, **kwargs) -> str:
+    """Join the chunks of an encoded stream."""
+    return "".join([chunk async for chunk in iter_json_array(stream(items), **kwargs)])
+
+
+class TestIterJsonArray:
+    """Test the streaming JSON array writer."""
+
+    async def test_matches_json_dumps(self):
+        """Test that indented output is laid out like json.dumps."""
+        notifications = [make_notification(i, body=ESCAPED_BODY, tags=["a"]) for i in (1, 2, 3)]
+        expected = [n.model_dump(mode="json", exclude_none=True) for n in notifications]
+
+        assert await encode(notifications) == json.dumps(expected, indent=2)
+        assert json.loads(await encode(notifications, indent=None)) == expected
+
+    async def test_empty_stream(self):
+        """Test that an empty stream is an empty array in either layout."""
+        assert await encode([]) == "[]"
+        assert await encode([], indent=None) == "[]"
+
+
+class TestHistoryResource:
+    """Test the notification://<channel>/history resource."""
+
+    @pytest.fixture
+    def server(self):
+        server = NotifyMCPServer()
+        server.storage = InMemoryStorage()
+        return server
+
+    async def test_streams_range_oldest_first(self, server):
+        """Test that the resource renders the requested range oldest first."""
+        notifications = [make_notification(i, body=ESCAPED_BODY) for i in range(1, 8)]
+        await server.storage.save_notifications(notifications)
+
+        history = json.loads(await server._read_history("ops", ""))
+        assert [n["metadata"]["sequence"] for n in history] == list(range(1, 8))
+
+        ranged = json.loads(await server._read_history("ops", "since=2&until=5"))
+        assert [n["metadata"]["sequence"] for n in ranged] == [3, 4, 5]
+        assert json.loads(await server._read_history("missing", "")) == []
+
+    async def test_reads_are_capped(self, server, monkeypatch):
+        """Test that one read returns at most limit notifications, continued with since."""
+        await server.storage.save_notifications([make_notification(i) for i in range(1, 8)])
+
+        first = json.loads(await server._read_history("ops", "limit=3"))
+        assert [n["metadata"]["sequence"] for n in first] == [1, 2, 3]
+        rest = json.loads(await server._read_history("ops", "since=3&limit=3"))
+        assert [n["metadata"]["sequence"] for n in rest] == [4, 5, 6]
+
+        monkeypatch.setattr("notify_mcp.server.MAX_HISTORY_PAGE_SIZE", 5)
+        capped = json.loads(await server._read_history("ops", ""))
+        assert [n["metadata"]["sequence"] for n in capped] == [1, 2, 3, 4, 5]
+
+    async def test_rejects_invalid_range(self, server):
+        """Test that non-integer bounds and out-of-range limits are reported."""
+        with pytest.raises(ValueError):
+            await server._read_history("ops", "since=yesterday")
+        with pytest.raises(ValueError):
+            await server._read_history("ops", "limit=0")
+        with pytest.raises(ValueError):
+            await server._read_history("ops", "limit=501")
+
+
+class TestRecentResource:
+    """Test filtered pages of the notification://<channel>/recent resource."""
+
+    @pytest.fixture
+    async def server(self):
+        server = NotifyMCPServer()
+        server.storage = InMemoryStorage()
+        notifications = [make_notification(i) for i in range(1, 11)]
+        for notification in notifications[::3]:
+            notification.context.priority = "critical"
+            notification.context.tags = ["deploy"]
+        await server.storage.save_notifications(notifications)
+        return server
+
+    async def test_filters_are_applied_by_storage(self, server, monkeypatch):
+        """Test that filter parameters page through matches only."""
+        calls = []
+        original = server.storage.get_filtered_notifications_page
+
+        async def spy(channel, filters, limit=50, before=None):
+            calls.append(filters)
+            return await original(channel, filters, limit, before)
+
+        monkeypatch.setattr(server.storage, "get_filtered_notifications_page", spy)
+
+        page = json.loads(await server._read_recent("ops", "priority=high,critical&limit=2"))
+        assert [n["metadata"]["sequence"] for n in page["notifications"]] == [10, 7]
+        assert page["next_before"] == 7
+        rest = json.loads(await server._read_recent("ops", "tags=deploy&before=7"))
+        assert [n["metadata"]["sequence"] for n in rest["notifications"]] == [4, 1]
+        assert rest["next_before"] is None
+        assert calls[0].priority == ["high", "critical"]
+        assert calls[1].tags == ["deploy"]
+
+        unfiltered = json.loads(await server._read_recent("ops", "limit=3"))
+        assert [n["metadata"]["sequence"] for n in unfiltered] == [10, 9, 8]
+        assert len(calls) == 2
+
+    async def test_rejects_invalid_filters(self, server):
+        """Test that unknown filter values and after cursors are reported."""
+        with pytest.raises(ValueError):
+            await server._read_recent("ops", "priority=urgent")
+        with pytest.raises(ValueError):
+            await server._read_recent("ops", "priority=high&after=3")
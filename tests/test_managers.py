@@ -110,6 +110,23 @@ class TestChannelManager:
         updated = await channel_manager.get_channel("test")
         assert updated.notificationCount == 10
 
+    @pytest.mark.asyncio
+    async def test_record_notification(self, channel_manager):
+        """Test that each recorded notification bumps the count and activity time."""
+        await channel_manager.create_channel(
+            channel_id="test",
+            name="Test Channel",
+            created_by="user",
+        )
+        published_at = datetime(2025, 1, 1, 12, 0, 0)
+
+        await channel_manager.record_notification("test", published_at)
+        await channel_manager.record_notification("test", published_at)
+
+        updated = await channel_manager.get_channel("test")
+        assert updated.notificationCount == 2
+        assert updated.lastNotificationAt == published_at
+
 
 class TestSubscriptionManager:
     """Test subscription manager."""
@@ -0,0 +1,303 @@
+"""Tests for the PostgreSQL storage adapter.
+
+These run against a real server and are skipped unless
+``NOTIFY_MCP_TEST_POSTGRESQL_URL`` points at a throwaway database, e.g.::
+
+    NOTIFY_MCP_TEST_POSTGRESQL_URL=postgresql://postgres@localhost/notify_test pytest
+
+Every test starts from dropped tables.
+"""
+
+import asyncio
+import os
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+asyncpg = pytest.importorskip("asyncpg")
+
+from notify_mcp.models import (  # noqa: E402
+    Channel,
+    Subscription,
+    SubscriptionFilter,
+)
+from notify_mcp.storage.change_feed import create_change_feed  # noqa: E402
+from notify_mcp.storage.postgres_storage import PostgreSQLStorage  # noqa: E402
+from tests.conftest import make_notification  # noqa: E402
+
+POSTGRESQL_URL = os.environ.get("NOTIFY_MCP_TEST_POSTGRESQL_URL")
+
+pytestmark = pytest.mark.skipif(
+    POSTGRESQL_URL is None, reason="NOTIFY_MCP_TEST_POSTGRESQL_URL is not set"
+)
+
+
+async def drop_tables() -> None:
+    """Drop the notify-mcp tables from the test database."""
+    conn = await asyncpg.connect(POSTGRESQL_URL)
+    try:
+        await conn.execute("DROP TABLE IF EXISTS notifications, subscriptions, channels")
+    finally:
+        await conn.close()
+
+
+async def open_storage(**kwargs) -> PostgreSQLStorage:
+    """Open PostgreSQL storage on freshly dropped tables."""
+    await drop_tables()
+    storage = PostgreSQLStorage(connection_url=POSTGRESQL_URL, **kwargs)
+    await storage.initialize()
+    return storage
+
+
+@pytest.fixture
+async def pg_storage():
+    """PostgreSQL storage with a channel 'ops' and a short history."""
+    storage = await open_storage(max_history_per_channel=10, trim_interval=5)
+    await storage.save_channel(
+        Channel(id="ops", name="Ops", createdAt=datetime.now(), createdBy="user")
+    )
+    yield storage
+    await storage.close()
+
+
+class TestPostgreSQLStorage:
+    """Test PostgreSQL storage adapter."""
+
+    async def test_channel_round_trip_and_stats(self, pg_storage):
+        """Test channel upserts, stats bumps and cascade deletes."""
+        channel = await pg_storage.get_channel("ops")
+        channel.description = "Operations"
+        await pg_storage.save_channel(channel)
+        await pg_storage.record_channel_notification(
+            "ops", datetime(2025, 2, 1, tzinfo=UTC), count=3
+        )
+
+        retrieved = await pg_storage.get_channel("ops")
+        assert retrieved.description == "Operations"
+        assert retrieved.notificationCount == 3
+        assert retrieved.lastNotificationAt == datetime(2025, 2, 1)
+        assert [c.id for c in await pg_storage.list_channels()] == ["ops"]
+
+        await pg_storage.save_subscription(
+            Subscription(id="sub-1", clientId="client", channel="ops", subscribedAt=datetime.now())
+        )
+        await pg_storage.save_notification(make_notification(1))
+        await pg_storage.delete_channel("ops")
+        assert await pg_storage.get_channel("ops") is None
+        assert await pg_storage.get_subscriptions_by_client("client") == []
+        assert await pg_storage.get_latest_sequence("ops") == 0
+
+    async def test_subscriptions(self, pg_storage):
+        """Test subscription lookups by channel, client and both."""
+        filters = SubscriptionFilter(tags=["deploy"])
+        for client in ("alice", "bob"):
+            await pg_storage.save_subscription(
+                Subscription(
+                    id=f"sub-{client}",
+                    clientId=client,
+                    channel="ops",
+                    subscribedAt=datetime.now(),
+                    filters=filters,
+                )
+            )
+
+        assert len(await pg_storage.get_subscriptions_by_channel("ops")) == 2
+        [alice] = await pg_storage.get_subscriptions_by_client_and_channel("alice", "ops")
+        assert alice.filters == filters
+
+        await pg_storage.delete_subscription("sub-alice")
+        assert await pg_storage.get_subscriptions_by_client("alice") == []
+        with pytest.raises(asyncpg.ForeignKeyViolationError):
+            await pg_storage.save_subscription(
+                Subscription(id="x", clientId="c", channel="missing", subscribedAt=datetime.now())
+            )
+
+    async def test_bulk_operations(self, pg_storage):
+        """Test batch channel and subscription methods."""
+        await pg_storage.save_channel(
+            Channel(id="dev", name="Dev", createdAt=datetime.now(), createdBy="user")
+        )
+        await pg_storage.save_subscriptions(
+            [
+                Subscription(
+                    id=f"sub-{i}",
+                    clientId=f"client-{i}",
+                    channel="ops" if i % 2 else "dev",
+                    subscribedAt=datetime.now(),
+                )
+                for i in range(6)
+            ]
+        )
+
+        assert sorted(await pg_storage.get_channels(["ops", "dev", "missing"])) == ["dev", "ops"]
+        by_channel = await pg_storage.get_subscriptions_by_channels(["ops", "none"])
+        assert sorted(s.id for s in by_channel["ops"]) == ["sub-1", "sub-3", "sub-5"]
+        assert by_channel["none"] == []
+
+        await pg_storage.delete_subscriptions(["sub-1", "sub-2"])
+        remaining = await pg_storage.get_subscriptions_by_channels(["ops", "dev"])
+        assert sorted(s.id for subs in remaining.values() for s in subs) == [
+            "sub-0",
+            "sub-3",
+            "sub-4",
+            "sub-5",
+        ]
+        with pytest.raises(asyncpg.ForeignKeyViolationError):
+            await pg_storage.save_subscriptions(
+                [Subscription(id="x", clientId="c", channel="missing", subscribedAt=datetime.now())]
+            )
+
+    async def test_history_window_and_pages(self, pg_storage):
+        """Test sequence numbering, the max_history window and keyset pages."""
+        for i in range(1, 24):
+            await pg_storage.save_notification(
+                make_notification(i, base=datetime(2025, 1, 1, tzinfo=UTC))
+            )
+
+        assert await pg_storage.get_latest_sequence("ops") == 23
+        assert await pg_storage.get_notification_count("ops") == 10
+
+        latest = await pg_storage.get_notifications_page("ops", limit=3)
+        assert [n.metadata.sequence for n in latest] == [23, 22, 21]
+        older = await pg_storage.get_notifications_page("ops", limit=3, before=21)
+        assert [n.metadata.sequence for n in older] == [20, 19, 18]
+        newer = await pg_storage.get_notifications_page("ops", limit=2, after=18)
+        assert [n.metadata.sequence for n in newer] == [20, 19]
+        assert latest[0].metadata.timestamp == datetime(2025, 1, 1, 0, 0, 23, tzinfo=UTC)
+
+        # Trims ran every 5 inserts; nothing older than the window is left
+        assert await pg_storage.get_notifications_page("ops", limit=50, before=14) == []
+
+        stream = pg_storage.iter_notifications("ops", since=15, batch_size=3)
+        assert [n.metadata.sequence async for n in stream] == list(range(16, 24))
+
+    async def test_appends_get_unique_sequences(self, pg_storage):
+        """Test that concurrent appends from two processes never share a sequence."""
+        other = PostgreSQLStorage(connection_url=POSTGRESQL_URL)
+        await other.initialize()
+        notifications = [make_notification(i) for i in range(1, 41)]
+        sequences = await asyncio.gather(
+            *(
+                (pg_storage, other)[i % 2].append_notification(notification)
+                for i, notification in enumerate(notifications)
+            )
+        )
+
+        assert sorted(sequences) == list(range(1, 41))
+        assert [n.metadata.sequence for n in notifications] == sequences
+        with pytest.raises(asyncpg.UniqueViolationError):
+            await pg_storage.save_notification(make_notification(41, sequence=40))
+        await other.close()
+
+    async def test_bulk_save_uses_copy(self, pg_storage):
+        """Test that COPY and executemany batches store the same rows."""
+        pg_storage.max_history = 1000
+        await pg_storage.save_notifications([make_notification(i) for i in range(1, 4)])
+        pg_storage.copy_threshold = 10
+        await pg_storage.save_notifications([make_notification(i) for i in range(4, 54)])
+
+        page = await pg_storage.get_notifications_page("ops", limit=100)
+        assert [n.metadata.sequence for n in page] == list(range(53, 0, -1))
+        assert page[0] == make_notification(53, sequence=53)
+
+    async def test_filtered_pages(self, pg_storage):
+        """Test tag, theme and priority filters evaluated in SQL."""
+        pg_storage.max_history = 1000
+        for i in range(1, 31):
+            await pg_storage.save_notification(
+                make_notification(
+                    i,
+                    tags=["deploy"] if i % 3 == 0 else ["misc"],
+                    theme="alert" if i % 5 == 0 else "info",
+                    priority="high" if i % 2 == 0 else "low",
+                )
+            )
+
+        async def sequences(filters, **kwargs):
+            page = await pg_storage.get_filtered_notifications_page("ops", filters, **kwargs)
+            return [n.metadata.sequence for n in page.notifications]
+
+        assert await sequences(SubscriptionFilter(tags=["deploy", "none"]), limit=3) == [30, 27, 24]
+        assert await sequences(SubscriptionFilter(themes=["alert"]), before=20) == [15, 10, 5]
+        assert await sequences(
+            SubscriptionFilter(tags=["deploy"], themes=["alert"], priority=["high"])
+        ) == [30]
+        assert await sequences(SubscriptionFilter(senders=["someone-else"])) == []
+
+        page = await pg_storage.get_filtered_notifications_page(
+            "ops", SubscriptionFilter(themes=["alert"]), limit=2
+        )
+        assert page.next_before == 25
+        rest = await pg_storage.get_filtered_notifications_page(
+            "ops", SubscriptionFilter(themes=["alert"]), limit=10, before=25
+        )
+        assert rest.next_before is None
+
+    async def test_full_text_search(self, pg_storage):
+        """Test that every term must match and snippets mark the hits."""
+        for i in (1, 2):
+            await pg_storage.save_notification(
+                make_notification(i, body=f"Database migration step {i}")
+            )
+
+        results = await pg_storage.search_notifications("migration 2")
+        assert [r.notification.metadata.id for r in results] == ["ops-2"]
+        assert "[migration]" in results[0].snippet
+        assert await pg_storage.search_notifications("migration", channels=["other"]) == []
+        assert await pg_storage.search_notifications("!!") == []
+
+    async def test_expired_notifications_hidden_and_purged(self, pg_storage):
+        """Test that expired rows are hidden at once and purged in batches."""
+        past = datetime.now(UTC) - timedelta(minutes=1)
+        for i in range(1, 6):
+            await pg_storage.save_notification(make_notification(i, validity=past))
+        await pg_storage.save_notification(make_notification(6))
+        await pg_storage.save_notification(make_notification(7, validity=past))
+
+        assert await pg_storage.get_notification_count("ops") == 1
+        assert await pg_storage.purge_expired(batch_size=4) == 4
+        # The newest row is kept so sequence numbering survives
+        assert await pg_storage.purge_expired() == 1
+        assert await pg_storage.get_latest_sequence("ops") == 7
+
+    async def test_rejects_invalid_pool_sizes(self):
+        """Test pool size validation."""
+        with pytest.raises(ValueError):
+            PostgreSQLStorage(POSTGRESQL_URL, pool_min_size=5, pool_max_size=2)
+
+
+class TestPostgresChangeFeed:
+    """Test the LISTEN/NOTIFY change feed."""
+
+    async def test_delivers_announced_notifications(self, pg_storage):
+        """Test that each process receives the other's saves and skips its own."""
+        listener = PostgreSQLStorage(connection_url=POSTGRESQL_URL)
+        await listener.initialize()
+        feeds = [create_change_feed(pg_storage), create_change_feed(listener)]
+        received: list[list[str]] = [[], []]
+        arrived = asyncio.Event()
+
+        for feed, ids in zip(feeds, received, strict=True):
+
+            async def callback(notifications, ids=ids):
+                ids.extend(n.metadata.id for n in notifications)
+                if sum(map(len, received)) == 4:
+                    arrived.set()
+
+            await feed.start(callback)
+
+        async def publish(index, notifications):
+            feeds[index].mark_local(notifications)
+            await (pg_storage, listener)[index].save_notifications(notifications)
+            await feeds[index].announce(notifications)
+
+        await publish(0, [make_notification(i, sequence=i) for i in (1, 2)])
+        await publish(1, [make_notification(3, sequence=3)])
+        await publish(0, [make_notification(4, sequence=4)])
+
+        await asyncio.wait_for(arrived.wait(), timeout=5.0)
+        assert received == [["ops-3"], ["ops-1", "ops-2", "ops-4"]]
+
+        for feed in feeds:
+            await feed.stop()
+        await listener.close()
@@ -0,0 +1,177 @@
+"""Tests for client session tracking and orphaned-subscription collection."""
+
+from datetime import datetime
+
+import pytest
+
+from notify_mcp.config.transport_config import TransportSettings
+from notify_mcp.core import session_tracker
+from notify_mcp.core.session_tracker import SessionTracker
+from notify_mcp.core.subscription_manager import SubscriptionManager
+from notify_mcp.models import Channel
+from notify_mcp.server import NotifyMCPServer
+from notify_mcp.storage.memory import InMemoryStorage
+from tests.conftest import FakeClock
+from tests.test_http_transport import call_tool_as
+
+
+@pytest.fixture
+async def storage():
+    """Memory storage with channels 'ops' and 'dev'."""
+    storage = InMemoryStorage()
+    for channel_id in ("ops", "dev"):
+        await storage.save_channel(
+            Channel(id=channel_id, name=channel_id, createdAt=datetime.now(), createdBy="u")
+        )
+    return storage
+
+
+def make_tracker(storage, clock, **kwargs) -> SessionTracker:
+    """Tracker with a 60s idle timeout and 30s grace period."""
+    return SessionTracker(storage, idle_timeout=60, grace_period=30, clock=clock, **kwargs)
+
+
+async def channels_of(storage, client_id: str) -> list[str]:
+    """Channels a client is subscribed to, sorted."""
+    return sorted(s.channel for s in await storage.get_subscriptions_by_client(client_id))
+
+
+class TestSessionTracker:
+    """Test session lifecycle and subscription collection."""
+
+    async def test_idle_client_is_parked_and_restored(self, storage):
+        """Test that an idle client's subscriptions are parked, then restored on return."""
+        clock = FakeClock(1000.0)
+        tracker = make_tracker(storage, clock)
+        manager = SubscriptionManager(storage)
+        await tracker.touch("alice")
+        await tracker.touch("bob")
+        await manager.subscribe("alice", "ops")
+        await manager.subscribe("alice", "dev")
+        await manager.subscribe("bob", "ops")
+
+        clock.now += 80  # Idle for 20s: still within the grace period
+        await tracker.touch("bob")
+        assert await tracker.sweep() == 0
+
+        clock.now += 15
+        assert await tracker.sweep() == 2
+        assert await channels_of(storage, "alice") == []
+        assert [s.clientId for s in await manager.get_subscribers("ops")] == ["bob"]
+        assert list(tracker.clients) == ["bob"]
+
+        # The dev channel disappears while alice is away
+        await storage.delete_channel("dev")
+        session = await tracker.touch("alice")
+        assert session.requests == 1
+        assert await channels_of(storage, "alice") == ["ops"]
+        assert tracker.parked == {}
+
+    async def test_delete_action_and_disconnect(self, storage):
+        """Test that a disconnected client is collected after the grace period only."""
+        clock = FakeClock(1000.0)
+        tracker = make_tracker(storage, clock, action="delete")
+        await tracker.touch("alice")
+        await SubscriptionManager(storage).subscribe("alice", "ops")
+
+        tracker.disconnect("alice")
+        clock.now += 29
+        assert await tracker.sweep() == 0
+        clock.now += 1
+        assert await tracker.sweep() == 1
+
+        await tracker.touch("alice")
+        assert await channels_of(storage, "alice") == []
+        assert tracker.parked == {}
+
+    async def test_leaves_untracked_clients_alone(self, storage):
+        """Test that only clients seen or adopted by this tracker are collected."""
+        clock = FakeClock(1000.0)
+        tracker = make_tracker(storage, clock)
+        manager = SubscriptionManager(storage)
+        for client_id in ("http-old", "http-older", "other-process", "stdio-client"):
+            await manager.subscribe(client_id, "ops")
+
+        assert await tracker.adopt_stored("http-") == 2
+        clock.now += 100
+        assert await tracker.sweep() == 2
+
+        remaining = sorted(s.clientId for s in await manager.get_subscribers("ops"))
+        assert remaining == ["other-process", "stdio-client"]
+
+    async def test_parked_clients_are_capped(self, storage, monkeypatch):
+        """Test that the longest-parked client's subscriptions are dropped beyond the cap."""
+        monkeypatch.setattr(session_tracker, "MAX_PARKED_CLIENTS", 2)
+        clock = FakeClock(1000.0)
+        tracker = make_tracker(storage, clock)
+        manager = SubscriptionManager(storage)
+        for client_id in ("alice", "bob", "carol"):
+            await tracker.touch(client_id)
+            await manager.subscribe(client_id, "ops")
+            clock.now += 1
+
+        clock.now += 100
+        assert await tracker.sweep() == 3
+        assert list(tracker.parked) == ["bob", "carol"]
+
+        await tracker.touch("alice")
+        assert await channels_of(storage, "alice") == []
+
+    def test_rejects_invalid_settings(self, storage):
+        """Test argument validation."""
+        with pytest.raises(ValueError):
+            SessionTracker(storage, idle_timeout=0)
+        with pytest.raises(ValueError):
+            SessionTracker(storage, grace_period=-1)
+        with pytest.raises(ValueError):
+            SessionTracker(storage, action="archive")
+
+
+class TestServerSessionTracking:
+    """Test how the server feeds the tracker."""
+
+    async def test_requests_and_session_termination(self, storage):
+        """Test that tool calls register clients and DELETE marks them disconnected."""
+        server = NotifyMCPServer()
+        server.storage = storage
+        server.subscription_manager = SubscriptionManager(storage)
+        server.session_tracker = make_tracker(storage, FakeClock(1000.0))
+        server.active_clients = server.session_tracker.clients
+
+        headers = {"Mcp-Session-Id": "abc"}
+        await call_tool_as(server, headers, "subscribe_to_channel", {"channel": "ops"})
+        await call_tool_as(server, headers, "get_my_subscriptions", {})
+        assert server.active_clients["http-abc"].requests == 2
+
+        class SessionManager:
+            async def handle_request(self, scope, receive, send):
+                pass
+
+        app = server._http_app(SessionManager())
+        scope = {
+            "type": "http",
+            "method": "DELETE",
+            "path": "/mcp",
+            "headers": [(b"mcp-session-id", b"abc")],
+        }
+        await app(scope, None, None)
+        assert server.active_clients["http-abc"].disconnected_at is not None
+
+        server.session_tracker.clock.now += 30
+        assert await server.session_tracker.sweep() == 1
+        assert server.active_clients == {}
+
+    async def test_start_adopts_leftover_sessions(self, storage):
+        """Test that HTTP startup adopts earlier sessions' clients unless disabled."""
+        await SubscriptionManager(storage).subscribe("http-previous-run", "ops")
+        server = NotifyMCPServer()
+        server.storage = storage
+
+        await server._start_session_tracker(TransportSettings(session_idle_timeout=0))
+        assert server.session_tracker is None
+
+        await server._start_session_tracker(TransportSettings(session_gc_action="delete"))
+        assert list(server.active_clients) == ["http-previous-run"]
+        assert server.session_tracker.action == "delete"
+        await server._shutdown_server()
+        assert server.session_tracker is None
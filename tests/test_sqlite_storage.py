@@ -1,10 +1,15 @@
 """Tests for SQLite storage adapter."""
 
+import asyncio
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 import tempfile
 
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from notify_mcp.storage.sqlite_sharded import ShardedSQLiteStorage
 from notify_mcp.storage.sqlite_storage import SQLiteStorage
 from notify_mcp.models.channel import Channel, ChannelPermissions
 from notify_mcp.models.subscription import Subscription, SubscriptionFilter
@@ -75,6 +80,43 @@ class TestSQLiteStorage:
         assert retrieved.subscriberCount == 10
         assert retrieved.name == "Updated Channel"
 
+    async def test_upsert_keeps_single_row(self, sqlite_storage):
+        """Test that re-saving a channel and subscription updates in place."""
+        channel = Channel(
+            id="test-channel", name="Test", createdAt=datetime.now(), createdBy="user"
+        )
+        await sqlite_storage.save_channel(channel)
+        await sqlite_storage.save_channel(channel)
+
+        subscription = Subscription(
+            id="sub1", clientId="client1", channel="test-channel", subscribedAt=datetime.now()
+        )
+        await sqlite_storage.save_subscription(subscription)
+        subscription.filters = SubscriptionFilter(priority=["critical"])
+        await sqlite_storage.save_subscription(subscription)
+
+        assert len(await sqlite_storage.list_channels()) == 1
+        subs = await sqlite_storage.get_subscriptions_by_channel("test-channel")
+        assert len(subs) == 1
+        assert subs[0].filters.priority == ["critical"]
+
+    async def test_record_channel_notification(self, sqlite_storage):
+        """Test the atomic channel stats bump."""
+        channel = Channel(
+            id="test-channel", name="Test", createdAt=datetime.now(), createdBy="user",
+            notificationCount=5,
+        )
+        await sqlite_storage.save_channel(channel)
+        published_at = datetime(2025, 1, 1, 12, 0, 0)
+
+        await sqlite_storage.record_channel_notification("test-channel", published_at)
+        await sqlite_storage.record_channel_notification("test-channel", published_at, count=3)
+        await sqlite_storage.record_channel_notification("missing", published_at)
+
+        retrieved = await sqlite_storage.get_channel("test-channel")
+        assert retrieved.notificationCount == 9
+        assert retrieved.lastNotificationAt == published_at
+
     async def test_get_nonexistent_channel(self, sqlite_storage):
         """Test getting a channel that doesn't exist."""
         result = await sqlite_storage.get_channel("nonexistent")
@@ -378,3 +420,837 @@ class TestSQLiteStorage:
         page1_ids = {n.metadata.id for n in page1}
         page2_ids = {n.metadata.id for n in page2}
         assert len(page1_ids & page2_ids) == 0
+
+    async def test_keyset_pagination(self, sqlite_storage):
+        """Test sequence cursors, including notifications with identical timestamps."""
+        await sqlite_storage.save_channel(
+            Channel(id="test-channel", name="Test", createdAt=datetime.now(), createdBy="user")
+        )
+        same_time = datetime(2025, 1, 1, 12, 0, 0)
+        for i in range(1, 16):
+            await sqlite_storage.save_notification(
+                Notification(
+                    sender=Sender(id="user1", name="User 1", role="dev"),
+                    context=Context(theme="info", priority="medium"),
+                    information=Information(title=f"Notification {i}", body="Test"),
+                    metadata=Metadata(
+                        id=f"notif{i}", timestamp=same_time, channel="test-channel", sequence=i
+                    ),
+                )
+            )
+
+        # max_history=10 keeps sequences 6-15, ordered by sequence despite tied timestamps
+        latest = await sqlite_storage.get_notifications_page("test-channel", limit=4)
+        assert [n.metadata.sequence for n in latest] == [15, 14, 13, 12]
+
+        older = await sqlite_storage.get_notifications_page("test-channel", limit=4, before=12)
+        assert [n.metadata.sequence for n in older] == [11, 10, 9, 8]
+
+        oldest = await sqlite_storage.get_notifications_page("test-channel", limit=4, before=8)
+        assert [n.metadata.sequence for n in oldest] == [7, 6]
+
+        newer = await sqlite_storage.get_notifications_page("test-channel", limit=2, after=11)
+        assert [n.metadata.sequence for n in newer] == [13, 12]
+
+        window = await sqlite_storage.get_notifications_page(
+            "test-channel", limit=10, before=14, after=11
+        )
+        assert [n.metadata.sequence for n in window] == [13, 12]
+
+    async def _publish(self, storage, channel, count, title, body, start=1, validity=None):
+        """Save numbered notifications with the given title and body."""
+        for i in range(start, start + count):
+            await storage.save_notification(
+                Notification(
+                    sender=Sender(id="user1", name="User 1", role="dev"),
+                    context=Context(theme="info", priority="medium", validity=validity),
+                    information=Information(title=f"{title} {i}", body=body),
+                    metadata=Metadata(
+                        id=f"{channel}-{i}", timestamp=datetime.now(), channel=channel, sequence=i
+                    ),
+                )
+            )
+
+    async def test_full_text_search(self, sqlite_storage):
+        """Test FTS5 search: AND semantics, ranking, snippets and channel filters."""
+        for channel_id in ("ops", "dev"):
+            await sqlite_storage.save_channel(
+                Channel(id=channel_id, name=channel_id, createdAt=datetime.now(), createdBy="u")
+            )
+        await self._publish(sqlite_storage, "ops", 2, "Weekly update", "Database migration tonight")
+        await self._publish(sqlite_storage, "dev", 1, "Database migration", "Schema changes")
+        await self._publish(sqlite_storage, "dev", 1, "Lunch", "Pizza", start=2)
+
+        results = await sqlite_storage.search_notifications("did anyone announce a migration?")
+        assert results == []
+
+        results = await sqlite_storage.search_notifications("database migration")
+        assert len(results) == 3
+        # Title matches rank first
+        assert results[0].notification.metadata.id == "dev-1"
+        assert results[0].score > results[-1].score
+        assert "[Database]" in results[0].snippet
+
+        only_ops = await sqlite_storage.search_notifications("migration", channels=["ops"])
+        assert {r.notification.metadata.id for r in only_ops} == {"ops-1", "ops-2"}
+        assert await sqlite_storage.search_notifications("migration", channels=[]) == []
+        assert len(await sqlite_storage.search_notifications("migration", limit=1)) == 1
+
+        await sqlite_storage.delete_channel("dev")
+        results = await sqlite_storage.search_notifications("migration")
+        assert {r.notification.metadata.id for r in results} == {"ops-1", "ops-2"}
+
+    async def test_search_index_follows_trim_and_backfills(self, tmp_path):
+        """Test that trimmed rows leave the index and existing rows are indexed on upgrade."""
+        db_path = str(tmp_path / "test.db")
+        storage = SQLiteStorage(db_path=db_path, max_history_per_channel=5, trim_interval=1)
+        await storage.initialize()
+        await storage.save_channel(
+            Channel(id="ops", name="Ops", createdAt=datetime.now(), createdBy="u")
+        )
+        await self._publish(storage, "ops", 8, "Release", "Candidate build")
+
+        results = await storage.search_notifications("release candidate", limit=20)
+        assert sorted(r.notification.metadata.sequence for r in results) == [4, 5, 6, 7, 8]
+
+        # Simulate a database created before the search index existed
+        async with storage.engine.begin() as conn:
+            await conn.execute(text("DROP TABLE notifications_fts"))
+        await storage.close()
+
+        reopened = SQLiteStorage(db_path=db_path, max_history_per_channel=5)
+        await reopened.initialize()
+        results = await reopened.search_notifications("release", limit=20)
+        assert len(results) == 5
+        await reopened.close()
+
+    async def test_expired_notifications_hidden_and_purged(self, sqlite_storage):
+        """Test that reads skip expired rows and purges keep each channel's newest row."""
+        await sqlite_storage.save_channel(
+            Channel(id="ops", name="Ops", createdAt=datetime.now(), createdBy="u")
+        )
+        past = datetime.now() - timedelta(minutes=1)
+        await self._publish(sqlite_storage, "ops", 3, "Deploy", "Live", start=1)
+        await self._publish(sqlite_storage, "ops", 4, "Deploy", "Stale", start=4, validity=past)
+
+        history = await sqlite_storage.get_notifications("ops")
+        assert [n.metadata.sequence for n in history] == [3, 2, 1]
+        page = await sqlite_storage.get_notifications_page("ops", limit=2, after=1)
+        assert [n.metadata.sequence for n in page] == [3, 2]
+        assert await sqlite_storage.get_notification_count("ops") == 3
+        assert await sqlite_storage.search_notifications("stale") == []
+
+        # The newest row (sequence 7) stays as the channel's sequence anchor
+        assert await sqlite_storage.purge_expired(batch_size=2) == 2
+        assert await sqlite_storage.purge_expired(batch_size=2) == 1
+        assert await sqlite_storage.purge_expired() == 0
+        assert await sqlite_storage.get_latest_sequence("ops") == 7
+
+        async with sqlite_storage.engine.connect() as conn:
+            fts_rows = await conn.execute(
+                text("SELECT count(*) FROM notifications_fts WHERE notifications_fts MATCH 'stale'")
+            )
+            assert fts_rows.scalar_one() == 1
+
+    async def test_expires_at_migration(self, tmp_path):
+        """Test that databases without expires_at get it added and backfilled."""
+        db_path = str(tmp_path / "test.db")
+        storage = SQLiteStorage(db_path=db_path)
+        await storage.initialize()
+        await storage.save_channel(
+            Channel(id="ops", name="Ops", createdAt=datetime.now(), createdBy="u")
+        )
+        past = datetime.now() - timedelta(minutes=1)
+        await self._publish(storage, "ops", 2, "Old", "Body", validity=past)
+        await self._publish(storage, "ops", 1, "New", "Body", start=3)
+
+        # Simulate a database created before expiry tracking
+        async with storage.engine.begin() as conn:
+            await conn.execute(text("DROP INDEX ix_notifications_expires_at"))
+            await conn.execute(text("ALTER TABLE notifications DROP COLUMN expires_at"))
+        await storage.close()
+
+        reopened = SQLiteStorage(db_path=db_path)
+        await reopened.initialize()
+        assert await reopened.get_notification_count("ops") == 1
+        assert await reopened.purge_expired() == 2
+        await reopened.close()
+
+    async def test_unique_sequence_migration(self, tmp_path):
+        """Test that (channel, sequence) is unique, also on databases that predate it."""
+        db_path = str(tmp_path / "test.db")
+        storage = SQLiteStorage(db_path=db_path)
+        await storage.initialize()
+        await storage.save_channel(
+            Channel(id="ops", name="Ops", createdAt=datetime.now(), createdBy="u")
+        )
+        await self._publish(storage, "ops", 2, "Entry", "Body")
+
+        # Simulate a database created before the index was unique
+        async with storage.engine.begin() as conn:
+            await conn.execute(text("DROP INDEX ix_notifications_channel_sequence"))
+            await conn.execute(
+                text(
+                    "CREATE INDEX ix_notifications_channel_sequence "
+                    "ON notifications (channel, sequence)"
+                )
+            )
+        await storage.close()
+
+        reopened = SQLiteStorage(db_path=db_path)
+        await reopened.initialize()
+        async with reopened.engine.connect() as conn:
+            indexes = await conn.execute(text("PRAGMA index_list(notifications)"))
+            assert {row.name: row.unique for row in indexes}[
+                "ix_notifications_channel_sequence"
+            ] == 1
+        notification = (await reopened.get_notifications("ops", limit=1))[0]
+        notification.metadata.id = "duplicate"
+        with pytest.raises(IntegrityError):
+            await reopened.save_notification(notification)
+        await reopened.close()
+
+    async def test_incremental_vacuum(self, tmp_path):
+        """Test converting to incremental auto-vacuum and reclaiming space."""
+        db_path = str(tmp_path / "test.db")
+        storage = SQLiteStorage(db_path=db_path)
+        await storage.initialize()
+        await storage.save_channel(
+            Channel(id="ops", name="Ops", createdAt=datetime.now(), createdBy="u")
+        )
+        past = datetime.now() - timedelta(minutes=1)
+        await self._publish(storage, "ops", 200, "Bulk", "x" * 2000, validity=past)
+        await storage.close()
+
+        # Existing database: converted with a one-time VACUUM, search index rebuilt
+        storage = SQLiteStorage(db_path=db_path, incremental_vacuum=True)
+        await storage.initialize()
+        async with storage.engine.connect() as conn:
+            assert (await conn.execute(text("PRAGMA auto_vacuum"))).scalar_one() == 2
+
+        assert await storage.purge_expired() == 199
+        async with storage.engine.connect() as conn:
+            before = (await conn.execute(text("PRAGMA freelist_count"))).scalar_one()
+        await storage.reclaim_space()
+        async with storage.engine.connect() as conn:
+            after = (await conn.execute(text("PRAGMA freelist_count"))).scalar_one()
+        assert before > 0
+        assert after == 0
+        await storage.close()
+
+    async def test_amortized_trim(self, tmp_path):
+        """Test that trimming is amortized while reads stay exact."""
+        storage = SQLiteStorage(
+            db_path=str(tmp_path / "test.db"), max_history_per_channel=10, trim_interval=5
+        )
+        await storage.initialize()
+        channel = Channel(
+            id="test-channel", name="Test", createdAt=datetime.now(), createdBy="user"
+        )
+        await storage.save_channel(channel)
+
+        for i in range(1, 24):
+            notification = Notification(
+                sender=Sender(id="user1", name="User 1", role="dev"),
+                context=Context(theme="info", priority="medium"),
+                information=Information(title=f"Notification {i}", body="Test"),
+                metadata=Metadata(
+                    id=f"notif{i}", timestamp=datetime.now(), channel="test-channel", sequence=i
+                ),
+            )
+            await storage.save_notification(notification)
+
+        # Last trim ran at insert 20 (watermark 10); 11-23 are still on disk
+        async with storage.engine.connect() as conn:
+            result = await conn.execute(text("SELECT count(*) FROM notifications"))
+            assert result.scalar_one() == 13
+
+        # Reads only see the latest max_history
+        assert await storage.get_notification_count("test-channel") == 10
+        notifs = await storage.get_notifications("test-channel", limit=50)
+        assert {n.metadata.sequence for n in notifs} == set(range(14, 24))
+
+        await storage.close()
+
+    async def test_latest_sequence(self, sqlite_storage):
+        """Test latest sequence lookup and assignment of missing sequences."""
+        channel = Channel(
+            id="test-channel", name="Test", createdAt=datetime.now(), createdBy="user"
+        )
+        await sqlite_storage.save_channel(channel)
+        assert await sqlite_storage.get_latest_sequence("test-channel") == 0
+
+        for i, sequence in enumerate([3, None]):
+            notification = Notification(
+                sender=Sender(id="user1", name="User 1", role="dev"),
+                context=Context(theme="info", priority="medium"),
+                information=Information(title=f"Notification {i}", body="Test"),
+                metadata=Metadata(
+                    id=f"notif{i}",
+                    timestamp=datetime.now(),
+                    channel="test-channel",
+                    sequence=sequence,
+                ),
+            )
+            await sqlite_storage.save_notification(notification)
+
+        assert await sqlite_storage.get_latest_sequence("test-channel") == 4
+
+    async def test_save_notifications_bulk(self, sqlite_storage):
+        """Test bulk insert across channels in one transaction."""
+        for channel_id in ("channel1", "channel2"):
+            await sqlite_storage.save_channel(
+                Channel(id=channel_id, name=channel_id, createdAt=datetime.now(), createdBy="user")
+            )
+
+        notifications = [
+            Notification(
+                sender=Sender(id="user1", name="User 1", role="dev"),
+                context=Context(theme="info", priority="medium"),
+                information=Information(title=f"Notification {i}", body="Test"),
+                metadata=Metadata(
+                    id=f"notif{i}", timestamp=datetime.now(), channel=f"channel{i % 2 + 1}"
+                ),
+            )
+            for i in range(6)
+        ]
+        await sqlite_storage.save_notifications(notifications)
+
+        assert await sqlite_storage.get_notification_count("channel1") == 3
+        assert await sqlite_storage.get_notification_count("channel2") == 3
+        # Sequences are assigned per channel in order
+        assert await sqlite_storage.get_latest_sequence("channel1") == 3
+
+    async def test_bulk_operations(self, sqlite_storage):
+        """Test batch methods, including ID lists longer than one IN clause."""
+        for channel_id in ("ops", "dev"):
+            await sqlite_storage.save_channel(
+                Channel(id=channel_id, name=channel_id, createdAt=datetime.now(), createdBy="u")
+            )
+        subscriptions = [
+            Subscription(
+                id=f"sub-{i}",
+                clientId=f"client-{i}",
+                channel="ops" if i % 2 else "dev",
+                subscribedAt=datetime.now(),
+            )
+            for i in range(1200)
+        ]
+        await sqlite_storage.save_subscriptions(subscriptions)
+        await sqlite_storage.save_subscriptions(subscriptions[:10])  # Upserts
+
+        channels = await sqlite_storage.get_channels(["dev", "missing", *["ops"] * 600])
+        assert sorted(channels) == ["dev", "ops"]
+        by_channel = await sqlite_storage.get_subscriptions_by_channels(["ops", "dev", "none"])
+        assert {c: len(subs) for c, subs in by_channel.items()} == {
+            "ops": 600,
+            "dev": 600,
+            "none": 0,
+        }
+
+        await sqlite_storage.delete_subscriptions([f"sub-{i}" for i in range(1100)])
+        remaining = await sqlite_storage.get_subscriptions_by_channels(["ops", "dev"])
+        assert sorted(s.id for subs in remaining.values() for s in subs) == sorted(
+            f"sub-{i}" for i in range(1100, 1200)
+        )
+
+    async def test_iter_notifications(self, sqlite_storage):
+        """Test that streamed ranges honour bounds, the history window and expiry."""
+        await sqlite_storage.save_channel(
+            Channel(id="ops", name="Ops", createdAt=datetime.now(), createdBy="u")
+        )
+        sqlite_storage.trim_interval = 1000  # Leave rows past the window untrimmed
+        expired = datetime.now() - timedelta(minutes=1)
+        await sqlite_storage.save_notifications(
+            [
+                Notification(
+                    sender=Sender(id="user1", name="User 1", role="dev"),
+                    context=Context(
+                        theme="info", priority="medium", validity=expired if i == 15 else None
+                    ),
+                    information=Information(title=f"Entry {i}", body="Body"),
+                    metadata=Metadata(
+                        id=f"ops-{i}", timestamp=datetime.now(), channel="ops", sequence=i
+                    ),
+                )
+                for i in range(1, 21)
+            ]
+        )
+
+        async def sequences(**kwargs):
+            stream = sqlite_storage.iter_notifications("ops", **kwargs)
+            return [n.metadata.sequence async for n in stream]
+
+        assert await sequences(batch_size=3) == [11, 12, 13, 14, 16, 17, 18, 19, 20]
+        assert await sequences(since=12, until=17) == [13, 14, 16, 17]
+        assert await sequences(since=20) == []
+        with pytest.raises(ValueError):
+            await sequences(batch_size=0)
+
+
+class TestSQLiteArchive:
+    """Test the compressed archive tier for trimmed history."""
+
+    async def _open(self, tmp_path, **kwargs):
+        storage = SQLiteStorage(
+            db_path=str(tmp_path / "test.db"),
+            max_history_per_channel=10,
+            trim_interval=5,
+            archive_dir=str(tmp_path / "archive"),
+            **kwargs,
+        )
+        await storage.initialize()
+        if await storage.get_channel("ops") is None:
+            await storage.save_channel(
+                Channel(id="ops", name="Ops", createdAt=datetime.now(), createdBy="u")
+            )
+        return storage
+
+    async def _publish(self, storage, start, stop, validity=None):
+        await storage.save_notifications(
+            [
+                Notification(
+                    sender=Sender(id="user1", name="User 1", role="dev"),
+                    context=Context(theme="info", priority="medium", validity=validity),
+                    information=Information(title=f"Entry {i}", body="Archived body"),
+                    metadata=Metadata(
+                        id=f"ops-{i}", timestamp=datetime.now(), channel="ops", sequence=i
+                    ),
+                )
+                for i in range(start, stop)
+            ]
+        )
+
+    async def _walk(self, storage, limit, **cursor):
+        """Follow cursors to the end, returning every sequence seen."""
+        seen = []
+        while page := await storage.get_notifications_page("ops", limit=limit, **cursor):
+            seen.extend(n.metadata.sequence for n in page)
+            if "after" in cursor:
+                cursor = {"after": page[0].metadata.sequence}
+            else:
+                cursor = {"before": page[-1].metadata.sequence}
+        return seen
+
+    async def test_trim_moves_rows_into_archive(self, tmp_path):
+        """Test that trimmed rows stay reachable through cursors in both directions."""
+        storage = await self._open(tmp_path)
+        for start in range(1, 101, 5):
+            await self._publish(storage, start, start + 5)
+
+        async with storage.engine.connect() as conn:
+            hot = (await conn.execute(text("SELECT count(*) FROM notifications"))).scalar_one()
+        assert hot <= 15
+        assert storage.archive.last_sequence("ops") == 90
+        assert list(storage.archive._channel_dir("ops").glob("*.seg"))
+
+        # Hot-window reads are unchanged
+        assert await storage.get_notification_count("ops") == 10
+        assert len(await storage.get_notifications("ops", limit=50)) == 10
+
+        assert await self._walk(storage, 7) == list(range(100, 0, -1))
+        forward = await self._walk(storage, 7, after=0)
+        assert sorted(forward) == list(range(1, 101))
+
+        page = await storage.get_notifications_page("ops", limit=3, before=42)
+        assert [n.metadata.sequence for n in page] == [41, 40, 39]
+        assert page[0].information.title == "Entry 41"
+        await storage.close()
+
+    async def test_iter_notifications_spans_archive(self, tmp_path):
+        """Test that streams read archived history before the hot table."""
+        storage = await self._open(tmp_path)
+        for start in range(1, 51, 5):
+            await self._publish(storage, start, start + 5)
+        assert storage.archive.last_sequence("ops") == 40
+
+        streamed = storage.iter_notifications("ops", batch_size=4)
+        assert [n.metadata.sequence async for n in streamed] == list(range(1, 51))
+        ranged = storage.iter_notifications("ops", since=37, until=43, batch_size=2)
+        assert [n.metadata.sequence async for n in ranged] == list(range(38, 44))
+        await storage.close()
+
+    async def test_archive_survives_restart_and_segments_roll(self, tmp_path):
+        """Test that the sparse index is rebuilt on open across several segments."""
+        storage = await self._open(tmp_path, archive_segment_bytes=256)
+        for start in range(1, 61, 5):
+            await self._publish(storage, start, start + 5)
+        await storage.close()
+
+        segments = list(storage.archive._channel_dir("ops").glob("*.seg"))
+        assert len(segments) > 1
+
+        reopened = await self._open(tmp_path, archive_segment_bytes=256)
+        assert reopened.archive.last_sequence("ops") == 50
+        assert await self._walk(reopened, 9) == list(range(60, 0, -1))
+        await reopened.close()
+
+    async def test_torn_frame_truncated(self, tmp_path):
+        """Test that a partially written frame is dropped on open."""
+        storage = await self._open(tmp_path)
+        for start in range(1, 31, 5):
+            await self._publish(storage, start, start + 5)
+        await storage.close()
+
+        (segment,) = storage.archive._channel_dir("ops").glob("*.seg")
+        intact = segment.stat().st_size
+        with open(segment, "ab") as f:
+            f.write(b"\x00" * 30)
+
+        reopened = await self._open(tmp_path)
+        assert segment.stat().st_size == intact
+        assert await self._walk(reopened, 50) == list(range(30, 0, -1))
+        await reopened.close()
+
+    async def test_expired_and_deleted_channels(self, tmp_path):
+        """Test that archived reads skip expired entries and channel deletion drops the archive."""
+        storage = await self._open(tmp_path)
+        past = datetime.now() - timedelta(minutes=1)
+        await self._publish(storage, 1, 6, validity=past)
+        for start in range(6, 31, 5):
+            await self._publish(storage, start, start + 5)
+
+        assert await self._walk(storage, 4) == list(range(30, 5, -1))
+
+        await storage.delete_channel("ops")
+        assert not storage.archive._channel_dir("ops").exists()
+        assert storage.archive.last_sequence("ops") == 0
+        await storage.close()
+
+    async def test_channel_ids_stay_inside_archive(self, tmp_path):
+        """Test that channel IDs like '..' neither escape the archive nor get lost on restart."""
+        channels = [".", "..", "a/../b"]
+        storage = await self._open(tmp_path)
+        for channel_id in channels:
+            await storage.save_channel(
+                Channel(id=channel_id, name="Odd", createdAt=datetime.now(), createdBy="u")
+            )
+            await storage.save_notifications(
+                [
+                    Notification(
+                        sender=Sender(id="user1", name="User 1", role="dev"),
+                        context=Context(theme="info", priority="medium"),
+                        information=Information(title=f"Entry {i}", body="Archived body"),
+                        metadata=Metadata(
+                            id=f"{channel_id}-{i}",
+                            timestamp=datetime.now(),
+                            channel=channel_id,
+                            sequence=i,
+                        ),
+                    )
+                    for i in range(1, 16)
+                ]
+            )
+        await storage.close()
+
+        archive_dir = tmp_path / "archive"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["archive", "test.db"]
+        for channel_id in channels:
+            assert storage.archive._channel_dir(channel_id).parent == archive_dir
+
+        reopened = await self._open(tmp_path)
+        for channel_id in channels:
+            assert reopened.archive.last_sequence(channel_id) == 5
+            page = await reopened.get_notifications_page(channel_id, limit=50)
+            assert [n.metadata.sequence for n in page] == list(range(15, 0, -1))
+
+        await reopened.delete_channel("..")
+        assert (tmp_path / "test.db").exists()
+        assert reopened.archive.last_sequence(".") == 5
+        await reopened.close()
+
+
+class TestSQLiteBackup:
+    """Test online backups through the SQLite backup API."""
+
+    async def _open(self, path):
+        storage = SQLiteStorage(db_path=str(path), max_history_per_channel=10_000)
+        await storage.initialize()
+        if await storage.get_channel("ops") is None:
+            await storage.save_channel(
+                Channel(id="ops", name="Ops", createdAt=datetime.now(), createdBy="u")
+            )
+        return storage
+
+    def _notification(self, i):
+        return Notification(
+            sender=Sender(id="user1", name="User 1", role="dev"),
+            context=Context(theme="info", priority="medium"),
+            information=Information(title=f"Backup entry {i}", body="x" * 500),
+            metadata=Metadata(id=f"ops-{i}", timestamp=datetime.now(), channel="ops", sequence=i),
+        )
+
+    async def test_backup_is_complete_copy(self, tmp_path):
+        """Test that a stepped backup restores history and the search index."""
+        storage = await self._open(tmp_path / "live.db")
+        await storage.save_notifications([self._notification(i) for i in range(1, 301)])
+
+        stats = await storage.backup(tmp_path / "backup.db", pages=4, sleep=0)
+        assert stats.pages > 4
+        assert stats.restarts == 0
+        assert not (tmp_path / "backup.db.tmp").exists()
+        await storage.close()
+
+        restored = await self._open(tmp_path / "backup.db")
+        assert await restored.get_latest_sequence("ops") == 300
+        results = await restored.search_notifications("entry 150")
+        assert [r.notification.metadata.id for r in results] == ["ops-150"]
+        await restored.close()
+
+    async def test_backup_during_writes(self, tmp_path):
+        """Test that concurrent publishes neither block nor corrupt the backup."""
+        storage = await self._open(tmp_path / "live.db")
+        await storage.save_notifications([self._notification(i) for i in range(1, 501)])
+
+        written = 500
+
+        async def publish():
+            nonlocal written
+            while not backup_task.done():
+                written += 1
+                await storage.save_notification(self._notification(written))
+
+        backup_task = asyncio.create_task(
+            storage.backup(tmp_path / "backup.db", pages=1, sleep=0.001, max_restarts=1)
+        )
+        await asyncio.gather(backup_task, publish())
+        await storage.close()
+
+        restored = await self._open(tmp_path / "backup.db")
+        latest = await restored.get_latest_sequence("ops")
+        assert 500 <= latest <= written
+        assert await restored.get_notification_count("ops") == latest
+        await restored.close()
+
+    async def test_invalid_step(self, tmp_path):
+        """Test that a non-positive step size is rejected."""
+        storage = await self._open(tmp_path / "live.db")
+        with pytest.raises(ValueError):
+            await storage.backup(tmp_path / "backup.db", pages=0)
+        await storage.close()
+
+
+class TestShardedSQLiteStorage:
+    """Test channels partitioned across several SQLite files."""
+
+    CHANNELS = [f"channel-{i}" for i in range(12)]
+
+    async def _open(self, tmp_path, shards=3):
+        storage = ShardedSQLiteStorage(db_path=str(tmp_path / "storage.db"), shards=shards)
+        await storage.initialize()
+        return storage
+
+    async def _populate(self, storage):
+        for channel_id in self.CHANNELS:
+            await storage.save_channel(
+                Channel(id=channel_id, name=channel_id, createdAt=datetime.now(), createdBy="u")
+            )
+            await storage.save_subscription(
+                Subscription(
+                    id=f"sub-{channel_id}",
+                    clientId="client",
+                    channel=channel_id,
+                    subscribedAt=datetime.now(),
+                )
+            )
+        await storage.save_notifications(
+            [
+                Notification(
+                    sender=Sender(id="user1", name="User 1", role="dev"),
+                    context=Context(theme="info", priority="medium"),
+                    information=Information(title=f"Deploy {channel_id}", body="Sharded body"),
+                    metadata=Metadata(
+                        id=f"{channel_id}-{i}",
+                        timestamp=datetime.now(),
+                        channel=channel_id,
+                        sequence=i,
+                    ),
+                )
+                for channel_id in self.CHANNELS
+                for i in (1, 2)
+            ]
+        )
+
+    async def test_bulk_operations(self, tmp_path):
+        """Test that batch methods are split by shard and merged back."""
+        storage = await self._open(tmp_path)
+        await self._populate(storage)
+        await storage.save_subscriptions(
+            [
+                Subscription(
+                    id=f"bulk-{channel_id}",
+                    clientId="bulk",
+                    channel=channel_id,
+                    subscribedAt=datetime.now(),
+                )
+                for channel_id in self.CHANNELS
+            ]
+        )
+
+        channels = await storage.get_channels([*self.CHANNELS, "missing"])
+        assert sorted(channels) == sorted(self.CHANNELS)
+        by_channel = await storage.get_subscriptions_by_channels(self.CHANNELS[::-1])
+        assert list(by_channel) == self.CHANNELS[::-1]
+        assert all(len(subs) == 2 for subs in by_channel.values())
+
+        await storage.delete_subscriptions([f"bulk-{c}" for c in self.CHANNELS])
+        assert await storage.get_subscriptions_by_client("bulk") == []
+        assert len(await storage.get_subscriptions_by_client("client")) == 12
+        await storage.close()
+
+    async def test_channels_spread_over_shards(self, tmp_path):
+        """Test that each channel's rows live only on its shard."""
+        storage = await self._open(tmp_path)
+        await self._populate(storage)
+
+        assert {storage.shard_index(c) for c in self.CHANNELS} == {0, 1, 2}
+        for channel_id in self.CHANNELS:
+            owner = storage.shard_for(channel_id)
+            assert await owner.get_notification_count(channel_id) == 2
+            for shard in storage.shards:
+                if shard is not owner:
+                    assert await shard.get_channel(channel_id) is None
+
+            page = await storage.get_notifications_page(channel_id, limit=10)
+            assert [n.metadata.sequence for n in page] == [2, 1]
+            stream = storage.iter_notifications(channel_id)
+            assert [n.metadata.sequence async for n in stream] == [1, 2]
+            assert await storage.get_latest_sequence(channel_id) == 2
+        await storage.close()
+
+        assert sorted(p.name for p in tmp_path.glob("*.db")) == [
+            f"storage.shard-{i}-of-3.db" for i in range(3)
+        ]
+
+    async def test_fan_out_queries(self, tmp_path):
+        """Test that cross-channel queries merge the results of every shard."""
+        storage = await self._open(tmp_path)
+        await self._populate(storage)
+
+        assert [c.id for c in await storage.list_channels()] == self.CHANNELS
+        subscriptions = await storage.get_subscriptions_by_client("client")
+        assert sorted(s.channel for s in subscriptions) == sorted(self.CHANNELS)
+
+        await storage.delete_subscription("sub-channel-0")
+        assert len(await storage.get_subscriptions_by_client("client")) == 11
+
+        results = await storage.search_notifications("deploy", limit=5)
+        assert len(results) == 5
+        assert results == sorted(results, key=lambda r: r.score, reverse=True)
+        results = await storage.search_notifications("deploy", channels=["channel-3", "channel-7"])
+        assert {r.notification.metadata.channel for r in results} == {"channel-3", "channel-7"}
+
+        await storage.delete_channel("channel-5")
+        assert len(await storage.list_channels()) == 11
+        await storage.close()
+
+    async def test_purge_expired_sums_shards(self, tmp_path):
+        """Test that purges run on every shard and report the total."""
+        storage = await self._open(tmp_path)
+        await self._populate(storage)
+        past = datetime.now() - timedelta(hours=1)
+        await storage.save_notifications(
+            [
+                Notification(
+                    sender=Sender(id="user1", name="User 1", role="dev"),
+                    context=Context(theme="info", priority="medium", validity=past),
+                    information=Information(title="Stale", body="Expired"),
+                    metadata=Metadata(
+                        id=f"{channel_id}-stale{i}",
+                        timestamp=datetime.now(),
+                        channel=channel_id,
+                        sequence=i,
+                    ),
+                )
+                for channel_id in self.CHANNELS
+                for i in (0, -1)
+            ]
+        )
+
+        assert await storage.purge_expired(batch_size=100) == 24
+        assert await storage.purge_expired(batch_size=100) == 0
+        await storage.close()
+
+    async def test_rejects_changed_shard_count(self, tmp_path):
+        """Test that files from a different shard count are not silently re-routed."""
+        storage = await self._open(tmp_path, shards=2)
+        await storage.close()
+
+        with pytest.raises(ValueError, match="2-shard layout"):
+            await self._open(tmp_path, shards=4)
+        with pytest.raises(ValueError):
+            ShardedSQLiteStorage(db_path=str(tmp_path / "storage.db"), shards=0)
+
+
+class TestSQLitePragmaProfiles:
+    """Test PRAGMA profiles applied on every connection."""
+
+    async def _pragma(self, conn, name):
+        result = await conn.execute(text(f"PRAGMA {name}"))
+        return result.scalar_one()
+
+    async def test_profile_applied_to_every_connection(self, tmp_path):
+        """Test that concurrently checked-out connections all get the profile."""
+        storage = SQLiteStorage(db_path=str(tmp_path / "test.db"), pragma_profile="durable")
+        await storage.initialize()
+
+        async with (
+            storage.engine.connect() as writer,
+            storage.read_engine.connect() as reader1,
+            storage.read_engine.connect() as reader2,
+        ):
+            for conn in (writer, reader1, reader2):
+                assert await self._pragma(conn, "foreign_keys") == 1
+                assert await self._pragma(conn, "synchronous") == 2  # FULL
+                assert await self._pragma(conn, "busy_timeout") == 5000
+                assert (await self._pragma(conn, "journal_mode")).lower() == "wal"
+            assert await self._pragma(writer, "query_only") == 0
+            assert await self._pragma(reader1, "query_only") == 1
+
+        await storage.close()
+
+    async def test_pragma_overrides(self, tmp_path):
+        """Test that explicit pragmas override the profile."""
+        storage = SQLiteStorage(
+            db_path=str(tmp_path / "test.db"),
+            pragma_profile="throughput",
+            pragmas={"cache_size": -1000},
+        )
+        await storage.initialize()
+
+        async with storage.engine.connect() as conn:
+            assert await self._pragma(conn, "synchronous") == 0  # OFF
+            assert await self._pragma(conn, "cache_size") == -1000
+
+        await storage.close()
+
+    async def test_reads_use_read_only_pool(self, tmp_path):
+        """Test that readers see committed writes but cannot write."""
+        storage = SQLiteStorage(db_path=str(tmp_path / "test.db"), read_pool_size=2)
+        await storage.initialize()
+        await storage.save_channel(
+            Channel(id="test-channel", name="Test", createdAt=datetime.now(), createdBy="user")
+        )
+
+        assert storage.read_engine.pool.size() == 2
+        assert storage.engine.pool.size() == 1
+        assert (await storage.get_channel("test-channel")) is not None
+
+        async with storage.read_engine.connect() as reader:
+            with pytest.raises(OperationalError):
+                await reader.execute(text("DELETE FROM channels"))
+
+        await storage.close()
+
+    def test_invalid_profile_and_pragma(self, tmp_path):
+        """Test that unknown profiles, malformed pragmas and empty read pools are rejected."""
+        with pytest.raises(ValueError):
+            SQLiteStorage(db_path=str(tmp_path / "test.db"), pragma_profile="fast")
+
+        with pytest.raises(ValueError):
+            SQLiteStorage(
+                db_path=str(tmp_path / "test.db"), pragmas={"cache_size": "1; DROP TABLE x"}
+            )
+
+        with pytest.raises(ValueError):
+            SQLiteStorage(db_path=str(tmp_path / "test.db"), read_pool_size=0)
@@ -1,10 +1,29 @@
 """Tests for storage implementations."""
 
+import asyncio
+import os
+import threading
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 
+from notify_mcp.core import storage_adapter
+from notify_mcp.core.storage_adapter import StorageAdapter
+from notify_mcp.storage.caching import CachingStorageAdapter
+from notify_mcp.storage.compact import CompactNotification
+from notify_mcp.storage.expiry import ExpiryHeap
+from notify_mcp.core.expiry_reaper import ExpiryReaper
+from notify_mcp.storage.eviction import (
+    ChannelFloorPolicy,
+    PriorityAwarePolicy,
+    create_eviction_policy,
+)
+from notify_mcp.storage.journal import MemoryJournal
 from notify_mcp.storage.memory import InMemoryStorage
+from notify_mcp.storage.ring_buffer import RingBuffer
+from notify_mcp.utils.search import InvertedIndex, fts_query, make_snippet
 from notify_mcp.models import (
+    Action,
+    Attachment,
     Channel,
     ChannelPermissions,
     Notification,
@@ -14,7 +33,9 @@ from notify_mcp.models import (
     Metadata,
     Subscription,
     SubscriptionFilter,
+    Visibility,
 )
+from tests.conftest import FakeClock, make_notification
 
 
 @pytest.fixture
@@ -150,6 +171,38 @@ class TestInMemoryStorage:
         assert "notif-5" in ids
         assert "notif-0" not in ids
 
+    @pytest.mark.asyncio
+    async def test_get_notification_by_id(self, storage):
+        """Test looking up notifications by ID, including evicted ones."""
+        storage = InMemoryStorage(max_history_per_channel=3)
+
+        for i in range(5):
+            notification = Notification(
+                schema_version="1.0.0",
+                sender=Sender(id="user", name="User", role="dev"),
+                context=Context(theme="info", priority="medium", tags=[]),
+                information=Information(title=f"Test {i}", body=f"Body {i}", format="text"),
+                metadata=Metadata(
+                    id=f"notif-{i}",
+                    timestamp=datetime.now(),
+                    channel="test",
+                    sequence=i,
+                ),
+            )
+            await storage.save_notification(notification)
+
+        found = await storage.get_notification("test", "notif-4")
+        assert found is not None
+        assert found.information.title == "Test 4"
+
+        # Evicted and unknown IDs are not found
+        assert await storage.get_notification("test", "notif-0") is None
+        assert await storage.get_notification("other", "notif-4") is None
+
+        # Tail reads stay in chronological order after wrap-around
+        notifications = await storage.get_notifications("test", limit=2)
+        assert [n.metadata.id for n in notifications] == ["notif-3", "notif-4"]
+
     @pytest.mark.asyncio
     async def test_get_notification_count(self, storage, sample_notification):
         """Test getting notification count for a channel."""
@@ -271,3 +324,974 @@ class TestInMemoryStorage:
 
         by_client = await storage.get_subscriptions_by_client("client-456")
         assert len(by_client) == 0
+
+    @pytest.mark.asyncio
+    async def test_get_subscriptions_by_client_and_channel(self, storage):
+        """Test the (client, channel) composite index."""
+        sub1 = Subscription(
+            id="sub-1",
+            clientId="client-1",
+            channel="channel-1",
+            subscribedAt=datetime.now(),
+        )
+        sub2 = Subscription(
+            id="sub-2",
+            clientId="client-1",
+            channel="channel-2",
+            subscribedAt=datetime.now(),
+        )
+        await storage.save_subscription(sub1)
+        await storage.save_subscription(sub2)
+
+        subscriptions = await storage.get_subscriptions_by_client_and_channel(
+            "client-1", "channel-2"
+        )
+        assert [sub.id for sub in subscriptions] == ["sub-2"]
+
+        await storage.delete_subscription("sub-2")
+        assert await storage.get_subscriptions_by_client_and_channel("client-1", "channel-2") == []
+
+    @pytest.mark.asyncio
+    async def test_resave_subscription_moves_indexes(self, storage, sample_subscription):
+        """Test that re-saving a subscription does not duplicate or leave stale index entries."""
+        await storage.save_subscription(sample_subscription)
+        await storage.save_subscription(sample_subscription)
+        assert len(await storage.get_subscriptions_by_channel("test-channel")) == 1
+
+        moved = sample_subscription.model_copy(update={"channel": "other-channel"})
+        await storage.save_subscription(moved)
+
+        assert await storage.get_subscriptions_by_channel("test-channel") == []
+        assert len(await storage.get_subscriptions_by_channel("other-channel")) == 1
+        assert len(await storage.get_subscriptions_by_client("client-456")) == 1
+
+    @pytest.mark.asyncio
+    async def test_delete_channel_cleans_subscription_indexes(self, storage, sample_channel):
+        """Test that deleting a channel removes its subscriptions from every index."""
+        await storage.save_channel(sample_channel)
+        for i in range(3):
+            await storage.save_subscription(
+                Subscription(
+                    id=f"sub-{i}",
+                    clientId=f"client-{i}",
+                    channel="test-channel",
+                    subscribedAt=datetime.now(),
+                )
+            )
+        await storage.save_subscription(
+            Subscription(
+                id="sub-other",
+                clientId="client-0",
+                channel="other-channel",
+                subscribedAt=datetime.now(),
+            )
+        )
+
+        await storage.delete_channel("test-channel")
+
+        assert await storage.get_subscriptions_by_channel("test-channel") == []
+        assert await storage.get_subscriptions_by_client("client-1") == []
+        remaining = await storage.get_subscriptions_by_client("client-0")
+        assert [sub.id for sub in remaining] == ["sub-other"]
+
+    @pytest.mark.asyncio
+    async def test_bulk_operations(self, storage, sample_channel):
+        """Test batch channel and subscription methods."""
+        await storage.save_channel(sample_channel)
+        await storage.save_subscriptions(
+            [
+                Subscription(
+                    id=f"sub-{i}",
+                    clientId=f"client-{i % 2}",
+                    channel="test-channel" if i < 3 else "other-channel",
+                    subscribedAt=datetime.now(),
+                )
+                for i in range(5)
+            ]
+        )
+
+        assert list(await storage.get_channels(["missing", "test-channel"])) == ["test-channel"]
+        by_channel = await storage.get_subscriptions_by_channels(
+            ["test-channel", "other-channel", "missing"]
+        )
+        assert {channel: [s.id for s in subs] for channel, subs in by_channel.items()} == {
+            "test-channel": ["sub-0", "sub-1", "sub-2"],
+            "other-channel": ["sub-3", "sub-4"],
+            "missing": [],
+        }
+
+        await storage.delete_subscriptions(["sub-0", "sub-3", "unknown"])
+        assert [s.id for s in await storage.get_subscriptions_by_client("client-0")] == [
+            "sub-2",
+            "sub-4",
+        ]
+        assert [s.id for s in await storage.get_subscriptions_by_client("client-1")] == ["sub-1"]
+
+
+class TestRingBuffer:
+    """Test the ring buffer backing in-memory notification history."""
+
+    def test_append_and_tail(self):
+        """Test appending below capacity and reading the tail."""
+        ring = RingBuffer(capacity=5)
+        for i in range(3):
+            assert ring.append(f"k{i}", i) is None
+
+        assert len(ring) == 3
+        assert ring.tail(2) == [1, 2]
+        assert ring.tail(10) == [0, 1, 2]
+        assert ring.tail(0) == []
+
+    def test_eviction_when_full(self):
+        """Test that appending to a full buffer evicts the oldest item."""
+        ring = RingBuffer(capacity=3)
+        for i in range(3):
+            ring.append(f"k{i}", i)
+
+        assert ring.append("k3", 3) == 0
+        assert len(ring) == 3
+        assert list(ring) == [1, 2, 3]
+        assert ring.get("k0") is None
+        assert "k0" not in ring
+        assert ring.get("k3") == 3
+
+    def test_popleft(self):
+        """Test removing the oldest item explicitly."""
+        ring = RingBuffer(capacity=3)
+        assert ring.popleft() is None
+
+        ring.append("a", 1)
+        ring.append("b", 2)
+        assert ring.peek_oldest() == 1
+        assert ring.popleft() == 1
+        assert ring.peek_oldest() == 2
+        assert len(ring) == 1
+
+        # Freed slot is reused by subsequent appends
+        ring.append("c", 3)
+        ring.append("d", 4)
+        assert list(ring) == [2, 3, 4]
+
+    def test_duplicate_key_keeps_newest(self):
+        """Test that evicting an older duplicate does not drop the newer index entry."""
+        ring = RingBuffer(capacity=2)
+        ring.append("dup", "old")
+        ring.append("dup", "new")
+        ring.append("other", "x")
+
+        assert ring.get("dup") == "new"
+
+    def test_invalid_capacity(self):
+        """Test that a non-positive capacity is rejected."""
+        with pytest.raises(ValueError):
+            RingBuffer(capacity=0)
+
+    def test_indexing_after_wraparound(self):
+        """Test logical indexing (0 = oldest) once the buffer has wrapped."""
+        ring = RingBuffer(capacity=3)
+        for i in range(5):
+            ring.append(f"k{i}", i)
+
+        assert [ring[i] for i in range(len(ring))] == [2, 3, 4]
+        with pytest.raises(IndexError):
+            ring[3]
+
+    def test_filtered_tail_and_discard(self):
+        """Test skipping items in tail and removing them in place."""
+        ring = RingBuffer(capacity=4)
+        for i in range(6):
+            ring.append(f"k{i}", i)
+
+        assert ring.tail(2, keep=lambda i: i % 2) == [3, 5]
+        assert ring.discard_where(lambda i: i % 2) == [3, 5]
+        assert list(ring) == [2, 4]
+        assert ring.get("k4") == 4
+        assert "k3" not in ring
+
+        ring.append("k6", 6)
+        assert list(ring) == [2, 4, 6]
+
+
+class TestCompactNotification:
+    """Test the compact record used for in-memory history."""
+
+    def test_round_trip_defaults(self, sample_notification):
+        """Test that a minimal notification survives compaction unchanged."""
+        record = CompactNotification.from_notification(sample_notification)
+        restored = record.to_notification()
+
+        assert restored.model_dump() == sample_notification.model_dump()
+        assert record.visibility is None
+        assert record.actions is None
+
+    def test_round_trip_all_fields(self):
+        """Test that every optional field survives compaction unchanged."""
+        notification = Notification(
+            schemaVersion="1.0.0",
+            sender=Sender(
+                id="user1", name="Alice", role="dev", aiTool="claude", email="a@example.com"
+            ),
+            context=Context(
+                theme="decision",
+                priority="high",
+                validity=datetime(2030, 1, 1),
+                tags=["api", "breaking"],
+                relatedConversationId="conv-1",
+                projectId="proj-1",
+            ),
+            information=Information(
+                title="Title",
+                body="**Body**",
+                format="markdown",
+                attachments=[Attachment(type="link", url="https://example.com", name="doc")],
+            ),
+            metadata=Metadata(
+                id="notif-1",
+                timestamp=datetime.now(),
+                version="2",
+                channel="test",
+                replyTo="notif-0",
+                sequence=7,
+            ),
+            actions=[Action(type="approve", label="Approve", data={"k": "v"})],
+            visibility=Visibility(teams=["dev"], private=True, allowedUsers=["bob"]),
+        )
+
+        restored = CompactNotification.from_notification(notification).to_notification()
+
+        assert restored.model_dump() == notification.model_dump()
+        assert restored.model_dump(mode="json", exclude_none=True) == notification.model_dump(
+            mode="json", exclude_none=True
+        )
+
+    def test_strings_are_interned(self, sample_notification):
+        """Test that repeated strings share a single object across records."""
+        other = sample_notification.model_copy(deep=True)
+        other.metadata.channel = "".join(["test-", "channel"])
+
+        first = CompactNotification.from_notification(sample_notification)
+        second = CompactNotification.from_notification(other)
+
+        assert first.channel is second.channel
+        assert first.tags[0] is second.tags[0]
+
+
+class TestMemoryBudget:
+    """Test byte-budget eviction across channels."""
+
+    @pytest.mark.asyncio
+    async def test_usage_tracking(self):
+        """Test that memory usage follows saves, trims and channel deletes."""
+        storage = InMemoryStorage(max_history_per_channel=2)
+        assert storage.memory_bytes == 0
+
+        for i in range(3):
+            await storage.save_notification(make_notification(i, "a"))
+        size = CompactNotification.from_notification(make_notification(0, "a")).size
+        assert storage.memory_bytes == 2 * size
+
+        await storage.delete_channel("a")
+        assert storage.memory_bytes == 0
+        assert storage.get_memory_stats()["notifications"] == 0
+
+    @pytest.mark.asyncio
+    async def test_global_lru_evicts_oldest_across_channels(self):
+        """Test that the default policy evicts the globally oldest notifications."""
+        size = CompactNotification.from_notification(make_notification(0, "busy")).size
+        storage = InMemoryStorage(max_memory_bytes=size * 10)
+
+        # The idle channel's only notification is the oldest overall
+        await storage.save_notification(make_notification(0, "idle"))
+        for i in range(1, 30):
+            await storage.save_notification(make_notification(i, "busy"))
+
+        assert storage.memory_bytes <= size * 10
+        assert await storage.get_notification_count("idle") == 0
+        busy = await storage.get_notifications("busy", limit=100)
+        assert busy[-1].metadata.id == "busy-29"
+        assert storage.get_memory_stats()["evicted_by_budget"] > 0
+
+    @pytest.mark.asyncio
+    async def test_channel_floor_policy(self):
+        """Test that the floor policy keeps a minimum history in every channel."""
+        size = CompactNotification.from_notification(make_notification(0, "busy")).size
+        storage = InMemoryStorage(
+            max_memory_bytes=size * 10, eviction_policy=ChannelFloorPolicy(min_per_channel=2)
+        )
+
+        for i in range(2):
+            await storage.save_notification(make_notification(i, "idle"))
+        for i in range(2, 40):
+            await storage.save_notification(make_notification(i, "busy"))
+
+        assert await storage.get_notification_count("idle") == 2
+        assert storage.memory_bytes <= size * 10
+
+    @pytest.mark.asyncio
+    async def test_floor_stall_offers_only_published_channels(self):
+        """Test that once every channel is at its floor, publishes stop rescanning all channels."""
+
+        class CountingPolicy(ChannelFloorPolicy):
+            def victims(self, histories):
+                offered.append(len(histories))
+                return super().victims(histories)
+
+        offered: list[int] = []
+        size = CompactNotification.from_notification(make_notification(0, "ch-00")).size
+        storage = InMemoryStorage(
+            max_memory_bytes=size * 10, eviction_policy=CountingPolicy(min_per_channel=2)
+        )
+        for i in range(20):
+            await storage.save_notification(make_notification(i, f"ch-{i:02d}"))
+        assert offered[-1] == 20
+
+        # Every channel is at or below its floor: each publish offers its own channel only
+        offered.clear()
+        for i in range(20, 60):
+            await storage.save_notification(make_notification(i, "ch-05"))
+        assert offered == [1] * 40
+        assert await storage.get_notification_count("ch-05") == 2
+
+        # A new channel brings back a full pass
+        offered.clear()
+        await storage.save_notification(make_notification(60, "new"))
+        assert offered == [21]
+
+        storage.max_memory_bytes = size * 11
+        offered.clear()
+        await storage.save_notification(make_notification(61, "ch-06"))
+        assert offered == [21]
+
+    @pytest.mark.asyncio
+    async def test_priority_aware_policy(self):
+        """Test that low-priority history is evicted before critical history."""
+        size = CompactNotification.from_notification(make_notification(0, "alerts")).size
+        storage = InMemoryStorage(
+            max_memory_bytes=size * 10, eviction_policy=PriorityAwarePolicy()
+        )
+
+        for i in range(3):
+            await storage.save_notification(make_notification(i, "alerts", priority="critical"))
+        for i in range(3, 30):
+            await storage.save_notification(make_notification(i, "chatter", priority="low"))
+
+        assert await storage.get_notification_count("alerts") == 3
+
+    def test_create_eviction_policy(self):
+        """Test policy lookup by name."""
+        assert isinstance(create_eviction_policy("priority"), PriorityAwarePolicy)
+        floor = create_eviction_policy("channel-floor", min_per_channel=5)
+        assert isinstance(floor, ChannelFloorPolicy)
+        assert floor.min_per_channel == 5
+
+        with pytest.raises(ValueError):
+            create_eviction_policy("random")  # type: ignore[arg-type]
+
+
+class TestMemoryJournal:
+    """Test journal durability for in-memory storage."""
+
+    async def _open(self, path, **kwargs) -> InMemoryStorage:
+        storage = InMemoryStorage(journal=MemoryJournal(path, **kwargs))
+        await storage.initialize()
+        return storage
+
+    @pytest.mark.asyncio
+    async def test_restore_from_journal(self, tmp_path, sample_channel, sample_subscription):
+        """Test that state survives a restart via journal replay."""
+        storage = await self._open(tmp_path)
+        await storage.save_channel(sample_channel)
+        await storage.save_subscription(sample_subscription)
+        await storage.save_subscription(
+            sample_subscription.model_copy(update={"id": "sub-gone"})
+        )
+        await storage.delete_subscription("sub-gone")
+        for i in range(3):
+            await storage.save_notification(make_notification(i, "test-channel"))
+        await storage.close()
+
+        restored = await self._open(tmp_path)
+        assert (await restored.get_channel("test-channel")).name == "Test Channel"
+        subs = await restored.get_subscriptions_by_channel("test-channel")
+        assert [sub.id for sub in subs] == ["sub-123"]
+        notifications = await restored.get_notifications("test-channel", limit=10)
+        assert [n.metadata.id for n in notifications] == [
+            "test-channel-0",
+            "test-channel-1",
+            "test-channel-2",
+        ]
+        await restored.close()
+
+    @pytest.mark.asyncio
+    async def test_snapshot_compacts_journal(self, tmp_path, sample_channel):
+        """Test that a snapshot replaces old journals and restores with the tail."""
+        storage = await self._open(tmp_path)
+        await storage.save_channel(sample_channel)
+        for i in range(5):
+            await storage.save_notification(make_notification(i, "test-channel"))
+
+        await storage.snapshot()
+        await storage.save_notification(make_notification(5, "test-channel"))
+        await storage.close()
+
+        assert not (tmp_path / "journal.0.ndjson").exists()
+        assert (tmp_path / "snapshot.ndjson").exists()
+
+        restored = await self._open(tmp_path)
+        assert await restored.get_notification_count("test-channel") == 6
+        assert await restored.get_channel("test-channel") is not None
+        await restored.close()
+
+    @pytest.mark.asyncio
+    async def test_snapshot_syncs_off_the_event_loop(self, tmp_path, monkeypatch):
+        """Test that the rotated journal is fsync'd in a worker thread."""
+        storage = await self._open(tmp_path)
+        await storage.save_notification(make_notification(0, "test"))
+
+        fsync_threads = []
+        fsync = os.fsync
+
+        def record_fsync(fd):
+            fsync_threads.append(threading.current_thread())
+            fsync(fd)
+
+        monkeypatch.setattr(os, "fsync", record_fsync)
+        await storage.snapshot()
+        monkeypatch.undo()
+        await storage.close()
+
+        assert len(fsync_threads) == 2  # Rotated journal and snapshot
+        assert threading.main_thread() not in fsync_threads
+
+    @pytest.mark.asyncio
+    async def test_automatic_snapshot(self, tmp_path):
+        """Test that compaction is triggered once enough entries accumulate."""
+        storage = await self._open(tmp_path, snapshot_every=3)
+        for i in range(4):
+            await storage.save_notification(make_notification(i, "test"))
+        await storage.close()
+
+        assert (tmp_path / "snapshot.ndjson").exists()
+
+        restored = await self._open(tmp_path)
+        assert await restored.get_notification_count("test") == 4
+        await restored.close()
+
+    @pytest.mark.asyncio
+    async def test_truncated_journal_entry_is_ignored(self, tmp_path):
+        """Test that a torn final line from a crash does not break restore."""
+        storage = await self._open(tmp_path)
+        await storage.save_notification(make_notification(0, "test"))
+        await storage.close()
+
+        with open(tmp_path / "journal.0.ndjson", "a") as f:
+            f.write('{"op":"save_notification","data":{"sche')
+
+        restored = await self._open(tmp_path)
+        assert await restored.get_notification_count("test") == 1
+
+        # Appends after the repair are readable on the next restart
+        await restored.save_notification(make_notification(1, "test"))
+        await restored.close()
+
+        again = await self._open(tmp_path)
+        assert await again.get_notification_count("test") == 2
+        await again.close()
+
+
+class TestKeysetPagination:
+    """Test sequence-cursor pagination of channel history."""
+
+    @pytest.mark.asyncio
+    async def test_pages_newest_first(self):
+        """Test paging backwards and forwards with before/after cursors."""
+        storage = InMemoryStorage(max_history_per_channel=20)
+        for i in range(1, 31):
+            await storage.save_notification(make_notification(i, "test"))
+
+        latest = await storage.get_notifications_page("test", limit=5)
+        assert [n.metadata.sequence for n in latest] == [30, 29, 28, 27, 26]
+
+        older = await storage.get_notifications_page("test", limit=5, before=26)
+        assert [n.metadata.sequence for n in older] == [25, 24, 23, 22, 21]
+
+        newer = await storage.get_notifications_page("test", limit=3, after=21)
+        assert [n.metadata.sequence for n in newer] == [24, 23, 22]
+
+        # Only the retained history (sequences 11-30) is reachable
+        oldest = await storage.get_notifications_page("test", limit=5, before=13)
+        assert [n.metadata.sequence for n in oldest] == [12, 11]
+        assert await storage.get_notifications_page("test", limit=5, after=30) == []
+        assert await storage.get_notifications_page("missing") == []
+
+    @pytest.mark.asyncio
+    async def test_walk_full_history(self):
+        """Test that following before cursors visits every notification once."""
+        storage = InMemoryStorage(max_history_per_channel=100)
+        for i in range(1, 101):
+            await storage.save_notification(make_notification(i, "test"))
+
+        seen = []
+        before = None
+        while page := await storage.get_notifications_page("test", limit=7, before=before):
+            seen.extend(n.metadata.sequence for n in page)
+            before = page[-1].metadata.sequence
+
+        assert seen == list(range(100, 0, -1))
+
+    @pytest.mark.asyncio
+    async def test_filtered_pages(self):
+        """Test that filtered pages scan past non-matching notifications."""
+        storage = InMemoryStorage(max_history_per_channel=200)
+        for i in range(1, 121):
+            await storage.save_notification(
+                make_notification(i, "test", priority="high" if i % 10 == 0 else "low")
+            )
+
+        urgent = SubscriptionFilter(priority=["high"])
+        page = await storage.get_filtered_notifications_page("test", urgent, limit=3)
+        assert [n.metadata.sequence for n in page.notifications] == [120, 110, 100]
+        assert page.next_before == 100
+
+        rest = await storage.get_filtered_notifications_page("test", urgent, limit=20, before=100)
+        assert [n.metadata.sequence for n in rest.notifications] == list(range(90, 0, -10))
+        assert rest.next_before is None
+
+    @pytest.mark.asyncio
+    async def test_filtered_pages_bound_the_scan(self, monkeypatch):
+        """Test that a sparse filter returns partial pages with a cursor past the scanned rows."""
+        monkeypatch.setattr(storage_adapter, "MAX_FILTER_SCAN", 25)
+        storage = InMemoryStorage(max_history_per_channel=200)
+        for i in range(1, 101):
+            await storage.save_notification(
+                make_notification(i, "test", priority="high" if i == 5 else "low")
+            )
+
+        urgent = SubscriptionFilter(priority=["high"])
+        cursors = []
+        matched = []
+        before = None
+        while True:
+            page = await storage.get_filtered_notifications_page("test", urgent, before=before)
+            matched.extend(n.metadata.sequence for n in page.notifications)
+            if page.next_before is None:
+                break
+            cursors.append(before := page.next_before)
+
+        assert cursors == [76, 51, 26, 1]
+        assert matched == [5]
+
+    @pytest.mark.asyncio
+    async def test_iter_notifications(self):
+        """Test streamed ranges from the ring buffer and from the keyset-page default."""
+        storage = InMemoryStorage(max_history_per_channel=50)
+        for i in range(1, 61):
+            await storage.save_notification(make_notification(i, "test"))
+
+        async def sequences(iterate, **kwargs):
+            return [n.metadata.sequence async for n in iterate(storage, "test", **kwargs)]
+
+        for iterate in (InMemoryStorage.iter_notifications, StorageAdapter.iter_notifications):
+            assert await sequences(iterate, batch_size=7) == list(range(11, 61))
+            assert await sequences(iterate, since=20, until=33, batch_size=5) == list(
+                range(21, 34)
+            )
+            assert await sequences(iterate, since=60) == []
+            with pytest.raises(ValueError):
+                await sequences(iterate, batch_size=0)
+        assert [n async for n in storage.iter_notifications("missing")] == []
+
+    @pytest.mark.asyncio
+    async def test_iter_notifications_during_publishes(self):
+        """Test that publishes and evictions between batches neither repeat nor skip."""
+        storage = InMemoryStorage(max_history_per_channel=20)
+        for i in range(1, 21):
+            await storage.save_notification(make_notification(i, "test"))
+
+        seen = []
+        async for notification in storage.iter_notifications("test", batch_size=4):
+            seen.append(notification.metadata.sequence)
+            if len(seen) == 4:
+                # Evicts sequences 1-10, including the rest of the first batch
+                for i in range(21, 31):
+                    await storage.save_notification(make_notification(i, "test"))
+        assert seen == list(range(1, 5)) + list(range(11, 31))
+
+
+class TestSearch:
+    """Test full-text search for in-memory storage."""
+
+    def test_inverted_index_requires_all_terms(self):
+        """Test AND semantics, channel filtering, removal and size accounting."""
+        documents = {
+            "a": ("Database migration", "Running the migration tonight"),
+            "b": ("Deploy", "Database is fine"),
+            "c": ("Migration plan", "database schema changes"),
+        }
+        index = InvertedIndex(documents.__getitem__)
+        for sequence, (key, (title, body)) in enumerate(documents.items(), 1):
+            index.add(key, "ops" if key != "c" else "dev", sequence, title, body)
+
+        assert {hit.key for hit in index.search("database migration")} == {"a", "c"}
+        assert [hit.key for hit in index.search("database migration", channels=["dev"])] == ["c"]
+        assert index.search("database unknownword") == []
+
+        index.remove("a")
+        assert [hit.key for hit in index.search("migration", channels=["ops"])] == []
+        assert len(index) == 2
+
+        index.remove("b")
+        index.remove("c")
+        assert index.size == 0
+
+    def test_ranking_prefers_title_and_frequency(self):
+        """Test that title matches outrank body-only matches."""
+        documents = {
+            "body": ("Weekly update", "outage in eu-west"),
+            "title": ("Outage report", "details inside"),
+        }
+        index = InvertedIndex(documents.__getitem__)
+        for sequence, (key, (title, body)) in enumerate(documents.items(), 1):
+            index.add(key, "ops", sequence, title, body)
+
+        assert [hit.key for hit in index.search("outage")] == ["title", "body"]
+
+    def test_query_and_snippet_helpers(self):
+        """Test FTS query quoting and snippet highlighting."""
+        assert fts_query('did anyone announce "X"?') == '"did" "anyone" "announce" "x"'
+        assert fts_query("?!") is None
+
+        text = " ".join(f"word{i}" for i in range(30)) + " Release shipped"
+        snippet = make_snippet(text, ["release"], width=6)
+        assert snippet.startswith("…")
+        assert "[Release]" in snippet
+
+    @pytest.mark.asyncio
+    async def test_search_tracks_eviction_and_deletion(self):
+        """Test that evicted and deleted notifications drop out of the index."""
+        storage = InMemoryStorage(max_history_per_channel=3, search_index=True)
+        for i in range(5):
+            await storage.save_notification(
+                make_notification(i, "ops", body=f"release candidate {i}")
+            )
+        await storage.save_notification(make_notification(0, "dev", body="release notes"))
+
+        results = await storage.search_notifications("release")
+        assert {r.notification.metadata.id for r in results} == {
+            "ops-2", "ops-3", "ops-4", "dev-0"
+        }
+        assert "[release]" in results[0].snippet
+
+        only_dev = await storage.search_notifications("release", channels=["dev"])
+        assert [r.notification.metadata.id for r in only_dev] == ["dev-0"]
+
+        await storage.delete_channel("ops")
+        results = await storage.search_notifications("release candidate")
+        assert results == []
+
+    @pytest.mark.asyncio
+    async def test_index_is_opt_in_and_budgeted(self):
+        """Test that search works without the index and the index counts toward the budget."""
+        plain = InMemoryStorage()
+        indexed = InMemoryStorage(search_index=True)
+        for storage in (plain, indexed):
+            for i in range(1, 4):
+                await storage.save_notification(make_notification(i, body=f"deploy step {i}"))
+
+        for storage in (plain, indexed):
+            results = await storage.search_notifications("deploy 2")
+            assert [r.notification.metadata.id for r in results] == ["ops-2"]
+            assert results[0].snippet == "[deploy] step [2]"
+
+        stats = indexed.get_memory_stats()
+        assert stats["search_index_bytes"] > 0
+        assert indexed.memory_bytes == plain.memory_bytes + stats["search_index_bytes"]
+        assert plain.get_memory_stats()["search_index_bytes"] == 0
+
+        await indexed.delete_channel("ops")
+        assert indexed.memory_bytes == 0
+
+
+class TestExpiry:
+    """Test expiry of notifications past their Context.validity."""
+
+    def test_expiry_heap_pops_due_in_order(self):
+        """Test that due items pop soonest first, bounded by limit."""
+        heap = ExpiryHeap()
+        for expires_at, item in [(30.0, "c"), (10.0, "a"), (20.0, "b"), (99.0, "z")]:
+            heap.push(expires_at, item)
+
+        assert heap.pop_due(25.0, limit=10) == ["a", "b"]
+        assert heap.pop_due(50.0, limit=10) == ["c"]
+        heap.prune(lambda item: item != "z")
+        assert len(heap) == 0
+
+    @pytest.mark.asyncio
+    async def test_reads_hide_expired(self):
+        """Test that history, pages, counts and search skip expired notifications."""
+        storage = InMemoryStorage()
+        past = datetime.now() - timedelta(minutes=1)
+        future = datetime.now() + timedelta(hours=1)
+        for i in range(1, 7):
+            await storage.save_notification(
+                make_notification(i, "ops", body="deploy", validity=past if i % 2 else future)
+            )
+
+        history = await storage.get_notifications("ops", limit=2)
+        assert [n.metadata.sequence for n in history] == [4, 6]
+        page = await storage.get_notifications_page("ops", limit=2, after=1)
+        assert [n.metadata.sequence for n in page] == [4, 2]
+        assert await storage.get_notification_count("ops") == 3
+        assert await storage.get_notification("ops", "ops-1") is None
+        results = await storage.search_notifications("deploy")
+        assert {r.notification.metadata.sequence for r in results} == {2, 4, 6}
+
+    @pytest.mark.asyncio
+    async def test_count_skips_expired_without_scanning(self, monkeypatch):
+        """Test that counts subtract due records without walking the history."""
+        storage = InMemoryStorage(max_history_per_channel=5)
+        past = datetime.now() - timedelta(minutes=1)
+        future = datetime.now() + timedelta(hours=1)
+        for i in range(1, 9):
+            await storage.save_notification(
+                make_notification(i, "ops", validity=past if i % 2 else future)
+            )
+
+        def no_scan(self):
+            raise AssertionError("history was scanned")
+
+        with monkeypatch.context() as patched:
+            patched.setattr(RingBuffer, "__iter__", no_scan)
+            assert await storage.get_notification_count("ops") == 3
+
+            # Expired 5 leaves through the ring buffer before it is purged
+            for i in range(9, 11):
+                await storage.save_notification(make_notification(i, "ops"))
+            assert await storage.get_notification_count("ops") == 4
+
+        assert await storage.purge_expired() == 1
+        assert await storage.get_notification_count("ops") == 4
+        assert [n.metadata.sequence for n in await storage.get_notifications("ops")] == [
+            6, 8, 9, 10
+        ]
+
+    @pytest.mark.asyncio
+    async def test_purge_in_batches(self):
+        """Test batched purges release memory and keep the latest sequence."""
+        storage = InMemoryStorage()
+        past = datetime.now() - timedelta(minutes=1)
+        for i in range(1, 11):
+            await storage.save_notification(make_notification(i, "ops", validity=past))
+        await storage.save_notification(make_notification(11, "ops"))
+
+        assert await storage.purge_expired(batch_size=4) == 4
+        assert await storage.purge_expired(batch_size=100) == 6
+        assert await storage.purge_expired() == 0
+
+        remaining = await storage.get_notifications("ops")
+        assert [n.metadata.id for n in remaining] == ["ops-11"]
+        assert storage.memory_bytes == CompactNotification.from_notification(
+            remaining[0]
+        ).size
+        assert await storage.get_latest_sequence("ops") == 11
+
+    @pytest.mark.asyncio
+    async def test_purge_skips_evicted_records(self):
+        """Test that records already evicted by max_history are not purged twice."""
+        storage = InMemoryStorage(max_history_per_channel=2)
+        past = datetime.now() - timedelta(minutes=1)
+        for i in range(1, 6):
+            await storage.save_notification(make_notification(i, "ops", validity=past))
+
+        assert await storage.purge_expired() == 2
+        assert storage.memory_bytes == 0
+        assert await storage.get_latest_sequence("ops") == 5
+
+    @pytest.mark.asyncio
+    async def test_reaper_pass(self):
+        """Test that a reaper pass drains every batch."""
+        storage = InMemoryStorage()
+        past = datetime.now() - timedelta(minutes=1)
+        for i in range(1, 8):
+            await storage.save_notification(make_notification(i, "ops", validity=past))
+
+        reaper = ExpiryReaper(storage, interval=60.0, batch_size=3)
+        assert await reaper.reap() == 7
+        assert await storage.get_notification_count("ops") == 0
+
+        reaper.start()
+        await reaper.stop()
+
+
+class TestCachingStorageAdapter:
+    """Test the read-through caching wrapper."""
+
+    def _wrap(self, tail_size: int = 0):
+        backend = InMemoryStorage()
+        clock = FakeClock()
+        cache = CachingStorageAdapter(backend, ttl=10, tail_size=tail_size, clock=clock)
+        return cache, backend, clock
+
+    def _channel(self, channel_id: str, name: str | None = None) -> Channel:
+        return Channel(
+            id=channel_id, name=name or channel_id, createdAt=datetime.now(), createdBy="u"
+        )
+
+    @pytest.mark.asyncio
+    async def test_channel_read_through_ttl_and_invalidation(self):
+        """Test hits, TTL expiry and invalidation by writes through the wrapper."""
+        cache, backend, clock = self._wrap()
+        assert await cache.get_channel("ops") is None  # Misses are cached too
+        await cache.save_channel(self._channel("ops"))
+        assert (await cache.get_channel("ops")).name == "ops"
+        assert (await cache.get_channel("ops")).name == "ops"
+
+        # A write behind the cache's back is only seen after the TTL
+        await backend.save_channel(self._channel("ops", "Operations"))
+        assert (await cache.get_channel("ops")).name == "ops"
+        clock.now += 11
+        assert (await cache.get_channel("ops")).name == "Operations"
+
+        stats = cache.cache_stats()["channels"]
+        assert (stats.hits, stats.misses) == (2, 3)
+        assert stats.hit_rate == pytest.approx(0.4)
+
+        await cache.delete_channel("ops")
+        assert await cache.get_channel("ops") is None
+
+    @pytest.mark.asyncio
+    async def test_publish_keeps_channel_cached(self):
+        """Test that stats bumps update cached channels and the channel list."""
+        cache, _, _ = self._wrap()
+        for channel_id in ("ops", "dev"):
+            await cache.save_channel(self._channel(channel_id))
+        assert [c.id for c in await cache.list_channels()] == ["ops", "dev"]
+
+        timestamp = datetime(2025, 6, 1)
+        await cache.record_channel_notification("ops", timestamp, count=3)
+        channel = await cache.get_channel("ops")
+        assert (channel.notificationCount, channel.lastNotificationAt) == (3, timestamp)
+        listed = {c.id: c for c in await cache.list_channels()}
+        assert listed["ops"].notificationCount == 3
+        assert cache.cache_stats()["channel_list"].hits == 1
+
+    @pytest.mark.asyncio
+    async def test_subscription_lists(self):
+        """Test that subscription writes invalidate the cached lists."""
+        cache, _, _ = self._wrap()
+        await cache.save_channel(self._channel("ops"))
+        assert await cache.get_subscriptions_by_channel("ops") == []
+
+        await cache.save_subscription(
+            Subscription(id="s1", clientId="c1", channel="ops", subscribedAt=datetime.now())
+        )
+        assert [s.id for s in await cache.get_subscriptions_by_channel("ops")] == ["s1"]
+        assert [s.id for s in await cache.get_subscriptions_by_client("c1")] == ["s1"]
+        assert [s.id for s in await cache.get_subscriptions_by_client_and_channel("c1", "ops")] == [
+            "s1"
+        ]
+
+        await cache.delete_subscription("s1")
+        assert await cache.get_subscriptions_by_channel("ops") == []
+        assert await cache.get_subscriptions_by_client("c1") == []
+
+    @pytest.mark.asyncio
+    async def test_bulk_lookups(self):
+        """Test that batch lookups load only uncached entries and fill the caches."""
+        cache, backend, _ = self._wrap()
+        for channel_id in ("ops", "dev"):
+            await cache.save_channel(self._channel(channel_id))
+        await cache.save_subscriptions(
+            [
+                Subscription(id=f"s-{c}", clientId="c1", channel=c, subscribedAt=datetime.now())
+                for c in ("ops", "dev")
+            ]
+        )
+        await cache.get_channel("ops")
+
+        loaded = []
+        get_channels = backend.get_channels
+
+        async def tracking_get_channels(channel_ids):
+            loaded.append(channel_ids)
+            return await get_channels(channel_ids)
+
+        backend.get_channels = tracking_get_channels
+        channels = await cache.get_channels(["ops", "dev", "missing"])
+        assert sorted(channels) == ["dev", "ops"]
+        assert loaded == [["dev", "missing"]]
+        await cache.get_channels(["dev", "missing"])
+        assert len(loaded) == 1
+
+        by_channel = await cache.get_subscriptions_by_channels(["dev", "ops"])
+        assert {c: [s.id for s in subs] for c, subs in by_channel.items()} == {
+            "dev": ["s-dev"],
+            "ops": ["s-ops"],
+        }
+        assert [s.id for s in await cache.get_subscriptions_by_channel("ops")] == ["s-ops"]
+        assert cache.cache_stats()["subscriptions_by_channel"].hits == 1
+
+        await cache.delete_subscriptions(["s-ops"])
+        assert (await cache.get_subscriptions_by_channels(["ops"]))["ops"] == []
+
+    @pytest.mark.asyncio
+    async def test_write_during_miss_is_not_undone(self):
+        """Test that a load racing an invalidating write does not cache stale data."""
+        cache, backend, _ = self._wrap()
+        await cache.save_channel(self._channel("ops"))
+        release = asyncio.Event()
+        load_channel = backend.get_channel
+
+        async def slow_get_channel(channel_id):
+            channel = await load_channel(channel_id)
+            await release.wait()
+            return channel
+
+        backend.get_channel = slow_get_channel
+        pending = asyncio.create_task(cache.get_channel("ops"))
+        await asyncio.sleep(0)
+        await cache.save_channel(self._channel("ops", "Renamed"))
+        release.set()
+        assert (await pending).name == "ops"  # The stale read itself is returned once...
+        assert (await cache.get_channel("ops")).name == "Renamed"  # ...but not cached
+
+    @pytest.mark.asyncio
+    async def test_tail_cache_pages(self):
+        """Test that history pages inside the tail match the backend."""
+        cache, backend, _ = self._wrap(tail_size=5)
+        await cache.save_notifications([make_notification(i, "ops") for i in range(1, 11)])
+
+        async def sequences(storage, **cursor):
+            page = await storage.get_notifications_page("ops", **cursor)
+            return [n.metadata.sequence for n in page]
+
+        cursors = [
+            {"limit": 3},
+            {"limit": 5},
+            {"limit": 8},
+            {"limit": 2, "before": 9},
+            {"limit": 4, "before": 8},
+            {"limit": 3, "after": 7},
+            {"limit": 10, "after": 4},
+            {"limit": 10, "after": 2},
+        ]
+        for cursor in cursors:
+            assert await sequences(cache, **cursor) == await sequences(backend, **cursor)
+
+        # Publishes extend the tail; pages covered by it are hits
+        await cache.save_notification(make_notification(11, "ops"))
+        hits = cache.cache_stats()["tail"].hits
+        assert await sequences(cache, limit=5) == [11, 10, 9, 8, 7]
+        assert cache.cache_stats()["tail"].hits == hits + 1
+
+        # Expired notifications are skipped like the backend does
+        past = datetime.now() - timedelta(minutes=1)
+        await cache.save_notification(make_notification(12, "ops", validity=past))
+        assert await sequences(cache, limit=2) == await sequences(backend, limit=2) == [11, 10]
+
+    def test_rejects_invalid_options(self):
+        """Test option validation."""
+        with pytest.raises(ValueError):
+            CachingStorageAdapter(InMemoryStorage(), ttl=0)
+        with pytest.raises(ValueError):
+            CachingStorageAdapter(InMemoryStorage(), tail_size=-1)
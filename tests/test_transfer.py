@@ -0,0 +1,193 @@
+"""Tests for the CLI data commands: export, import and backup."""
+
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+
+from notify_mcp.__main__ import main
+from notify_mcp.models import (
+    Channel,
+    Subscription,
+)
+from notify_mcp.storage.journal import MemoryJournal
+from notify_mcp.storage.memory import InMemoryStorage
+from notify_mcp.storage.sqlite_storage import SQLiteStorage
+from notify_mcp.storage.transfer import export_file, export_lines, import_file, import_lines
+from tests.conftest import make_notification
+
+
+async def populate(storage, notifications_per_channel: int = 25) -> None:
+    """Fill a store with two channels, a subscription and notifications."""
+    for channel_id in ("ops", "dev"):
+        await storage.save_channel(
+            Channel(id=channel_id, name=channel_id, createdAt=datetime.now(), createdBy="u")
+        )
+        for i in range(1, notifications_per_channel + 1):
+            await storage.save_notification(make_notification(i, channel_id, tags=["t"]))
+    await storage.save_subscription(
+        Subscription(id="sub-1", clientId="client", channel="ops", subscribedAt=datetime.now())
+    )
+
+
+async def history(storage, channel: str) -> list[str]:
+    """Notification IDs of a channel, newest first."""
+    page = await storage.get_notifications_page(channel, limit=1000)
+    return [n.metadata.id for n in page]
+
+
+class TestTransfer:
+    """Test streaming export and import between backends."""
+
+    async def test_memory_to_sqlite_round_trip(self, tmp_path):
+        """Test that an export from memory storage imports into SQLite unchanged."""
+        source = InMemoryStorage()
+        await populate(source)
+
+        path = tmp_path / "export.ndjson"
+        exported = await export_file(source, path, page_size=7)
+        assert (exported.channels, exported.subscriptions, exported.notifications) == (2, 1, 50)
+        assert exported.rows_per_second > 0
+
+        target = SQLiteStorage(db_path=str(tmp_path / "target.db"))
+        await target.initialize()
+        imported = await import_file(target, path, batch_size=10)
+        assert imported.rows == exported.rows
+
+        for channel in ("ops", "dev"):
+            assert await history(target, channel) == await history(source, channel)
+        assert [s.id for s in await target.get_subscriptions_by_channel("ops")] == ["sub-1"]
+        assert await target.get_latest_sequence("ops") == 25
+        await target.close()
+
+    async def test_lines_are_ordered_and_versioned(self):
+        """Test the header, channel-first ordering and oldest-first notifications."""
+        source = InMemoryStorage()
+        await populate(source, notifications_per_channel=3)
+
+        lines = [json.loads(line) async for line in export_lines(source, page_size=2)]
+        assert "version" in lines[0]
+        ops = [line["op"] for line in lines[1:]]
+        assert ops[:2] == ["save_channel", "save_channel"]
+        saved = [
+            line["data"]["metadata"] for line in lines if line.get("op") == "save_notification"
+        ]
+        ops_ids = [metadata["id"] for metadata in saved if metadata["channel"] == "ops"]
+        assert ops_ids == ["ops-1", "ops-2", "ops-3"]
+
+    async def test_subscriptions_are_read_per_channel(self, monkeypatch):
+        """Test that subscriptions are fetched as each channel is streamed, not all up front."""
+        source = InMemoryStorage()
+        await populate(source, notifications_per_channel=3)
+        fetched = []
+        original = source.get_subscriptions_by_channel
+
+        async def spy(channel):
+            fetched.append(channel)
+            return await original(channel)
+
+        monkeypatch.setattr(source, "get_subscriptions_by_channel", spy)
+
+        lines = export_lines(source)
+        async for line in lines:
+            if json.loads(line).get("op") == "save_subscription":
+                break
+        assert fetched == ["ops"]
+        async for _ in lines:
+            pass
+        assert fetched == ["ops", "dev"]
+
+    async def test_gzip_and_snapshot_import(self, tmp_path):
+        """Test compressed exports and importing a memory storage snapshot."""
+        source = InMemoryStorage(journal=MemoryJournal(tmp_path / "journal"))
+        await source.initialize()
+        await populate(source, notifications_per_channel=5)
+
+        path = tmp_path / "export.ndjson.gz"
+        await export_file(source, path)
+        with gzip.open(path, "rt") as f:
+            assert sum(1 for _ in f) == 1 + 2 + 1 + 10
+
+        await source.snapshot()
+        await source.close()
+
+        for dump in (path, tmp_path / "journal" / "snapshot.ndjson"):
+            target = InMemoryStorage()
+            stats = await import_file(target, dump)
+            assert stats.notifications == 10
+            assert await history(target, "dev") == await history(source, "dev")
+
+    async def test_rejects_unknown_entries(self):
+        """Test that unsupported versions and unknown ops fail loudly."""
+        with pytest.raises(ValueError):
+            await import_lines(InMemoryStorage(), ['{"version": 99}'])
+        with pytest.raises(ValueError):
+            await import_lines(InMemoryStorage(), ['{"version": 1}', '{"op": "drop", "data": 1}'])
+
+    async def test_cli_export_import(self, tmp_path, monkeypatch, capsys):
+        """Test the export and import subcommands against configured SQLite stores."""
+        monkeypatch.setenv("NOTIFY_MCP_STORAGE_TYPE", "sqlite")
+        monkeypatch.setenv("NOTIFY_MCP_SQLITE_PATH", str(tmp_path / "source.db"))
+        source = SQLiteStorage(db_path=str(tmp_path / "source.db"))
+        await source.initialize()
+        await populate(source, notifications_per_channel=4)
+        await source.close()
+
+        path = str(tmp_path / "backup.ndjson")
+        await main(["export", path])
+        assert "Exported 2 channels, 1 subscriptions, 8 notifications" in capsys.readouterr().out
+
+        monkeypatch.setenv("NOTIFY_MCP_SQLITE_PATH", str(tmp_path / "target.db"))
+        await main(["import", path, "--batch-size", "3"])
+        assert "rows/s" in capsys.readouterr().out
+
+        target = SQLiteStorage(db_path=str(tmp_path / "target.db"))
+        await target.initialize()
+        assert await history(target, "ops") == ["ops-4", "ops-3", "ops-2", "ops-1"]
+        await target.close()
+
+    async def test_cli_backup(self, tmp_path, monkeypatch, capsys):
+        """Test the backup subcommand and its storage type check."""
+        monkeypatch.setenv("NOTIFY_MCP_STORAGE_TYPE", "sqlite")
+        monkeypatch.setenv("NOTIFY_MCP_SQLITE_PATH", str(tmp_path / "live.db"))
+        source = SQLiteStorage(db_path=str(tmp_path / "live.db"))
+        await source.initialize()
+        await populate(source, notifications_per_channel=3)
+
+        await main(["backup", str(tmp_path / "copy.db"), "--pages", "2"])
+        assert "Backed up" in capsys.readouterr().out
+        await source.close()
+
+        copy = SQLiteStorage(db_path=str(tmp_path / "copy.db"))
+        await copy.initialize()
+        assert await history(copy, "dev") == ["dev-3", "dev-2", "dev-1"]
+        await copy.close()
+
+        monkeypatch.setenv("NOTIFY_MCP_STORAGE_TYPE", "memory")
+        with pytest.raises(SystemExit):
+            await main(["backup", str(tmp_path / "copy.db")])
+
+    async def test_cli_backup_uses_configured_pragmas(self, tmp_path, monkeypatch, capsys):
+        """Test that the backup connections get the server's configured pragmas."""
+        monkeypatch.setenv("NOTIFY_MCP_STORAGE_TYPE", "sqlite")
+        monkeypatch.setenv("NOTIFY_MCP_SQLITE_PATH", str(tmp_path / "live.db"))
+        monkeypatch.setenv("NOTIFY_MCP_SQLITE_PRAGMAS", '{"cache_size": -1234}')
+        source = SQLiteStorage(db_path=str(tmp_path / "live.db"))
+        await source.initialize()
+        await populate(source, notifications_per_channel=3)
+        await source.close()
+
+        applied = []
+        apply_pragmas = SQLiteStorage._apply_pragmas
+
+        def spy(self, dbapi_connection, read_only=False):
+            apply_pragmas(self, dbapi_connection, read_only)
+            applied.append(
+                (read_only, dbapi_connection.execute("PRAGMA cache_size").fetchone()[0])
+            )
+
+        monkeypatch.setattr(SQLiteStorage, "_apply_pragmas", spy)
+        await main(["backup", str(tmp_path / "copy.db")])
+        assert "Backed up" in capsys.readouterr().out
+        assert sorted(applied) == [(False, -1234), (True, -1234)]